@@ -15,7 +15,7 @@ from datetime import timedelta
 # Importiere Utility-Funktionen
 from utils.logger import log
 from utils.database import init_all_dbs
-from utils.provider import init_services
+from utils.provider import init_services, start_prompt_watcher, start_cortex_job_queue
 from utils.helpers import ensure_env_file
 from utils.access_control import check_access
 
@@ -108,6 +108,8 @@ def check_ip_access():
 
 def start_flask_server(host, port):
     """Startet den Flask-Server in einem separaten Thread."""
+    start_prompt_watcher()
+    start_cortex_job_queue()
     app.run(host=host, port=port, debug=False, use_reloader=False)
 
 
@@ -355,6 +357,8 @@ if __name__ == '__main__':
             migrate_settings()
             log.info("Server running at: http://%s:%s", host, server_port)
             log.info("Web UI & Backend developed by Sakushi-Dev")
+            start_prompt_watcher()
+            start_cortex_job_queue()
             app.run(host=host, port=server_port, debug=False)
     else:
         # Fallback: Normaler Flask-Server ohne GUI-Fenster
@@ -368,6 +372,8 @@ if __name__ == '__main__':
             log.info("Flask-Backend auf http://%s:%s", host, server_port)
         else:
             log.info("Server running at: http://%s:%s", host, server_port)
+        start_prompt_watcher()
+        start_cortex_job_queue()
         app.run(host=host, port=server_port, debug=False)
 
 
@@ -0,0 +1,40 @@
+"""
+benchmarks – Offline-Lasttests und Benchmarks für PersonaUI.
+
+Enthält:
+- mock_api:   Lokaler Anthropic-kompatibler HTTP-Stub (messages.create,
+              SSE-Streaming, tool_use Rounds, Transcript-Replay)
+- load_test:  Last-Treiber für Chat-Stream, Afterthought und Cortex Tool-Loop
+              (p50/p99 Time-to-First-Chunk, Durchsatz)
+- route_bench: Chat-/Session-/Cortex-Endpunkte über den Flask-Test-Client,
+              Latenz zerlegt in Phasen (environment.py, phases.py)
+- compare:    Gegenüberstellung zweier route_bench Ergebnisse (JSON)
+- prompt_build: Microbenchmark für PromptEngine.build_system_prompt()
+- engine_startup: Kalt-/Warmstart der PromptEngine (Load-Cache, Lazy-Init)
+- prompt_search: Editor-Suche und Placeholder-Verwendung, Index vs. Scan
+              (synthetisches Manifest mit 1.000+ Prompts)
+- validation: Vollvalidierung vs. inkrementeller Validierungsgraph
+              (synthetisches Manifest mit 2.000 Prompts)
+- prompt_archive: Durchsatz von ZIP-Export/-Import (Hash-Dedup, Dry-Run)
+- recall_index: Aufbau und top_k-Latenz des BM25-Recall-Index
+              (synthetische Persona-DB mit 100.000 Nachrichten)
+- cortex_patch: Cortex-Update mit Patch-Tools vs. write_file
+              (Tool-Rounds, Tokens, Wall-Time gegen die Mock-API)
+- cortex_incremental: Folge-Updates mit vollem Kontextfenster vs. nur neuen
+              Nachrichten seit dem Memory-Marker (Input-Tokens pro Update)
+
+Alle Skripte laufen ohne Netzwerkzugang und ohne echten API-Key:
+    cd src
+    python -m benchmarks.load_test --scenario all --concurrency 8
+    python -m benchmarks.route_bench --sessions 20 --messages 1000
+    python -m benchmarks.prompt_build --iterations 500
+    python -m benchmarks.engine_startup --iterations 20
+    python -m benchmarks.prompt_search --prompts 1000
+    python -m benchmarks.validation --prompts 2000
+    python -m benchmarks.prompt_archive --prompts 5000
+    python -m benchmarks.recall_index --items 100000
+    python -m benchmarks.cortex_patch --bullets 80
+    python -m benchmarks.cortex_incremental --updates 8 --every 32
+
+Ergebnisse (JSON) landen in benchmarks/results/ (nicht versioniert).
+"""
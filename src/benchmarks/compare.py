@@ -0,0 +1,71 @@
+"""
+Vergleich zweier Route-Benchmark Läufe (JSON aus route_bench.py).
+
+Zeigt pro Endpunkt p50/p99 der Gesamtdauer, TTFC und die Mittelwerte der
+Phasen mit relativer Änderung.
+
+Verwendung:
+    cd src
+    python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+"""
+
+import argparse
+import json
+from typing import Dict, Optional, Any
+
+
+def _delta(before: Optional[float], after: Optional[float]) -> str:
+    if before is None or after is None:
+        return ''
+    if before == 0:
+        return '   n/a'
+    return f'{(after - before) / before * 100:+6.1f}%'
+
+
+def _row(name: str, before: Optional[float], after: Optional[float]) -> str:
+    fmt = lambda v: f'{v:>9.1f}' if v is not None else f'{"–":>9}'  # noqa: E731
+    return f'    {name:<24}{fmt(before)} ms {fmt(after)} ms  {_delta(before, after)}'
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    """Erzeugt den Vergleich als Text."""
+    lines = [
+        f"Vorher:  {before.get('label') or '-'} ({before.get('timestamp')}, {before.get('git_revision')})",
+        f"Nachher: {after.get('label') or '-'} ({after.get('timestamp')}, {after.get('git_revision')})",
+    ]
+    if before.get('config') != after.get('config'):
+        lines.append('Achtung: unterschiedliche Konfiguration – Werte nur bedingt vergleichbar')
+
+    for endpoint, b in before.get('endpoints', {}).items():
+        a = after.get('endpoints', {}).get(endpoint)
+        if a is None:
+            continue
+        lines.append(f'{endpoint}')
+        lines.append(_row('total p50', b['total']['p50_ms'], a['total']['p50_ms']))
+        lines.append(_row('total p99', b['total']['p99_ms'], a['total']['p99_ms']))
+        if b.get('first_chunk') and a.get('first_chunk'):
+            lines.append(_row('first_chunk p50', b['first_chunk']['p50_ms'], a['first_chunk']['p50_ms']))
+        for phase in sorted(set(b['phases']) | set(a['phases'])):
+            lines.append(_row(
+                f'{phase} mean',
+                b['phases'].get(phase, {}).get('mean_ms'),
+                a['phases'].get(phase, {}).get('mean_ms'),
+            ))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vergleicht zwei Route-Benchmark Ergebnisse')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    with open(args.before, 'r', encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, 'r', encoding='utf-8') as f:
+        after = json.load(f)
+    print(compare(before, after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Cortex-Incremental Benchmark – volles Kontextfenster vs. nur neue Nachrichten.
+
+Eine Session wächst in Schritten von `--every` Nachrichten (≈ Tier-Schwelle);
+nach jedem Schritt läuft ein echtes CortexUpdateService.execute_update gegen
+die Mock-API (Standard-Tool-Loop: read_file → write_file → end_turn):
+    full        – incremental=False: jedes Update sendet die letzten
+                  context_limit Nachrichten, also überwiegend bereits
+                  eingearbeiteten Verlauf
+    incremental – Memory-Marker pro Session: nur die Nachrichten seit dem
+                  letzten Update plus CORTEX_UPDATE_OVERLAP_MESSAGES davor
+
+Gemessen werden Input-Tokens pro Update (kumuliert über alle Tool-Rounds,
+wie vom Mock gemeldet), gesendete Nachrichten und Wall-Time. Das erste Update
+einer Session ist in beiden Varianten identisch (noch kein Marker) und wird
+für den Vergleich separat ausgewiesen.
+
+Verwendung:
+    cd src
+    python -m benchmarks.cortex_incremental --updates 8 --every 32
+    python -m benchmarks.cortex_incremental --json results/cortex_incremental.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+# src/ als Importpfad (benchmarks/cortex_incremental.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.load_test import make_client, summarize_latencies  # noqa: E402
+from benchmarks.mock_api import MockAnthropicServer  # noqa: E402
+from utils.cortex.update_service import CORTEX_UPDATE_OVERLAP_MESSAGES, CortexUpdateService  # noqa: E402
+from utils.cortex_service import CortexService  # noqa: E402
+from utils.database import connection, create_session, save_message  # noqa: E402
+from utils.database.schema import init_persona_db  # noqa: E402
+from utils.logger import log  # noqa: E402
+
+MODES = ('full', 'incremental')
+
+_WORDS = ('Kaffee', 'Katze', 'Minka', 'Urlaub', 'Meer', 'Konzert', 'Bücher', 'Regen', 'Arbeit',
+          'Geburtstag', 'Fahrrad', 'Berge', 'Kochen', 'Pasta', 'Jazz', 'Freunde', 'Zug', 'Garten',
+          'heute', 'gestern', 'wirklich', 'vielleicht', 'erzählen', 'gefreut', 'morgen', 'schön')
+
+_CHARACTER = {'char_name': 'Mia', 'identity': 'Eine freundliche Begleiterin', 'core': '', 'background': ''}
+
+
+def _message(rng: random.Random) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(15, 45)))
+
+
+def _run_mode(mode: str, base_url: str, cortex: CortexService, updates: int, every: int,
+              seed: int) -> Dict[str, Any]:
+    """Eine Session, `updates` Schritte à `every` Nachrichten, je ein Update."""
+    rng = random.Random(seed)   # identischer Verlauf in beiden Varianten
+    session_id = create_session(f'bench_{mode}', persona_id='default')
+    service = CortexUpdateService()
+    client = make_client(base_url)
+    input_tokens, sent, durations = [], [], []
+
+    with patch.object(service, '_get_api_client', return_value=client), \
+            patch.object(service, '_get_cortex_service', return_value=cortex):
+        for step in range(updates):
+            for i in range(every):
+                save_message(_message(rng), i % 2 == 0, 'Mia', session_id=session_id)
+
+            start = time.perf_counter()
+            result = service.execute_update('default', session_id, respect_rate_limit=False,
+                                            incremental=mode == 'incremental')
+            durations.append(time.perf_counter() - start)
+            if not result['success']:
+                raise RuntimeError(f"{mode}, Update {step + 1}: {result['error']}")
+            input_tokens.append(result['usage']['input_tokens'])
+            sent.append(result['new_messages'] + result['overlap_messages'])
+
+    steady = input_tokens[1:] or input_tokens
+    return {
+        'first_update_input_tokens': input_tokens[0],
+        'input_tokens_per_update': round(sum(steady) / len(steady)),
+        'messages_per_update': round(sum(sent[1:] or sent) / len(sent[1:] or sent), 1),
+        'input_tokens_total': sum(input_tokens),
+        'wall': summarize_latencies(durations),
+    }
+
+
+def run_benchmark(updates: int = 8, every: int = 32, context_limit: int = 65,
+                  latency: float = 0.05, tps: float = 2000.0, seed: int = 7) -> Dict[str, Any]:
+    """Misst beide Varianten über denselben synthetischen Gesprächsverlauf."""
+    results: Dict[str, Any] = {'updates': updates, 'every': every, 'context_limit': context_limit,
+                               'overlap': CORTEX_UPDATE_OVERLAP_MESSAGES}
+
+    with tempfile.TemporaryDirectory(prefix='personaui_cortex_incremental_') as data_dir, \
+            patch.object(connection, 'DATA_DIR', data_dir), \
+            patch('utils.cortex_service.get_cortex_dir', return_value=os.path.join(data_dir, 'cortex')), \
+            patch.object(CortexUpdateService, '_get_context_limit', return_value=context_limit), \
+            patch.object(CortexUpdateService, '_get_prompt_engine', return_value=None), \
+            patch.object(CortexUpdateService, '_load_character', return_value=_CHARACTER), \
+            patch.object(CortexUpdateService, '_load_user_profile', return_value={'user_name': 'Alex'}):
+        init_persona_db('default')
+        cortex = CortexService(MagicMock())
+        server = MockAnthropicServer(latency=latency, tokens_per_second=tps, seed=42)
+        with server:
+            for mode in MODES:
+                results[mode] = _run_mode(mode, server.base_url, cortex, updates, every, seed)
+
+    full, incremental = results['full'], results['incremental']
+    results['input_token_reduction'] = round(
+        1 - incremental['input_tokens_per_update'] / full['input_tokens_per_update'], 3)
+    results['total_input_token_reduction'] = round(
+        1 - incremental['input_tokens_total'] / full['input_tokens_total'], 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cortex-Update: volles Kontextfenster vs. inkrementell')
+    parser.add_argument('--updates', type=int, default=8, help='Updates pro Session')
+    parser.add_argument('--every', type=int, default=32, help='Neue Nachrichten zwischen zwei Updates')
+    parser.add_argument('--context-limit', type=int, default=65)
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock: Sekunden bis zum ersten Token')
+    parser.add_argument('--tps', type=float, default=2000.0, help='Mock: Tokens pro Sekunde')
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(args.updates, args.every, args.context_limit, args.latency, args.tps)
+
+    print(f"{results['updates']} Updates, alle {results['every']} Nachrichten, "
+          f"contextLimit={results['context_limit']}, Überlappung={results['overlap']}")
+    for mode in MODES:
+        stats = results[mode]
+        print(f"    {mode:<12} erstes Update in={stats['first_update_input_tokens']}  "
+              f"danach in={stats['input_tokens_per_update']}/Update "
+              f"({stats['messages_per_update']} Nachrichten)  gesamt in={stats['input_tokens_total']}  "
+              f"wall p50={stats['wall']['p50_ms']}ms")
+    print(f"    Input-Tokens pro Folge-Update −{results['input_token_reduction']:.0%}, "
+          f"gesamt −{results['total_input_token_reduction']:.0%}")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
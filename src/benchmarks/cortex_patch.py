@@ -0,0 +1,198 @@
+"""
+Cortex-Patch Benchmark – Patch-Tools vs. vollständiges Neuschreiben.
+
+Ein Cortex-Update mit derselben Änderungsmenge (neue Bullets + geänderte
+Bullets in memory.md) läuft zweimal gegen die Mock-API:
+    rewrite – read_file → write_file mit dem kompletten neuen Inhalt → end_turn
+    patch   – read_file → append_bullet/replace_bullet (parallel) → end_turn;
+              ohne geänderte Bullets entfällt das Lesen
+
+Die Antworten der "KI" sind per Transcript vorgegeben; gemessen wird, was
+das Protokoll kostet: Tool-Rounds, Input-/Output-Tokens (kumuliert über alle
+Rounds, wie vom Mock gemeldet) und Wall-Time pro Update. Ausgeführt werden
+die Tools vom echten CortexUpdateService._execute_tool gegen echte
+Cortex-Dateien; beide Varianten müssen denselben Endinhalt ergeben.
+
+Verwendung:
+    cd src
+    python -m benchmarks.cortex_patch --bullets 80 --appends 3 --replaces 1
+    python -m benchmarks.cortex_patch --json results/cortex_patch.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+from unittest.mock import MagicMock, patch
+
+# src/ als Importpfad (benchmarks/cortex_patch.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.load_test import make_client, summarize_latencies, _HISTORY, _SYSTEM_PROMPT  # noqa: E402
+from benchmarks.mock_api import MockAnthropicServer, Transcript  # noqa: E402
+from utils.api_request import RequestConfig  # noqa: E402
+from utils.cortex.sections import append_bullet, replace_bullet  # noqa: E402
+from utils.cortex.update_service import (  # noqa: E402
+    CORTEX_TOOLS, CORTEX_UPDATE_MAX_TOKENS, CORTEX_UPDATE_TEMPERATURE, CortexUpdateService
+)
+from utils.cortex_service import MEMORY_TEMPLATE, CortexService  # noqa: E402
+from utils.database import connection  # noqa: E402
+from utils.logger import log  # noqa: E402
+
+MODES = ('rewrite', 'patch')
+
+_SECTIONS = ('About {{user}}', 'Shared Experiences', 'Details & Preferences', 'Important Events & Dates')
+_WORDS = ('Kaffee', 'Katze', 'Minka', 'Urlaub', 'Meer', 'Konzert', 'Bücher', 'Regen', 'Arbeit',
+          'Geburtstag', 'Fahrrad', 'Berge', 'Kochen', 'Pasta', 'Jazz', 'Freunde', 'Zug', 'Garten')
+
+
+def _bullet(rng: random.Random) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(5, 12)))
+
+
+def _seed_memory(bullets: int, rng: random.Random) -> str:
+    """memory.md-Template mit `bullets` Einträgen, reihum auf die Sektionen verteilt."""
+    content = MEMORY_TEMPLATE
+    for i in range(bullets):
+        content = append_bullet(content, _SECTIONS[i % len(_SECTIONS)], f"{i}: {_bullet(rng)}")
+    return content
+
+
+def _changes(initial: str, appends: int, replaces: int,
+             rng: random.Random) -> Tuple[List[Dict[str, Any]], str]:
+    """Tool-Calls der Patch-Variante und der daraus resultierende Endinhalt."""
+    calls: List[Dict[str, Any]] = []
+    content = initial
+    for i in range(replaces):
+        section = _SECTIONS[i % len(_SECTIONS)]
+        old_text = next(line[2:] for line in content.split(f"## {section}", 1)[1].splitlines()
+                        if line.startswith('- '))
+        new_text = f"{old_text} (aktualisiert)"
+        calls.append({'name': 'replace_bullet', 'input': {
+            'filename': 'memory.md', 'section': section, 'old_text': old_text, 'new_text': new_text}})
+        content = replace_bullet(content, section, old_text, new_text)
+    for i in range(appends):
+        section = _SECTIONS[(i + 1) % len(_SECTIONS)]
+        text = f"neu {i}: {_bullet(rng)}"
+        calls.append({'name': 'append_bullet', 'input': {
+            'filename': 'memory.md', 'section': section, 'text': text}})
+        content = append_bullet(content, section, text)
+    return calls, content
+
+
+def _tool_use(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {'content': [dict(call, type='tool_use') for call in calls], 'stop_reason': 'tool_use'}
+
+
+def _transcript(mode: str, calls: List[Dict[str, Any]], final: str, needs_read: bool) -> Transcript:
+    read = {'name': 'read_file', 'input': {'filename': 'memory.md'}}
+    if mode == 'rewrite':
+        steps = [[read], [{'name': 'write_file', 'input': {'filename': 'memory.md', 'content': final}}]]
+    else:
+        steps = ([[read]] if needs_read else []) + [calls]
+    responses = [dict(_tool_use(step), match={'tools': True, 'round': i + 1}) for i, step in enumerate(steps)]
+    responses.append({'match': {'tools': True}, 'text': 'Fertig.'})
+    return Transcript(responses, name=f'cortex_{mode}')
+
+
+def run_benchmark(bullets: int = 80, appends: int = 3, replaces: int = 1, iterations: int = 5,
+                  latency: float = 0.2, tps: float = 400.0, seed: int = 7) -> Dict[str, Any]:
+    """Misst beide Varianten mit identischer Änderungsmenge."""
+    rng = random.Random(seed)
+    initial = _seed_memory(bullets, rng)
+    calls, final = _changes(initial, appends, replaces, rng)
+    service = CortexUpdateService()
+    results: Dict[str, Any] = {'bullets': bullets, 'appends': appends, 'replaces': replaces,
+                               'file_chars': len(initial)}
+
+    with tempfile.TemporaryDirectory(prefix='personaui_cortex_patch_') as data_dir, \
+            patch.object(connection, 'DATA_DIR', data_dir), \
+            patch('utils.cortex_service.get_cortex_dir', return_value=os.path.join(data_dir, 'cortex')):
+        cortex = CortexService(MagicMock())
+        for mode in MODES:
+            transcript = _transcript(mode, calls, final, needs_read=replaces > 0)
+            server = MockAnthropicServer(latency=latency, tokens_per_second=tps, transcript=transcript, seed=42)
+            rounds, input_tokens, output_tokens, durations = [], [], [], []
+            with server:
+                client = make_client(server.base_url)
+                for _ in range(iterations):
+                    cortex.write_file('default', 'memory.md', initial)
+                    before = server.stats()['tool_rounds']
+
+                    def executor(tool_name: str, tool_input: dict):
+                        return service._execute_tool(cortex, 'default', tool_name, tool_input, [], [])
+
+                    start = time.perf_counter()
+                    response = client.tool_request(RequestConfig(
+                        system_prompt=_SYSTEM_PROMPT,
+                        messages=_HISTORY + [{'role': 'user', 'content': 'Aktualisiere deine Cortex-Dateien.'}],
+                        tools=CORTEX_TOOLS, max_tokens=CORTEX_UPDATE_MAX_TOKENS,
+                        temperature=CORTEX_UPDATE_TEMPERATURE, request_type='cortex_update',
+                    ), executor)
+                    durations.append(time.perf_counter() - start)
+                    if not response.success:
+                        raise RuntimeError(f"{mode}: {response.error}")
+                    if cortex.read_file('default', 'memory.md') != final:
+                        raise RuntimeError(f"{mode}: Endinhalt weicht ab")
+                    rounds.append(server.stats()['tool_rounds'] - before)
+                    input_tokens.append(response.usage['input_tokens'])
+                    output_tokens.append(response.usage['output_tokens'])
+
+            results[mode] = {
+                'rounds': max(rounds),
+                'input_tokens': max(input_tokens),
+                'output_tokens': max(output_tokens),
+                'wall': summarize_latencies(durations),
+            }
+
+    rewrite, patched = results['rewrite'], results['patch']
+    results['output_token_reduction'] = round(1 - patched['output_tokens'] / rewrite['output_tokens'], 3)
+    results['input_token_reduction'] = round(1 - patched['input_tokens'] / rewrite['input_tokens'], 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cortex-Update: Patch-Tools vs. write_file')
+    parser.add_argument('--bullets', type=int, default=80, help='Bullets in memory.md vor dem Update')
+    parser.add_argument('--appends', type=int, default=3)
+    parser.add_argument('--replaces', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2, help='Mock: Sekunden bis zum ersten Token')
+    parser.add_argument('--tps', type=float, default=400.0, help='Mock: Tokens pro Sekunde')
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(args.bullets, args.appends, args.replaces, args.iterations,
+                            args.latency, args.tps)
+
+    print(f"memory.md: {results['bullets']} Bullets ({results['file_chars']} Zeichen), "
+          f"Änderung: {results['appends']} neu, {results['replaces']} geändert")
+    for mode in MODES:
+        stats = results[mode]
+        print(f"    {mode:<8} rounds={stats['rounds']} in={stats['input_tokens']} out={stats['output_tokens']} "
+              f"wall p50={stats['wall']['p50_ms']}ms p99={stats['wall']['p99_ms']}ms")
+    print(f"    Output-Tokens −{results['output_token_reduction']:.0%}, "
+          f"Input-Tokens −{results['input_token_reduction']:.0%}")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
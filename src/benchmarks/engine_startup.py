@@ -0,0 +1,128 @@
+"""
+Engine-Startup Benchmark – Kalt- vs. Warmstart der PromptEngine.
+
+Misst auf einer Kopie von instructions/prompts:
+    cold_sequential – alle Dateien lesen, Domains nacheinander (kein Load-Cache)
+    cold_parallel   – alle Dateien lesen, Domains im Thread-Pool, Cache schreiben
+    warm            – Start aus dem Load-Cache (Quelldateien unverändert)
+    lazy            – PromptEngine(lazy=True): Dauer des Konstruktors und bis
+                      zum ersten build_system_prompt() (Warmstart)
+
+Persona-/Profil-Daten für den ersten Build kommen wie im Betrieb aus src/.
+
+Verwendung:
+    cd src
+    python -m benchmarks.engine_startup --iterations 20
+    python -m benchmarks.engine_startup --json results/startup.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+# src/ als Importpfad (benchmarks/engine_startup.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.load_test import summarize_latencies  # noqa: E402
+from benchmarks.prompt_build import DEFAULT_RUNTIME_VARS, INSTRUCTIONS_DIR  # noqa: E402
+from utils.logger import log  # noqa: E402
+from utils.prompt_engine import PromptEngine  # noqa: E402
+
+
+def _measure(run: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return summarize_latencies(samples)
+
+
+def run_benchmark(instructions_dir: str = INSTRUCTIONS_DIR, iterations: int = 10) -> Dict[str, Any]:
+    """Misst Kalt-, Warm- und Lazy-Start auf einer Kopie des Prompt-Verzeichnisses."""
+    with tempfile.TemporaryDirectory(prefix='personaui_startup_bench_') as root:
+        bench_dir = os.path.join(root, 'instructions')
+        shutil.copytree(os.path.join(instructions_dir, 'prompts'), os.path.join(bench_dir, 'prompts'))
+        cache_path = os.path.join(root, 'cache', 'prompt_engine.pickle')
+
+        # Einmal laden: Migration/User-Manifest anlegen, damit alle Läufe dieselben Dateien sehen
+        reference = PromptEngine(bench_dir, use_load_cache=False)
+        expected = reference.build_system_prompt('default', DEFAULT_RUNTIME_VARS)
+
+        def cold(workers: int):
+            def run():
+                PromptEngine.LOAD_WORKERS = workers
+                try:
+                    if os.path.exists(cache_path):
+                        os.remove(cache_path)
+                    PromptEngine(bench_dir, cache_path=cache_path)
+                finally:
+                    PromptEngine.LOAD_WORKERS = default_workers
+            return run
+
+        default_workers = PromptEngine.LOAD_WORKERS
+        results: Dict[str, Any] = {
+            'prompt_count': len(reference.get_all_prompts()),
+            'domain_files': len(reference._domains),
+            'load_workers': default_workers,
+            'cold_sequential': _measure(cold(1), iterations),
+            'cold_parallel': _measure(cold(default_workers), iterations),
+        }
+
+        # Cache für die Warmstarts einmal schreiben
+        PromptEngine(bench_dir, cache_path=cache_path)
+        warm_engine = PromptEngine(bench_dir, cache_path=cache_path)
+        results['warm_source'] = warm_engine.get_load_stats()['source']
+        results['warm'] = _measure(lambda: PromptEngine(bench_dir, cache_path=cache_path), iterations)
+
+        constructor, first_build = [], []
+        output = None
+        for _ in range(iterations):
+            start = time.perf_counter()
+            engine = PromptEngine(bench_dir, lazy=True, cache_path=cache_path)
+            constructor.append(time.perf_counter() - start)
+            output = engine.build_system_prompt('default', DEFAULT_RUNTIME_VARS)
+            first_build.append(time.perf_counter() - start)
+        results['lazy_constructor'] = summarize_latencies(constructor)
+        results['lazy_first_build'] = summarize_latencies(first_build)
+        results['identical_output'] = output == expected
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kalt-/Warmstart der PromptEngine')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(iterations=args.iterations)
+
+    print(f"{results['prompt_count']} Prompts, {results['domain_files']} Domain-Dateien, "
+          f"Warmstart aus {results['warm_source']}, identisch={results['identical_output']}")
+    for path in ('cold_sequential', 'cold_parallel', 'warm', 'lazy_constructor', 'lazy_first_build'):
+        stats = results[path]
+        print(f"    {path:<17} mean={stats['mean_ms']}ms p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark-Umgebung – Isolierte Daten, geseedete Persona-DBs und Flask-App.
+
+BenchEnvironment leitet alle schreibenden Pfade (Persona-DBs, Cortex-Dateien,
+cycle_state.json) in ein temporäres Verzeichnis um, startet die Mock-API und
+baut eine Flask-App mit allen Blueprints – ohne app.py (kein Splash, kein
+ensure_env_file). Prompts, Persona-Config und Settings werden nur gelesen.
+
+Verwendung:
+    with BenchEnvironment(sessions=10, messages_per_session=400) as env:
+        client = env.app.test_client()
+        client.get(f'/api/sessions/{env.session_ids[0]}')
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+from contextlib import ExitStack
+from typing import List, Optional
+from unittest.mock import patch
+
+from flask import Flask
+
+from benchmarks.mock_api import MockAnthropicServer
+from utils.sql_loader import sql, load_schema
+
+
+_USER_LINES = (
+    'Wie war dein Tag heute?',
+    'Ich habe gerade an unseren Urlaub am Meer gedacht.',
+    'Erzähl mir mehr über das Buch, das du gerade liest.',
+    'Manchmal weiß ich nicht, ob ich die richtige Entscheidung getroffen habe.',
+    'Was würdest du an einem freien Sonntag am liebsten machen?',
+)
+_BOT_LINES = (
+    'Oh, das klingt schön! Ich erinnere mich gut daran, wie wir darüber gesprochen haben.',
+    'Ich finde, du machst dir manchmal zu viele Gedanken – aber genau das mag ich an dir.',
+    'Lass uns das gemeinsam durchgehen, Schritt für Schritt, ganz in Ruhe.',
+    'Weißt du, ich habe letzte Nacht noch lange über deine Frage nachgedacht.',
+)
+
+
+def seed_persona_db(db_path: str, persona_id: str, sessions: int,
+                    messages_per_session: int, rng: random.Random) -> List[int]:
+    """
+    Legt eine Persona-DB an und füllt sie mit Sessions und Nachrichten.
+
+    Returns:
+        Liste der angelegten Session-IDs
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(load_schema())
+        conn.execute(sql('chat.upsert_db_info'), ('persona_id', persona_id))
+        session_ids = []
+        for i in range(sessions):
+            cursor = conn.execute(sql('sessions.create_session'), (f'Benchmark-Session {i + 1}', persona_id))
+            session_id = cursor.lastrowid
+            session_ids.append(session_id)
+            rows = []
+            for n in range(messages_per_session):
+                is_user = n % 2 == 0
+                lines = _USER_LINES if is_user else _BOT_LINES
+                text = ' '.join(rng.choice(lines) for _ in range(rng.randint(1, 2 if is_user else 6)))
+                rows.append((session_id, text, is_user, 'Bench'))
+            conn.executemany(sql('chat.insert_message'), rows)
+        conn.commit()
+        return session_ids
+    finally:
+        conn.close()
+
+
+class BenchEnvironment:
+    """
+    Isolierte Laufzeitumgebung für Route-Benchmarks.
+
+    Args:
+        sessions: Sessions in der DB der aktiven Persona
+        messages_per_session: Nachrichten pro Session
+        extra_personas: Zusätzliche Persona-DBs (gleiche Größe), die bei der
+            Session→Persona Auflösung mit durchsucht werden
+        latency / tokens_per_second / output_tokens: Parameter der Mock-API
+        keep_data: Temp-Verzeichnis nach dem Lauf nicht löschen
+    """
+
+    def __init__(self, sessions: int = 10, messages_per_session: int = 200,
+                 extra_personas: int = 0, latency: float = 0.05,
+                 tokens_per_second: float = 200.0, output_tokens: int = 80,
+                 seed: int = 42, keep_data: bool = False):
+        self.sessions = sessions
+        self.messages_per_session = messages_per_session
+        self.extra_personas = extra_personas
+        self.seed = seed
+        self.keep_data = keep_data
+        self.mock = MockAnthropicServer(
+            latency=latency, tokens_per_second=tokens_per_second,
+            output_tokens=output_tokens, seed=seed,
+        )
+
+        self.root: Optional[str] = None
+        self.app: Optional[Flask] = None
+        self.persona_id: Optional[str] = None
+        self.session_ids: List[int] = []
+        self._stack: Optional[ExitStack] = None
+
+    # ─── Aufbau ─────────────────────────────────────────────────────
+
+    def _redirect_paths(self, stack: ExitStack) -> None:
+        """Alle schreibenden Pfade auf das Temp-Verzeichnis umbiegen."""
+        from utils.database import connection
+        from utils import cortex_service
+        from utils.cortex import tier_tracker
+
+        data_dir = os.path.join(self.root, 'data')
+        cortex_dir = os.path.join(self.root, 'cortex')
+        os.makedirs(data_dir)
+        os.makedirs(cortex_dir)
+
+        stack.enter_context(patch.object(connection, 'DATA_DIR', data_dir))
+        stack.enter_context(patch.object(cortex_service, 'CORTEX_BASE_DIR', cortex_dir))
+        stack.enter_context(patch.object(cortex_service, 'CORTEX_DEFAULT_DIR', os.path.join(cortex_dir, 'default')))
+        stack.enter_context(patch.object(cortex_service, 'CORTEX_CUSTOM_DIR', os.path.join(cortex_dir, 'custom')))
+        stack.enter_context(patch.object(tier_tracker, '_STATE_FILE', os.path.join(self.root, 'cycle_state.json')))
+        stack.enter_context(patch.object(tier_tracker, '_cycle_state', {}))
+        stack.enter_context(patch.object(tier_tracker, '_loaded', True))
+
+    def _seed(self) -> None:
+        from utils.config import get_active_persona_id
+        from utils.database import get_db_path
+
+        rng = random.Random(self.seed)
+        self.persona_id = get_active_persona_id()
+        self.session_ids = seed_persona_db(
+            get_db_path(self.persona_id), self.persona_id,
+            self.sessions, self.messages_per_session, rng
+        )
+        for i in range(self.extra_personas):
+            pid = f'bench{i:03d}'
+            seed_persona_db(get_db_path(pid), pid, self.sessions, self.messages_per_session, rng)
+
+    def _build_app(self, stack: ExitStack) -> Flask:
+        from utils import provider
+        from routes import register_routes
+
+        # Services frisch gegen die Mock-API initialisieren, alte Singletons zurücksetzen
+        for name in ('_api_client', '_chat_service', '_cortex_service'):
+            stack.enter_context(patch.object(provider, name, None))
+        stack.enter_context(patch.dict(os.environ, {
+            'ANTHROPIC_API_KEY': 'mock-key',
+            'ANTHROPIC_BASE_URL': self.mock.base_url,
+        }))
+        provider.init_services()
+
+        api_client = provider.get_api_client()
+        # Benchmark misst Latenz, nicht das lokale Rate-Limit
+        api_client.scheduler.configure(requests_per_minute=0, tokens_per_minute=0)
+
+        app = Flask('personaui_benchmark')
+        app.json.sort_keys = False
+        register_routes(app)
+        return app
+
+    def __enter__(self) -> 'BenchEnvironment':
+        self.root = tempfile.mkdtemp(prefix='personaui_bench_')
+        self._stack = ExitStack()
+        try:
+            self.mock.start()
+            self._stack.callback(self.mock.stop)
+            self._redirect_paths(self._stack)
+            self._seed()
+            self.app = self._build_app(self._stack)
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._stack is not None:
+            self._stack.close()
+            self._stack = None
+        if self.root and not self.keep_data:
+            shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,280 @@
+"""
+Load-Test – Durchsatz und Latenz des ApiClient gegen die Mock-API.
+
+Szenarien (jeweils ein vollständiger Ablauf pro Iteration):
+    chat          – Chat-Stream (request_type='chat')
+    afterthought  – Decision-Request + Followup-Stream
+    cortex        – Cortex-Update Tool-Loop (read_file → write_file → end_turn)
+
+Gemessen wird pro Iteration die Time-to-First-Chunk (TTFC, ab Start des
+Ablaufs) und die Gesamtdauer. Ausgegeben werden p50/p99 sowie Requests
+und Output-Tokens pro Sekunde.
+
+Verwendung:
+    cd src
+    python -m benchmarks.load_test --scenario all --concurrency 8 --iterations 40
+    python -m benchmarks.load_test --scenario chat --tps 120 --json results/chat.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
+
+# src/ als Importpfad (benchmarks/load_test.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.mock_api import MockAnthropicServer  # noqa: E402
+from utils.api_request import ApiClient, RequestConfig, ResponseCache  # noqa: E402
+from utils.cortex.update_service import CORTEX_TOOLS  # noqa: E402
+from utils.logger import log  # noqa: E402
+from utils.provider import configure_api_scheduler  # noqa: E402
+
+
+SCENARIOS = ('chat', 'afterthought', 'cortex')
+
+# Grobe Nachbildung realer Payload-Größen
+_SYSTEM_PROMPT = ('Du bist TestPersona, eine freundliche Gesprächspartnerin. ' * 120).strip()
+_HISTORY = [
+    {'role': 'user' if i % 2 == 0 else 'assistant',
+     'content': f'Nachricht {i}: ' + 'Wir reden über den Urlaub am Meer. ' * 6}
+    for i in range(30)
+]
+_AFTERTHOUGHT_INSTRUCTION = (
+    'Innerer Dialog (afterthought): Möchtest du noch etwas ergänzen? '
+    'Beende mit [afterthought_OK] oder [i_can_wait].'
+)
+
+
+# ─── Statistik ───────────────────────────────────────────────────────────────
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-Rank Perzentil (None bei leerer Liste)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, Optional[float]]:
+    """Mittelwert/p50/p99/Max in Millisekunden."""
+    def _ms(v):
+        return round(v * 1000, 1) if v is not None else None
+    return {
+        'mean_ms': _ms(sum(values) / len(values) if values else None),
+        'p50_ms': _ms(percentile(values, 50)),
+        'p99_ms': _ms(percentile(values, 99)),
+        'max_ms': _ms(max(values) if values else None),
+    }
+
+
+# ─── Szenarien ───────────────────────────────────────────────────────────────
+
+def _consume_stream(client: ApiClient, config: RequestConfig, start: float, result: dict) -> None:
+    for event in client.stream(config):
+        if event.event_type == 'chunk':
+            if result['ttfc'] is None:
+                result['ttfc'] = time.perf_counter() - start
+        elif event.event_type == 'done':
+            result['output_tokens'] += event.data.get('output_tokens', 0)
+        elif event.event_type == 'error':
+            result['error'] = event.data
+
+
+def run_chat(client: ApiClient) -> dict:
+    start = time.perf_counter()
+    result = {'ttfc': None, 'output_tokens': 0, 'error': None}
+    config = RequestConfig(
+        system_prompt=_SYSTEM_PROMPT,
+        messages=_HISTORY + [{'role': 'user', 'content': 'Wie war dein Tag?'}],
+        max_tokens=500, stream=True, request_type='chat',
+    )
+    _consume_stream(client, config, start, result)
+    return result
+
+
+def run_afterthought(client: ApiClient) -> dict:
+    start = time.perf_counter()
+    result = {'ttfc': None, 'output_tokens': 0, 'error': None}
+    decision = client.request(RequestConfig(
+        system_prompt=_SYSTEM_PROMPT,
+        messages=_HISTORY + [{'role': 'user', 'content': _AFTERTHOUGHT_INSTRUCTION}],
+        max_tokens=1500, request_type='afterthought_decision',
+    ))
+    if not decision.success:
+        result['error'] = decision.error
+        return result
+    result['output_tokens'] += (decision.usage or {}).get('output_tokens', 0)
+
+    if decision.content.split()[-1].strip('.,!?:;').lower() == '[afterthought_ok]':
+        config = RequestConfig(
+            system_prompt=_SYSTEM_PROMPT,
+            messages=_HISTORY + [
+                {'role': 'assistant', 'content': decision.content},
+                {'role': 'user', 'content': 'Sprich deinen Gedanken aus.'},
+            ],
+            max_tokens=500, stream=True, request_type='afterthought_followup',
+        )
+        _consume_stream(client, config, start, result)
+    return result
+
+
+def run_cortex(client: ApiClient) -> dict:
+    files = {'memory.md': '# Erinnerungen\n', 'soul.md': '# Seele\n', 'relationship.md': '# Beziehung\n'}
+
+    def executor(tool_name: str, tool_input: dict):
+        filename = tool_input.get('filename', '')
+        if tool_name == 'read_file':
+            return True, files.get(filename, '')
+        if tool_name == 'write_file':
+            files[filename] = tool_input.get('content', '')
+            return True, f"File '{filename}' successfully updated."
+        return False, f"Unknown tool: '{tool_name}'"
+
+    response = client.tool_request(RequestConfig(
+        system_prompt=_SYSTEM_PROMPT,
+        messages=_HISTORY + [{'role': 'user', 'content': 'Aktualisiere deine Cortex-Dateien.'}],
+        max_tokens=8192, temperature=0.4, request_type='cortex_update', tools=CORTEX_TOOLS,
+    ), executor)
+    return {
+        # Tool-Loop streamt nicht → nur Gesamtdauer aussagekräftig
+        'ttfc': None,
+        'output_tokens': (response.usage or {}).get('output_tokens', 0),
+        'error': None if response.success else response.error,
+    }
+
+
+_RUNNERS: Dict[str, Callable[[ApiClient], dict]] = {
+    'chat': run_chat,
+    'afterthought': run_afterthought,
+    'cortex': run_cortex,
+}
+
+
+# ─── Treiber ─────────────────────────────────────────────────────────────────
+
+def make_client(base_url: str, respect_rate_limit: bool = False) -> ApiClient:
+    """ApiClient gegen die Mock-API (ohne Response-Cache, optional mit dem lokalen Rate-Limit der Settings)."""
+    client = ApiClient(api_key='mock-key', base_url=base_url,
+                       response_cache=ResponseCache(request_types=()))
+    if respect_rate_limit:
+        configure_api_scheduler(client)
+    else:
+        client.scheduler.configure(requests_per_minute=0, tokens_per_minute=0)
+    return client
+
+
+def run_scenario(client: ApiClient, scenario: str, iterations: int, concurrency: int) -> Dict[str, Any]:
+    """Führt ein Szenario `iterations` Mal mit `concurrency` Threads aus."""
+    runner = _RUNNERS[scenario]
+
+    def _timed(_):
+        start = time.perf_counter()
+        try:
+            outcome = runner(client)
+        except Exception as e:  # Lasttest soll weiterlaufen
+            outcome = {'ttfc': None, 'output_tokens': 0, 'error': str(e)}
+        outcome['total'] = time.perf_counter() - start
+        return outcome
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f'load-{scenario}') as pool:
+        outcomes = list(pool.map(_timed, range(iterations)))
+    wall = time.perf_counter() - wall_start
+
+    ok = [o for o in outcomes if not o['error']]
+    output_tokens = sum(o['output_tokens'] for o in ok)
+    return {
+        'scenario': scenario,
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'errors': len(outcomes) - len(ok),
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(ok) / wall, 2) if wall else 0.0,
+        'output_tokens_per_second': round(output_tokens / wall, 1) if wall else 0.0,
+        'ttfc': summarize_latencies([o['ttfc'] for o in ok if o['ttfc'] is not None]),
+        'total': summarize_latencies([o['total'] for o in ok]),
+        'sample_error': next((o['error'] for o in outcomes if o['error']), None),
+    }
+
+
+def _fmt_ms(value: Optional[float]) -> str:
+    return f'{value}ms' if value is not None else '–'
+
+
+def _print_result(result: Dict[str, Any]) -> None:
+    ttfc, total = result['ttfc'], result['total']
+    print(
+        f"{result['scenario']:<13} "
+        f"n={result['iterations']:<4} c={result['concurrency']:<3} "
+        f"err={result['errors']:<3} "
+        f"TTFC p50={_fmt_ms(ttfc['p50_ms'])} p99={_fmt_ms(ttfc['p99_ms'])}  "
+        f"Gesamt p50={_fmt_ms(total['p50_ms'])} p99={_fmt_ms(total['p99_ms'])}  "
+        f"{result['throughput_rps']} req/s  {result['output_tokens_per_second']} tok/s"
+    )
+    if result['sample_error']:
+        print(f"    Beispiel-Fehler: {result['sample_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-Test des ApiClient gegen die Mock-API')
+    parser.add_argument('--scenario', choices=SCENARIOS + ('all',), default='all')
+    parser.add_argument('--iterations', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2, help='Mock: Sekunden bis zum ersten Token')
+    parser.add_argument('--tps', type=float, default=80.0, help='Mock: Tokens pro Sekunde')
+    parser.add_argument('--output-tokens', type=int, default=120)
+    parser.add_argument('--transcript', default='persona_session.json',
+                        help="Transcript-Fixture ('' = generierte Antworten)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Mock: Anteil 529-Fehler')
+    parser.add_argument('--respect-rate-limit', action='store_true',
+                        help='Lokales Rate-Limit aus den Settings anwenden (apiRequestsPerMinute/apiTokensPerMinute)')
+    parser.add_argument('--json', dest='json_path', help='Ergebnisse zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # Pro Request loggt der ApiClient auf INFO – bei Last nur Warnungen zeigen
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    scenarios = SCENARIOS if args.scenario == 'all' else (args.scenario,)
+    server = MockAnthropicServer(
+        latency=args.latency, tokens_per_second=args.tps, output_tokens=args.output_tokens,
+        transcript=args.transcript or None, error_rate=args.error_rate, seed=42,
+    )
+    results = []
+    with server:
+        client = make_client(server.base_url, args.respect_rate_limit)
+        for scenario in scenarios:
+            result = run_scenario(client, scenario, args.iterations, args.concurrency)
+            _print_result(result)
+            results.append(result)
+
+        report = {
+            'mock': {'latency': args.latency, 'tokens_per_second': args.tps,
+                     'output_tokens': args.output_tokens, 'error_rate': args.error_rate,
+                     'requests': server.stats()},
+            'retries': client.get_retry_stats(),
+            'scheduler': client.scheduler.snapshot(),
+            'results': results,
+        }
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
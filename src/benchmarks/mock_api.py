@@ -0,0 +1,471 @@
+"""
+Mock-API – Lokaler Anthropic-kompatibler HTTP-Stub.
+
+Implementiert POST /v1/messages so weit, wie der ApiClient es nutzt:
+- Non-Stream Antworten (messages.create)
+- SSE-Streaming (messages.stream) mit Token-für-Token Deltas
+- tool_use Rounds (Cortex Tool-Loop)
+
+Latenz bis zum ersten Token und Token-Rate sind konfigurierbar. Antworten
+kommen entweder aus einem Transcript (JSON-Fixture, siehe fixtures/) oder
+werden deterministisch generiert. Optional werden Fehler (z.B. 529
+Overloaded) eingestreut, um die Retry-Schicht unter Last zu messen.
+
+Verwendung im Code:
+    with MockAnthropicServer(latency=0.2, tokens_per_second=80) as server:
+        client = ApiClient(api_key='mock-key', base_url=server.base_url)
+
+Verwendung als eigenständiger Server (z.B. für die laufende App):
+    cd src
+    python -m benchmarks.mock_api --port 8765 --transcript benchmarks/fixtures/persona_session.json
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python app.py --no-gui
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+_FILLER_WORDS = (
+    'ich', 'denke', 'dass', 'wir', 'heute', 'noch', 'etwas', 'schönes', 'erleben',
+    'werden', 'und', 'freue', 'mich', 'darauf', 'mit', 'dir', 'zu', 'reden', 'weil',
+    'du', 'mir', 'immer', 'zuhörst', 'wenn', 'es', 'wichtig', 'ist',
+)
+
+_ERROR_TYPES = {
+    429: 'rate_limit_error',
+    500: 'api_error',
+    503: 'api_error',
+    529: 'overloaded_error',
+}
+
+_CHARS_PER_TOKEN = 4
+
+
+# ─── Transcript ──────────────────────────────────────────────────────────────
+
+def _request_text(body: dict) -> str:
+    """System-Prompt + Text der letzten User-Message (für 'contains'-Matches)."""
+    system = body.get('system') or ''
+    if isinstance(system, list):
+        system = ' '.join(b.get('text', '') for b in system if isinstance(b, dict))
+    last_user = ''
+    for msg in reversed(body.get('messages') or []):
+        if msg.get('role') == 'user':
+            content = msg.get('content')
+            if isinstance(content, list):
+                content = ' '.join(
+                    str(b.get('text') or b.get('content') or '') for b in content if isinstance(b, dict)
+                )
+            last_user = content or ''
+            break
+    return f'{system}\n{last_user}'
+
+
+def tool_round(body: dict) -> int:
+    """Aktuelle Tool-Round: 1 + Anzahl bisheriger Assistant-Turns mit tool_use."""
+    rounds = 1
+    for msg in body.get('messages') or []:
+        content = msg.get('content')
+        if msg.get('role') == 'assistant' and isinstance(content, list):
+            if any(isinstance(b, dict) and b.get('type') == 'tool_use' for b in content):
+                rounds += 1
+    return rounds
+
+
+class Transcript:
+    """
+    Aufgezeichnete Antworten zum Abspielen.
+
+    Fixture-Format:
+        {
+          "name": "persona_session",
+          "mode": "match",              # oder "sequential"
+          "responses": [
+            {"match": {"stream": true}, "text": "Hallo!"},
+            {"match": {"tools": true, "round": 1},
+             "content": [{"type": "tool_use", "name": "read_file",
+                          "input": {"filename": "memory.md"}}],
+             "stop_reason": "tool_use"}
+          ]
+        }
+
+    Match-Kriterien (alle optional, alle müssen zutreffen):
+        stream   – Request ist ein Stream
+        tools    – Request enthält Tool-Definitionen
+        round    – Tool-Round (1 = erster Call)
+        contains – Teilstring in System-Prompt oder letzter User-Message
+
+    Im Modus "sequential" werden die Antworten der Reihe nach (zyklisch)
+    ausgeliefert, unabhängig vom Request.
+    """
+
+    def __init__(self, responses: List[Dict[str, Any]], mode: str = 'match', name: str = ''):
+        self.responses = responses
+        self.mode = mode
+        self.name = name
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Transcript':
+        if not os.path.isabs(path) and not os.path.exists(path):
+            path = os.path.join(FIXTURES_DIR, path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('responses', []), data.get('mode', 'match'), data.get('name', ''))
+
+    @staticmethod
+    def _matches(criteria: dict, body: dict) -> bool:
+        if 'stream' in criteria and bool(body.get('stream')) != criteria['stream']:
+            return False
+        if 'tools' in criteria and bool(body.get('tools')) != criteria['tools']:
+            return False
+        if 'round' in criteria and tool_round(body) != criteria['round']:
+            return False
+        if 'contains' in criteria and criteria['contains'] not in _request_text(body):
+            return False
+        return True
+
+    def next_response(self, body: dict) -> Optional[Dict[str, Any]]:
+        """Gibt die passende Antwort zurück oder None (→ generierte Antwort)."""
+        if not self.responses:
+            return None
+        if self.mode == 'sequential':
+            with self._lock:
+                entry = self.responses[self._cursor % len(self.responses)]
+                self._cursor += 1
+            return entry
+        for entry in self.responses:
+            if self._matches(entry.get('match', {}), body):
+                return entry
+        return None
+
+
+# ─── Antwort-Erzeugung ───────────────────────────────────────────────────────
+
+def _generate_text(n_tokens: int, seed: int) -> str:
+    rng = random.Random(seed)
+    words = [rng.choice(_FILLER_WORDS) for _ in range(max(1, n_tokens))]
+    words[0] = words[0].capitalize()
+    return ' '.join(words) + '.'
+
+
+def _tokenize(text: str) -> List[str]:
+    """Zerlegt Text in 'Tokens' (Wörter inkl. führendem Leerzeichen)."""
+    parts = text.split(' ')
+    return [parts[0]] + [' ' + p for p in parts[1:]]
+
+
+def _estimate_input_tokens(body: dict) -> int:
+    chars = len(json.dumps(body.get('system') or '', ensure_ascii=False))
+    chars += len(json.dumps(body.get('messages') or [], ensure_ascii=False))
+    return max(1, chars // _CHARS_PER_TOKEN)
+
+
+def _default_tool_script(body: dict) -> Optional[List[Dict[str, Any]]]:
+    """
+    Standard Tool-Loop ohne Transcript (angelehnt an den Cortex-Update):
+    Round 1 liest memory.md, Round 2 schreibt memory.md, Round 3 beendet.
+    Werden die Tools nicht angeboten, gibt es direkt eine Text-Antwort.
+    """
+    names = {t.get('name') for t in body.get('tools') or []}
+    current = tool_round(body)
+    if current == 1 and 'read_file' in names:
+        return [{'type': 'tool_use', 'name': 'read_file', 'input': {'filename': 'memory.md'}}]
+    if current == 2 and 'write_file' in names:
+        return [{'type': 'tool_use', 'name': 'write_file', 'input': {
+            'filename': 'memory.md',
+            'content': '# Erinnerungen\n\n- ' + _generate_text(40, current),
+        }}]
+    return None
+
+
+def build_message(body: dict, entry: Optional[Dict[str, Any]], output_tokens: int,
+                  seed: int) -> Dict[str, Any]:
+    """Baut eine vollständige Message (Non-Stream Format) für den Request."""
+    if entry is not None:
+        content = entry.get('content') or [{'type': 'text', 'text': entry.get('text', '')}]
+        stop_reason = entry.get('stop_reason') or (
+            'tool_use' if any(b.get('type') == 'tool_use' for b in content) else 'end_turn'
+        )
+    else:
+        content = _default_tool_script(body) if body.get('tools') else None
+        if content:
+            stop_reason = 'tool_use'
+        else:
+            n_tokens = min(output_tokens, int(body.get('max_tokens') or output_tokens))
+            content = [{'type': 'text', 'text': _generate_text(n_tokens, seed)}]
+            stop_reason = 'end_turn'
+
+    blocks = []
+    for block in content:
+        block = dict(block)
+        if block.get('type') == 'tool_use':
+            block.setdefault('id', 'toolu_' + uuid.uuid4().hex[:24])
+            block.setdefault('input', {})
+        blocks.append(block)
+
+    out_tokens = 0
+    for block in blocks:
+        if block['type'] == 'text':
+            out_tokens += len(_tokenize(block['text']))
+        else:
+            out_tokens += max(1, len(json.dumps(block['input'])) // _CHARS_PER_TOKEN)
+
+    return {
+        'id': 'msg_' + uuid.uuid4().hex[:24],
+        'type': 'message',
+        'role': 'assistant',
+        'model': body.get('model', 'mock-model'),
+        'content': blocks,
+        'stop_reason': stop_reason,
+        'stop_sequence': None,
+        'usage': {
+            'input_tokens': _estimate_input_tokens(body),
+            'output_tokens': out_tokens,
+        },
+    }
+
+
+# ─── HTTP-Server ─────────────────────────────────────────────────────────────
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: '_MockHTTPServer'
+
+    def log_message(self, format, *args):  # noqa: A002 – Signatur der Basisklasse
+        pass
+
+    # ── Hilfen ──────────────────────────────────────────────────────
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('request-id', 'req_' + uuid.uuid4().hex[:24])
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunk(self, event: str, payload: dict) -> None:
+        data = f'event: {event}\ndata: {json.dumps(payload)}\n\n'.encode('utf-8')
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def _pace(self, n_tokens: int) -> None:
+        tps = self.server.mock.tokens_per_second
+        if tps and n_tokens:
+            time.sleep(n_tokens / tps)
+
+    # ── Routing ─────────────────────────────────────────────────────
+
+    def do_POST(self):  # noqa: N802 – Name durch BaseHTTPRequestHandler vorgegeben
+        if self.path.split('?')[0] != '/v1/messages':
+            self._send_json(404, {'type': 'error', 'error': {
+                'type': 'not_found_error', 'message': f'Unbekannter Pfad: {self.path}'}})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'type': 'error', 'error': {
+                'type': 'invalid_request_error', 'message': 'Ungültiges JSON'}})
+            return
+
+        mock = self.server.mock
+        error_status = mock.pick_error()
+        if error_status:
+            mock.count('errors')
+            self._send_json(error_status, {'type': 'error', 'error': {
+                'type': _ERROR_TYPES.get(error_status, 'api_error'),
+                'message': 'Overloaded' if error_status == 529 else 'Mock-Fehler'}})
+            return
+
+        entry = mock.transcript.next_response(body) if mock.transcript else None
+        message = build_message(body, entry, mock.output_tokens, mock.next_seed())
+        if body.get('tools'):
+            mock.count('tool_rounds')
+
+        time.sleep(mock.latency)
+        if body.get('stream'):
+            mock.count('streams')
+            self._stream(message)
+        else:
+            mock.count('creates')
+            self._pace(message['usage']['output_tokens'])
+            self._send_json(200, message)
+
+    def _stream(self, message: dict) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        start = dict(message, content=[], stop_reason=None,
+                     usage={'input_tokens': message['usage']['input_tokens'], 'output_tokens': 1})
+        self._send_chunk('message_start', {'type': 'message_start', 'message': start})
+
+        for index, block in enumerate(message['content']):
+            if block['type'] == 'text':
+                self._send_chunk('content_block_start', {
+                    'type': 'content_block_start', 'index': index,
+                    'content_block': {'type': 'text', 'text': ''}})
+                for token in _tokenize(block['text']):
+                    self._pace(1)
+                    self._send_chunk('content_block_delta', {
+                        'type': 'content_block_delta', 'index': index,
+                        'delta': {'type': 'text_delta', 'text': token}})
+            else:
+                self._send_chunk('content_block_start', {
+                    'type': 'content_block_start', 'index': index,
+                    'content_block': {'type': 'tool_use', 'id': block['id'],
+                                      'name': block['name'], 'input': {}}})
+                self._send_chunk('content_block_delta', {
+                    'type': 'content_block_delta', 'index': index,
+                    'delta': {'type': 'input_json_delta', 'partial_json': json.dumps(block['input'])}})
+            self._send_chunk('content_block_stop', {'type': 'content_block_stop', 'index': index})
+
+        self._send_chunk('message_delta', {
+            'type': 'message_delta',
+            'delta': {'stop_reason': message['stop_reason'], 'stop_sequence': None},
+            'usage': {'output_tokens': message['usage']['output_tokens']}})
+        self._send_chunk('message_stop', {'type': 'message_stop'})
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: 'MockAnthropicServer'
+
+
+class MockAnthropicServer:
+    """
+    Startet den Stub in einem Hintergrund-Thread.
+
+    Args:
+        latency: Sekunden bis zum ersten Byte (Time-to-First-Token)
+        tokens_per_second: Ausgabe-Rate (0 = ohne Drosselung)
+        output_tokens: Länge generierter Antworten (Wörter)
+        transcript: Transcript oder Pfad zu einer Fixture
+        error_rate: Anteil der Requests, die mit error_status scheitern
+        error_status: HTTP-Status für eingestreute Fehler
+        seed: Seed für Fehler-Auswahl und Textgenerierung
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.2, tokens_per_second: float = 80.0,
+                 output_tokens: int = 120, transcript=None,
+                 error_rate: float = 0.0, error_status: int = 529,
+                 seed: Optional[int] = None):
+        if isinstance(transcript, str):
+            transcript = Transcript.from_file(transcript)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.transcript: Optional[Transcript] = transcript
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._seed = seed or 0
+        self._counts = {'creates': 0, 'streams': 0, 'tool_rounds': 0, 'errors': 0}
+        self._httpd: Optional[_MockHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    def start(self) -> 'MockAnthropicServer':
+        self._httpd = _MockHTTPServer((self.host, self.port), _Handler)
+        self._httpd.mock = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name='mock-anthropic', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> 'MockAnthropicServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ── Intern (vom Handler genutzt) ────────────────────────────────
+
+    def pick_error(self) -> Optional[int]:
+        if not self.error_rate:
+            return None
+        with self._lock:
+            return self.error_status if self._rng.random() < self.error_rate else None
+
+    def next_seed(self) -> int:
+        with self._lock:
+            self._seed += 1
+            return self._seed
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            self._counts[field] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler Anthropic-kompatibler Mock-Server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help='Sekunden bis zum ersten Token')
+    parser.add_argument('--tps', type=float, default=80.0, help='Tokens pro Sekunde (0 = unbegrenzt)')
+    parser.add_argument('--output-tokens', type=int, default=120, help='Länge generierter Antworten')
+    parser.add_argument('--transcript', help='Transcript-Fixture (Pfad oder Name in fixtures/)')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=529)
+    args = parser.parse_args()
+
+    server = MockAnthropicServer(
+        host=args.host, port=args.port, latency=args.latency,
+        tokens_per_second=args.tps, output_tokens=args.output_tokens,
+        transcript=args.transcript, error_rate=args.error_rate,
+        error_status=args.error_status,
+    ).start()
+    print(f'Mock-API läuft auf {server.base_url} (Strg+C zum Beenden)')
+    print(f'  ANTHROPIC_BASE_URL={server.base_url}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f'Beendet. Statistik: {server.stats()}')
+
+
+if __name__ == '__main__':
+    main()
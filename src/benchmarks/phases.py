@@ -0,0 +1,138 @@
+"""
+Phasen-Messung – Zerlegt die Latenz eines Requests in Abschnitte.
+
+Die Route-Module importieren ihre Abhängigkeiten per `from ... import`,
+daher lassen sich die Aufrufe pro Modul-Attribut mit einer Zeitmessung
+umhüllen, ohne den Produktionscode anzufassen. Jede Phase summiert die
+Dauer aller zugeordneten Aufrufe innerhalb eines Requests.
+
+Phasen:
+    persona_resolution – resolve_persona_id / Session→Persona Lookup
+    config_loading     – Persona-Config, User-Profil, Cortex-Settings
+    prompt_build       – last_encounter, Cortex-Kontext, System-Prompt, Messages
+    history_fetch      – Chat-Verlauf, Nachrichtenzahl, Session-Daten
+    persistence        – Nachrichten speichern/löschen
+    cortex             – Tier-Check und Progress-Berechnung
+"""
+
+import importlib
+import threading
+import time
+import types
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Tuple
+
+
+PHASES = (
+    'persona_resolution', 'config_loading', 'prompt_build',
+    'history_fetch', 'persistence', 'cortex',
+)
+
+# (Modul, Attribut, Phase) – Aufrufe aus Sicht der Route-Module
+ROUTE_TARGETS: List[Tuple[str, str, str]] = [
+    ('routes.chat', 'resolve_persona_id', 'persona_resolution'),
+    ('routes.sessions', 'resolve_persona_id', 'persona_resolution'),
+    ('routes.sessions', 'get_active_persona_id', 'persona_resolution'),
+    ('routes.cortex', 'resolve_persona_id', 'persona_resolution'),
+
+    ('routes.chat', 'load_character', 'config_loading'),
+    ('routes.chat', 'get_user_profile_data', 'config_loading'),
+    ('routes.sessions', 'load_character', 'config_loading'),
+    ('routes.sessions', 'load_char_config', 'config_loading'),
+    ('routes.sessions', 'activate_persona', 'config_loading'),
+    ('routes.cortex', '_load_cortex_config', 'config_loading'),
+    ('routes.cortex', '_get_context_limit', 'config_loading'),
+
+    ('utils.last_encounter', 'compute_last_encounter', 'prompt_build'),
+
+    ('routes.chat', 'get_conversation_context', 'history_fetch'),
+    ('routes.chat', 'get_last_message', 'history_fetch'),
+    ('routes.sessions', 'get_session', 'history_fetch'),
+    ('routes.sessions', 'get_chat_history', 'history_fetch'),
+    ('routes.sessions', 'get_message_count', 'history_fetch'),
+    ('routes.cortex', 'get_message_count', 'history_fetch'),
+
+    ('routes.chat', 'save_message', 'persistence'),
+    ('routes.chat', 'delete_last_message', 'persistence'),
+
+    ('routes.chat', 'check_and_trigger_cortex_update', 'cortex'),
+    ('routes.cortex', 'get_progress', 'cortex'),
+]
+
+# Methoden des ChatService (Instanz-Attribute)
+CHAT_SERVICE_TARGETS = [
+    ('_load_cortex_context', 'prompt_build'),
+    ('_build_chat_messages', 'prompt_build'),
+]
+
+
+class PhaseRecorder:
+    """
+    Sammelt Phasen-Dauern pro Request.
+
+    Gemessen wird nur im Thread, der begin() aufgerufen hat – Hintergrund-
+    Threads (z.B. Cortex-Update) verfälschen die Werte nicht.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def begin(self) -> None:
+        self._local.phases = defaultdict(float)
+
+    def end(self) -> Dict[str, float]:
+        phases = getattr(self._local, 'phases', None) or {}
+        self._local.phases = None
+        return dict(phases)
+
+    def wrap(self, phase: str, func: Callable) -> Callable:
+        recorder = self
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            phases = getattr(recorder._local, 'phases', None)
+            if phases is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                phases[phase] += time.perf_counter() - start
+        return timed
+
+    @contextmanager
+    def instrument(self, chat_service=None, engine=None):
+        """Installiert die Zeitmessung für die Dauer des Blocks."""
+        installed: List[Tuple[object, str, Callable]] = []
+
+        def _install(owner, attr: str, phase: str) -> None:
+            original = getattr(owner, attr, None)
+            if original is None:
+                return
+            installed.append((owner, attr, original))
+            setattr(owner, attr, self.wrap(phase, original))
+
+        for module_name, attr, phase in ROUTE_TARGETS:
+            _install(importlib.import_module(module_name), attr, phase)
+        if chat_service is not None:
+            for attr, phase in CHAT_SERVICE_TARGETS:
+                _install(chat_service, attr, phase)
+        if engine is not None:
+            _install(engine, 'build_system_prompt', 'prompt_build')
+        try:
+            yield self
+        finally:
+            for owner, attr, original in reversed(installed):
+                if isinstance(owner, types.ModuleType):
+                    setattr(owner, attr, original)
+                else:
+                    # Instanz-Attribut entfernen → Klassen-Methode wieder sichtbar
+                    owner.__dict__.pop(attr, None)
+
+
+def phase_totals(samples: List[Dict[str, float]], phase: str) -> List[float]:
+    """Werte einer Phase über alle Samples (fehlende Phase = 0)."""
+    return [sample.get(phase, 0.0) for sample in samples]
+
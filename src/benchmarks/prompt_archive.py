@@ -0,0 +1,135 @@
+"""
+Prompt-Archiv Benchmark – Durchsatz von ZIP-Export und -Import.
+
+Auf einem synthetischen Prompt-Set (Standard: 5.000 Prompts, erzeugt wie in
+benchmarks.prompt_search) wird gemessen:
+    export        – PromptEngine.export_prompt_set (blockweise, mit SHA-256)
+    dry_run       – import_prompt_set(dry_run=True): nur Diff, keine Schreibzugriffe
+    import_same   – Import des eigenen Exports (alle Dateien per Hash unverändert)
+    import_change – Import mit einer geänderten Domain-Datei im Archiv
+
+Verwendung:
+    cd src
+    python -m benchmarks.prompt_archive --prompts 5000 --iterations 5
+    python -m benchmarks.prompt_archive --json results/archive.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import zipfile
+from typing import Any, Dict
+
+# src/ als Importpfad (benchmarks/prompt_archive.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.engine_startup import _measure  # noqa: E402
+from benchmarks.prompt_search import build_synthetic_instructions  # noqa: E402
+from utils.logger import log  # noqa: E402
+from utils.prompt_engine import PromptEngine  # noqa: E402
+
+
+def _instructions_bytes(instructions_dir: str) -> int:
+    total = 0
+    for root, _, files in os.walk(os.path.join(instructions_dir, 'prompts')):
+        if '_defaults' in root:
+            continue
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def _with_changed_entry(source_zip: str, target_zip: str) -> None:
+    """Kopie des Archivs, in der eine Domain-Datei einen zusätzlichen Prompt-Text hat."""
+    with zipfile.ZipFile(source_zip) as src, zipfile.ZipFile(target_zip, 'w', zipfile.ZIP_DEFLATED) as dst:
+        changed = next(n for n in src.namelist() if n.startswith('prompts/synthetic_'))
+        for name in src.namelist():
+            if name == 'metadata.json':
+                continue
+            data = src.read(name)
+            if name == changed:
+                domain = json.loads(data)
+                prompt_id = next(iter(domain))
+                domain[prompt_id]['variants']['default']['content'] = 'Geänderter Text'
+                data = json.dumps(domain, ensure_ascii=False).encode('utf-8')
+            dst.writestr(name, data)
+
+
+def _throughput(stats: Dict[str, Any], size: int) -> float:
+    return round(size / (1024 * 1024) / (stats['mean_ms'] / 1000), 1) if stats['mean_ms'] else 0.0
+
+
+def run_benchmark(prompt_count: int = 5000, iterations: int = 5) -> Dict[str, Any]:
+    """Misst Export und Import auf einem synthetischen Prompt-Set."""
+    with tempfile.TemporaryDirectory(prefix='personaui_archive_bench_') as root:
+        bench_dir = os.path.join(root, 'instructions')
+        build_synthetic_instructions(bench_dir, prompt_count)
+        engine = PromptEngine(bench_dir, use_load_cache=False)
+        size = _instructions_bytes(bench_dir)
+
+        export_path = os.path.join(root, 'export.zip')
+        changed_path = os.path.join(root, 'changed.zip')
+        results: Dict[str, Any] = {
+            'prompt_count': len(engine.get_all_prompts()),
+            'size_mb': round(size / (1024 * 1024), 2),
+            'export': _measure(lambda: engine.export_prompt_set(export_path), iterations),
+        }
+        _with_changed_entry(export_path, changed_path)
+
+        results['dry_run'] = _measure(
+            lambda: engine.import_prompt_set(export_path, dry_run=True), iterations)
+        results['import_same'] = _measure(
+            lambda: engine.import_prompt_set(export_path), iterations)
+        results['unchanged_files'] = engine.import_prompt_set(export_path)['unchanged']
+
+        # Abwechselnd geändertes und originales Archiv → jeder Lauf schreibt eine Datei
+        toggle = {'n': 0}
+
+        def import_change():
+            toggle['n'] += 1
+            path = changed_path if toggle['n'] % 2 else export_path
+            toggle['imported'] = engine.import_prompt_set(path, merge_mode='overwrite')['imported']
+        results['import_change'] = _measure(import_change, iterations)
+        results['changed_files'] = toggle['imported']
+
+        for path in ('export', 'dry_run', 'import_same'):
+            results[path]['mb_per_s'] = _throughput(results[path], size)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prompt-Archiv: Export-/Import-Durchsatz')
+    parser.add_argument('--prompts', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(args.prompts, args.iterations)
+
+    print(f"{results['prompt_count']} Prompts, {results['size_mb']} MB, "
+          f"unverändert erkannt={results['unchanged_files']}, "
+          f"geändert geschrieben={results['changed_files']}")
+    for path in ('export', 'dry_run', 'import_same', 'import_change'):
+        stats = results[path]
+        rate = f" {stats['mb_per_s']} MB/s" if 'mb_per_s' in stats else ''
+        print(f"    {path:<13} mean={stats['mean_ms']}ms p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms{rate}")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
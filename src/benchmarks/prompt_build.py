@@ -0,0 +1,167 @@
+"""
+Prompt-Build Microbenchmark – Dauer von PromptEngine.build_system_prompt().
+
+Vergleicht drei Pfade auf denselben Prompt-Dateien:
+    legacy    – Nachbildung des alten Ablaufs: pro Block PATTERN.sub über den
+                Rohtext und eine frisch aufgebaute Variablen-Map
+    compiled  – Build ohne Cache: vorkompilierte Templates, eine lazy
+                Variablen-Map pro Build (nur referenzierte Werte berechnet)
+    cached    – build_system_prompt(): LRU-Treffer + Einsetzen der Zeit-Werte
+
+Die Prompt-Dateien werden in ein Temp-Verzeichnis kopiert (die Engine legt
+beim Laden ggf. das User-Manifest an), Persona-/Profil-Daten kommen wie im
+Betrieb aus src/. Alle Pfade müssen denselben Text liefern.
+
+Verwendung:
+    cd src
+    python -m benchmarks.prompt_build --iterations 500
+    python -m benchmarks.prompt_build --variant experimental --json results/prompt.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Any
+
+# src/ als Importpfad (benchmarks/prompt_build.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.load_test import summarize_latencies  # noqa: E402
+from utils.logger import log  # noqa: E402
+from utils.prompt_engine import PromptEngine  # noqa: E402
+
+
+INSTRUCTIONS_DIR = os.path.join(_SRC_DIR, 'instructions')
+
+# Runtime-Variablen wie im Chat (Cortex-Blöcke aktiv)
+DEFAULT_RUNTIME_VARS = {
+    'language': 'deutsch',
+    'ip_address': '127.0.0.1',
+    'last_encounter': 'vor 2 Stunden',
+    'cortex_memory': '- Max hat eine Katze namens Luna\n- Arbeitet als Gärtner',
+    'cortex_soul': '- Ich schätze Ehrlichkeit',
+    'cortex_relationship': '- Wir kennen uns seit drei Wochen',
+}
+
+_NON_CHAT_CATEGORIES = {'summary', 'spec_autofill', 'cortex'}
+
+
+def legacy_build_system_prompt(engine: PromptEngine, variant: str = 'default',
+                               runtime_vars: Optional[Dict[str, str]] = None) -> str:
+    """Alter Ablauf: Regex-Substitution + Variablen-Map pro Block."""
+    resolver = engine._resolver
+    parts: List[str] = []
+    for prompt_data in engine.get_prompts_by_target('system_prompt'):
+        meta = prompt_data['meta']
+        if meta.get('position', 'system_prompt') == 'system_prompt_append':
+            continue
+        if meta.get('category') in _NON_CHAT_CATEGORIES:
+            continue
+        if not engine._should_include_block(meta, runtime_vars, variant):
+            continue
+        variant_condition = meta.get('variant_condition')
+        if variant_condition and variant_condition != variant:
+            continue
+        variants = prompt_data['content'].get('variants', {})
+        variant_data = variants.get(variant) or variants.get('default')
+        if not variant_data or meta.get('type', 'text') == 'multi_turn':
+            continue
+        raw = variant_data.get('content', '')
+        if not raw:
+            continue
+        variables = resolver._build_variables(variant, runtime_vars)
+        resolved = resolver.PATTERN.sub(
+            lambda m: str(variables.get(m.group(1), '{{' + m.group(1) + '}}')), raw
+        )
+        content = engine._clean_resolved_text(resolved)
+        if content:
+            parts.append(content)
+    return '\n\n'.join(parts)
+
+
+def _measure(build: Callable[[], str], iterations: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        build()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        build()
+        samples.append(time.perf_counter() - start)
+    return summarize_latencies(samples)
+
+
+def run_benchmark(instructions_dir: str = INSTRUCTIONS_DIR, variant: str = 'default',
+                  runtime_vars: Optional[Dict[str, str]] = None,
+                  iterations: int = 200, warmup: int = 10) -> Dict[str, Any]:
+    """Misst legacy vs. compiled auf einer Kopie des instructions/prompts Verzeichnisses."""
+    runtime_vars = dict(DEFAULT_RUNTIME_VARS if runtime_vars is None else runtime_vars)
+    with tempfile.TemporaryDirectory(prefix='personaui_prompt_bench_') as root:
+        bench_dir = os.path.join(root, 'instructions')
+        shutil.copytree(os.path.join(instructions_dir, 'prompts'), os.path.join(bench_dir, 'prompts'))
+        engine = PromptEngine(bench_dir)
+
+        legacy = legacy_build_system_prompt(engine, variant, runtime_vars)
+        compiled = engine._render_system_prompt(variant, runtime_vars)
+        cached = engine.build_system_prompt(variant, runtime_vars)
+
+        results = {
+            'variant': variant,
+            'blocks': sum(1 for p in engine.get_prompts_by_target('system_prompt')),
+            'prompt_chars': len(compiled),
+            'identical_output': legacy == compiled == cached,
+            'legacy': _measure(lambda: legacy_build_system_prompt(engine, variant, runtime_vars),
+                               iterations, warmup),
+            'compiled': _measure(lambda: engine._render_system_prompt(variant, runtime_vars),
+                                 iterations, warmup),
+            'cached': _measure(lambda: engine.build_system_prompt(variant, runtime_vars),
+                               iterations, warmup),
+            'resolve_stats': engine.get_resolve_stats(variant),
+            'prompt_cache': engine.get_prompt_cache_stats(),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark für build_system_prompt()')
+    parser.add_argument('--variant', default='default')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(variant=args.variant, iterations=args.iterations, warmup=args.warmup)
+
+    print(f"Variante {results['variant']}: {results['blocks']} Blöcke, "
+          f"{results['prompt_chars']} Zeichen, identisch={results['identical_output']}")
+    for path in ('legacy', 'compiled', 'cached'):
+        stats = results[path]
+        print(f"    {path:<10} mean={stats['mean_ms']}ms p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms")
+    resolve_stats = results['resolve_stats']
+    print(f"    Compute-Aufrufe: {resolve_stats['computed_evaluated']} berechnet, "
+          f"{resolve_stats['computed_skipped']} übersprungen "
+          f"(nicht referenziert: {', '.join(resolve_stats['computed_unreferenced']) or '-'})")
+    cache_stats = results['prompt_cache']
+    print(f"    Prompt-Cache: {cache_stats['hits']} Hits, {cache_stats['misses']} Misses")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Prompt-Suche Benchmark – Invertierter Index vs. linearer Scan.
+
+Erzeugt aus den echten Prompt-Dateien ein synthetisches Manifest mit
+--prompts Einträgen (Kopien der vorhandenen Prompts mit eigenen IDs und
+einem eindeutigen Wort pro Kopie) und misst:
+    scan_search      – alter EditorApi.search_prompts: Substring über alle Varianten
+    index_search     – PromptEngine.search_prompts (Präfix), fuzzy=False
+    index_fuzzy      – PromptEngine.search_prompts mit einem Tippfehler
+    scan_usages      – alter get_placeholder_usages: Regex über allen Content
+    index_usages     – PromptEngine.get_placeholder_usages
+    index_build      – Erster Aufbau des Index (einmal pro Snapshot-Linie)
+    save_prompt      – save_prompt inkl. inkrementeller Index-Fortschreibung
+
+Verwendung:
+    cd src
+    python -m benchmarks.prompt_search --prompts 1000 --iterations 200
+    python -m benchmarks.prompt_search --json results/search.json
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+# src/ als Importpfad (benchmarks/prompt_search.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.load_test import summarize_latencies  # noqa: E402
+from benchmarks.prompt_build import INSTRUCTIONS_DIR  # noqa: E402
+from utils.logger import log  # noqa: E402
+from utils.prompt_engine import PromptEngine  # noqa: E402
+
+_PH_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+# Prompts pro synthetischer Domain-Datei
+_PROMPTS_PER_FILE = 50
+
+
+def build_synthetic_instructions(target_dir: str, prompt_count: int,
+                                 source_dir: str = INSTRUCTIONS_DIR) -> int:
+    """
+    Schreibt ein instructions/-Verzeichnis mit prompt_count synthetischen Prompts.
+
+    Kopien der echten Prompts (ID-Suffix _s<n>, eigenes Wort 'variante<n>'
+    im Text), verteilt auf Domain-Dateien zu je 50 Prompts. Die Registry
+    wird unverändert übernommen.
+
+    Returns:
+        Anzahl geschriebener Prompts
+    """
+    reference = PromptEngine(source_dir, use_load_cache=False)
+    originals = [(pid, reference.get_prompt(pid)) for pid in reference.get_all_prompts()]
+    originals = [(pid, data) for pid, data in originals if data]
+
+    prompts_dir = os.path.join(target_dir, 'prompts')
+    meta_dir = os.path.join(prompts_dir, '_meta')
+    os.makedirs(meta_dir, exist_ok=True)
+
+    manifest: Dict[str, Any] = {'version': '2.0', 'prompts': {}}
+    domains: Dict[str, Dict[str, Any]] = {}
+    for n in range(prompt_count):
+        source_id, data = originals[n % len(originals)]
+        prompt_id = f'{source_id}_s{n}'
+        domain_file = f'synthetic_{n // _PROMPTS_PER_FILE:03d}.json'
+        content = copy.deepcopy(data['content'])
+        for variant_data in content.get('variants', {}).values():
+            if variant_data.get('content'):
+                variant_data['content'] += f'\n\nvariante{n}'
+        manifest['prompts'][prompt_id] = {
+            **data['meta'], 'domain_file': domain_file, 'order': n,
+        }
+        domains.setdefault(domain_file, {})[prompt_id] = content
+
+    with open(os.path.join(meta_dir, 'prompt_manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    with open(os.path.join(meta_dir, 'placeholder_registry.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': '2.0', 'placeholders': reference.get_all_placeholders()}, f, ensure_ascii=False)
+    for domain_file, data in domains.items():
+        with open(os.path.join(prompts_dir, domain_file), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+    return prompt_count
+
+
+def scan_search(engine: PromptEngine, query: str) -> list:
+    """Alter Ablauf von EditorApi.search_prompts (Substring-Scan)."""
+    query_lower = query.lower()
+    results = []
+    for prompt_id, meta in engine.get_all_prompts().items():
+        name_match = query_lower in (meta.get('name', '') + ' ' + prompt_id + ' ' + meta.get('description', '')).lower()
+        content_match = False
+        prompt_data = engine.get_prompt(prompt_id)
+        if prompt_data:
+            for variant_data in prompt_data.get('content', {}).get('variants', {}).values():
+                text = variant_data.get('content', '')
+                if text and query_lower in text.lower():
+                    content_match = True
+                    break
+        if name_match or content_match:
+            results.append(prompt_id)
+    return results
+
+
+def scan_usages(engine: PromptEngine) -> Dict[str, list]:
+    """Alter Ablauf von EditorApi.get_placeholder_usages (Regex über allen Content)."""
+    usage_map: Dict[str, list] = {key: [] for key in engine.get_all_placeholders()}
+    for prompt_id in engine.get_all_prompts():
+        prompt_data = engine.get_prompt(prompt_id)
+        if not prompt_data:
+            continue
+        for variant_data in prompt_data.get('content', {}).get('variants', {}).values():
+            for match in _PH_PATTERN.finditer(variant_data.get('content', '') or ''):
+                ids = usage_map.setdefault(match.group(1), [])
+                if prompt_id not in ids:
+                    ids.append(prompt_id)
+    return usage_map
+
+
+def _measure(run, iterations: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return summarize_latencies(samples)
+
+
+def run_benchmark(prompt_count: int = 1000, iterations: int = 100) -> Dict[str, Any]:
+    """Misst Suche und Placeholder-Lookups auf einem synthetischen Manifest."""
+    with tempfile.TemporaryDirectory(prefix='personaui_search_bench_') as root:
+        bench_dir = os.path.join(root, 'instructions')
+        build_synthetic_instructions(bench_dir, prompt_count)
+        engine = PromptEngine(bench_dir, use_load_cache=False)
+
+        start = time.perf_counter()
+        engine._snapshot.search
+        build_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        target = f'variante{prompt_count // 2}'
+        results: Dict[str, Any] = {
+            'prompt_count': len(engine.get_all_prompts()),
+            'index_build_ms': build_ms,
+            'scan_search': _measure(lambda: scan_search(engine, 'persona'), iterations),
+            'index_search': _measure(lambda: engine.search_prompts('persona', fuzzy=False), iterations),
+            'index_fuzzy': _measure(lambda: engine.search_prompts('persnoa'), iterations),
+            'scan_usages': _measure(lambda: scan_usages(engine), iterations),
+            'index_usages': _measure(engine.get_placeholder_usages, iterations),
+        }
+        results['same_results'] = (
+            set(scan_search(engine, target)) == {r['id'] for r in engine.search_prompts(target, fuzzy=False)}
+        )
+
+        prompt_id = next(iter(engine.get_all_prompts()))
+        counter = {'n': 0}
+
+        def save():
+            counter['n'] += 1
+            engine.save_prompt(prompt_id, {
+                'content': {'variants': {'default': {'content': f'Neuer Text {counter["n"]} für {{{{char_name}}}}'}}}
+            })
+        results['save_prompt'] = _measure(save, max(1, iterations // 10))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prompt-Suche: Index vs. Scan')
+    parser.add_argument('--prompts', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(args.prompts, args.iterations)
+
+    print(f"{results['prompt_count']} Prompts, Index-Aufbau {results['index_build_ms']}ms, "
+          f"gleiche Treffer={results['same_results']}")
+    for path in ('scan_search', 'index_search', 'index_fuzzy', 'scan_usages', 'index_usages', 'save_prompt'):
+        stats = results[path]
+        print(f"    {path:<13} mean={stats['mean_ms']}ms p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Recall-Index Benchmark – Aufbau und Abfrage-Latenz des BM25-Index.
+
+Auf einer synthetischen Persona-DB (Standard: 100.000 Nachrichten,
+Zipf-verteiltes Vokabular) wird gemessen:
+    build        – RecallIndex.build(): alle Nachrichten aus SQLite lesen und indizieren
+    query        – top_k(query, k) für zufällige Queries aus 2–6 Wörtern
+    query_filter – wie query, mit accept-Filter (wie ChatService für {{recalled_context}})
+    add          – inkrementelles Hinzufügen einer Nachricht (Pfad von save_message)
+
+Verwendung:
+    cd src
+    python -m benchmarks.recall_index --items 100000 --queries 200
+    python -m benchmarks.recall_index --json results/recall.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+# src/ als Importpfad (benchmarks/recall_index.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.engine_startup import _measure  # noqa: E402
+from utils.database import connection  # noqa: E402
+from utils.database.schema import init_persona_db  # noqa: E402
+from utils.logger import log  # noqa: E402
+from utils.recall import RecallIndex  # noqa: E402
+
+VOCABULARY_SIZE = 20000
+
+
+def _vocabulary(rng: random.Random) -> List[str]:
+    letters = 'abcdefghijklmnopqrstuvwxyzäöü'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(VOCABULARY_SIZE)]
+
+
+def _zipf_weights() -> List[float]:
+    return [1.0 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+
+
+def _fill_db(db_path: str, items: int, rng: random.Random) -> List[str]:
+    """Schreibt items Nachrichten (8–40 Wörter) in eine Session. Returns: Vokabular."""
+    vocab = _vocabulary(rng)
+    weights = _zipf_weights()
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO chat_sessions (title, persona_id) VALUES ('Bench', 'default')")
+    rows = (
+        (1, ' '.join(rng.choices(vocab, weights, k=rng.randint(8, 40))), i % 2, 'Mia')
+        for i in range(items)
+    )
+    conn.executemany(
+        "INSERT INTO chat_messages (session_id, message, is_user, character_name) VALUES (?, ?, ?, ?)",
+        rows)
+    conn.commit()
+    conn.close()
+    return vocab
+
+
+def run_benchmark(items: int = 100000, queries: int = 200, k: int = 5, seed: int = 7) -> Dict[str, Any]:
+    """Baut eine synthetische Persona-DB und misst Aufbau und Abfragen."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix='personaui_recall_bench_') as data_dir, \
+            patch.object(connection, 'DATA_DIR', data_dir):
+        init_persona_db('default')
+        vocab = _fill_db(connection.get_db_path('default'), items, rng)
+        weights = _zipf_weights()
+        query_texts = [' '.join(rng.choices(vocab, weights, k=rng.randint(2, 6))) for _ in range(queries)]
+
+        holder: Dict[str, RecallIndex] = {}
+
+        def build():
+            holder['index'] = RecallIndex('default')
+            holder['index'].build()
+        results: Dict[str, Any] = {'items': items, 'k': k, 'build': _measure(build, 1)}
+        index = holder['index']
+
+        it = iter(query_texts * 2)
+        results['query'] = _measure(lambda: index.top_k(next(it), k=k), queries)
+        odd = lambda hit: hit.ref_id % 2 == 1
+        it_filter = iter(query_texts)
+        results['query_filter'] = _measure(lambda: index.top_k(next(it_filter), k=k, accept=odd), queries)
+
+        counter = {'id': items}
+
+        def add():
+            counter['id'] += 1
+            index.add('message', counter['id'], ' '.join(rng.choices(vocab, weights, k=20)), 'User')
+        results['add'] = _measure(add, queries)
+        results['documents'] = index.get_stats()['documents']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recall-Index: Aufbau und top_k-Latenz')
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(args.items, args.queries, args.k)
+
+    print(f"{results['documents']} Dokumente, k={results['k']}")
+    for name in ('build', 'query', 'query_filter', 'add'):
+        stats = results[name]
+        print(f"    {name:<13} mean={stats['mean_ms']}ms p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Route-Benchmark – Latenz der Chat- und Session-Endpunkte, zerlegt in Phasen.
+
+Treibt die Endpunkte über den Flask-Test-Client gegen geseedete Persona-DBs
+und die Mock-API (feste Token-Rate):
+
+    chat_stream      POST /chat_stream
+    regenerate       POST /chat/regenerate
+    session_load     GET  /api/sessions/<id>
+    load_more        POST /api/sessions/<id>/load_more
+    cortex_progress  GET  /api/cortex/progress
+
+Pro Endpunkt: Gesamtdauer, Time-to-First-Chunk (Streams) und die Phasen aus
+phases.py. Der Rest ('unattributed') ist API-Wartezeit + Flask-Overhead.
+Ergebnisse landen als JSON in benchmarks/results/ und lassen sich mit
+benchmarks/compare.py gegenüberstellen.
+
+Verwendung:
+    cd src
+    python -m benchmarks.route_bench --sessions 20 --messages 1000 --iterations 30
+    python -m benchmarks.route_bench --label nach-cache --json results/after.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+
+# src/ als Importpfad (benchmarks/route_bench.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.environment import BenchEnvironment  # noqa: E402
+from benchmarks.load_test import summarize_latencies  # noqa: E402
+from benchmarks.phases import PHASES, PhaseRecorder, phase_totals  # noqa: E402
+from utils.logger import log  # noqa: E402
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+ENDPOINTS = ('chat_stream', 'regenerate', 'session_load', 'load_more', 'cortex_progress')
+
+_CHUNK_MARKER = b'"type": "chunk"'
+
+
+# ─── Einzel-Requests ─────────────────────────────────────────────────────────
+
+def _consume(response, start: float) -> Dict[str, Any]:
+    """Liest die (evtl. gestreamte) Antwort vollständig und misst den ersten Chunk."""
+    first_chunk = None
+    body = b''
+    for piece in response.response:
+        if isinstance(piece, str):
+            piece = piece.encode('utf-8')
+        if first_chunk is None and _CHUNK_MARKER in piece:
+            first_chunk = time.perf_counter() - start
+        body += piece
+    response.close()
+    error = None
+    if response.status_code >= 400 or b'"type": "error"' in body:
+        error = body[:200].decode('utf-8', errors='replace')
+    return {'first_chunk': first_chunk, 'error': error}
+
+
+class RouteDriver:
+    """Erzeugt die Requests pro Endpunkt und misst sie."""
+
+    def __init__(self, env: BenchEnvironment, recorder: PhaseRecorder):
+        self.env = env
+        self.client = env.app.test_client()
+        self.recorder = recorder
+        self._counter = 0
+
+    def _session(self, i: int) -> int:
+        return self.env.session_ids[i % len(self.env.session_ids)]
+
+    def _timed(self, send: Callable[[], Any]) -> Dict[str, Any]:
+        self.recorder.begin()
+        start = time.perf_counter()
+        try:
+            outcome = _consume(send(), start)
+        finally:
+            outcome_total = time.perf_counter() - start
+            phases = self.recorder.end()
+        outcome['total'] = outcome_total
+        outcome['phases'] = phases
+        return outcome
+
+    def chat_stream(self, i: int) -> Dict[str, Any]:
+        self._counter += 1
+        payload = {'message': f'Benchmark-Nachricht {self._counter}: Wie geht es dir?',
+                   'session_id': self._session(0)}
+        return self._timed(lambda: self.client.post('/chat_stream', json=payload, buffered=False))
+
+    def regenerate(self, i: int) -> Dict[str, Any]:
+        # Letzte Nachricht der Session ist nach chat_stream immer eine Bot-Antwort
+        payload = {'session_id': self._session(0)}
+        return self._timed(lambda: self.client.post('/chat/regenerate', json=payload, buffered=False))
+
+    def session_load(self, i: int) -> Dict[str, Any]:
+        session_id = self._session(i)
+        return self._timed(lambda: self.client.get(f'/api/sessions/{session_id}'))
+
+    def load_more(self, i: int) -> Dict[str, Any]:
+        session_id = self._session(i)
+        payload = {'offset': 30 * (1 + i % 10), 'limit': 30}
+        return self._timed(lambda: self.client.post(f'/api/sessions/{session_id}/load_more', json=payload))
+
+    def cortex_progress(self, i: int) -> Dict[str, Any]:
+        session_id = self._session(i)
+        return self._timed(lambda: self.client.get(f'/api/cortex/progress?session_id={session_id}'))
+
+
+# ─── Auswertung ──────────────────────────────────────────────────────────────
+
+def summarize_endpoint(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [s for s in samples if not s['error']]
+    phase_samples = [s['phases'] for s in ok]
+    phases = {}
+    for phase in PHASES:
+        values = phase_totals(phase_samples, phase)
+        if any(values):
+            phases[phase] = summarize_latencies(values)
+    phases['unattributed'] = summarize_latencies(
+        [s['total'] - sum(s['phases'].values()) for s in ok]
+    )
+    first_chunks = [s['first_chunk'] for s in ok if s['first_chunk'] is not None]
+    return {
+        'iterations': len(samples),
+        'errors': len(samples) - len(ok),
+        'total': summarize_latencies([s['total'] for s in ok]),
+        'first_chunk': summarize_latencies(first_chunks) if first_chunks else None,
+        'phases': phases,
+        'sample_error': next((s['error'] for s in samples if s['error']), None),
+    }
+
+
+def run_benchmark(env: BenchEnvironment, endpoints=ENDPOINTS, iterations: int = 20,
+                  warmup: int = 2) -> Dict[str, Any]:
+    """Führt alle Endpunkte aus und gibt die Zusammenfassung pro Endpunkt zurück."""
+    from utils.provider import get_chat_service
+
+    recorder = PhaseRecorder()
+    driver = RouteDriver(env, recorder)
+    chat_service = get_chat_service()
+    results = {}
+
+    with recorder.instrument(chat_service=chat_service, engine=chat_service._engine):
+        for endpoint in endpoints:
+            run = getattr(driver, endpoint)
+            if endpoint == 'regenerate':
+                # Regenerate braucht eine Bot-Antwort als letzte Nachricht
+                driver.chat_stream(0)
+            for i in range(warmup):
+                run(i)
+            samples = [run(i) for i in range(iterations)]
+            results[endpoint] = summarize_endpoint(samples)
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=_SRC_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _print_results(results: Dict[str, Any]) -> None:
+    for endpoint, result in results.items():
+        total, first = result['total'], result['first_chunk']
+        line = f"{endpoint:<16} n={result['iterations']:<4} err={result['errors']:<3} " \
+               f"p50={total['p50_ms']}ms p99={total['p99_ms']}ms"
+        if first:
+            line += f"  TTFC p50={first['p50_ms']}ms"
+        print(line)
+        for phase, stats in result['phases'].items():
+            print(f"    {phase:<20} mean={stats['mean_ms']}ms p99={stats['p99_ms']}ms")
+        if result['sample_error']:
+            print(f"    Beispiel-Fehler: {result['sample_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Route-Benchmark mit Phasen-Zerlegung (offline)')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--sessions', type=int, default=10, help='Sessions der aktiven Persona')
+    parser.add_argument('--messages', type=int, default=200, help='Nachrichten pro Session')
+    parser.add_argument('--extra-personas', type=int, default=3, help='Zusätzliche Persona-DBs')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock: Sekunden bis zum ersten Token')
+    parser.add_argument('--tps', type=float, default=200.0, help='Mock: Tokens pro Sekunde')
+    parser.add_argument('--output-tokens', type=int, default=80)
+    parser.add_argument('--label', default='', help='Freitext zur Identifikation des Laufs')
+    parser.add_argument('--json', dest='json_path', help='Ziel-Datei (Default: benchmarks/results/)')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    config = {
+        'sessions': args.sessions, 'messages_per_session': args.messages,
+        'extra_personas': args.extra_personas, 'iterations': args.iterations,
+        'warmup': args.warmup, 'mock_latency': args.latency,
+        'mock_tokens_per_second': args.tps, 'mock_output_tokens': args.output_tokens,
+    }
+    with BenchEnvironment(
+        sessions=args.sessions, messages_per_session=args.messages,
+        extra_personas=args.extra_personas, latency=args.latency,
+        tokens_per_second=args.tps, output_tokens=args.output_tokens,
+    ) as env:
+        results = run_benchmark(env, args.endpoints, args.iterations, args.warmup)
+
+    _print_results(results)
+
+    report = {
+        'benchmark': 'routes',
+        'label': args.label,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'endpoints': results,
+    }
+    path = args.json_path or os.path.join(
+        RESULTS_DIR, f"routes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f'Ergebnisse gespeichert: {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Validierungs-Benchmark – Vollvalidierung vs. inkrementeller Validierungsgraph.
+
+Auf einem synthetischen Manifest (Standard: 2.000 Prompts, erzeugt wie in
+benchmarks.prompt_search) wird gemessen:
+    full         – PromptValidator.validate_all über Manifest, Domains, Registry
+    graph_build  – ValidationGraph.build (erster Aufbau, alle Knoten)
+    incremental  – ValidationGraph.updated nach Änderung eines Prompts
+                   (Copy-on-Write wie in save_prompt)
+    save_prompt  – PromptEngine.save_prompt Ende-zu-Ende (inkl. Datei-I/O)
+
+Verwendung:
+    cd src
+    python -m benchmarks.validation --prompts 2000 --iterations 20
+    python -m benchmarks.validation --json results/validation.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+from typing import Any, Dict
+
+# src/ als Importpfad (benchmarks/validation.py → src/)
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from benchmarks.engine_startup import _measure  # noqa: E402
+from benchmarks.prompt_search import build_synthetic_instructions  # noqa: E402
+from utils.logger import log  # noqa: E402
+from utils.prompt_engine import PromptEngine  # noqa: E402
+from utils.prompt_engine.validation_graph import ValidationGraph  # noqa: E402
+from utils.prompt_engine.validator import PromptValidator  # noqa: E402
+
+
+def run_benchmark(prompt_count: int = 2000, iterations: int = 20) -> Dict[str, Any]:
+    """Misst Voll- und inkrementelle Validierung auf einem synthetischen Manifest."""
+    with tempfile.TemporaryDirectory(prefix='personaui_validation_bench_') as root:
+        bench_dir = os.path.join(root, 'instructions')
+        build_synthetic_instructions(bench_dir, prompt_count)
+        engine = PromptEngine(bench_dir, use_load_cache=False)
+        snap = engine._snapshot
+        manifest, domains, registry = snap.manifest, snap.domains, snap.registry
+        validator = PromptValidator()
+        graph = ValidationGraph.build(manifest, domains, registry)
+
+        # Ein Prompt mit geändertem Text, Rest per Copy-on-Write geteilt
+        prompt_id = next(iter(manifest['prompts']))
+        domain_file = manifest['prompts'][prompt_id]['domain_file']
+        counter = {'n': 0}
+
+        def incremental():
+            counter['n'] += 1
+            entry = {'variants': {'default': {'content': f'Text {counter["n"]} {{{{char_name}}}}'}}}
+            changed_domains = {**domains, domain_file: {**domains[domain_file], prompt_id: entry}}
+            incremental.graph = graph.updated(manifest, changed_domains, registry)
+
+        full = validator.validate_all(manifest, domains, registry)
+        results: Dict[str, Any] = {
+            'prompt_count': len(manifest['prompts']),
+            'node_count': len(graph),
+            'full': _measure(lambda: validator.validate_all(manifest, domains, registry), iterations),
+            'graph_build': _measure(lambda: ValidationGraph.build(manifest, domains, registry), iterations),
+            'incremental': _measure(incremental, iterations),
+            'same_results': (sorted(full['errors']) == sorted(graph.errors)
+                             and sorted(full['warnings']) == sorted(graph.warnings)),
+        }
+        results['incremental_revalidated'] = incremental.graph.revalidated
+
+        engine.validate_all()
+
+        def save():
+            counter['n'] += 1
+            engine.save_prompt(prompt_id, {
+                'content': {'variants': {'default': {'content': f'Neuer Text {counter["n"]}'}}}
+            })
+        results['save_prompt'] = _measure(save, iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Voll- vs. inkrementelle Validierung')
+    parser.add_argument('--prompts', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--json', dest='json_path', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='INFO-Logs auf der Konsole anzeigen')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in log.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+    results = run_benchmark(args.prompts, args.iterations)
+
+    print(f"{results['prompt_count']} Prompts, {results['node_count']} Knoten, "
+          f"gleiche Meldungen={results['same_results']}, "
+          f"inkrementell neu geprüft={results['incremental_revalidated']}")
+    for path in ('full', 'graph_build', 'incremental', 'save_prompt'):
+        stats = results[path]
+        print(f"    {path:<12} mean={stats['mean_ms']}ms p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f'Ergebnisse gespeichert: {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
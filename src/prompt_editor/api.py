@@ -7,12 +7,9 @@ Dicts/Listen (pywebview serialisiert automatisch).
 
 import re
 import json
-from typing import Dict, List
 from utils.prompt_engine import PromptEngine
 from utils.logger import log
 
-_PH_PATTERN = re.compile(r'\{\{(\w+)\}\}')
-
 
 class EditorApi:
     """Python API-Bridge für den WebUI Editor."""
@@ -146,31 +143,9 @@ class EditorApi:
             return {"status": "error", "message": str(e)}
 
     def search_prompts(self, query: str) -> dict:
-        """Durchsucht alle Prompt-Namen und Inhalte."""
+        """Durchsucht alle Prompt-Namen und Inhalte (Präfix- und Fuzzy-Suche über den Engine-Index)."""
         try:
-            query_lower = query.lower()
-            results = []
-            prompts = self.engine.get_all_prompts()
-            for prompt_id, meta in prompts.items():
-                # Name / ID / Description durchsuchen
-                name_match = query_lower in (meta.get('name', '') + ' ' + prompt_id + ' ' + meta.get('description', '')).lower()
-                # Content durchsuchen
-                content_match = False
-                prompt_data = self.engine.get_prompt(prompt_id)
-                if prompt_data:
-                    for variant_data in prompt_data.get('content', {}).get('variants', {}).values():
-                        text = variant_data.get('content', '')
-                        if text and query_lower in text.lower():
-                            content_match = True
-                            break
-                if name_match or content_match:
-                    results.append({
-                        'id': prompt_id,
-                        'name': meta.get('name', prompt_id),
-                        'category': meta.get('category', 'custom'),
-                        'match_type': 'name' if name_match else 'content'
-                    })
-            return {"status": "ok", "results": results}
+            return {"status": "ok", "results": self.engine.search_prompts(query)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
@@ -185,9 +160,8 @@ class EditorApi:
             return {"status": "error", "message": str(e)}
 
     def get_placeholder_values(self, variant: str = 'default') -> dict:
-        """Alle aufgelösten Placeholder-Werte (Cache wird vorher geleert für aktuelle Daten)."""
+        """Alle aufgelösten Placeholder-Werte (Static-Cache ist über die Quelldateien versioniert)."""
         try:
-            self.engine.invalidate_cache()
             values = self.engine.get_current_values(variant)
             return {"status": "ok", "values": values}
         except Exception as e:
@@ -197,30 +171,10 @@ class EditorApi:
         """Für jeden Placeholder: in welchen Prompts wird er verwendet?"""
         try:
             registry = self.engine.get_all_placeholders()
-            prompts = self.engine.get_all_prompts()
-
-            # Sammle alle Placeholder-Verwendungen aus Content
-            usage_map: Dict[str, List[str]] = {key: [] for key in registry}
-            all_used_keys: set = set()
-
-            for prompt_id, meta in prompts.items():
-                prompt_data = self.engine.get_prompt(prompt_id)
-                if not prompt_data:
-                    continue
-                for variant_data in prompt_data.get('content', {}).get('variants', {}).values():
-                    text = variant_data.get('content', '')
-                    if not text:
-                        continue
-                    for match in _PH_PATTERN.finditer(text):
-                        key = match.group(1)
-                        all_used_keys.add(key)
-                        if key not in usage_map:
-                            usage_map[key] = []
-                        if prompt_id not in usage_map[key]:
-                            usage_map[key].append(prompt_id)
+            usage_map = self.engine.get_placeholder_usages()
 
             # Orphaned: in Prompts verwendet, aber nicht in Registry
-            orphaned = {k: usage_map[k] for k in all_used_keys if k not in registry}
+            orphaned = {k: ids for k, ids in usage_map.items() if k not in registry}
 
             # Unused: in Registry, aber nirgends verwendet
             unused = [k for k in registry if not usage_map.get(k)]
@@ -297,7 +251,6 @@ class EditorApi:
     def preview_prompt(self, prompt_id: str, variant: str = 'default') -> dict:
         """Einzelnen Prompt aufgelöst anzeigen."""
         try:
-            self.engine.invalidate_cache()
             resolved = self.engine.resolve_prompt(prompt_id, variant)
             return {"status": "ok", "content": resolved or ''}
         except Exception as e:
@@ -306,69 +259,47 @@ class EditorApi:
     def preview_full_system(self, variant: str = 'default') -> dict:
         """Vollständigen System-Prompt als Preview."""
         try:
-            self.engine.invalidate_cache()
-            system_prompt = self.engine.build_system_prompt(variant)
-            prefill = self.engine.build_prefill(variant)
-            first_assistant = self.engine.get_first_assistant_content(variant)
-            append = self.engine.get_system_prompt_append(variant)
-
+            bundle = self.engine.preview_bundle(variant, prompt_ids=[])
             return {
                 "status": "ok",
-                "system_prompt": system_prompt,
-                "system_prompt_append": append,
-                "prefill": prefill,
-                "first_assistant": first_assistant,
-                "system_tokens_est": len(system_prompt) // 4,
-                "prefill_tokens_est": len(prefill) // 4 if prefill else 0,
+                "system_prompt": bundle['system_prompt'],
+                "system_prompt_append": bundle['system_prompt_append'],
+                "prefill": bundle['prefill'],
+                "first_assistant": bundle['first_assistant'],
+                "system_tokens_est": bundle['tokens_est']['system_prompt'],
+                "prefill_tokens_est": bundle['tokens_est']['prefill'],
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    def preview_bundle(self, variant: str = 'default', prompt_ids_json: str = None) -> dict:
+        """Alle Preview-Daten in einem Aufruf (Blöcke, Abschnitte, Token-Schätzungen).
+
+        Unveränderte Blöcke kommen aus dem Preview-Cache der Engine – für
+        Live-Previews beim Tippen gedacht.
+        """
+        try:
+            prompt_ids = json.loads(prompt_ids_json) if prompt_ids_json else None
+            bundle = self.engine.preview_bundle(variant, prompt_ids=prompt_ids)
+            for block in bundle['blocks']:
+                self._annotate_block(block)
+            return {"status": "ok", **bundle}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
     def preview_category(self, category: str, variant: str = 'default') -> dict:
         """Preview für eine bestimmte Kategorie (chat, afterthought, summary, spec_autofill)."""
         try:
-            self.engine.invalidate_cache()
-            blocks = []
-            total_tokens = 0
-
-            for prompt_id, meta in sorted(
-                self.engine.get_all_prompts().items(),
-                key=lambda x: x[1].get('order', 9999)
-            ):
-                if meta.get('category') != category:
-                    continue
-                if not meta.get('enabled', True):
-                    continue
-
-                prompt_type = meta.get('type', 'text')
-
-                if prompt_type == 'multi_turn':
-                    # Multi-turn: Messages als Content-String formatieren
-                    resolved = self._resolve_multi_turn_content(prompt_id, variant)
-                else:
-                    resolved = ''
-                    try:
-                        resolved = self.engine.resolve_prompt(prompt_id, variant) or ''
-                    except Exception:
-                        pass
-
-                tokens = len(resolved) // 4 if resolved else 0
-                total_tokens += tokens
-                blocks.append({
-                    'id': prompt_id,
-                    'name': meta.get('name', prompt_id),
-                    'target': meta.get('target', ''),
-                    'position': meta.get('position', ''),
-                    'type': prompt_type,
-                    'content': resolved,
-                    'tokens_est': tokens,
-                })
-
+            blocks = [
+                self._preview_block(block)
+                for block in self.engine.preview_bundle(variant)['blocks']
+                if block['category'] == category and block['enabled']
+            ]
             return {
                 "status": "ok",
                 "category": category,
                 "blocks": blocks,
-                "total_tokens_est": total_tokens,
+                "total_tokens_est": sum(b['tokens_est'] for b in blocks),
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -381,52 +312,26 @@ class EditorApi:
         - 'message': target=message oder target=prefill (Messages/Prefill)
         """
         try:
-            self.engine.invalidate_cache()
             chat_categories = {'system', 'persona', 'context', 'prefill', 'dialog_injection'}
             system_blocks = []
             message_blocks = []
             total_tokens = 0
 
-            for prompt_id, meta in sorted(
-                self.engine.get_all_prompts().items(),
-                key=lambda x: x[1].get('order', 9999)
-            ):
-                if meta.get('category') not in chat_categories:
+            for block in self.engine.preview_bundle(variant)['blocks']:
+                if block['category'] not in chat_categories or not block['enabled']:
                     continue
-                if not meta.get('enabled', True):
-                    continue
-
-                prompt_type = meta.get('type', 'text')
-                target = meta.get('target', 'system_prompt')
 
-                if prompt_type == 'multi_turn':
-                    resolved = self._resolve_multi_turn_content(prompt_id, variant)
-                else:
-                    resolved = ''
-                    try:
-                        resolved = self.engine.resolve_prompt(prompt_id, variant) or ''
-                    except Exception:
-                        pass
-
-                tokens = len(resolved) // 4 if resolved else 0
-                total_tokens += tokens
-                block = {
-                    'id': prompt_id,
-                    'name': meta.get('name', prompt_id),
-                    'category': meta.get('category', ''),
-                    'target': target,
-                    'position': meta.get('position', ''),
-                    'type': prompt_type,
-                    'content': resolved,
-                    'tokens_est': tokens,
-                }
+                target = block['target'] or 'system_prompt'
+                item = self._preview_block(block, category=True)
+                item['target'] = target
+                total_tokens += item['tokens_est']
 
                 if target == 'system_prompt':
-                    block['section'] = 'system'
-                    system_blocks.append(block)
+                    item['section'] = 'system'
+                    system_blocks.append(item)
                 else:
-                    block['section'] = 'message'
-                    message_blocks.append(block)
+                    item['section'] = 'message'
+                    message_blocks.append(item)
 
             return {
                 "status": "ok",
@@ -444,95 +349,43 @@ class EditorApi:
         Innerhalb jeder Gruppe: System- und Message-Blöcke getrennt.
         """
         try:
-            self.engine.invalidate_cache()
-            prompts = self.engine.get_all_prompts()
-            blocks = []
-
-            # Mapping: category → request_type
-            CATEGORY_TO_REQUEST = {
-                'system': 'chat',
-                'persona': 'chat',
-                'context': 'chat',
-                'prefill': 'chat',
-                'dialog_injection': 'chat',
-                'afterthought': 'afterthought',
-                'summary': 'summary',
-                'spec_autofill': 'spec_autofill',
-                'utility': 'utility',
-                'cortex': 'cortex',
-                'custom': 'chat',
-            }
-
-            for prompt_id, meta in sorted(prompts.items(), key=lambda x: x[1].get('order', 9999)):
-                prompt_type = meta.get('type', 'text')
-                target = meta.get('target', '')
-
-                if prompt_type == 'multi_turn':
-                    resolved = self._resolve_multi_turn_content(prompt_id, variant)
-                else:
-                    resolved = ''
-                    try:
-                        resolved = self.engine.resolve_prompt(prompt_id, variant) or ''
-                    except Exception:
-                        pass
-
-                category = meta.get('category', 'custom')
-                request_type = CATEGORY_TO_REQUEST.get(category, 'chat')
-
-                # Section: system vs message
-                section = 'system' if target == 'system_prompt' else 'message'
-
-                blocks.append({
-                    'id': prompt_id,
-                    'name': meta.get('name', prompt_id),
-                    'category': category,
-                    'target': target,
-                    'position': meta.get('position', ''),
-                    'order': meta.get('order', 9999),
-                    'enabled': meta.get('enabled', True),
-                    'variant_condition': meta.get('variant_condition'),
-                    'type': prompt_type,
-                    'request_type': request_type,
-                    'section': section,
-                    'content': resolved,
-                    'tokens_est': len(resolved) // 4 if resolved else 0,
-                })
-
+            blocks = self.engine.preview_bundle(variant)['blocks']
+            for block in blocks:
+                self._annotate_block(block)
             return {"status": "ok", "blocks": blocks, "variant": variant}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     # ===== Utilities =========================================================
 
-    def _resolve_multi_turn_content(self, prompt_id: str, variant: str) -> str:
-        """Löst multi_turn Prompts auf und gibt einen lesbaren String zurück."""
-        try:
-            prompt_data = self.engine.get_prompt(prompt_id)
-            if not prompt_data:
-                return ''
-
-            meta = prompt_data.get('meta', {})
-            content_data = prompt_data.get('content', {})
-
-            # Check variant_condition
-            variant_condition = meta.get('variant_condition')
-            if variant_condition and variant_condition != variant:
-                return ''
-
-            variants = content_data.get('variants', {})
-            variant_data = variants.get(variant) or variants.get('default')
-            if not variant_data or 'messages' not in variant_data:
-                return ''
-
-            messages = variant_data['messages']
-            parts = []
-            for msg in messages:
-                role = msg.get('role', 'user').upper()
-                content = msg.get('content', '')
-                parts.append(f"[{role}]: {content}")
-            return '\n\n'.join(parts)
-        except Exception:
-            return ''
+    # Mapping: category → request_type
+    CATEGORY_TO_REQUEST = {
+        'system': 'chat',
+        'persona': 'chat',
+        'context': 'chat',
+        'prefill': 'chat',
+        'dialog_injection': 'chat',
+        'afterthought': 'afterthought',
+        'summary': 'summary',
+        'spec_autofill': 'spec_autofill',
+        'utility': 'utility',
+        'cortex': 'cortex',
+        'custom': 'chat',
+    }
+
+    def _annotate_block(self, block: dict) -> dict:
+        """Ergänzt einen Bundle-Block um request_type und section (Compositor)."""
+        block['category'] = block['category'] or 'custom'
+        block['request_type'] = self.CATEGORY_TO_REQUEST.get(block['category'], 'chat')
+        block['section'] = 'system' if block['target'] == 'system_prompt' else 'message'
+        return block
+
+    @staticmethod
+    def _preview_block(block: dict, category: bool = False) -> dict:
+        """Bundle-Block auf die Felder der Kategorie-/Chat-Preview reduzieren."""
+        keys = ['id', 'name'] + (['category'] if category else []) + [
+            'target', 'position', 'type', 'content', 'tokens_est']
+        return {key: block[key] for key in keys}
 
     def validate_all(self) -> dict:
         """Validiert alle Prompts und Placeholder."""
@@ -542,6 +395,7 @@ class EditorApi:
                 "status": "ok",
                 "errors": result.get('errors', []),
                 "warnings": result.get('warnings', []),
+                "nodes": self.engine.get_validation_results()['nodes'],
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -566,6 +420,7 @@ class EditorApi:
                 "placeholder_count": len(placeholders),
                 "load_errors": load_errors,
                 "is_loaded": self.engine.is_loaded,
+                "prompt_cache": self.engine.get_prompt_cache_stats(),
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
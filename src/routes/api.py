@@ -410,3 +410,18 @@ def reload_prompts():
         )
     return success_response(message='Prompts erfolgreich neu geladen')
 
+
+
+# ===== API-Traffic Status =====
+
+@api_bp.route('/api/requests/status', methods=['GET'])
+@handle_route_error('get_request_status')
+def get_request_status():
+    """Queue-Tiefe des API-Schedulers, Retry- und Response-Cache-Statistiken."""
+    api_client = get_api_client()
+    cache = api_client.response_cache
+    return success_response(
+        scheduler=api_client.scheduler.snapshot(),
+        retries=api_client.get_retry_stats(),
+        response_cache=cache.stats() if cache is not None else None
+    )
@@ -6,7 +6,7 @@ from flask import Blueprint, request
 from utils.logger import log
 from utils.config import (
     load_char_profile, load_char_config, save_char_config, get_available_char_options,
-    list_created_personas, save_created_persona, delete_created_persona, update_created_persona,
+    get_persona_page, save_created_persona, delete_created_persona, update_created_persona,
     activate_persona, restore_default_persona,
     get_active_persona_id
 )
@@ -117,9 +117,11 @@ def save_char_config_route():
 @character_bp.route('/api/personas', methods=['GET'])
 @handle_route_error('get_personas')
 def get_personas():
-    """Listet alle erstellten Personas + Standard"""
-    personas = list_created_personas()
-    return success_response(personas=personas)
+    """Listet alle erstellten Personas + Standard (optional seitenweise: ?offset=&limit=)"""
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    personas, total = get_persona_page(offset, limit)
+    return success_response(personas=personas, total=total)
 
 
 @character_bp.route('/api/personas', methods=['POST'])
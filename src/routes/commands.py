@@ -127,13 +127,13 @@ def cortex_update():
     # 5. Zähler-Reset: cycle_base = aktuelle message_count
     set_cycle_base(persona_id, session_id, message_count)
 
-    # 6. Background-Update starten
-    _start_background_cortex_update(persona_id, session_id)
+    # 6. Update in der Job-Queue einplanen
+    job_id = _start_background_cortex_update(persona_id, session_id, reason='manual')
 
     log.info(
-        "[/cortex] Manueller Cortex-Update gestartet — Persona: %s, Session: %s, "
+        "[/cortex] Manueller Cortex-Update eingeplant (Job %s) — Persona: %s, Session: %s, "
         "Messages: %d",
-        persona_id, session_id, message_count
+        job_id, persona_id, session_id, message_count
     )
 
     # 7. Progress-Daten für Frontend (nach Reset = 0%)
@@ -147,6 +147,7 @@ def cortex_update():
         cortex={
             "triggered": True,
             "progress": progress,
-            "frequency": frequency
+            "frequency": frequency,
+            "job_id": job_id
         }
     )
@@ -2,15 +2,16 @@
 Cortex Routes — REST-Endpunkte für Cortex-Dateizugriff und Cortex-Settings.
 
 Ermöglicht dem Frontend (CortexOverlay) das Lesen, Bearbeiten und Zurücksetzen
-der drei Cortex-Dateien (memory.md, soul.md, relationship.md) sowie die
-Konfiguration der Cortex-Einstellungen (enabled, frequency).
+der drei Cortex-Dateien (memory.md, soul.md, relationship.md), die
+Konfiguration der Cortex-Einstellungen (enabled, frequency) sowie den Status
+der Cortex-Update-Jobs (Job-Queue).
 """
 
 import os
 import json
 from flask import Blueprint, request
 
-from utils.provider import get_cortex_service
+from utils.provider import get_cortex_service, get_cortex_job_queue
 from utils.cortex_service import CORTEX_FILES, TEMPLATES
 from utils.cortex.tier_checker import _load_cortex_config, _get_context_limit, _calculate_threshold
 from utils.cortex.tier_tracker import get_progress
@@ -365,3 +366,73 @@ def get_cortex_progress():
         frequency=frequency,
         enabled=True
     )
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  CORTEX JOB ENDPOINTS
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@cortex_bp.route('/api/cortex/jobs', methods=['GET'])
+@handle_route_error('get_cortex_jobs')
+def get_cortex_jobs():
+    """
+    Listet die neuesten Cortex-Update-Jobs.
+
+    Query-Parameter:
+        persona_id (str): Optional — nur Jobs dieser Persona
+        status (str): Optional — pending | running | done | failed
+        limit (int): Optional — maximale Anzahl (Standard: 50, max. 500)
+
+    Returns:
+        {
+            "success": true,
+            "jobs": [{"id": 12, "persona_id": "default", "session_id": 3,
+                      "status": "done", "from_message_id": null,
+                      "to_message_id": 120, "triggers": 2, "attempts": 1, ...}]
+        }
+    """
+    limit = max(1, min(500, request.args.get('limit', 50, type=int)))
+    jobs = get_cortex_job_queue().list_jobs(
+        persona_id=request.args.get('persona_id') or None,
+        status=request.args.get('status') or None,
+        limit=limit
+    )
+    return success_response(jobs=jobs)
+
+
+@cortex_bp.route('/api/cortex/jobs/stats', methods=['GET'])
+@handle_route_error('get_cortex_job_stats')
+def get_cortex_job_stats():
+    """
+    Gibt Durchsatz und Latenzen der Cortex-Job-Queue zurück.
+
+    Returns:
+        {
+            "success": true,
+            "stats": {
+                "workers": 2,
+                "jobs": {"pending": 1, "running": 1, "done": 40, "failed": 0},
+                "enqueued": 42, "coalesced": 7, "completed": 40, "failed": 0, "retried": 2,
+                "throughput_per_minute": 0.4,
+                "wait": {"p50_ms": 31000.0, "p99_ms": 95000.0},
+                "run": {"p50_ms": 8200.0, "p99_ms": 21000.0}
+            }
+        }
+    """
+    return success_response(stats=get_cortex_job_queue().stats())
+
+
+@cortex_bp.route('/api/cortex/jobs/<int:job_id>', methods=['GET'])
+@handle_route_error('get_cortex_job')
+def get_cortex_job(job_id):
+    """
+    Gibt den Status eines einzelnen Cortex-Update-Jobs zurück.
+
+    Fehler:
+        404 — Job unbekannt (oder bereits aufgeräumt)
+    """
+    job = get_cortex_job_queue().get_job(job_id)
+    if job is None:
+        return error_response(f'Job {job_id} nicht gefunden', 404)
+    return success_response(job=job)
@@ -7,6 +7,7 @@ import json
 import re
 from utils.settings_defaults import get_autofill_model
 from utils.logger import log
+from utils.config import invalidate_character_cache
 from utils.provider import get_api_client
 from utils.api_request import RequestConfig
 from routes.helpers import success_response, error_response, handle_route_error
@@ -62,6 +63,7 @@ def _save_custom_spec(data):
     try:
         with open(CUSTOM_SPEC_FILE, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        invalidate_character_cache()
         return True
     except Exception as e:
         log.error("Fehler beim Speichern der Custom Spec: %s", e)
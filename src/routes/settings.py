@@ -20,7 +20,10 @@ DEFAULT_SETTINGS = load_defaults()
 MODEL_OPTIONS = load_model_options()
 
 # Keys die nur aus defaults kommen und nicht in user_settings gespeichert werden
-_DEFAULTS_ONLY_KEYS = {'apiAutofillModel'}
+_DEFAULTS_ONLY_KEYS = {'apiAutofillModel', 'personaContextCacheSize', 'cortexTokenBudget'}
+
+# Keys, nach deren Änderung der API-Scheduler neu konfiguriert wird
+_SCHEDULER_KEYS = {'apiRequestsPerMinute', 'apiTokensPerMinute'}
 
 # Nachgedanke/Afterthought Defaults
 _AFTERTHOUGHT_DEFAULTS = {
@@ -66,6 +69,15 @@ def _save_settings(settings):
         return False
 
 
+def _reconfigure_scheduler():
+    """Neue Rate-Limits sofort auf den laufenden ApiClient anwenden."""
+    try:
+        from utils.provider import configure_api_scheduler, get_api_client
+        configure_api_scheduler(get_api_client())
+    except RuntimeError:
+        pass  # ApiClient noch nicht initialisiert – init_services liest die Settings
+
+
 @settings_bp.route('/api/user-settings', methods=['GET'])
 @handle_route_error('get_user_settings')
 def get_user_settings():
@@ -86,6 +98,8 @@ def update_user_settings():
     current.update(data)
 
     if _save_settings(current):
+        if _SCHEDULER_KEYS & data.keys():
+            _reconfigure_scheduler()
         return success_response(settings=current, defaults={**DEFAULT_SETTINGS, 'apiModelOptions': MODEL_OPTIONS})
     else:
         return error_response('Speichern fehlgeschlagen', 500)
@@ -96,6 +110,7 @@ def update_user_settings():
 def reset_user_settings():
     """Setzt alle User-Settings auf Standardwerte zurück"""
     if _save_settings(dict(DEFAULT_SETTINGS)):
+        _reconfigure_scheduler()
         return success_response(settings=DEFAULT_SETTINGS, defaults={**DEFAULT_SETTINGS, 'apiModelOptions': MODEL_OPTIONS})
     return error_response('Reset fehlgeschlagen', 500)
 
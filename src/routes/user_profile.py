@@ -108,14 +108,7 @@ def update_user_profile():
         current['persona_language'] = current['persona_language'].strip().lower()
     
     if _save_profile(current):
-        # PromptEngine-Cache invalidieren (user_profile-Werte wie language sind gecached)
-        try:
-            from utils.provider import get_prompt_engine
-            engine = get_prompt_engine()
-            if engine:
-                engine.invalidate_cache()
-        except Exception:
-            pass
+        # Kein Cache-Reset nötig: PromptEngine erkennt die geänderte user_profile.json
         return success_response(profile=current)
     else:
         return error_response('Speichern fehlgeschlagen', 500)
@@ -28,6 +28,14 @@ WHERE session_id = ?
 ORDER BY id DESC
 LIMIT ?;
 
+-- name: get_messages_in_range
+-- Holt die neuesten N Nachrichten mit after_id < id <= until_id (nach ID absteigend)
+SELECT id, message, is_user
+FROM chat_messages
+WHERE session_id = ? AND id > ? AND id <= ?
+ORDER BY id DESC
+LIMIT ?;
+
 -- name: insert_message
 -- Speichert eine neue Nachricht
 INSERT INTO chat_messages (session_id, message, is_user, character_name)
@@ -0,0 +1,51 @@
+-- =============================================
+-- Cortex-Gedächtnis Abfragen (Persona-DB)
+-- Strukturierte Einträge der Cortex-Dateien
+-- =============================================
+
+-- name: get_entries
+-- Alle Einträge einer Cortex-Datei in Dokument-Reihenfolge
+SELECT id, filename, section, kind, text, position, salience,
+       created_at, updated_at, recall_count, last_recalled_at
+FROM cortex_entries
+WHERE filename = ?
+ORDER BY position;
+
+-- name: insert_entry
+-- Neuer Eintrag
+INSERT INTO cortex_entries
+    (filename, section, kind, text, position, salience, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+
+-- name: update_position
+-- Unveränderter Eintrag an neuer Stelle
+UPDATE cortex_entries SET position = ? WHERE id = ?;
+
+-- name: delete_entry
+-- Entfernt einen Eintrag
+DELETE FROM cortex_entries WHERE id = ?;
+
+-- name: mark_recalled
+-- Gesammelte Abrufe eines Eintrags nachtragen (Salience-Verstärkung, gedeckelt)
+UPDATE cortex_entries
+SET recall_count = recall_count + ?,
+    last_recalled_at = ?,
+    salience = MIN(salience + ?, ?)
+WHERE id = ?;
+
+-- name: set_salience
+-- Setzt die Salience eines Eintrags
+UPDATE cortex_entries SET salience = ? WHERE id = ?;
+
+-- name: get_file_hash
+-- Inhalts-Hash der zuletzt synchronisierten Datei
+SELECT content_hash FROM cortex_files WHERE filename = ?;
+
+-- name: upsert_file_hash
+-- Speichert den Inhalts-Hash nach einer Synchronisation
+INSERT OR REPLACE INTO cortex_files (filename, content_hash, synced_at)
+VALUES (?, ?, ?);
+
+-- name: count_entries
+-- Anzahl Einträge pro Datei
+SELECT filename, COUNT(*) FROM cortex_entries GROUP BY filename;
@@ -0,0 +1,126 @@
+-- =============================================
+-- Cortex-Job-Queue (data/cortex_jobs.db)
+-- Persistente Warteschlange für Cortex-Updates
+-- =============================================
+
+-- name: create_table
+-- Legt die Job-Tabelle an (idempotent)
+CREATE TABLE IF NOT EXISTS cortex_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    persona_id TEXT NOT NULL,
+    session_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    reason TEXT,
+    from_message_id INTEGER,
+    to_message_id INTEGER,
+    triggers INTEGER NOT NULL DEFAULT 1,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    last_error TEXT,
+    result_json TEXT
+);
+
+-- name: create_index
+-- Index für das Abholen fälliger Jobs
+CREATE INDEX IF NOT EXISTS idx_cortex_jobs_status
+ON cortex_jobs(status, not_before);
+
+-- name: insert_job
+-- Neuer wartender Job
+INSERT INTO cortex_jobs
+    (persona_id, session_id, status, reason, from_message_id, to_message_id, not_before, created_at)
+VALUES (?, ?, 'pending', ?, ?, ?, ?, ?);
+
+-- name: get_pending_for_session
+-- Wartender Job derselben Persona und Session (für Coalescing)
+SELECT id, from_message_id, to_message_id
+FROM cortex_jobs
+WHERE persona_id = ? AND session_id = ? AND status = 'pending'
+ORDER BY id
+LIMIT 1;
+
+-- name: coalesce_job
+-- Führt einen weiteren Trigger in einen wartenden Job zusammen
+UPDATE cortex_jobs
+SET from_message_id = ?, to_message_id = ?, triggers = triggers + 1, reason = ?
+WHERE id = ?;
+
+-- name: get_due_jobs
+-- Fällige wartende Jobs in Abarbeitungsreihenfolge
+SELECT id, persona_id, session_id
+FROM cortex_jobs
+WHERE status = 'pending' AND not_before <= ?
+ORDER BY not_before, id;
+
+-- name: get_next_not_before
+-- Frühester Zeitpunkt, zu dem ein wartender Job fällig wird
+SELECT MIN(not_before) FROM cortex_jobs WHERE status = 'pending';
+
+-- name: mark_running
+-- Job übernehmen (nur wenn er noch wartet)
+UPDATE cortex_jobs
+SET status = 'running', started_at = ?, attempts = attempts + 1
+WHERE id = ? AND status = 'pending';
+
+-- name: mark_done
+-- Job erfolgreich abgeschlossen
+UPDATE cortex_jobs
+SET status = 'done', finished_at = ?, last_error = NULL, result_json = ?
+WHERE id = ?;
+
+-- name: mark_failed
+-- Job endgültig fehlgeschlagen
+UPDATE cortex_jobs
+SET status = 'failed', finished_at = ?, last_error = ?, result_json = ?
+WHERE id = ?;
+
+-- name: mark_retry
+-- Job nach Fehler erneut einplanen
+UPDATE cortex_jobs
+SET status = 'pending', not_before = ?, last_error = ?
+WHERE id = ?;
+
+-- name: requeue_running
+-- Nach einem Neustart: unterbrochene Jobs wieder einplanen
+UPDATE cortex_jobs SET status = 'pending' WHERE status = 'running';
+
+-- name: get_last_finished
+-- Letzter Abschluss pro Persona (Mindestabstand nach Neustart)
+SELECT persona_id, MAX(finished_at)
+FROM cortex_jobs
+WHERE finished_at IS NOT NULL
+GROUP BY persona_id;
+
+-- name: get_job
+-- Einzelner Job
+SELECT id, persona_id, session_id, status, reason, from_message_id, to_message_id,
+       triggers, attempts, not_before, created_at, started_at, finished_at, last_error, result_json
+FROM cortex_jobs
+WHERE id = ?;
+
+-- name: list_jobs
+-- Neueste Jobs, optional gefiltert nach Persona und Status (NULL = alle)
+SELECT id, persona_id, session_id, status, reason, from_message_id, to_message_id,
+       triggers, attempts, not_before, created_at, started_at, finished_at, last_error, result_json
+FROM cortex_jobs
+WHERE (? IS NULL OR persona_id = ?) AND (? IS NULL OR status = ?)
+ORDER BY id DESC
+LIMIT ?;
+
+-- name: count_by_status
+-- Anzahl Jobs pro Status
+SELECT status, COUNT(*) FROM cortex_jobs GROUP BY status;
+
+-- name: delete_old_finished
+-- Behält nur die N neuesten abgeschlossenen Jobs
+DELETE FROM cortex_jobs
+WHERE status IN ('done', 'failed')
+  AND id NOT IN (
+      SELECT id FROM cortex_jobs
+      WHERE status IN ('done', 'failed')
+      ORDER BY id DESC
+      LIMIT ?
+  );
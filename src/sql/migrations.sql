@@ -2,3 +2,23 @@
 -- PersonaUI Database Migrations
 -- Spalten-Erweiterungen für bestehende Tabellen
 -- =============================================
+
+-- name: check_last_memory_message_id
+-- Prüft ob der Memory-Marker (letzte in Cortex eingearbeitete Nachricht) existiert
+SELECT last_memory_message_id FROM chat_sessions LIMIT 1;
+
+-- name: add_last_memory_message_id
+-- Memory-Marker zu Sessions hinzufügen
+ALTER TABLE chat_sessions ADD COLUMN last_memory_message_id INTEGER DEFAULT NULL;
+
+-- name: check_memory_message_ranges
+-- Prüft ob die Range-Spalten (Bereich des letzten Cortex-Updates) existieren
+SELECT memory_start_message_id, memory_end_message_id FROM chat_sessions LIMIT 1;
+
+-- name: add_start_message_id
+-- Range-Start: erste neue Nachricht des letzten Cortex-Updates
+ALTER TABLE chat_sessions ADD COLUMN memory_start_message_id INTEGER DEFAULT NULL;
+
+-- name: add_end_message_id
+-- Range-Ende: letzte Nachricht des letzten Cortex-Updates
+ALTER TABLE chat_sessions ADD COLUMN memory_end_message_id INTEGER DEFAULT NULL;
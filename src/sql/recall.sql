@@ -0,0 +1,17 @@
+-- =============================================
+-- Recall-Index Abfragen (Persona-DB)
+-- Dokumente für den Aufbau des Ähnlichkeits-Index
+-- =============================================
+
+-- name: get_all_messages
+-- Alle Nachrichten aller Sessions
+SELECT id, message, is_user, character_name
+FROM chat_messages
+ORDER BY id;
+
+-- name: get_cortex_entries
+-- Inhalts-Einträge des Cortex-Stores (ohne Überschriften und Platzhalter)
+SELECT id, text, filename
+FROM cortex_entries
+WHERE kind != 'heading' AND text != '(no entries yet)'
+ORDER BY id;
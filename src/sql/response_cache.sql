@@ -0,0 +1,62 @@
+-- =============================================
+-- Response-Cache Abfragen (data/response_cache.db)
+-- Memoisierte Antworten deterministischer Utility-Requests
+-- =============================================
+
+-- name: create_table
+-- Legt die Cache-Tabelle an (idempotent)
+CREATE TABLE IF NOT EXISTS response_cache (
+    cache_key TEXT PRIMARY KEY,
+    request_type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    usage_json TEXT,
+    stop_reason TEXT,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+
+-- name: create_index
+-- Index für LRU-Eviction
+CREATE INDEX IF NOT EXISTS idx_response_cache_access
+ON response_cache(last_access);
+
+-- name: get_entry
+-- Holt einen Cache-Eintrag
+SELECT content, usage_json, stop_reason, created_at
+FROM response_cache
+WHERE cache_key = ?;
+
+-- name: touch_entry
+-- Aktualisiert den letzten Zugriff (LRU)
+UPDATE response_cache SET last_access = ? WHERE cache_key = ?;
+
+-- name: upsert_entry
+-- Speichert oder ersetzt einen Cache-Eintrag
+INSERT OR REPLACE INTO response_cache
+    (cache_key, request_type, content, usage_json, stop_reason, created_at, last_access)
+VALUES (?, ?, ?, ?, ?, ?, ?);
+
+-- name: delete_entry
+-- Löscht einen einzelnen Eintrag
+DELETE FROM response_cache WHERE cache_key = ?;
+
+-- name: delete_expired
+-- Löscht alle Einträge älter als die TTL
+DELETE FROM response_cache WHERE created_at < ?;
+
+-- name: count_entries
+-- Anzahl aller Einträge
+SELECT COUNT(*) FROM response_cache;
+
+-- name: delete_lru
+-- Löscht die N am längsten nicht genutzten Einträge
+DELETE FROM response_cache
+WHERE cache_key IN (
+    SELECT cache_key FROM response_cache
+    ORDER BY last_access ASC
+    LIMIT ?
+);
+
+-- name: clear
+-- Leert den gesamten Cache
+DELETE FROM response_cache;
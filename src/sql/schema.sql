@@ -15,7 +15,10 @@ CREATE TABLE IF NOT EXISTS chat_sessions (
     title TEXT DEFAULT 'Neue Konversation',
     persona_id TEXT DEFAULT 'default',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_memory_message_id INTEGER DEFAULT NULL,
+    memory_start_message_id INTEGER DEFAULT NULL,
+    memory_end_message_id INTEGER DEFAULT NULL
 );
 
 -- Chat-Nachrichten Tabelle
@@ -32,3 +35,28 @@ CREATE TABLE IF NOT EXISTS chat_messages (
 -- Index für schnellere Nachrichten-Abfragen
 CREATE INDEX IF NOT EXISTS idx_session_id 
 ON chat_messages(session_id);
+
+-- Cortex-Gedächtnis: eine Zeile pro Eintrag der Cortex-Dateien
+CREATE TABLE IF NOT EXISTS cortex_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL,
+    section TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL DEFAULT 'bullet',
+    text TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    salience REAL NOT NULL DEFAULT 1.0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    recall_count INTEGER NOT NULL DEFAULT 0,
+    last_recalled_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_cortex_entries_file
+ON cortex_entries(filename, position);
+
+-- Stand der Synchronisation Datei → cortex_entries
+CREATE TABLE IF NOT EXISTS cortex_files (
+    filename TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
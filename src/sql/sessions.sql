@@ -45,3 +45,13 @@ SELECT id FROM chat_sessions WHERE id = ?;
 -- Zusammenfassung: Sessions pro Persona
 SELECT COUNT(*) as session_count, MAX(updated_at) as last_updated
 FROM chat_sessions;
+
+-- name: get_memory_marker
+-- Letzte bereits in Cortex eingearbeitete Nachricht einer Session
+SELECT last_memory_message_id FROM chat_sessions WHERE id = ?;
+
+-- name: set_memory_marker
+-- Setzt Memory-Marker und Range des letzten Cortex-Updates (ohne updated_at zu ändern)
+UPDATE chat_sessions
+SET last_memory_message_id = ?, memory_start_message_id = ?, memory_end_message_id = ?
+WHERE id = ?;
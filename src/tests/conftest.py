@@ -15,6 +15,22 @@ sys.path.insert(0, SRC_DIR)
 os.chdir(SRC_DIR)
 
 
+# ============================================================
+# Datenbank-Isolation
+# ============================================================
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Persona-DBs in ein temporäres Verzeichnis (CortexService synchronisiert beim Schreiben)."""
+    data_dir = str(tmp_path / 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    for name in ('utils.database.connection', 'src.utils.database.connection'):
+        module = sys.modules.get(name)
+        if module is not None:
+            monkeypatch.setattr(module, 'DATA_DIR', data_dir)
+    return data_dir
+
+
 # ============================================================
 # Character Data / Persona Fixtures
 # ============================================================
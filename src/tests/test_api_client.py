@@ -242,3 +242,411 @@ class TestPackageExports:
         assert ApiResponse is not None
         assert StreamEvent is not None
         assert callable(clean_api_response)
+
+
+# ============================================================
+# Resilienz Tests (resilience.py + Retry im ApiClient)
+# ============================================================
+
+def _status_error(status_code, message='Fehler', headers=None):
+    """Echte anthropic Status-Exception mit gemockter Response."""
+    import anthropic as real_anthropic
+    from unittest.mock import MagicMock
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return real_anthropic.APIStatusError(message, response=response, body=None)
+
+
+class TestRetryClassification:
+    def test_rate_limit_always_retryable(self):
+        from utils.api_request.resilience import is_retryable_error, RetryPolicy
+        assert is_retryable_error(_status_error(429), RetryPolicy(idempotent=False))
+        assert is_retryable_error(_status_error(529), RetryPolicy(idempotent=False))
+
+    def test_server_error_only_when_idempotent(self):
+        from utils.api_request.resilience import is_retryable_error, RetryPolicy
+        assert not is_retryable_error(_status_error(500), RetryPolicy(idempotent=False))
+        assert is_retryable_error(_status_error(500), RetryPolicy(idempotent=True))
+
+    def test_client_errors_never_retryable(self):
+        from utils.api_request.resilience import is_retryable_error, RetryPolicy
+        policy = RetryPolicy(idempotent=True)
+        assert not is_retryable_error(_status_error(400), policy)
+        assert not is_retryable_error(_status_error(401), policy)
+        assert not is_retryable_error(_status_error(429, 'Your credit balance is too low'), policy)
+
+    def test_retry_after_header(self):
+        from utils.api_request.resilience import get_retry_after
+        assert get_retry_after(_status_error(429, headers={'retry-after': '3'})) == 3.0
+        assert get_retry_after(_status_error(429, headers={'retry-after-ms': '1500'})) == 1.5
+        assert get_retry_after(_status_error(429)) is None
+
+    def test_backoff_respects_retry_after_and_budget(self):
+        from utils.api_request.resilience import compute_backoff, RetryPolicy
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0, max_retry_after=10.0)
+        for attempt in range(1, 6):
+            assert 0 <= compute_backoff(attempt, policy) <= 4.0
+        assert compute_backoff(1, policy, retry_after=5.0) >= 5.0
+        assert compute_backoff(1, policy, retry_after=30.0) is None
+
+
+class TestApiClientRetry:
+    def _client(self, mock_anthropic):
+        import anthropic as real_anthropic
+        from utils.api_request import ApiClient
+        mock_anthropic.APIError = real_anthropic.APIError
+        client = ApiClient(api_key='test-key')
+        client._sleep = lambda seconds: None
+        client.response_cache = None
+        return client
+
+    def test_request_retries_rate_limit(self, mock_anthropic):
+        from utils.api_request.types import RequestConfig
+        client = self._client(mock_anthropic)
+        create = mock_anthropic.Anthropic.return_value.messages.create
+        ok = create.return_value
+        create.side_effect = [_status_error(429), _status_error(529), ok]
+
+        response = client.request(RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Hi'}],
+            request_type='cortex_update'
+        ))
+
+        assert response.success is True
+        assert create.call_count == 3
+        stats = client.get_retry_stats()['cortex_update']
+        assert stats['retries'] == 2
+        assert stats['retried_requests'] == 1
+        assert stats['failed_after_retry'] == 0
+
+    def test_request_gives_up_after_max_attempts(self, mock_anthropic):
+        from utils.api_request.types import RequestConfig
+        from utils.api_request.resilience import get_retry_policy
+        client = self._client(mock_anthropic)
+        create = mock_anthropic.Anthropic.return_value.messages.create
+        create.side_effect = _status_error(529, 'Overloaded')
+
+        response = client.request(RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Hi'}],
+            request_type='session_title'
+        ))
+
+        assert response.success is False
+        assert create.call_count == get_retry_policy('session_title').max_attempts
+        assert client.get_retry_stats()['session_title']['failed_after_retry'] == 1
+
+    def test_non_idempotent_policy_does_not_retry_server_error(self, mock_anthropic):
+        from utils.api_request.types import RequestConfig
+        client = self._client(mock_anthropic)
+        create = mock_anthropic.Anthropic.return_value.messages.create
+        create.side_effect = _status_error(500)
+
+        response = client.request(RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Hi'}],
+            request_type='generic'
+        ))
+
+        assert response.success is False
+        assert create.call_count == 1
+
+    def test_stream_retries_before_first_chunk(self, mock_anthropic):
+        from unittest.mock import MagicMock
+        from utils.api_request.types import RequestConfig
+        client = self._client(mock_anthropic)
+
+        ok_ctx = MagicMock()
+        ok_ctx.__enter__ = MagicMock(return_value=ok_ctx)
+        ok_ctx.__exit__ = MagicMock(return_value=False)
+        ok_ctx.text_stream = iter(['Hallo ', 'Welt'])
+        ok_ctx.get_final_message.return_value.usage.input_tokens = 10
+        ok_ctx.get_final_message.return_value.usage.output_tokens = 2
+
+        stream = mock_anthropic.Anthropic.return_value.messages.stream
+        stream.side_effect = [_status_error(529, 'Overloaded'), ok_ctx]
+
+        events = list(client.stream(RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Hi'}],
+            stream=True, request_type='chat'
+        )))
+
+        assert [e.event_type for e in events] == ['chunk', 'chunk', 'done']
+        assert stream.call_count == 2
+        assert client.get_retry_stats()['chat']['retries'] == 1
+
+    def test_stream_error_after_first_chunk_not_retried(self, mock_anthropic):
+        from unittest.mock import MagicMock
+        from utils.api_request.types import RequestConfig
+        client = self._client(mock_anthropic)
+
+        def broken_stream():
+            yield 'Hallo '
+            raise _status_error(529, 'Overloaded')
+
+        ctx = MagicMock()
+        ctx.__enter__ = MagicMock(return_value=ctx)
+        ctx.__exit__ = MagicMock(return_value=False)
+        ctx.text_stream = broken_stream()
+        stream = mock_anthropic.Anthropic.return_value.messages.stream
+        stream.return_value = ctx
+
+        events = list(client.stream(RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Hi'}],
+            stream=True, request_type='chat'
+        )))
+
+        assert [e.event_type for e in events] == ['chunk', 'error']
+        assert stream.call_count == 1
+
+    def test_hedged_request_uses_faster_call(self, mock_anthropic):
+        import threading
+        from utils.api_request.types import RequestConfig
+        from utils.api_request.resilience import configure_retry_policy, get_retry_policy
+        client = self._client(mock_anthropic)
+        create = mock_anthropic.Anthropic.return_value.messages.create
+        ok = create.return_value
+        release = threading.Event()
+        calls = []
+
+        def slow_then_fast(**kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(2)
+            return ok
+
+        create.side_effect = slow_then_fast
+        original = get_retry_policy('session_title')
+        configure_retry_policy('session_title', hedge_delay=0.01)
+        try:
+            response = client.request(RequestConfig(
+                system_prompt='', messages=[{'role': 'user', 'content': 'Titel'}],
+                request_type='session_title'
+            ))
+        finally:
+            release.set()
+            configure_retry_policy('session_title', hedge_delay=original.hedge_delay)
+
+        assert response.success is True
+        assert len(calls) == 2
+        stats = client.get_retry_stats()['session_title']
+        assert stats['hedged'] == 1
+        assert stats['hedge_wins'] == 1
+
+
+# ============================================================
+# Scheduler Tests (scheduler.py)
+# ============================================================
+
+class TestApiScheduler:
+    def test_priorities(self):
+        from utils.api_request.scheduler import (
+            get_priority, PRIORITY_INTERACTIVE, PRIORITY_AFTERTHOUGHT, PRIORITY_BACKGROUND
+        )
+        assert get_priority('chat') == PRIORITY_INTERACTIVE
+        assert get_priority('afterthought_decision') == PRIORITY_AFTERTHOUGHT
+        assert get_priority('cortex_update') == PRIORITY_BACKGROUND
+        assert get_priority('unknown_type') == PRIORITY_BACKGROUND
+
+    def test_token_estimate(self):
+        from utils.api_request.scheduler import estimate_input_tokens
+        assert estimate_input_tokens('a' * 400, [{'role': 'user', 'content': 'b' * 400}]) == 200
+
+    def test_slot_counts_and_snapshot(self):
+        from utils.api_request.scheduler import ApiScheduler
+        scheduler = ApiScheduler(requests_per_minute=10, tokens_per_minute=1000)
+        with scheduler.slot('chat', 100):
+            snap = scheduler.snapshot()
+            assert snap['classes']['interactive']['active'] == 1
+        snap = scheduler.snapshot()
+        assert snap['queue_depth'] == 0
+        assert snap['classes']['interactive']['active'] == 0
+        assert snap['classes']['interactive']['admitted'] == 1
+        assert snap['available']['tokens'] <= 1000
+
+    def test_background_respects_reserve(self):
+        from utils.api_request.scheduler import ApiScheduler, SchedulerTimeout
+        import pytest
+        scheduler = ApiScheduler(requests_per_minute=5, tokens_per_minute=60,
+                                 background_reserve=0.5, background_max_wait=0.05)
+        # Background darf die Reserve (50%) nicht angreifen
+        scheduler.acquire('cortex_update', 30)
+        with pytest.raises(SchedulerTimeout):
+            scheduler.acquire('cortex_update', 20)
+        # Interaktiver Chat bekommt die Reserve
+        scheduler.acquire('chat', 25)
+        assert scheduler.snapshot()['classes']['background']['timeouts'] == 1
+
+    def test_interactive_overtakes_background(self):
+        import threading
+        import time
+        from utils.api_request.scheduler import ApiScheduler
+        scheduler = ApiScheduler(requests_per_minute=600, tokens_per_minute=600,
+                                 background_reserve=0.0)
+        scheduler.acquire('chat', 600)  # Token-Bucket leeren (Refill: 10/s)
+        order = []
+
+        def run(request_type, tokens):
+            scheduler.acquire(request_type, tokens)
+            order.append(request_type)
+
+        background = threading.Thread(target=run, args=('cortex_update', 3))
+        background.start()
+        time.sleep(0.05)
+        interactive = threading.Thread(target=run, args=('chat', 3))
+        interactive.start()
+        background.join(5)
+        interactive.join(5)
+        assert order == ['chat', 'cortex_update']
+
+    def test_chat_never_waits_for_background_consumption(self):
+        import threading
+        import time
+        from utils.api_request.scheduler import ApiScheduler
+        scheduler = ApiScheduler(requests_per_minute=600, tokens_per_minute=6000,
+                                 background_reserve=0.2, background_max_wait=5)
+        scheduler.acquire('cortex_update', 4800)   # Background leert bis zur Reserve
+        blocked = threading.Thread(target=scheduler.acquire, args=('cortex_update', 2000))
+        blocked.start()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        scheduler.acquire('chat', 5000)             # größer als die verbleibende Reserve
+        assert time.monotonic() - start < 0.1
+        snap = scheduler.snapshot()
+        assert snap['classes']['interactive']['overdrawn'] == 1
+        assert snap['classes']['background']['queued'] == 1
+
+        scheduler.configure(tokens_per_minute=0)    # gibt den wartenden Background frei
+        blocked.join(5)
+        assert not blocked.is_alive()
+
+    def test_afterthought_wait_is_bounded(self):
+        import time
+        from utils.api_request.scheduler import ApiScheduler
+        scheduler = ApiScheduler(requests_per_minute=600, tokens_per_minute=600,
+                                 afterthought_max_wait=0.05)
+        scheduler.acquire('chat', 600)
+        start = time.monotonic()
+        scheduler.acquire('afterthought_decision', 300)
+        assert time.monotonic() - start < 1.0
+        assert scheduler.snapshot()['classes']['afterthought']['overdrawn'] == 1
+
+    def test_zero_disables_local_limit(self):
+        from utils.api_request.scheduler import ApiScheduler
+        scheduler = ApiScheduler(requests_per_minute=0, tokens_per_minute=0)
+        assert scheduler.enabled is False
+        for _ in range(100):
+            scheduler.acquire('cortex_update', 10 ** 6)
+        snap = scheduler.snapshot()
+        assert snap['classes']['background']['timeouts'] == 0
+        assert snap['limits']['enabled'] is False
+        assert snap['available'] == {'requests': None, 'tokens': None}
+
+    def test_limits_from_settings(self, api_client):
+        from utils import provider
+        settings = {'apiRequestsPerMinute': 30, 'apiTokensPerMinute': '40000'}
+        with patch('utils.settings_defaults.get_setting', side_effect=lambda k, d=None: settings.get(k, d)):
+            provider.configure_api_scheduler(api_client)
+        limits = api_client.scheduler.snapshot()['limits']
+        assert (limits['enabled'], limits['requests_per_minute'], limits['tokens_per_minute']) == (True, 30, 40000)
+
+    def test_init_services_activates_scheduler(self, monkeypatch):
+        from utils import provider
+        from utils.api_request.scheduler import DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
+        for name in ('_api_client', '_chat_service', '_cortex_service'):
+            monkeypatch.setattr(provider, name, None)
+        monkeypatch.setattr('utils.settings_defaults._USER_SETTINGS_FILE', '/nonexistent/user_settings.json')
+        with patch('utils.cortex_service.CortexService.ensure_cortex_files'):
+            provider.init_services(api_key='sk-ant-test')
+
+        limits = provider.get_api_client().scheduler.snapshot()['limits']
+        assert DEFAULT_REQUESTS_PER_MINUTE > 0 and DEFAULT_TOKENS_PER_MINUTE > 0
+        assert (limits['enabled'], limits['requests_per_minute'], limits['tokens_per_minute']) == \
+            (True, DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE)
+
+    def test_client_requests_use_scheduler(self, api_client):
+        from utils.api_request.types import RequestConfig
+        api_client.response_cache = None
+        api_client.request(RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Hi'}],
+            request_type='spec_autofill'
+        ))
+        snap = api_client.scheduler.snapshot()
+        assert snap['classes']['background']['admitted'] == 1
+        assert snap['classes']['background']['active'] == 0
+
+
+# ============================================================
+# Response-Cache Tests (response_cache.py)
+# ============================================================
+
+class TestResponseCache:
+    def _cache(self, tmp_path, **kwargs):
+        from utils.api_request.response_cache import ResponseCache
+        return ResponseCache(db_path=str(tmp_path / 'cache.db'), **kwargs)
+
+    def test_key_depends_on_all_parameters(self):
+        from utils.api_request.response_cache import make_cache_key
+        msgs = [{'role': 'user', 'content': 'Hi'}]
+        base = make_cache_key('m', 'sys', msgs, 0.7, 50)
+        assert base == make_cache_key('m', 'sys', [{'content': 'Hi', 'role': 'user'}], 0.7, 50)
+        assert base != make_cache_key('m2', 'sys', msgs, 0.7, 50)
+        assert base != make_cache_key('m', 'sys', msgs, 0.3, 50)
+        assert base != make_cache_key('m', 'sys', msgs, 0.7, 51)
+
+    def test_put_get_and_hit_rate(self, tmp_path):
+        cache = self._cache(tmp_path)
+        assert cache.get('k', 'session_title') is None
+        cache.put('k', 'session_title', 'Titel', {'input_tokens': 5, 'output_tokens': 2}, 'end_turn')
+        hit = cache.get('k', 'session_title')
+        assert hit['content'] == 'Titel'
+        assert hit['usage']['input_tokens'] == 5
+        stats = cache.stats()
+        assert stats['by_type']['session_title']['hits'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_ttl_expiry(self, tmp_path):
+        cache = self._cache(tmp_path, ttl_seconds=-1)
+        cache.put('k', 'spec_autofill', 'Text')
+        assert cache.get('k', 'spec_autofill') is None
+
+    def test_lru_size_cap(self, tmp_path):
+        import time
+        cache = self._cache(tmp_path, max_entries=2)
+        cache.put('a', 'spec_autofill', 'A')
+        time.sleep(0.01)
+        cache.put('b', 'spec_autofill', 'B')
+        time.sleep(0.01)
+        cache.get('a', 'spec_autofill')          # 'a' wird zuletzt genutzt
+        time.sleep(0.01)
+        cache.put('c', 'spec_autofill', 'C')     # verdrängt 'b'
+        assert cache.get('b', 'spec_autofill') is None
+        assert cache.get('a', 'spec_autofill')['content'] == 'A'
+        assert cache.get('c', 'spec_autofill')['content'] == 'C'
+
+    def test_client_serves_cached_response(self, mock_anthropic, tmp_path):
+        from utils.api_request import ApiClient
+        from utils.api_request.types import RequestConfig
+        client = ApiClient(api_key='test-key', response_cache=self._cache(tmp_path))
+        config = RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Titel bitte'}],
+            request_type='session_title'
+        )
+        first = client.request(config)
+        second = client.request(config)
+        create = mock_anthropic.Anthropic.return_value.messages.create
+        assert first.content == second.content == 'Test response'
+        assert create.call_count == 1
+        assert second.usage == first.usage
+
+    def test_client_does_not_cache_other_types(self, mock_anthropic, tmp_path):
+        from utils.api_request import ApiClient
+        from utils.api_request.types import RequestConfig
+        client = ApiClient(api_key='test-key', response_cache=self._cache(tmp_path))
+        config = RequestConfig(
+            system_prompt='', messages=[{'role': 'user', 'content': 'Hi'}],
+            request_type='afterthought_decision'
+        )
+        client.request(config)
+        client.request(config)
+        assert mock_anthropic.Anthropic.return_value.messages.create.call_count == 2
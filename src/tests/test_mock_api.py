@@ -0,0 +1,120 @@
+"""
+Tests für die lokale Mock-API (benchmarks/mock_api.py).
+Echter ApiClient (inkl. Anthropic SDK) gegen den HTTP-Stub – kein Netzwerk nötig.
+"""
+import pytest
+
+from benchmarks.mock_api import MockAnthropicServer, Transcript
+from benchmarks.load_test import percentile, run_scenario, make_client
+from utils.api_request import ApiClient, RequestConfig, ResponseCache
+from utils.cortex.update_service import CORTEX_TOOLS
+
+
+@pytest.fixture
+def server():
+    with MockAnthropicServer(latency=0.0, tokens_per_second=0, output_tokens=12, seed=1) as srv:
+        yield srv
+
+
+def _client(server):
+    client = ApiClient(api_key='mock-key', base_url=server.base_url,
+                       response_cache=ResponseCache(request_types=()))
+    client._sleep = lambda s: None
+    return client
+
+
+class TestMockApi:
+
+    def test_base_url_is_used(self, server):
+        client = _client(server)
+        assert str(client.client.base_url).rstrip('/') == server.base_url
+
+    def test_create(self, server):
+        response = _client(server).request(RequestConfig(
+            system_prompt='System', messages=[{'role': 'user', 'content': 'Hallo'}],
+            request_type='test'
+        ))
+        assert response.success
+        assert len(response.content.split()) == 12
+        assert response.usage['output_tokens'] == 12
+        assert response.stop_reason == 'end_turn'
+        assert server.stats()['creates'] == 1
+
+    def test_stream(self, server):
+        events = list(_client(server).stream(RequestConfig(
+            system_prompt='System', messages=[{'role': 'user', 'content': 'Hallo'}],
+            stream=True, request_type='chat'
+        )))
+        chunks = [e.data for e in events if e.event_type == 'chunk']
+        done = events[-1]
+        assert len(chunks) == 12
+        assert done.event_type == 'done'
+        assert done.data['raw_response'] == ''.join(chunks)
+        assert done.data['output_tokens'] == 12
+
+    def test_tool_loop(self, server):
+        files = {}
+
+        def executor(name, tool_input):
+            if name == 'write_file':
+                files[tool_input['filename']] = tool_input['content']
+            return True, files.get(tool_input['filename'], '')
+
+        response = _client(server).tool_request(RequestConfig(
+            system_prompt='Cortex', messages=[{'role': 'user', 'content': 'Update'}],
+            request_type='cortex_update', tools=CORTEX_TOOLS
+        ), executor)
+        assert response.success
+        assert [r['tool_name'] for r in response.tool_results] == ['read_file', 'write_file']
+        assert files['memory.md'].startswith('# Erinnerungen')
+        assert server.stats()['tool_rounds'] == 3
+
+    def test_transcript_replay(self):
+        transcript = Transcript([
+            {'match': {'stream': True}, 'text': 'Aus dem Transcript'},
+            {'match': {'contains': 'Titel'}, 'text': 'Ein Titel'},
+        ])
+        with MockAnthropicServer(latency=0.0, tokens_per_second=0, transcript=transcript) as srv:
+            client = _client(srv)
+            title = client.request(RequestConfig(
+                system_prompt='Erzeuge einen Titel', messages=[{'role': 'user', 'content': 'x'}],
+                request_type='test'
+            ))
+            events = list(client.stream(RequestConfig(
+                system_prompt='Chat', messages=[{'role': 'user', 'content': 'x'}],
+                stream=True, request_type='chat'
+            )))
+        assert title.content == 'Ein Titel'
+        assert events[-1].data['raw_response'] == 'Aus dem Transcript'
+
+    def test_fixture_file_loads(self):
+        transcript = Transcript.from_file('persona_session.json')
+        assert transcript.name == 'persona_session'
+        assert transcript.next_response({'stream': True, 'messages': []})['match'] == {'stream': True}
+
+    def test_injected_errors_are_retried(self):
+        with MockAnthropicServer(latency=0.0, tokens_per_second=0, output_tokens=3,
+                                 error_rate=0.25, seed=3) as srv:
+            client = _client(srv)
+            results = [client.request(RequestConfig(
+                system_prompt='S', messages=[{'role': 'user', 'content': str(i)}],
+                request_type='cortex_update'
+            )) for i in range(6)]
+        assert all(r.success for r in results)
+        assert srv.stats()['errors'] > 0
+        assert client.get_retry_stats()['cortex_update']['retries'] == srv.stats()['errors']
+
+
+class TestLoadTest:
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 50) is None
+
+    def test_run_scenario_reports_ttfc(self, server):
+        result = run_scenario(make_client(server.base_url), 'chat', iterations=4, concurrency=2)
+        assert result['errors'] == 0
+        assert result['ttfc']['p50_ms'] is not None
+        assert result['throughput_rps'] > 0
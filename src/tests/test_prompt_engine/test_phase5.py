@@ -171,6 +171,28 @@ class TestExportPromptSet:
             names = zf.namelist()
             assert not any('_defaults' in n for n in names)
 
+    def test_export_metadata_hashes(self, engine_dir, tmp_path):
+        """metadata.json enthält den SHA-256 jeder exportierten Datei."""
+        import hashlib
+
+        engine = _make_engine(engine_dir)
+        output = str(tmp_path / 'export.zip')
+        engine.export_prompt_set(output)
+
+        with zipfile.ZipFile(output, 'r') as zf:
+            hashes = json.loads(zf.read('metadata.json'))['hashes']
+            assert set(hashes) == set(zf.namelist()) - {'metadata.json'}
+            for name, digest in hashes.items():
+                assert hashlib.sha256(zf.read(name)).hexdigest() == digest
+
+    def test_export_leaves_no_temp_files(self, engine_dir, tmp_path):
+        """Das Archiv wird atomar geschrieben, keine Temp-Reste im Zielordner."""
+        engine = _make_engine(engine_dir)
+        export_dir = tmp_path / 'out'
+        engine.export_prompt_set(str(export_dir / 'export.zip'))
+
+        assert os.listdir(str(export_dir)) == ['export.zip']
+
 
 # ===== Import Tests =====
 
@@ -315,6 +337,76 @@ class TestImportPromptSet:
         domain = engine._loader.load_domain_file('test.json')
         assert domain['test_prompt']['variants']['default']['content'] == 'Original content.'
 
+    def test_roundtrip_skips_identical_files(self, engine_dir, tmp_path):
+        """Unveränderte Dateien werden per Content-Hash erkannt und nicht neu geschrieben."""
+        engine = _make_engine(engine_dir)
+        export_path = str(tmp_path / 'roundtrip.zip')
+        engine.export_prompt_set(export_path)
+        manifest_path = engine._loader.manifest_path
+        mtime = os.stat(manifest_path).st_mtime_ns
+
+        result = engine.import_prompt_set(export_path, merge_mode='replace')
+
+        assert result['errors'] == []
+        assert result['imported'] == 0
+        assert result['unchanged'] == 4  # Manifest, User-Manifest, Registry, test.json
+        assert os.stat(manifest_path).st_mtime_ns == mtime
+
+    def test_overwrite_writes_only_changed(self, engine_dir, tmp_path):
+        """overwrite: nur geänderte Dateien werden ersetzt, die Engine lädt sie nach."""
+        engine = _make_engine(engine_dir)
+        export_path = str(tmp_path / 'export.zip')
+        engine.export_prompt_set(export_path)
+        engine.save_prompt('test_prompt', {
+            'content': {'variants': {'default': {'content': 'Lokal geändert.'}}}
+        })
+
+        result = engine.import_prompt_set(export_path, merge_mode='overwrite')
+
+        assert result['changes']['changed'] == ['prompts/test.json']
+        assert result['imported'] == 1
+        assert engine.resolve_prompt('test_prompt') == 'Original content.'
+
+    def test_dry_run_reports_diff_without_writing(self, engine_dir, tmp_path):
+        """dry_run: Diff nach added/changed/unchanged/skipped/removed, keine Änderungen."""
+        engine = _make_engine(engine_dir)
+        zip_path = self._create_import_zip(tmp_path)
+        before = engine._loader.load_manifest()
+
+        result = engine.import_prompt_set(zip_path, merge_mode='replace', dry_run=True)
+
+        assert result['dry_run'] is True
+        assert result['changes']['added'] == ['prompts/new.json']
+        assert set(result['changes']['changed']) == {'_meta/prompt_manifest.json', 'prompts/test.json'}
+        assert result['imported'] == 3
+        assert engine._loader.load_manifest() == before
+        assert not os.path.exists(os.path.join(engine_dir, 'prompts', 'new.json'))
+
+    def test_dry_run_merge_lists_skipped(self, engine_dir, tmp_path):
+        """merge + dry_run: vorhandene Dateien erscheinen als skipped."""
+        engine = _make_engine(engine_dir)
+        zip_path = self._create_import_zip(tmp_path)
+
+        result = engine.import_prompt_set(zip_path, merge_mode='merge', dry_run=True)
+
+        assert set(result['changes']['skipped']) == {'_meta/prompt_manifest.json', 'prompts/test.json'}
+        assert result['changes']['added'] == ['prompts/new.json']
+
+    def test_hash_mismatch_rejects_entry(self, engine_dir, tmp_path):
+        """Passt ein Eintrag nicht zum Hash in metadata.json, wird er nicht importiert."""
+        engine = _make_engine(engine_dir)
+        zip_path = str(tmp_path / 'tampered.zip')
+        manifest = engine._loader.load_manifest()
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr('_meta/prompt_manifest.json', json.dumps(manifest))
+            zf.writestr('prompts/test.json', json.dumps({"test_prompt": {"variants": {}}}))
+            zf.writestr('metadata.json', json.dumps({'hashes': {'prompts/test.json': '0' * 64}}))
+
+        result = engine.import_prompt_set(zip_path, merge_mode='overwrite')
+
+        assert any('Hash' in err for err in result['errors'])
+        assert engine.resolve_prompt('test_prompt') == 'Original content.'
+
 
 # ===== Factory Reset Tests =====
 
@@ -950,6 +950,1020 @@ class TestPromptEngine:
         assert engine._resolver._static_cache == {}
 
 
+# ===== Kompilierte Templates =====
+
+class TestCompiledTemplates:
+    """Vorkompilierte Prompt-Texte und geteilte Variablen-Map pro Build."""
+
+    def test_compile_segments(self):
+        """Literal-Text und Slots wechseln sich ab."""
+        from src.utils.prompt_engine.placeholder_resolver import PlaceholderResolver
+
+        template = PlaceholderResolver.compile("Hallo {{char_name}}, {{user_name}}!")
+        assert template.segments == ('Hallo ', 'char_name', ', ', 'user_name', '!')
+        assert template.placeholders == {'char_name', 'user_name'}
+        assert template.render({'char_name': 'A'}) == 'Hallo A, {{user_name}}!'
+
+    def test_compile_without_slots(self):
+        """Text ohne Placeholder wird unverändert gerendert."""
+        from src.utils.prompt_engine.placeholder_resolver import PlaceholderResolver
+
+        template = PlaceholderResolver.compile("Nur Text.")
+        assert not template.has_slots
+        assert template.render({}) == 'Nur Text.'
+
+    def test_templates_compiled_at_load(self, temp_instructions_dir):
+        """Alle Prompt-Varianten sind nach dem Laden kompiliert."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+
+        assert set(engine._compiled['persona_description']) == {'default', 'experimental'}
+        assert engine._compiled['system_rule']['default'].placeholders == {
+            'char_name', 'language', 'user_name'}
+
+    def test_save_prompt_recompiles(self, temp_instructions_dir):
+        """save_prompt kompiliert den geänderten Prompt neu."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+
+        engine.save_prompt('impersonation', {
+            'content': {'variants': {'default': {'content': 'Ich bin {{char_name}}.'}}}
+        })
+        assert engine._compiled['impersonation']['default'].placeholders == {'char_name'}
+        assert engine.resolve_prompt('impersonation') == 'Ich bin TestPersona.'
+
+    def test_variables_built_once_per_build(self, temp_instructions_dir):
+        """build_system_prompt baut die Variablen-Map genau einmal."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        calls = []
+        original = engine._resolver.lazy_values
+
+        def counting(*args, **kwargs):
+            calls.append(1)
+            return original(*args, **kwargs)
+
+        engine._resolver.lazy_values = counting
+        result = engine.build_system_prompt(variant='default', runtime_vars={'language': 'de'})
+
+        assert 'TestPersona' in result
+        assert len(calls) == 1
+
+
+# ===== Lazy Placeholder-Auswertung =====
+
+class TestLazyPlaceholders:
+    """Computed-Placeholder werden nur bei Bedarf und einmal pro Build berechnet."""
+
+    def _make_counting_engine(self, temp_instructions_dir):
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        calls = []
+        engine._resolver._compute_functions = {
+            'build_character_description': lambda: calls.append('desc') or 'Test-Beschreibung',
+        }
+        return engine, calls
+
+    def test_unreferenced_computed_not_evaluated(self, temp_instructions_dir):
+        """Ohne Slot im Prompt läuft die Compute-Function nicht."""
+        engine, calls = self._make_counting_engine(temp_instructions_dir)
+
+        result = engine.build_prefill(variant='default')
+        assert 'TestPersona' in result
+        assert calls == []
+
+    def test_computed_memoised_within_build(self, temp_instructions_dir):
+        """Mehrfach referenzierter Placeholder wird pro Build einmal berechnet."""
+        engine, calls = self._make_counting_engine(temp_instructions_dir)
+        engine.save_prompt('impersonation', {
+            'content': {'variants': {'default': {'content': 'Kurz: {{char_description}}'}}}
+        })
+
+        result = engine.build_system_prompt(variant='default', runtime_vars={'language': 'de'})
+        assert result.count('Test-Beschreibung') == 2
+        assert calls == ['desc']
+
+    def test_lazy_values_match_full_resolution(self, temp_instructions_dir):
+        """LazyVariables liefert dieselben Werte wie get_all_values."""
+        engine, _ = self._make_counting_engine(temp_instructions_dir)
+        runtime_vars = {'language': 'de', 'extra': 'x'}
+
+        full = engine._resolver.get_all_values('default', runtime_vars)
+        lazy = engine._resolver.lazy_values('default', runtime_vars)
+        assert dict(lazy) == full
+        assert 'elapsed_time' not in lazy
+
+    def test_dependencies_per_variant(self, temp_instructions_dir):
+        """Abhängigkeiten berücksichtigen variant_condition."""
+        engine, _ = self._make_counting_engine(temp_instructions_dir)
+
+        assert 'char_description' in engine.get_placeholder_dependencies('default')
+        assert 'user_name' in engine.get_placeholder_dependencies('experimental')
+
+        engine.toggle_prompt('persona_description', False)
+        assert 'char_description' not in engine.get_placeholder_dependencies('default')
+
+    def test_resolve_stats(self, temp_instructions_dir):
+        """Stats zählen Builds und übersprungene Compute-Aufrufe."""
+        engine, _ = self._make_counting_engine(temp_instructions_dir)
+
+        engine.build_prefill(variant='default')
+        stats = engine.get_resolve_stats('default')
+        assert stats['builds'] == 1
+        assert stats['computed_evaluated'] == 0
+        assert stats['computed_skipped'] == stats['computed_registered'] == 1
+
+
+# ===== File Value Cache =====
+
+class TestFileValueCache:
+    """Versionierter Cache für Quelldateien (path, mtime_ns, size)."""
+
+    def test_parses_once_per_change(self, tmp_path):
+        """Unveränderte Datei wird nicht erneut geparst."""
+        from src.utils.prompt_engine.file_cache import FileValueCache
+
+        path = tmp_path / 'data.json'
+        path.write_text('{"a": 1}', encoding='utf-8')
+        cache = FileValueCache()
+
+        assert cache.load(str(path)) == {'a': 1}
+        assert cache.load(str(path)) == {'a': 1}
+        assert cache.get_stats()['parses'] == 1
+
+        path.write_text('{"a": 22}', encoding='utf-8')
+        assert cache.load(str(path)) == {'a': 22}
+        assert cache.get_stats()['parses'] == 2
+
+    def test_missing_and_invalid_file(self, tmp_path):
+        """Fehlende oder kaputte Dateien liefern None."""
+        from src.utils.prompt_engine.file_cache import FileValueCache
+
+        cache = FileValueCache()
+        assert cache.load(str(tmp_path / 'missing.json')) is None
+
+        broken = tmp_path / 'broken.json'
+        broken.write_text('{kaputt', encoding='utf-8')
+        assert cache.load(str(broken)) is None
+
+    def test_static_values_follow_file_changes(self, temp_instructions_dir):
+        """Persona-/Profil-Änderung wirkt ohne invalidate_cache()."""
+        resolver = TestPlaceholderResolver()._create_resolver(temp_instructions_dir)
+        assert resolver.resolve_text("{{char_name}}/{{user_name}}") == 'TestPersona/TestUser'
+
+        config_path = os.path.join(temp_instructions_dir, 'personas', 'active', 'persona_config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({'persona_settings': {'name': 'AnderePersona'}}, f)
+        profile_path = os.path.join(os.path.dirname(temp_instructions_dir), 'settings', 'user_profile.json')
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            json.dump({'user_name': 'NeuerUser'}, f)
+
+        assert resolver.resolve_text("{{char_name}}/{{user_name}}") == 'AnderePersona/NeuerUser'
+
+    def test_static_cache_reused_without_changes(self, temp_instructions_dir):
+        """Ohne Dateiänderung wird jede Quelldatei nur einmal geparst."""
+        resolver = TestPlaceholderResolver()._create_resolver(temp_instructions_dir)
+
+        for _ in range(5):
+            resolver.resolve_text("{{char_name}} {{user_name}}")
+        assert resolver._files.get_stats()['parses'] == 2
+
+
+# ===== System-Prompt Cache =====
+
+class TestSystemPromptCache:
+    """LRU der gebauten System-Prompts mit frisch eingesetzten Zeit-Werten."""
+
+    def _make_engine(self, temp_instructions_dir):
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        clock = {'time': '14:30'}
+        engine._resolver._compute_functions['get_time_context.current_time'] = lambda: clock['time']
+        engine._resolver._registry['current_time'] = {
+            'source': 'computed', 'compute_function': 'get_time_context.current_time',
+            'type': 'string', 'default': '', 'resolve_phase': 'computed',
+        }
+        engine.save_prompt('impersonation', {
+            'content': {'variants': {'default': {'content': 'Es ist {{current_time}} Uhr.'}}}
+        })
+        return engine, clock
+
+    def test_repeat_build_hits_cache(self, temp_instructions_dir):
+        """Gleiche Eingaben → Cache-Treffer mit identischem Ergebnis."""
+        engine, _ = self._make_engine(temp_instructions_dir)
+        runtime_vars = {'language': 'de'}
+
+        first = engine.build_system_prompt('default', runtime_vars)
+        second = engine.build_system_prompt('default', runtime_vars)
+
+        assert first == second
+        stats = engine.get_prompt_cache_stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+
+    def test_time_values_spliced_fresh(self, temp_instructions_dir):
+        """Zeit-Placeholder werden bei einem Treffer neu eingesetzt."""
+        engine, clock = self._make_engine(temp_instructions_dir)
+
+        assert 'Es ist 14:30 Uhr.' in engine.build_system_prompt('default', {'language': 'de'})
+        clock['time'] = '15:45'
+        result = engine.build_system_prompt('default', {'language': 'de'})
+
+        assert 'Es ist 15:45 Uhr.' in result
+        assert engine.get_prompt_cache_stats()['hits'] == 1
+
+    def test_relevant_runtime_vars_change_key(self, temp_instructions_dir):
+        """Referenzierte Runtime-Variablen sind Teil des Keys, andere nicht."""
+        engine, _ = self._make_engine(temp_instructions_dir)
+
+        engine.build_system_prompt('default', {'language': 'de'})
+        assert 'en' in engine.build_system_prompt('default', {'language': 'en'})
+        engine.build_system_prompt('default', {'language': 'en', 'ip_address': '1.2.3.4'})
+
+        stats = engine.get_prompt_cache_stats()
+        assert stats['misses'] == 2
+        assert stats['hits'] == 1
+
+    def test_save_prompt_invalidates(self, temp_instructions_dir):
+        """Änderungen am Prompt machen gecachte Builds ungültig."""
+        engine, _ = self._make_engine(temp_instructions_dir)
+        engine.build_system_prompt('default', {'language': 'de'})
+
+        engine.save_prompt('system_rule', {
+            'content': {'variants': {'default': {'content': 'Neue Regel.'}}}
+        })
+        assert 'Neue Regel.' in engine.build_system_prompt('default', {'language': 'de'})
+
+    def test_persona_change_invalidates(self, temp_instructions_dir):
+        """Neue persona_config.json → neuer Build ohne manuelle Invalidierung."""
+        engine, _ = self._make_engine(temp_instructions_dir)
+        assert 'TestPersona' in engine.build_system_prompt('default', {'language': 'de'})
+
+        config_path = os.path.join(temp_instructions_dir, 'personas', 'active', 'persona_config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({'persona_settings': {'name': 'ZweitePersona'}}, f)
+
+        assert 'ZweitePersona' in engine.build_system_prompt('default', {'language': 'de'})
+
+    def test_cache_is_bounded(self, temp_instructions_dir):
+        """Der Cache hält höchstens PROMPT_CACHE_SIZE Einträge."""
+        engine, _ = self._make_engine(temp_instructions_dir)
+        engine.PROMPT_CACHE_SIZE = 3
+
+        for i in range(6):
+            engine.build_system_prompt('default', {'language': f'lang{i}'})
+
+        assert engine.get_prompt_cache_stats()['size'] == 3
+
+
+# ===== Manifest-Indizes =====
+
+class TestManifestIndexes:
+    """Vorsortierte Views nach target/category/position/variant_condition."""
+
+    def _scan(self, engine, target):
+        """Referenz: vollständiger Scan wie vor den Indizes."""
+        result = [
+            pid for pid, meta in engine.get_all_prompts().items()
+            if meta.get('target') == target and meta.get('enabled', True)
+        ]
+        return sorted(result, key=lambda pid: engine.get_all_prompts()[pid].get('order', 9999))
+
+    def _ids(self, prompts):
+        return [p['id'] for p in prompts]
+
+    def test_index_matches_scan(self, temp_instructions_dir):
+        """Indizierte Views liefern dasselbe wie ein Scan."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+
+        for target in ('system_prompt', 'prefill', 'message'):
+            assert self._ids(engine.get_prompts_by_target(target)) == self._scan(engine, target)
+        assert self._ids(engine.get_prompts_by_category('system')) == [
+            'impersonation', 'system_rule', 'consent_agreement']
+        assert self._ids(engine.get_prompts_by_position('system_prompt_append')) == [
+            'afterthought_system_note']
+
+    def test_toggle_updates_index(self, temp_instructions_dir):
+        """Deaktivierte Prompts verschwinden aus target/position, nicht aus category."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+
+        engine.toggle_prompt('system_rule', False)
+        assert 'system_rule' not in self._ids(engine.get_prompts_by_target('system_prompt'))
+        assert 'system_rule' in self._ids(engine.get_prompts_by_category('system'))
+
+        engine.toggle_prompt('system_rule', True)
+        assert 'system_rule' in self._ids(engine.get_prompts_by_target('system_prompt'))
+
+    def test_reorder_updates_index(self, temp_instructions_dir):
+        """Reorder sortiert die Views neu."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+
+        engine.reorder_prompts({'impersonation': 999})
+        ids = self._ids(engine.get_prompts_by_target('system_prompt'))
+        assert ids[-1] == 'impersonation'
+        assert ids == self._scan(engine, 'system_prompt')
+
+    def test_create_delete_update_index(self, temp_instructions_dir):
+        """Neue Prompts erscheinen sofort, gelöschte verschwinden."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        engine.create_prompt({
+            'id': 'extra_rule',
+            'meta': {'name': 'Extra', 'category': 'system', 'type': 'text',
+                     'target': 'system_prompt', 'position': 'system_prompt',
+                     'order': 150, 'enabled': True},
+            'content': {'variants': {'default': {'content': 'Extra-Regel.'}}},
+        })
+
+        ids = self._ids(engine.get_prompts_by_target('system_prompt'))
+        assert ids.index('extra_rule') == ids.index('impersonation') + 1
+        assert 'Extra-Regel.' in engine.build_system_prompt('default', {'language': 'de'})
+
+        engine.delete_prompt('extra_rule')
+        assert 'extra_rule' not in self._ids(engine.get_prompts_by_category('system'))
+
+    def test_save_content_visible_in_index(self, temp_instructions_dir):
+        """Gespeicherter Content ist über die Views sichtbar."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        engine.save_prompt('remember', {
+            'content': {'variants': {'default': {'content': 'Neuer Prefill.'}}}
+        })
+
+        prefill = engine.get_prompts_by_target('prefill')[0]
+        assert prefill['content']['variants']['default']['content'] == 'Neuer Prefill.'
+        assert engine.build_prefill('default') == 'Neuer Prefill.'
+
+
+# ===== Engine-Snapshots (Copy-on-Write) =====
+
+class TestEngineSnapshots:
+    """Unveränderliche Snapshots: Writer tauschen aus, Leser ohne Lock."""
+
+    def test_write_publishes_new_snapshot(self, temp_instructions_dir):
+        """Schreiben ersetzt den Snapshot, der alte bleibt unverändert."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        old = engine._snapshot
+
+        engine.save_prompt('system_rule', {
+            'content': {'variants': {'default': {'content': 'Neue Regel.'}}},
+            'meta': {'name': 'Neu'},
+        })
+
+        new = engine._snapshot
+        assert new is not old
+        assert new.generation == old.generation + 1
+        assert old.manifest['prompts']['system_rule']['name'] == 'System-Regeln'
+        assert 'Neue Regel.' not in old.domains['chat.json']['system_rule']['variants']['default']['content']
+        assert new.compiled['system_rule']['default'].source == 'Neue Regel.'
+        # Nicht betroffene Templates werden übernommen, nicht neu kompiliert
+        assert new.compiled['impersonation'] is old.compiled['impersonation']
+
+    def test_reads_do_not_take_lock(self, temp_instructions_dir):
+        """Leser laufen weiter, während ein Writer den Lock hält."""
+        import threading
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        results = []
+
+        def read():
+            results.append(engine.build_system_prompt('default', {'language': 'de'}))
+            results.append(engine.get_prompts_by_target('prefill'))
+
+        with engine._lock:
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(timeout=5)
+            assert not reader.is_alive()
+        assert 'TestPersona' in results[0]
+
+    def test_failed_write_keeps_snapshot(self, temp_instructions_dir):
+        """Schlägt das Schreiben fehl, bleibt der veröffentlichte Stand erhalten."""
+        from unittest.mock import patch
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        old = engine._snapshot
+
+        with patch.object(engine._loader, 'save_domain_file', side_effect=OSError('disk full')):
+            assert not engine.save_prompt('system_rule', {
+                'content': {'variants': {'default': {'content': 'Kaputt.'}}}
+            })
+
+        assert engine._snapshot is old
+        assert 'Kaputt.' not in engine.build_system_prompt('default', {'language': 'de'})
+
+    def test_concurrent_readers_during_writes(self, temp_instructions_dir):
+        """32 Leser-Threads gegen fortlaufende Editor-Writes: keine Fehler, konsistente Stände."""
+        import threading
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        runtime = {'language': 'de'}
+        stop = threading.Event()
+        errors = []
+        writes = [0]
+
+        def save_rule(i):
+            # Content und Meta gehören zusammen (gleicher Snapshot)
+            engine.save_prompt('system_rule', {
+                'content': {'variants': {'default': {'content': f'Regel v{i} für {{{{char_name}}}}.'}}},
+                'meta': {'name': f'v{i}'},
+            })
+
+        save_rule(0)
+
+        def writer():
+            try:
+                while not stop.is_set():
+                    i = writes[0] + 1
+                    save_rule(i)
+                    engine.toggle_prompt('consent_agreement', i % 2 == 0)
+                    engine.reorder_prompts({'impersonation': 100 if i % 2 else 250})
+                    engine.create_prompt({
+                        'id': 'stress_rule',
+                        'meta': {'name': 'Stress', 'category': 'system', 'type': 'text',
+                                 'target': 'system_prompt', 'position': 'system_prompt',
+                                 'order': 300, 'enabled': True},
+                        'content': {'variants': {'default': {'content': 'Stress-Regel.'}}},
+                    })
+                    engine.delete_prompt('stress_rule')
+                    writes[0] = i
+            except Exception as e:  # pragma: no cover - nur bei Fehlern
+                errors.append(e)
+
+        def reader():
+            try:
+                for _ in range(25):
+                    prompt = engine.build_system_prompt('default', runtime)
+                    assert prompt.count('Regel v') == 1
+                    assert 'TestPersona' in prompt
+
+                    rule = engine.get_prompt('system_rule')
+                    version = rule['meta']['name']
+                    assert f'Regel {version} ' in rule['content']['variants']['default']['content']
+
+                    system = engine.get_prompts_by_target('system_prompt')
+                    orders = [p['meta'].get('order', 9999) for p in system]
+                    assert orders == sorted(orders)
+                    assert len({p['id'] for p in system}) == len(system)
+
+                    assert engine.build_prefill('default') == 'Ich bleibe als TestPersona in meiner Rolle.'
+                    sequence = engine.get_chat_message_sequence('default')
+                    assert [s['order'] for s in sequence] == sorted(s['order'] for s in sequence)
+            except Exception as e:
+                errors.append(e)
+
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+        threads = [threading.Thread(target=reader) for _ in range(32)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=30)
+        stop.set()
+        writer_thread.join(timeout=30)
+
+        assert not errors, errors[0]
+        assert writes[0] > 0
+        assert engine.get_prompt('system_rule')['meta']['name'] == f'v{writes[0]}'
+        assert engine.get_prompt('stress_rule') is None
+
+
+# ===== Hot-Reload (File Watcher) =====
+
+class TestPromptFileWatcher:
+    """Polling-Watcher mit Debounce und inkrementellem Domain-Reload."""
+
+    def _write(self, path, data, bump=1):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        # Eindeutige Signatur, auch bei grober mtime-Auflösung
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000_000))
+
+    def _chat_path(self, instructions_dir):
+        return os.path.join(instructions_dir, 'prompts', 'chat.json')
+
+    def _load(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_debounce_and_incremental_reload(self, temp_instructions_dir):
+        """Erst nach der Ruhezeit wird nur die geänderte Domain neu geladen."""
+        from src.utils.prompt_engine.watcher import PromptFileWatcher
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        watcher = PromptFileWatcher(engine, interval=0.1, debounce=0.5)
+        old = engine._snapshot
+
+        chat = self._load(self._chat_path(temp_instructions_dir))
+        chat['system_rule']['variants']['default']['content'] = 'Extern geändert.'
+        self._write(self._chat_path(temp_instructions_dir), chat)
+
+        assert watcher.poll(now=100.0) is None          # Änderung erkannt, Debounce läuft
+        result = watcher.poll(now=100.6)
+        assert result['reloaded'] == ['chat.json']
+        assert not result['full_reload']
+        assert 'Extern geändert.' in engine.build_system_prompt('default', {'language': 'de'})
+        # Andere Domains/Templates bleiben unangetastet
+        assert engine._snapshot.domains['prefill.json'] is old.domains['prefill.json']
+        assert engine._resolver is old.resolver
+        assert watcher.get_stats()['reloads'] == 1
+
+    def test_invalid_json_keeps_old_state(self, temp_instructions_dir):
+        """Kaputte Datei: Fehler wird gemeldet, der alte Stand bleibt aktiv."""
+        from src.utils.prompt_engine.watcher import PromptFileWatcher
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        watcher = PromptFileWatcher(engine, debounce=0)
+        old = engine._snapshot
+
+        with open(self._chat_path(temp_instructions_dir), 'w', encoding='utf-8') as f:
+            f.write('{ kaputt')
+        result = watcher.poll(now=1.0)
+
+        assert result['reloaded'] == []
+        assert 'chat.json' in result['errors'][0]
+        assert engine._snapshot is old
+
+    def test_validation_errors_of_changed_prompts(self, temp_instructions_dir):
+        """Nur die Prompts der geänderten Datei werden validiert."""
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        chat = self._load(self._chat_path(temp_instructions_dir))
+        del chat['system_rule']
+        self._write(self._chat_path(temp_instructions_dir), chat)
+
+        result = engine.reload_domains(['chat.json'])
+
+        assert result['reloaded'] == ['chat.json']
+        assert any('Domain[system_rule]' in err for err in result['errors'])
+        assert any('Domain[system_rule]' in err for err in engine.load_errors)
+
+    def test_own_writes_are_ignored(self, temp_instructions_dir):
+        """Writes des Editors erzeugen keinen zusätzlichen Reload."""
+        from src.utils.prompt_engine.watcher import PromptFileWatcher
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        watcher = PromptFileWatcher(engine, debounce=0)
+
+        engine.save_prompt('system_rule', {
+            'content': {'variants': {'default': {'content': 'Editor-Regel.'}}},
+            'meta': {'name': 'Editor'},
+        })
+        snap = engine._snapshot
+        result = watcher.poll(now=1.0)
+
+        assert result['reloaded'] == [] and not result['full_reload']
+        assert engine._snapshot is snap
+
+    def test_meta_change_triggers_full_reload(self, temp_instructions_dir):
+        """Änderungen am Manifest laden alles neu."""
+        from src.utils.prompt_engine.watcher import PromptFileWatcher
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        watcher = PromptFileWatcher(engine, debounce=0)
+
+        manifest_path = os.path.join(temp_instructions_dir, 'prompts', '_meta', 'prompt_manifest.json')
+        manifest = self._load(manifest_path)
+        manifest['prompts']['system_rule']['enabled'] = False
+        self._write(manifest_path, manifest)
+        result = watcher.poll(now=1.0)
+
+        assert result['full_reload']
+        ids = [p['id'] for p in engine.get_prompts_by_target('system_prompt')]
+        assert 'system_rule' not in ids
+
+    def test_thread_lifecycle(self, temp_instructions_dir):
+        """start()/stop() des Poll-Threads."""
+        from src.utils.prompt_engine.watcher import PromptFileWatcher
+        engine = TestPromptEngine()._make_engine(temp_instructions_dir)
+        watcher = PromptFileWatcher(engine, interval=0.01, debounce=0)
+
+        watcher.start()
+        assert watcher.is_running
+        watcher.stop()
+        assert not watcher.is_running
+
+
+# ===== Startup: Load-Cache & Lazy-Init =====
+
+class TestEngineStartup:
+    """Warmstart aus dem Load-Cache, Hintergrund-Laden mit lazy=True."""
+
+    def _cache_path(self, tmp_path):
+        return str(tmp_path / 'cache' / 'prompt_engine.pickle')
+
+    def test_warm_start_from_cache(self, temp_instructions_dir, tmp_path):
+        """Zweiter Start liest nur den Cache und liefert denselben Zustand."""
+        from src.utils.prompt_engine import PromptEngine
+        cache_path = self._cache_path(tmp_path)
+
+        cold = PromptEngine(temp_instructions_dir, cache_path=cache_path)
+        assert cold.get_load_stats()['source'] == 'files'
+        assert os.path.exists(cache_path)
+
+        warm = PromptEngine(temp_instructions_dir, cache_path=cache_path)
+        assert warm.get_load_stats()['source'] == 'cache'
+        assert warm.get_all_prompts() == cold.get_all_prompts()
+        assert warm.load_errors == cold.load_errors
+        assert warm._compiled['system_rule']['default'].placeholders == {'char_name', 'language', 'user_name'}
+        assert warm.build_prefill('default') == cold.build_prefill('default')
+
+    def test_changed_source_invalidates_cache(self, temp_instructions_dir, tmp_path):
+        """Geänderte Quelldatei → Kaltstart mit neuem Inhalt."""
+        from src.utils.prompt_engine import PromptEngine
+        cache_path = self._cache_path(tmp_path)
+        PromptEngine(temp_instructions_dir, cache_path=cache_path)
+
+        chat_path = os.path.join(temp_instructions_dir, 'prompts', 'chat.json')
+        with open(chat_path, 'r', encoding='utf-8') as f:
+            chat = json.load(f)
+        chat['impersonation']['variants']['default']['content'] = 'Geänderte Rolle.'
+        with open(chat_path, 'w', encoding='utf-8') as f:
+            json.dump(chat, f)
+        st = os.stat(chat_path)
+        os.utime(chat_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        engine = PromptEngine(temp_instructions_dir, cache_path=cache_path)
+        assert engine.get_load_stats()['source'] == 'files'
+        assert engine.get_prompt('impersonation')['content']['variants']['default']['content'] == 'Geänderte Rolle.'
+
+    def test_corrupt_cache_is_ignored(self, temp_instructions_dir, tmp_path):
+        """Unlesbarer Cache → Kaltstart, Cache wird neu geschrieben."""
+        from src.utils.prompt_engine import PromptEngine
+        cache_path = self._cache_path(tmp_path)
+        os.makedirs(os.path.dirname(cache_path))
+        with open(cache_path, 'wb') as f:
+            f.write(b'kein pickle')
+
+        engine = PromptEngine(temp_instructions_dir, cache_path=cache_path)
+        assert engine.get_load_stats()['source'] == 'files'
+        assert engine.is_loaded
+        assert PromptEngine(temp_instructions_dir, cache_path=cache_path).get_load_stats()['source'] == 'cache'
+
+    def test_reload_bypasses_cache(self, temp_instructions_dir, tmp_path):
+        """reload() liest immer von Disk."""
+        from src.utils.prompt_engine import PromptEngine
+        engine = PromptEngine(temp_instructions_dir, cache_path=self._cache_path(tmp_path))
+        engine.reload()
+        assert engine.get_load_stats()['source'] == 'files'
+
+    def test_without_load_cache(self, temp_instructions_dir, tmp_path):
+        """use_load_cache=False schreibt keine Cache-Datei."""
+        from src.utils.prompt_engine import PromptEngine
+        cache_path = self._cache_path(tmp_path)
+        engine = PromptEngine(temp_instructions_dir, cache_path=cache_path, use_load_cache=False)
+        assert engine.is_loaded
+        assert not os.path.exists(cache_path)
+
+    def test_lazy_init(self, temp_instructions_dir, tmp_path):
+        """lazy=True lädt im Hintergrund, der erste Zugriff wartet auf den Snapshot."""
+        from src.utils.prompt_engine import PromptEngine
+        engine = PromptEngine(temp_instructions_dir, lazy=True, cache_path=self._cache_path(tmp_path))
+
+        ids = [p['id'] for p in engine.get_prompts_by_target('system_prompt')]
+        assert engine.is_ready
+        assert 'impersonation' in ids
+        assert engine.wait_until_loaded(timeout=1)
+
+    def test_parallel_domain_loading(self, temp_instructions_dir):
+        """Thread-Pool liefert dieselben Domains und Fehler wie sequentielles Laden."""
+        from src.utils.prompt_engine.loader import PromptLoader
+        loader = PromptLoader(temp_instructions_dir)
+        manifest = loader.load_manifest()
+        manifest['prompts']['missing'] = {'domain_file': 'gibt_es_nicht.json'}
+
+        sequential = loader.load_all_domains(manifest)
+        parallel = loader.load_all_domains(manifest, max_workers=4)
+        assert parallel == sequential
+        assert any('gibt_es_nicht.json' in err for err in parallel[1])
+
+
+# ===== Suchindex =====
+
+class TestPromptSearchIndex:
+    """Invertierter Index: Präfix-/Fuzzy-Suche und Placeholder-Verwendung."""
+
+    def _make_engine(self, temp_instructions_dir):
+        return TestPromptEngine()._make_engine(temp_instructions_dir)
+
+    def _ids(self, results):
+        return [r['id'] for r in results]
+
+    def test_prefix_search(self, temp_instructions_dir):
+        """Wort-Präfixe finden Name/ID und Inhalt, Name-Treffer zuerst."""
+        engine = self._make_engine(temp_instructions_dir)
+
+        results = engine.search_prompts('imperson')
+
+        assert self._ids(results) == ['impersonation']
+        assert results[0]['match_type'] == 'name'
+        content_hits = engine.search_prompts('sprichst')
+        assert self._ids(content_hits) == ['system_rule']
+        assert content_hits[0]['match_type'] == 'content'
+
+    def test_all_words_must_match(self, temp_instructions_dir):
+        """Mehrere Wörter: jedes muss vorkommen."""
+        engine = self._make_engine(temp_instructions_dir)
+
+        assert self._ids(engine.search_prompts('persona name')) == ['persona_description']
+        assert engine.search_prompts('persona nachgedanke') == []
+
+    def test_fuzzy_search(self, temp_instructions_dir):
+        """Ein Tippfehler wird toleriert, außer fuzzy=False."""
+        engine = self._make_engine(temp_instructions_dir)
+
+        assert 'impersonation' in self._ids(engine.search_prompts('impersonatoin'))
+        assert 'system_rule' in self._ids(engine.search_prompts('sprchst'))
+        assert engine.search_prompts('sprchst', fuzzy=False) == []
+
+    def test_placeholder_usages(self, temp_instructions_dir):
+        """Placeholder → Prompt-IDs; registrierte Keys ohne Verwendung sind leer."""
+        engine = self._make_engine(temp_instructions_dir)
+
+        usages = engine.get_placeholder_usages()
+
+        assert set(usages['char_name']) == {
+            'system_rule', 'persona_description', 'consent_agreement', 'remember'}
+        assert usages['elapsed_time'] == []
+        assert engine.get_prompts_using_placeholder('language') == ['system_rule']
+
+    def test_incremental_updates(self, temp_instructions_dir):
+        """save/create/delete schreiben den Index fort, ohne ihn neu aufzubauen."""
+        from src.utils.prompt_engine.search_index import PromptSearchIndex
+
+        engine = self._make_engine(temp_instructions_dir)
+        assert engine.search_prompts('bananenbrot') == []
+
+        engine.save_prompt('impersonation', {
+            'content': {'variants': {'default': {'content': 'Bananenbrot für {{user_name}}.'}}}
+        })
+        assert self._ids(engine.search_prompts('bananen')) == ['impersonation']
+        assert 'impersonation' in engine.get_prompts_using_placeholder('user_name')
+        assert engine.search_prompts('charakter', fuzzy=False) == []
+
+        engine.create_prompt({
+            'id': 'kuchen_prompt',
+            'meta': {'name': 'Kuchen', 'domain_file': 'test_user.json', 'order': 999},
+            'content': {'variants': {'default': {'content': 'Mehr Bananenbrot, {{char_name}}.'}}}
+        })
+        assert self._ids(engine.search_prompts('bananenbrot')) == ['impersonation', 'kuchen_prompt']
+        assert 'kuchen_prompt' in engine.get_prompts_using_placeholder('char_name')
+
+        engine.delete_prompt('kuchen_prompt')
+        assert self._ids(engine.search_prompts('bananenbrot')) == ['impersonation']
+        assert 'kuchen_prompt' not in engine.get_prompts_using_placeholder('char_name')
+
+        snap = engine._snapshot
+        rebuilt = PromptSearchIndex.build(snap.manifest, snap.domains, snap.compiled)
+        assert snap.search._docs == rebuilt._docs
+        assert snap.search._postings == rebuilt._postings
+        assert snap.search._placeholders == rebuilt._placeholders
+        assert snap.search._vocab == rebuilt._vocab
+        assert snap.search._deletes == rebuilt._deletes
+
+    def test_unrelated_change_shares_index(self, temp_instructions_dir):
+        """Reorder ändert keinen Text → der Index wird unverändert übernommen."""
+        engine = self._make_engine(temp_instructions_dir)
+        index = engine._snapshot.search
+
+        engine.reorder_prompts({'impersonation': 50})
+
+        assert engine._snapshot.search is index
+
+
+# ===== Inkrementelle Validierung =====
+
+class TestValidationGraph:
+    """Validierungsgraph: gleiche Meldungen wie validate_all, nur geänderte Knoten neu geprüft."""
+
+    def _make_engine(self, temp_instructions_dir):
+        return TestPromptEngine()._make_engine(temp_instructions_dir)
+
+    def _full(self, engine):
+        from src.utils.prompt_engine.validator import PromptValidator
+
+        snap = engine._snapshot
+        return PromptValidator().validate_all(snap.manifest, snap.domains, snap.registry)
+
+    def _assert_matches_full(self, engine):
+        full = self._full(engine)
+        result = engine.validate_all()
+        assert sorted(result['errors']) == sorted(full['errors'])
+        assert sorted(result['warnings']) == sorted(full['warnings'])
+
+    def test_matches_full_validation(self, temp_instructions_dir):
+        """Gleiche Fehler/Warnungen wie PromptValidator.validate_all."""
+        engine = self._make_engine(temp_instructions_dir)
+        engine.save_prompt('system_rule', {
+            'content': {'variants': {'default': {'content': 'Hallo {{unbekannt}}.'}}}
+        })
+        engine.create_prompt({
+            'id': 'ohne_domain',
+            'meta': {'name': 'Ohne Domain', 'domain_file': 'neu.json', 'order': 5,
+                     'requires_any': ['fehlt_auch']},
+            'content': {'variants': {}},
+        })
+
+        self._assert_matches_full(engine)
+        assert engine.validate_all()['warnings']
+
+    def test_save_revalidates_only_affected_nodes(self, temp_instructions_dir):
+        """save_prompt prüft nur den Prompt-Knoten und seinen Domain-Eintrag."""
+        engine = self._make_engine(temp_instructions_dir)
+        engine.validate_all()
+
+        engine.save_prompt('impersonation', {
+            'content': {'variants': {'default': {'content': 'Neu mit {{gibt_es_nicht}}.'}}}
+        })
+        results = engine.get_validation_results()
+
+        assert results['revalidated'] == 2
+        assert results['node_count'] > 2
+        warnings = results['nodes']['entry:chat.json:impersonation']['warnings']
+        assert any('gibt_es_nicht' in w for w in warnings)
+        self._assert_matches_full(engine)
+
+    def test_per_prompt_results(self, temp_instructions_dir):
+        """prompt_id liefert Manifest- und Domain-Meldungen eines Prompts."""
+        engine = self._make_engine(temp_instructions_dir)
+        engine.save_prompt('system_rule', {
+            'content': {'variants': {'default': {'content': 'Text {{unknown_key}}'}}}
+        })
+
+        result = engine.get_validation_results('system_rule')
+
+        assert result['errors'] == []
+        assert any('unknown_key' in w for w in result['warnings'])
+        assert engine.get_validation_results('impersonation') == {'errors': [], 'warnings': []}
+        assert engine.get_validation_results('gibt_es_nicht') is None
+
+    def test_registry_change_revalidates_dependents(self, temp_instructions_dir):
+        """Neuer Placeholder → nur Knoten, die ihn referenzieren, werden neu geprüft."""
+        engine = self._make_engine(temp_instructions_dir)
+        engine.save_prompt('system_rule', {
+            'content': {'variants': {'default': {'content': 'Text {{mein_wert}}'}}}
+        })
+        assert engine.get_validation_results('system_rule')['warnings']
+
+        engine.create_placeholder('mein_wert', {'name': 'Mein Wert'})
+        results = engine.get_validation_results()
+
+        assert results['revalidated'] == 1
+        assert not any('mein_wert' in w and 'Registry' in w
+                       for w in engine.get_validation_results('system_rule')['warnings'])
+        self._assert_matches_full(engine)
+
+    def test_delete_removes_nodes(self, temp_instructions_dir):
+        """Gelöschte Prompts verschwinden aus dem Graphen."""
+        engine = self._make_engine(temp_instructions_dir)
+        engine.create_prompt({
+            'id': 'temp_prompt',
+            'meta': {'name': 'Temp', 'domain_file': 'temp.json', 'order': 5},
+            'content': {'variants': {'default': {'content': '{{nope}}'}}},
+        })
+        assert 'entry:temp.json:temp_prompt' in engine.get_validation_results()['nodes']
+
+        engine.delete_prompt('temp_prompt')
+
+        assert engine.get_validation_results('temp_prompt') is None
+        assert 'entry:temp.json:temp_prompt' not in engine.get_validation_results()['nodes']
+        self._assert_matches_full(engine)
+
+
+# ===== Charakterbeschreibung (Memo) =====
+
+class TestCharacterDescriptionCache:
+    """config.build_character_description: memoisiert über persona_config/-spec/custom_spec."""
+
+    def _setup(self, tmp_path, monkeypatch):
+        from src.utils import config
+
+        spec_dir = tmp_path / 'instructions' / 'personas' / 'spec'
+        (spec_dir / 'custom_spec').mkdir(parents=True)
+        (spec_dir / 'persona_spec.json').write_text(json.dumps({'persona_spec': {
+            'persona_type': {'KI': 'Eine KI'},
+            'core_traits_details': {'neugierig': {'description': 'Fragt nach', 'behaviors': []}},
+        }}), encoding='utf-8')
+        active_dir = tmp_path / 'instructions' / 'personas' / 'active'
+        active_dir.mkdir(parents=True)
+        (active_dir / 'persona_config.json').write_text(json.dumps({
+            'active_persona_id': 'default',
+            'persona_settings': {'name': 'Mia', 'persona': 'KI', 'core_traits': ['neugierig']},
+        }), encoding='utf-8')
+
+        monkeypatch.setattr(config, 'BASE_DIR', str(tmp_path))
+        config.invalidate_character_cache()
+        return config, spec_dir
+
+    def test_built_once_per_version(self, tmp_path, monkeypatch):
+        """Ohne Dateiänderung wird die Beschreibung nicht neu gebaut."""
+        config, _ = self._setup(tmp_path, monkeypatch)
+        calls = []
+        original = config._build_character_description_impl
+        monkeypatch.setattr(config, '_build_character_description_impl',
+                            lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+        first = config.build_character_description()
+        for _ in range(5):
+            assert config.build_character_description() == first
+        assert len(calls) == 1
+        assert 'Fragt nach' in first['desc']
+
+    def test_returns_independent_copies(self, tmp_path, monkeypatch):
+        """Aufrufer können das Ergebnis verändern, ohne den Cache zu beschädigen."""
+        config, _ = self._setup(tmp_path, monkeypatch)
+
+        config.build_character_description()['char_name'] = 'Kaputt'
+        assert config.build_character_description()['char_name'] == 'Mia'
+
+    def test_save_char_config_invalidates(self, tmp_path, monkeypatch):
+        """save_char_config wirkt sofort, auch bei gleicher Dateigröße."""
+        config, _ = self._setup(tmp_path, monkeypatch)
+        assert config.build_character_description()['char_name'] == 'Mia'
+
+        config.save_char_config({'name': 'Lea', 'persona': 'KI', 'core_traits': ['neugierig']})
+        assert config.build_character_description()['char_name'] == 'Lea'
+
+    def test_custom_spec_merged_and_followed(self, tmp_path, monkeypatch):
+        """Neue custom_spec.json wird in Spec und Beschreibung übernommen."""
+        config, spec_dir = self._setup(tmp_path, monkeypatch)
+        assert 'Eigenes Merkmal' not in config.build_character_description()['desc']
+
+        (spec_dir / 'custom_spec' / 'custom_spec.json').write_text(json.dumps({'persona_spec': {
+            'core_traits_details': {'neugierig': {'description': 'Eigenes Merkmal', 'behaviors': []}},
+        }}), encoding='utf-8')
+        config.invalidate_character_cache()
+
+        assert config.load_char_profile()['persona_spec']['core_traits_details']['neugierig']['description'] == 'Eigenes Merkmal'
+        assert 'Eigenes Merkmal' in config.build_character_description()['desc']
+
+
+# ===== Editor-Preview (Bundle) =====
+
+class TestPreviewBundle:
+    """preview_bundle(): alle Editor-Previews in einem Durchlauf, Blöcke gecached."""
+
+    def _make_engine(self, temp_instructions_dir):
+        return TestPromptEngine()._make_engine(temp_instructions_dir)
+
+    def test_sections_match_single_builds(self, temp_instructions_dir):
+        """Abschnitte identisch mit den einzelnen Build-Methoden."""
+        engine = self._make_engine(temp_instructions_dir)
+        runtime_vars = {'language': 'de'}
+
+        bundle = engine.preview_bundle('default', runtime_vars=runtime_vars)
+
+        assert bundle['system_prompt'] == engine.build_system_prompt('default', runtime_vars)
+        assert bundle['prefill'] == engine.build_prefill('default', runtime_vars)
+        assert bundle['system_prompt_append'] == engine.get_system_prompt_append('default', runtime_vars)
+        assert bundle['first_assistant'] == engine.get_first_assistant_content('default', runtime_vars)
+
+    def test_blocks_sorted_with_tokens(self, temp_instructions_dir):
+        """Alle Blöcke nach order sortiert, Inhalt wie resolve_prompt, Token-Schätzung."""
+        engine = self._make_engine(temp_instructions_dir)
+
+        bundle = engine.preview_bundle('default', runtime_vars={'language': 'de'})
+        orders = [block['order'] for block in bundle['blocks']]
+
+        assert len(bundle['blocks']) == len(engine.get_all_prompts())
+        assert orders == sorted(orders)
+        for block in bundle['blocks']:
+            if block['type'] == 'text':
+                assert block['content'] == (engine.resolve_prompt(block['id'], 'default', {'language': 'de'}) or '')
+            assert block['tokens_est'] == len(block['content']) // 4
+        assert bundle['tokens_est']['system_prompt'] == len(bundle['system_prompt']) // 4
+
+    def test_prompt_ids_filter(self, temp_instructions_dir):
+        """prompt_ids begrenzt die Blöcke, Abschnitte bleiben vollständig."""
+        engine = self._make_engine(temp_instructions_dir)
+
+        bundle = engine.preview_bundle('default', prompt_ids=['system_rule'])
+
+        assert [block['id'] for block in bundle['blocks']] == ['system_rule']
+        assert 'TestPersona' in bundle['system_prompt']
+
+    def test_unchanged_blocks_hit_cache(self, temp_instructions_dir):
+        """Zweiter Aufruf ohne Änderungen: alle Blöcke aus dem Cache."""
+        engine = self._make_engine(temp_instructions_dir)
+
+        first = engine.preview_bundle('default')
+        second = engine.preview_bundle('default')
+
+        assert first['cache']['misses'] > 0
+        assert second['cache']['misses'] == 0
+        assert second['cache']['hits'] == first['cache']['misses']
+        assert second['system_prompt'] == first['system_prompt']
+
+    def test_only_edited_block_misses(self, temp_instructions_dir):
+        """Nach save_prompt wird nur der geänderte Block neu gerendert."""
+        engine = self._make_engine(temp_instructions_dir)
+        engine.preview_bundle('default')
+
+        engine.save_prompt('system_rule', {
+            'content': {'variants': {'default': {'content': 'Neue Regel für {{char_name}}.'}}}
+        })
+        bundle = engine.preview_bundle('default')
+
+        assert bundle['cache']['misses'] == 1
+        assert 'Neue Regel für TestPersona.' in bundle['system_prompt']
+
+    def test_changed_value_misses(self, temp_instructions_dir):
+        """Geänderter Placeholder-Wert → betroffene Blöcke werden neu gerendert."""
+        engine = self._make_engine(temp_instructions_dir)
+        engine.preview_bundle('default', runtime_vars={'language': 'de'})
+
+        bundle = engine.preview_bundle('default', runtime_vars={'language': 'en'})
+
+        assert bundle['cache']['misses'] >= 1
+        assert bundle['system_prompt'] == engine.build_system_prompt('default', {'language': 'en'})
+
+
 # ===== Architektur-Tests =====
 
 class TestArchitecture:
@@ -423,9 +423,10 @@ class TestCortexUpdateServiceEngine:
         """Ohne PromptEngine werden Fallback-Tools verwendet."""
         with patch.object(service, '_get_prompt_engine', return_value=None):
             tools = service._build_cortex_tools()
-        assert len(tools) == 2
+        assert len(tools) == 5
         assert tools[0]['name'] == 'read_file'
         assert tools[1]['name'] == 'write_file'
+        assert [t['name'] for t in tools[2:]] == ['append_bullet', 'replace_bullet', 'remove_bullet']
 
     def test_build_cortex_tools_from_engine(self, service):
         """Mit PromptEngine werden Tool-Descriptions aus Domain-Data geladen."""
@@ -448,6 +449,9 @@ class TestCortexUpdateServiceEngine:
 
         assert tools[0]['description'] == 'Custom Read Description'
         assert tools[1]['description'] == 'Custom Write Description'
+        # Patch-Tools ohne eigene Beschreibung nutzen die Defaults
+        assert tools[2]['name'] == 'append_bullet'
+        assert tools[2]['description'].startswith('Adds one bullet')
 
     def test_build_messages_fallback(self, service):
         """Ohne PromptEngine wird Fallback-Message gebaut."""
@@ -0,0 +1,47 @@
+"""
+Tests für den Route-Benchmark (benchmarks/route_bench.py).
+Echte Routes + Mock-API in einer isolierten Temp-Umgebung.
+"""
+import os
+
+from benchmarks.environment import BenchEnvironment
+from benchmarks.route_bench import run_benchmark, ENDPOINTS
+from benchmarks.compare import compare
+
+
+class TestRouteBench:
+
+    def test_environment_is_isolated(self):
+        from utils.database import connection
+        from utils import provider
+
+        original_dir = connection.DATA_DIR
+        original_client = provider._api_client
+        with BenchEnvironment(sessions=2, messages_per_session=10, latency=0.0,
+                              tokens_per_second=0) as env:
+            assert connection.DATA_DIR.startswith(env.root)
+            assert len(env.session_ids) == 2
+            root = env.root
+        assert connection.DATA_DIR == original_dir
+        assert provider._api_client is original_client
+        assert not os.path.exists(root)
+
+    def test_run_benchmark_all_endpoints(self):
+        with BenchEnvironment(sessions=2, messages_per_session=40, extra_personas=1,
+                              latency=0.0, tokens_per_second=0, output_tokens=5) as env:
+            results = run_benchmark(env, iterations=2, warmup=0)
+
+        assert set(results) == set(ENDPOINTS)
+        for endpoint, result in results.items():
+            assert result['errors'] == 0, (endpoint, result['sample_error'])
+            assert result['total']['p50_ms'] is not None
+
+        chat = results['chat_stream']
+        assert chat['first_chunk']['p50_ms'] is not None
+        for phase in ('persona_resolution', 'config_loading', 'prompt_build',
+                      'history_fetch', 'persistence'):
+            assert phase in chat['phases']
+        assert results['session_load']['first_chunk'] is None
+
+        report = {'endpoints': results, 'config': {}}
+        assert 'chat_stream' in compare(report, report)
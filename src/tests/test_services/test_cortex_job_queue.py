@@ -0,0 +1,317 @@
+"""
+Tests für die Cortex-Job-Queue.
+Coalescing, Worker-Pool, Mindestabstand, Retries, Neustart und Status-Endpunkte.
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+import utils.cortex.job_queue as job_queue
+from utils.cortex.job_queue import CortexJobQueue, backoff_delay
+from utils.sql_loader import sql
+
+
+class _Runner:
+    """Zeichnet Aufrufe auf; optional blockierend oder mit vorgegebenen Ergebnissen."""
+
+    def __init__(self, results=None, gate=None):
+        self.calls = []
+        self.results = list(results or [])
+        self.gate = gate
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, persona_id, session_id, job):
+        with self._lock:
+            self.calls.append((persona_id, session_id, job['from_message_id'], job['to_message_id']))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        if self.gate is not None:
+            self.gate.wait(5)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+            return self.results.pop(0) if self.results else {'success': True}
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def _make(runner, **kwargs):
+        kwargs.setdefault('min_interval', 0)
+        queue = CortexJobQueue(db_path=str(tmp_path / 'cortex_jobs.db'), runner=runner, **kwargs)
+        queues.append(queue)
+        return queue
+    yield _make
+    for queue in queues:
+        queue.stop()
+
+
+# ============================================================
+# Coalescing
+# ============================================================
+
+class TestCoalescing:
+    """Mehrere Trigger derselben Session → ein Job"""
+
+    def test_pending_triggers_are_merged(self, make_queue):
+        gate = threading.Event()
+        runner = _Runner(gate=gate)
+        queue = make_queue(runner, workers=1)
+
+        busy = queue.enqueue('other', 9)                      # belegt den einzigen Worker
+        first = queue.enqueue('default', 1, from_message_id=10, to_message_id=20)
+        second = queue.enqueue('default', 1, from_message_id=5, to_message_id=30)
+        other_session = queue.enqueue('default', 2, to_message_id=40)
+
+        assert second == first
+        assert other_session != first
+        job = queue.get_job(first)
+        assert (job['status'], job['from_message_id'], job['to_message_id'], job['triggers']) == \
+            ('pending', 5, 30, 2)
+
+        gate.set()
+        assert queue.wait_idle()
+        assert sorted(runner.calls) == [('default', 1, 5, 30), ('default', 2, None, 40), ('other', 9, None, None)]
+        assert queue.get_job(busy)['status'] == 'done'
+        assert queue.stats()['coalesced'] == 1
+
+    def test_trigger_during_running_job_is_not_dropped(self, make_queue):
+        gate = threading.Event()
+        runner = _Runner(gate=gate)
+        queue = make_queue(runner, workers=2)
+
+        queue.enqueue('default', 1, to_message_id=20)
+        while not runner.calls:
+            time.sleep(0.005)
+        queue.enqueue('default', 1, to_message_id=25)
+
+        gate.set()
+        assert queue.wait_idle()
+        assert [call[3] for call in runner.calls] == [20, 25]
+
+
+# ============================================================
+# Worker-Pool
+# ============================================================
+
+class TestWorkerPool:
+    """Parallelität über Personas, seriell pro Persona"""
+
+    def test_one_job_per_persona_at_a_time(self, make_queue):
+        runner = _Runner()
+        queue = make_queue(runner, workers=4)
+        for session_id in range(1, 4):
+            queue.enqueue('default', session_id)
+        assert queue.wait_idle()
+        assert runner.max_active == 1
+        assert len(runner.calls) == 3
+
+    def test_personas_run_in_parallel(self, make_queue):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def runner(persona_id, session_id, job):
+            barrier.wait()   # wartet, bis beide Personas gleichzeitig laufen
+            return {'success': True}
+
+        queue = make_queue(runner, workers=2)
+        queue.enqueue('a', 1)
+        queue.enqueue('b', 1)
+        assert queue.wait_idle()
+        assert queue.stats()['completed'] == 2
+
+    def test_min_interval_defers_instead_of_dropping(self, make_queue):
+        runner = _Runner()
+        queue = make_queue(runner, workers=1, min_interval=0.3)
+        queue.enqueue('default', 1)
+        assert queue.wait_idle()
+        started = time.time()
+        job_id = queue.enqueue('default', 2)
+
+        assert queue.wait_idle()
+        job = queue.get_job(job_id)
+        assert job['status'] == 'done'
+        assert job['started_at'] - started >= 0.25
+
+
+# ============================================================
+# Retries
+# ============================================================
+
+class TestRetries:
+    """Backoff bei Fehlern, keine Wiederholung bei Vorbedingungen"""
+
+    def test_backoff_delay(self):
+        assert [backoff_delay(n) for n in (1, 2, 3)] == [30.0, 60.0, 120.0]
+        assert backoff_delay(20) == job_queue.BACKOFF_MAX_SECONDS
+
+    def test_failed_job_is_retried(self, make_queue):
+        runner = _Runner(results=[{'success': False, 'error': 'overloaded', 'retryable': True}])
+        queue = make_queue(runner)
+        with patch.object(job_queue, 'BACKOFF_BASE_SECONDS', 0.01):
+            job_id = queue.enqueue('default', 1)
+            assert queue.wait_idle()
+
+        job = queue.get_job(job_id)
+        assert (job['status'], job['attempts'], job['last_error']) == ('done', 2, None)
+        assert queue.stats()['retried'] == 1
+
+    def test_gives_up_after_max_attempts(self, make_queue):
+        error = {'success': False, 'error': 'overloaded', 'retryable': True}
+        queue = make_queue(_Runner(results=[error] * 3), max_attempts=2)
+        with patch.object(job_queue, 'BACKOFF_BASE_SECONDS', 0.01):
+            job_id = queue.enqueue('default', 1)
+            assert queue.wait_idle()
+        job = queue.get_job(job_id)
+        assert (job['status'], job['attempts'], job['last_error']) == ('failed', 2, 'overloaded')
+
+    def test_non_retryable_error_fails_immediately(self, make_queue):
+        runner = _Runner(results=[{'success': False, 'error': 'Zu wenig Gesprächsverlauf', 'retryable': False}])
+        queue = make_queue(runner)
+        job_id = queue.enqueue('default', 1)
+        assert queue.wait_idle()
+        assert queue.get_job(job_id)['status'] == 'failed'
+        assert len(runner.calls) == 1
+
+    def test_missing_retryable_means_permanent(self, make_queue):
+        runner = _Runner(results=[{'success': False, 'error': 'kaputt'}])
+        queue = make_queue(runner)
+        job_id = queue.enqueue('default', 1)
+        assert queue.wait_idle()
+        assert queue.get_job(job_id)['status'] == 'failed'
+        assert len(runner.calls) == 1
+
+    def test_runner_exception_is_retryable(self, make_queue):
+        calls = []
+
+        def runner(persona_id, session_id, job):
+            calls.append(job['attempts'])
+            if len(calls) == 1:
+                raise RuntimeError('boom')
+            return {'success': True}
+
+        queue = make_queue(runner)
+        with patch.object(job_queue, 'BACKOFF_BASE_SECONDS', 0.01):
+            job_id = queue.enqueue('default', 1)
+            assert queue.wait_idle()
+        assert calls == [1, 2]
+        assert queue.get_job(job_id)['status'] == 'done'
+
+
+# ============================================================
+# Persistenz
+# ============================================================
+
+class TestPersistence:
+    """Jobs überleben einen Neustart"""
+
+    def test_interrupted_and_pending_jobs_resume(self, make_queue, tmp_path):
+        db_path = str(tmp_path / 'cortex_jobs.db')
+        make_queue(_Runner()).list_jobs()   # legt die Tabelle an, ohne Worker
+
+        conn = sqlite3.connect(db_path)
+        now = time.time()
+        conn.execute(sql('cortex_jobs.insert_job'), ('default', 1, 'trigger', None, 10, now, now))
+        conn.execute(sql('cortex_jobs.insert_job'), ('other', 2, 'trigger', None, 20, now, now))
+        conn.execute("UPDATE cortex_jobs SET status = 'running' WHERE persona_id = 'default'")
+        conn.commit()
+        conn.close()
+
+        runner = _Runner()
+        restarted = make_queue(runner)
+        restarted.start()
+        assert restarted.wait_idle()
+        assert sorted(runner.calls) == [('default', 1, None, 10), ('other', 2, None, 20)]
+        assert [job['status'] for job in restarted.list_jobs()] == ['done', 'done']
+
+
+# ============================================================
+# Status-Endpunkte
+# ============================================================
+
+class TestJobRoutes:
+    """/api/cortex/jobs"""
+
+    @pytest.fixture
+    def client(self, make_queue):
+        from flask import Flask
+        from routes.cortex import cortex_bp
+
+        queue = make_queue(_Runner())
+        app = Flask(__name__)
+        app.register_blueprint(cortex_bp)
+        with patch('routes.cortex.get_cortex_job_queue', return_value=queue):
+            yield app.test_client(), queue
+
+    def test_list_get_and_stats(self, client):
+        http, queue = client
+        job_id = queue.enqueue('default', 1, to_message_id=12)
+        assert queue.wait_idle()
+
+        jobs = http.get('/api/cortex/jobs?persona_id=default').get_json()['jobs']
+        assert [(j['id'], j['status'], j['to_message_id']) for j in jobs] == [(job_id, 'done', 12)]
+        assert http.get('/api/cortex/jobs?persona_id=nobody').get_json()['jobs'] == []
+
+        job = http.get(f'/api/cortex/jobs/{job_id}').get_json()['job']
+        assert job['result'] == {'success': True}
+
+        stats = http.get('/api/cortex/jobs/stats').get_json()['stats']
+        assert stats['jobs']['done'] == 1
+        assert stats['completed'] == 1
+        assert stats['run']['p50_ms'] is not None
+
+    def test_unknown_job(self, client):
+        http, _ = client
+        assert http.get('/api/cortex/jobs/999').status_code == 404
+
+
+# ============================================================
+# Nachrichtenbereich → Cortex-Update
+# ============================================================
+
+class TestJobRange:
+    """Der Standard-Runner begrenzt das Update auf den (zusammengeführten) Bereich des Jobs"""
+
+    def test_coalesced_job_sends_merged_range(self, make_queue):
+        from utils.api_request.types import ApiResponse
+        from utils.cortex.update_service import CortexUpdateService
+        from utils.database import create_session, get_memory_marker, save_message
+        from utils.database.schema import init_persona_db
+
+        init_persona_db('default')
+        session_id = create_session(persona_id='default')
+        ids = [save_message(f'Nachricht {i}', i % 2 == 0, 'Mia', session_id=session_id) for i in range(10)]
+
+        gate = threading.Event()
+
+        def runner(persona_id, session_id, job):
+            if persona_id == 'other':
+                gate.wait(5)
+                return {'success': True}
+            return job_queue._run_cortex_update(persona_id, session_id, job)
+
+        api_client = MagicMock()
+        api_client.is_ready = True
+        api_client.tool_request.return_value = ApiResponse(success=True, content='ok', stop_reason='end_turn')
+        with patch.object(CortexUpdateService, '_get_api_client', return_value=api_client), \
+                patch.object(CortexUpdateService, '_get_cortex_service', return_value=MagicMock()), \
+                patch.object(CortexUpdateService, '_get_prompt_engine', return_value=None), \
+                patch.object(CortexUpdateService, '_load_character', return_value={'char_name': 'Mia'}), \
+                patch.object(CortexUpdateService, '_load_user_profile', return_value={'user_name': 'Alex'}):
+            queue = make_queue(runner, workers=1)
+            queue.enqueue('other', 9)                 # belegt den einzigen Worker
+            first = queue.enqueue('default', session_id, from_message_id=ids[3], to_message_id=ids[5])
+            second = queue.enqueue('default', session_id, from_message_id=ids[1], to_message_id=ids[7])
+            assert second == first
+            gate.set()
+            assert queue.wait_idle()
+
+        assert queue.get_job(first)['status'] == 'done'
+        text = api_client.tool_request.call_args[0][0].messages[0]['content']
+        assert [f'Nachricht {i}' in text for i in range(10)] == [False] + [True] * 7 + [False, False]
+        assert get_memory_marker(session_id) == ids[7]
@@ -0,0 +1,213 @@
+"""
+Tests für den strukturierten Cortex-Memory-Store.
+Sektions-Modell, Diff-Synchronisation in die Persona-DB und budgetierte Auswahl.
+"""
+import time
+import pytest
+from unittest.mock import MagicMock
+
+import utils.cortex_service as cortex_module
+from utils.cortex_service import CortexService, TEMPLATES
+from utils.cortex.memory_store import CortexMemoryStore, MemoryEntry, select_entries
+from utils.cortex.sections import BULLET, HEADING, parse_entries, render_entries
+
+
+MEMORY = """# Memory
+
+## About {{user}}
+
+- Heißt Max
+- Arbeitet als Tierarzt
+
+## Details & Preferences
+
+- Liebt Katzen
+- Trinkt morgens Kaffee
+"""
+
+
+@pytest.fixture
+def cortex_dirs(tmp_path, monkeypatch):
+    """Temporäre Cortex-Verzeichnisse (Persona-DBs isoliert conftest)."""
+    monkeypatch.setattr(cortex_module, 'CORTEX_BASE_DIR', str(tmp_path / 'cortex'))
+    monkeypatch.setattr(cortex_module, 'CORTEX_DEFAULT_DIR', str(tmp_path / 'cortex' / 'default'))
+    monkeypatch.setattr(cortex_module, 'CORTEX_CUSTOM_DIR', str(tmp_path / 'cortex' / 'custom'))
+    return tmp_path / 'cortex'
+
+
+# ============================================================
+# Sektions-Modell
+# ============================================================
+
+class TestSections:
+    """parse_entries / render_entries"""
+
+    def test_parse_kinds_and_sections(self):
+        entries = parse_entries(MEMORY)
+        assert entries[0].kind == HEADING and entries[0].section == ''
+        assert entries[2].kind == BULLET
+        assert entries[2].section == 'About {{user}}'
+        assert entries[2].text == 'Heißt Max'
+
+    @pytest.mark.parametrize('filename', sorted(TEMPLATES))
+    def test_templates_roundtrip(self, filename):
+        template = TEMPLATES[filename]
+        assert render_entries(parse_entries(template)) == template
+
+    def test_placeholder_is_no_content(self):
+        entries = parse_entries(TEMPLATES['memory.md'])
+        assert not any(e.is_content for e in entries)
+
+
+# ============================================================
+# Synchronisation
+# ============================================================
+
+class TestMemoryStoreSync:
+    """Diff-Abgleich Datei → cortex_entries"""
+
+    def test_sync_keeps_unchanged_entries(self):
+        store = CortexMemoryStore()
+        store.sync('default', 'memory.md', MEMORY)
+        before = {e.text: e for e in store.entries('default', 'memory.md')}
+
+        stats = store.sync('default', 'memory.md',
+                           MEMORY.replace('- Liebt Katzen', '- Liebt Hunde'))
+        after = {e.text: e for e in store.entries('default', 'memory.md')}
+
+        assert stats == {'inserted': 1, 'deleted': 1, 'kept': 6}
+        assert after['Heißt Max'].id == before['Heißt Max'].id
+        assert after['Heißt Max'].created_at == before['Heißt Max'].created_at
+        assert 'Liebt Katzen' not in after
+
+    def test_ensure_synced_skips_unchanged_content(self):
+        store = CortexMemoryStore()
+        assert store.ensure_synced('default', 'memory.md', MEMORY) is True
+        assert store.ensure_synced('default', 'memory.md', MEMORY) is False
+
+        fresh = CortexMemoryStore()   # Hash kommt aus der DB
+        assert fresh.ensure_synced('default', 'memory.md', MEMORY) is False
+
+    def test_recalls_are_deferred_until_sync(self):
+        from utils.database.connection import get_db_connection
+        store = CortexMemoryStore()
+        store.sync('default', 'memory.md', MEMORY)
+        entry = next(e for e in store.entries('default', 'memory.md') if e.text == 'Heißt Max')
+
+        def stored_count():
+            conn = get_db_connection('default')
+            try:
+                return conn.execute('SELECT recall_count FROM cortex_entries WHERE id = ?',
+                                    (entry.id,)).fetchone()[0]
+            finally:
+                conn.close()
+
+        store.mark_recalled('default', [entry.id])
+        store.mark_recalled('default', [entry.id])
+        assert stored_count() == 0                       # kein DB-Write auf dem Prompt-Pfad
+        seen = next(e for e in store.entries('default', 'memory.md') if e.id == entry.id)
+        assert (seen.recall_count, seen.salience) == (2, pytest.approx(1.1))
+
+        store.sync('default', 'memory.md', MEMORY + '\n- Neu')
+        assert stored_count() == 2
+        flushed = next(e for e in store.entries('default', 'memory.md') if e.id == entry.id)
+        assert (flushed.recall_count, flushed.salience) == (2, pytest.approx(1.1))
+        assert store.flush_recalls('default') == 0
+
+    def test_db_work_does_not_hold_store_lock(self):
+        """Eine laufende DB-Operation einer Persona blockiert mark_recalled anderer Personas nicht."""
+        store = CortexMemoryStore()
+        store.sync('default', 'memory.md', MEMORY)
+        with store._db_lock(store._db_key('default')):
+            start = time.monotonic()
+            store.mark_recalled('abc123', [1])
+            assert time.monotonic() - start < 0.1
+
+    def test_personas_are_separate(self):
+        store = CortexMemoryStore()
+        store.sync('default', 'memory.md', MEMORY)
+        store.sync('abc123', 'memory.md', '- Nur hier')
+
+        assert store.get_stats('default')['memory.md'] == 7
+        assert [e.text for e in store.entries('abc123', 'memory.md')] == ['Nur hier']
+
+
+# ============================================================
+# Auswahl
+# ============================================================
+
+def _entry(entry_id, text, updated_at, salience=1.0):
+    return MemoryEntry(entry_id, 'memory.md', 'S', BULLET, text, entry_id,
+                       salience, updated_at, updated_at)
+
+
+class TestSelectEntries:
+    """Relevanz, Aktualität, Salience und Budget"""
+
+    def test_query_match_wins(self):
+        now = time.time()
+        entries = [_entry(1, 'Trinkt morgens Kaffee', now),
+                   _entry(2, 'Liebt Katzen sehr', now - 90 * 86400)]
+        chosen = select_entries(entries, 'Hast du Katzen?', token_budget=6, now=now)
+        assert [e.id for e in chosen] == [2]
+
+    def test_recency_without_query(self):
+        now = time.time()
+        entries = [_entry(1, 'Alter Eintrag', now - 200 * 86400),
+                   _entry(2, 'Neuer Eintrag', now)]
+        chosen = select_entries(entries, None, token_budget=4, now=now)
+        assert [e.id for e in chosen] == [2]
+
+    def test_salience_breaks_ties(self):
+        now = time.time()
+        entries = [_entry(1, 'Eintrag eins', now, salience=0.5),
+                   _entry(2, 'Eintrag zwei', now, salience=1.5)]
+        chosen = select_entries(entries, None, token_budget=4, now=now)
+        assert [e.id for e in chosen] == [2]
+
+    def test_budget_respected(self):
+        now = time.time()
+        entries = [_entry(i, f'Eintrag Nummer {i}', now) for i in range(100)]
+        chosen = select_entries(entries, None, token_budget=50, now=now)
+        assert sum(len(e.text) // 4 + 1 for e in chosen) <= 50
+        assert chosen
+
+
+# ============================================================
+# CortexService-Integration
+# ============================================================
+
+class TestCortexPromptSelection:
+    """get_cortex_for_prompt über dem Budget"""
+
+    def test_small_files_are_injected_fully(self, cortex_dirs):
+        service = CortexService(MagicMock())
+        service.write_file('default', 'memory.md', MEMORY)
+        result = service.get_cortex_for_prompt('default')
+        assert result['cortex_memory'] == '### Memories & Knowledge\n\n' + MEMORY.strip()
+
+    def test_over_budget_selects_relevant_entries(self, cortex_dirs):
+        service = CortexService(MagicMock())
+        filler = '\n'.join(f'- Belangloses Detail {i}' for i in range(400))
+        service.write_file('default', 'memory.md', MEMORY + '\n## Sonstiges\n\n' + filler)
+
+        result = service.get_cortex_for_prompt('default', query='Was macht Max beruflich? Tierarzt?',
+                                               token_budget=300)
+        memory = result['cortex_memory']
+        assert memory.startswith('### Memories & Knowledge\n\n# Memory')
+        assert '## About {{user}}\n\n- Heißt Max\n- Arbeitet als Tierarzt' in memory
+        assert len(memory) // 4 <= 300
+
+        recalled = {e.text: e for e in service.memory_store.entries('default', 'memory.md')}
+        assert recalled['Arbeitet als Tierarzt'].recall_count == 1
+        assert recalled['Arbeitet als Tierarzt'].salience > 1.0
+
+    def test_external_edit_is_resynced(self, cortex_dirs):
+        service = CortexService(MagicMock())
+        service.write_file('default', 'memory.md', MEMORY)
+        path = cortex_dirs / 'default' / 'memory.md'
+        path.write_text(MEMORY + '\n'.join(f'- Neu {i}' for i in range(600)), encoding='utf-8')
+        service.evict_cache('default')
+
+        service.get_cortex_for_prompt('default', token_budget=200)
+        assert service.memory_store.get_stats('default')['memory.md'] == 607
@@ -3,9 +3,9 @@ Tests für Step 7: CortexService Robustness Fixes
 
 Testet:
 - 7B#1: Atomare Schreibvorgänge (tempfile + os.replace)
-- 7B#2: Dateigröße-Limit (MAX_CORTEX_FILE_SIZE)
+- 7B#2: Keine Kürzung großer Dateien (Budget greift erst im Prompt)
 - 7B#7: In-Memory-Cache mit Write-Through
-- 7B#15: Thread-Tracking im Tier-Checker
+- 7B#15: Tier-Checker plant Updates über die Job-Queue ein
 - 7B#16: Prompt-Injection-Hardening in Guidance-Templates
 """
 
@@ -14,7 +14,7 @@ import threading
 import pytest
 from unittest.mock import patch, MagicMock
 
-from utils.cortex_service import CortexService, MAX_CORTEX_FILE_SIZE
+from utils.cortex_service import CortexService, CORTEX_PROMPT_TOKEN_BUDGET
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -85,69 +85,53 @@ class TestAtomicWrites:
 
 
 # ═════════════════════════════════════════════════════════════════════════════
-#  7B#2: Dateigröße-Limit
+#  7B#2: Keine Kürzung großer Dateien
 # ═════════════════════════════════════════════════════════════════════════════
 
-class TestFileSizeLimit:
-    """Prüft dass write_file() Content auf MAX_CORTEX_FILE_SIZE kürzt."""
+class TestLargeFiles:
+    """write_file() speichert vollständig; das Token-Budget greift im Prompt."""
 
-    def test_within_limit_unchanged(self, tmp_path):
-        """Content innerhalb des Limits wird unverändert geschrieben."""
+    def _write(self, tmp_path, content):
         cortex_dir = tmp_path / "cortex" / "default"
         cortex_dir.mkdir(parents=True)
         for f in ['memory.md', 'soul.md', 'relationship.md']:
             (cortex_dir / f).write_text("", encoding="utf-8")
 
-        api_client = MagicMock()
-        service = CortexService(api_client)
-        content = "A" * 1000  # Weit unter dem Limit
-
+        service = CortexService(MagicMock())
         with patch.object(service, 'get_cortex_path', return_value=str(cortex_dir)), \
              patch.object(service, 'ensure_cortex_files'):
             service.write_file('default', 'memory.md', content)
+        return service, cortex_dir
 
+    def test_small_content_unchanged(self, tmp_path):
+        """Kleiner Inhalt wird unverändert geschrieben."""
+        _, cortex_dir = self._write(tmp_path, "A" * 1000)
         result = (cortex_dir / "memory.md").read_text(encoding="utf-8")
         assert len(result) == 1000
 
-    def test_exceeds_limit_truncated(self, tmp_path):
-        """Content über dem Limit wird gekürzt."""
-        cortex_dir = tmp_path / "cortex" / "default"
-        cortex_dir.mkdir(parents=True)
-        for f in ['memory.md', 'soul.md', 'relationship.md']:
-            (cortex_dir / f).write_text("", encoding="utf-8")
+    def test_large_content_not_truncated(self, tmp_path):
+        """Inhalt weit über dem früheren 8000-Zeichen-Limit bleibt vollständig."""
+        content = "\n".join(f"- Erinnerung {i}" for i in range(2000))
+        service, cortex_dir = self._write(tmp_path, content)
 
-        api_client = MagicMock()
-        service = CortexService(api_client)
-        content = "B" * (MAX_CORTEX_FILE_SIZE + 5000)  # Weit über dem Limit
+        assert (cortex_dir / "memory.md").read_text(encoding="utf-8") == content
+        assert service.memory_store.get_stats('default')['memory.md'] == 2000
 
-        with patch.object(service, 'get_cortex_path', return_value=str(cortex_dir)), \
-             patch.object(service, 'ensure_cortex_files'):
-            service.write_file('default', 'memory.md', content)
-
-        result = (cortex_dir / "memory.md").read_text(encoding="utf-8")
-        assert len(result) == MAX_CORTEX_FILE_SIZE
-
-    def test_exactly_at_limit(self, tmp_path):
-        """Content genau am Limit wird nicht gekürzt."""
-        cortex_dir = tmp_path / "cortex" / "default"
-        cortex_dir.mkdir(parents=True)
-        for f in ['memory.md', 'soul.md', 'relationship.md']:
-            (cortex_dir / f).write_text("", encoding="utf-8")
-
-        api_client = MagicMock()
-        service = CortexService(api_client)
-        content = "C" * MAX_CORTEX_FILE_SIZE
+    def test_prompt_stays_within_budget(self, tmp_path):
+        """Der Prompt-Anteil bleibt auch bei großem Gedächtnis im Budget."""
+        content = "\n".join(f"- Erinnerung Nummer {i}" for i in range(2000))
+        service, cortex_dir = self._write(tmp_path, content)
 
         with patch.object(service, 'get_cortex_path', return_value=str(cortex_dir)), \
              patch.object(service, 'ensure_cortex_files'):
-            service.write_file('default', 'memory.md', content)
+            result = service.get_cortex_for_prompt('default', token_budget=500)
 
-        result = (cortex_dir / "memory.md").read_text(encoding="utf-8")
-        assert len(result) == MAX_CORTEX_FILE_SIZE
+        total = sum(len(v) for v in result.values()) // 4
+        assert 0 < total <= 500
 
-    def test_max_cortex_file_size_constant(self):
-        """MAX_CORTEX_FILE_SIZE hat den erwarteten Wert."""
-        assert MAX_CORTEX_FILE_SIZE == 8000
+    def test_default_budget_constant(self):
+        """CORTEX_PROMPT_TOKEN_BUDGET hat den erwarteten Wert."""
+        assert CORTEX_PROMPT_TOKEN_BUDGET == 3000
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -243,19 +227,22 @@ class TestCortexCache:
 
 
 # ═════════════════════════════════════════════════════════════════════════════
-#  7B#15: Thread-Tracking
+#  7B#15: Thread-Tracking → Job-Queue
 # ═════════════════════════════════════════════════════════════════════════════
 
 class TestThreadTracking:
-    """Prüft das Thread-Tracking im Tier-Checker."""
-
-    def test_active_updates_dict_exists(self):
-        """_active_updates Dict und _active_lock existieren."""
-        from utils.cortex.tier_checker import _active_updates, _active_lock
-        assert isinstance(_active_updates, dict)
-        # Lock-Typ prüfen (threading.Lock() ist _thread.lock in CPython)
-        assert hasattr(_active_lock, 'acquire')
-        assert hasattr(_active_lock, 'release')
+    """Prüft das Einplanen im Tier-Checker (Job-Queue statt freier Threads)."""
+
+    def test_updates_go_through_job_queue(self):
+        """_start_background_cortex_update plant über die Cortex-Job-Queue ein."""
+        from utils.cortex.tier_checker import _start_background_cortex_update
+        queue = MagicMock()
+        queue.enqueue.return_value = 7
+        with patch('utils.provider.get_cortex_job_queue', return_value=queue), \
+             patch('utils.cortex.tier_checker.get_max_message_id', return_value=42):
+            job_id = _start_background_cortex_update('default', 3)
+        assert job_id == 7
+        queue.enqueue.assert_called_once_with('default', 3, to_message_id=42, reason='trigger')
 
     def test_no_threading_enumerate_usage(self):
         """tier_checker.py verwendet NICHT threading.enumerate()."""
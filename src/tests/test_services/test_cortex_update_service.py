@@ -7,6 +7,7 @@ Testet:
 - Rate-Limiting
 - System-Prompt-Builder
 - Message-Builder
+- Inkrementelle Updates (Memory-Marker, Migration)
 """
 
 import pytest
@@ -62,8 +63,10 @@ def mock_conversation():
 class TestToolDefinitions:
     """CORTEX_TOOLS Struktur."""
 
-    def test_has_two_tools(self):
-        assert len(CORTEX_TOOLS) == 2
+    def test_has_five_tools(self):
+        assert [t['name'] for t in CORTEX_TOOLS] == [
+            'read_file', 'write_file', 'append_bullet', 'replace_bullet', 'remove_bullet'
+        ]
 
     def test_read_file_tool(self):
         read_tool = next(t for t in CORTEX_TOOLS if t['name'] == 'read_file')
@@ -77,6 +80,10 @@ class TestToolDefinitions:
         assert 'content' in write_tool['input_schema']['properties']
         assert write_tool['input_schema']['required'] == ['filename', 'content']
 
+    def test_patch_tools(self):
+        replace_tool = next(t for t in CORTEX_TOOLS if t['name'] == 'replace_bullet')
+        assert replace_tool['input_schema']['required'] == ['filename', 'section', 'old_text', 'new_text']
+
 
 # ─── Rate-Limiting ──────────────────────────────────────────────────────────
 
@@ -166,6 +173,73 @@ class TestToolExecutor:
         assert files_read == ['memory.md']  # Nicht ['memory.md', 'memory.md']
 
 
+# ─── Patch-Tools ────────────────────────────────────────────────────────────
+
+class TestPatchTools:
+    """append_bullet / replace_bullet / remove_bullet gegen echte Cortex-Dateien."""
+
+    @pytest.fixture
+    def cortex(self, tmp_path):
+        from utils.cortex_service import CortexService
+        with patch('utils.cortex_service.get_cortex_dir', return_value=str(tmp_path / 'cortex')):
+            yield CortexService(MagicMock())
+
+    def _run(self, service, cortex, tool_name, tool_input, files_written=None):
+        return service._execute_tool(
+            cortex, 'default', tool_name, dict(tool_input, filename='memory.md'),
+            [], files_written if files_written is not None else []
+        )
+
+    def test_append_replaces_placeholder(self, service, cortex):
+        files_written = []
+        success, result = self._run(service, cortex, 'append_bullet',
+                                     {'section': 'Shared Experiences', 'text': 'Zoo-Besuch im Mai'},
+                                     files_written)
+
+        assert success is True
+        assert result == 'memory.md › Shared Experiences updated (1 bullets).'
+        assert files_written == ['memory.md']
+        content = cortex.read_file('default', 'memory.md')
+        assert '## Shared Experiences\n\n- Zoo-Besuch im Mai\n\n## Details' in content
+
+    def test_template_section_matches_user_name(self, service, cortex):
+        self._run(service, cortex, 'append_bullet', {'section': 'About Alex', 'text': 'Mag Kaffee'})
+        self._run(service, cortex, 'append_bullet', {'section': 'About Alex', 'text': 'Hat eine Katze'})
+        success, _ = self._run(service, cortex, 'replace_bullet',
+                               {'section': 'About {{user}}', 'old_text': 'mag kaffee', 'new_text': 'Mag Tee'})
+
+        assert success is True
+        assert '- Mag Tee\n- Hat eine Katze\n' in cortex.read_file('default', 'memory.md')
+
+    def test_remove_last_bullet_restores_placeholder(self, service, cortex):
+        from utils.cortex_service import MEMORY_TEMPLATE
+        self._run(service, cortex, 'append_bullet', {'section': 'Shared Experiences', 'text': 'Zoo'})
+        self._run(service, cortex, 'remove_bullet', {'section': 'Shared Experiences', 'text': 'Zoo'})
+        assert cortex.read_file('default', 'memory.md') == MEMORY_TEMPLATE
+
+    def test_invalid_patch_leaves_file_unchanged(self, service, cortex):
+        before = cortex.read_file('default', 'memory.md')
+        with patch.object(cortex, 'write_file') as write:
+            unknown_section = self._run(service, cortex, 'append_bullet', {'section': 'Hobbys', 'text': 'x'})
+            unknown_bullet = self._run(service, cortex, 'remove_bullet',
+                                       {'section': 'Shared Experiences', 'text': 'gibt es nicht'})
+            multiline = self._run(service, cortex, 'append_bullet',
+                                  {'section': 'Shared Experiences', 'text': 'a\nb'})
+
+        assert unknown_section[0] is False and "'Shared Experiences'" in unknown_section[1]
+        assert unknown_bullet[0] is False and 'not found' in unknown_bullet[1]
+        assert multiline[0] is False
+        write.assert_not_called()
+        assert cortex.read_file('default', 'memory.md') == before
+
+    def test_duplicate_append_is_noop(self, service, cortex):
+        self._run(service, cortex, 'append_bullet', {'section': 'Shared Experiences', 'text': 'Zoo'})
+        with patch.object(cortex, 'write_file') as write:
+            success, _ = self._run(service, cortex, 'append_bullet', {'section': 'Shared Experiences', 'text': '- Zoo'})
+        assert success is True
+        write.assert_not_called()
+
+
 # ─── System-Prompt-Builder ──────────────────────────────────────────────────
 
 class TestSystemPromptBuilder:
@@ -355,3 +429,142 @@ class TestConstants:
 
     def test_rate_limit(self):
         assert RATE_LIMIT_SECONDS == 30
+
+
+# ─── Inkrementelle Updates ──────────────────────────────────────────────────
+
+class TestIncrementalUpdate:
+    """Memory-Marker: Folge-Updates senden nur neue Nachrichten plus Überlappung."""
+
+    @pytest.fixture
+    def chat(self):
+        from utils.database import create_session, save_message
+        from utils.database.schema import init_persona_db
+        init_persona_db('default')
+        session_id = create_session(persona_id='default')
+
+        def say(count, start=0):
+            return [save_message(f'Nachricht {start + i}', i % 2 == 0, 'Mia', session_id=session_id)
+                    for i in range(count)]
+        return session_id, say
+
+    @pytest.fixture
+    def api(self, service, mock_character):
+        api_client = MagicMock()
+        api_client.is_ready = True
+        api_client.tool_request.return_value = ApiResponse(success=True, content='ok', stop_reason='end_turn')
+        with patch.object(CortexUpdateService, '_get_api_client', return_value=api_client), \
+                patch.object(CortexUpdateService, '_get_cortex_service', return_value=MagicMock()), \
+                patch.object(CortexUpdateService, '_get_prompt_engine', return_value=None), \
+                patch.object(CortexUpdateService, '_load_character', return_value=mock_character), \
+                patch.object(CortexUpdateService, '_load_user_profile', return_value={'user_name': 'Alex'}):
+            yield api_client
+
+    @staticmethod
+    def _sent_text(api_client):
+        return api_client.tool_request.call_args[0][0].messages[0]['content']
+
+    def test_second_update_sends_only_delta(self, service, chat, api):
+        from utils.database import get_memory_marker
+        from utils.cortex.update_service import CORTEX_UPDATE_OVERLAP_MESSAGES
+        session_id, say = chat
+        first_ids = say(10)
+
+        first = service.execute_update('default', session_id, respect_rate_limit=False)
+        assert (first['new_messages'], first['overlap_messages']) == (10, 0)
+        assert get_memory_marker(session_id) == first_ids[-1]
+
+        new_ids = say(3, start=10)
+        second = service.execute_update('default', session_id, respect_rate_limit=False)
+        assert (second['new_messages'], second['overlap_messages']) == (3, CORTEX_UPDATE_OVERLAP_MESSAGES)
+        assert get_memory_marker(session_id) == new_ids[-1]
+
+        text = self._sent_text(api)
+        assert 'Nachricht 5' not in text
+        assert text.index('Nachricht 6') < text.index('New since your last update') < text.index('Nachricht 10')
+
+    def test_no_new_messages_skips_api_call(self, service, chat, api):
+        session_id, say = chat
+        say(6)
+        service.execute_update('default', session_id, respect_rate_limit=False)
+        api.tool_request.reset_mock()
+
+        result = service.execute_update('default', session_id, respect_rate_limit=False)
+        assert (result['success'], result['new_messages']) == (True, 0)
+        api.tool_request.assert_not_called()
+
+    def test_failed_update_keeps_marker(self, service, chat, api):
+        from utils.database import get_memory_marker
+        session_id, say = chat
+        say(6)
+        api.tool_request.return_value = ApiResponse(success=False, error='overloaded')
+        service.execute_update('default', session_id, respect_rate_limit=False)
+        assert get_memory_marker(session_id) is None
+
+    def test_failure_after_patch_is_not_retryable(self, service, chat, api):
+        """Schlägt der Tool-Loop nach einem append_bullet fehl, darf kein neuer Versuch folgen."""
+        session_id, say = chat
+        say(6)
+
+        def tool_request(config, executor):
+            executor('append_bullet', {'filename': 'memory.md', 'section': 'About {{user}}', 'text': 'Mag Tee'})
+            return ApiResponse(success=False, error='overloaded')
+        api.tool_request.side_effect = tool_request
+
+        result = service.execute_update('default', session_id, respect_rate_limit=False)
+        assert (result['success'], result['retryable'], result['files_written']) == (False, False, ['memory.md'])
+
+    def test_failure_without_writes_is_retryable(self, service, chat, api):
+        session_id, say = chat
+        say(6)
+        api.tool_request.return_value = ApiResponse(success=False, error='overloaded')
+        result = service.execute_update('default', session_id, respect_rate_limit=False)
+        assert result['retryable'] is True
+
+    def test_every_result_sets_retryable(self, service, chat, api):
+        session_id, say = chat
+        say(6)
+        assert service.execute_update('default', session_id, respect_rate_limit=False)['retryable'] is False
+        assert service.execute_update('default', session_id, respect_rate_limit=False)['retryable'] is False  # übersprungen
+
+    def test_non_incremental_sends_full_window(self, service, chat, api):
+        session_id, say = chat
+        say(6)
+        service.execute_update('default', session_id, respect_rate_limit=False)
+        say(2, start=6)
+
+        result = service.execute_update('default', session_id, respect_rate_limit=False, incremental=False)
+        assert (result['new_messages'], result['overlap_messages']) == (8, 0)
+        assert 'Nachricht 0' in self._sent_text(api)
+
+    def test_to_message_id_bounds_delta(self, service, chat, api):
+        from utils.database import get_memory_marker
+        session_id, say = chat
+        say(6)
+        service.execute_update('default', session_id, respect_rate_limit=False)
+        new_ids = say(4, start=6)
+
+        result = service.execute_update('default', session_id, respect_rate_limit=False,
+                                        to_message_id=new_ids[1])
+        assert result['new_messages'] == 2
+        assert 'Nachricht 8' not in self._sent_text(api)
+        assert get_memory_marker(session_id) == new_ids[1]
+
+    def test_migration_adds_marker_columns(self):
+        """Bestehende DBs ohne Marker-Spalten bekommen sie per Migration."""
+        import sqlite3
+        from utils.database import get_db_path, get_memory_marker, set_memory_marker
+        from utils.database.migration import run_pending_migrations
+
+        conn = sqlite3.connect(get_db_path('default'))
+        conn.executescript(
+            "CREATE TABLE db_info (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE chat_sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT);"
+            "INSERT INTO chat_sessions (title) VALUES ('alt');"
+        )
+        conn.close()
+
+        run_pending_migrations('default')
+
+        assert set_memory_marker(1, 42, 30) is True
+        assert get_memory_marker(1) == 42
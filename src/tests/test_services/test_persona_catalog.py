@@ -0,0 +1,102 @@
+"""
+Tests für PersonaCatalog.
+Index der Persona-Zusammenfassungen, Signatur-Versionierung, Paging und Persistenz.
+"""
+import json
+import os
+import pytest
+
+from utils.persona_catalog import PersonaCatalog, persona_summary
+
+
+# ============================================================
+# Fixtures
+# ============================================================
+
+def _write_persona(personas_dir, persona_id, name, **settings):
+    path = os.path.join(personas_dir, f'{persona_id}.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'id': persona_id, 'persona_settings': {'name': name, **settings}}, f)
+    return path
+
+
+@pytest.fixture
+def catalog_dirs(tmp_path):
+    """created_personas/ mit zwei Personas + default_persona.json"""
+    personas_dir = tmp_path / 'created_personas'
+    personas_dir.mkdir()
+    default_file = tmp_path / 'default_persona.json'
+    default_file.write_text(json.dumps({'persona_settings': {'name': 'Standard'}}), encoding='utf-8')
+    _write_persona(str(personas_dir), 'aaaa1111', 'Anna', age=30)
+    _write_persona(str(personas_dir), 'bbbb2222', 'Ben')
+    return str(personas_dir), str(default_file)
+
+
+# ============================================================
+# Summaries
+# ============================================================
+
+class TestPersonaCatalog:
+    """Zusammenfassungen, Änderungserkennung und Paging"""
+
+    def test_default_first_then_sorted(self, catalog_dirs):
+        catalog = PersonaCatalog(*catalog_dirs)
+        entries = catalog.summaries()
+
+        assert [e['id'] for e in entries] == ['default', 'aaaa1111', 'bbbb2222']
+        assert entries[0]['is_default'] is True
+        assert entries[1]['age'] == 30
+        assert entries[2]['age'] == 18  # Fallback erstellter Personas
+
+    def test_parses_only_changed_files(self, catalog_dirs):
+        personas_dir, _ = catalog_dirs
+        catalog = PersonaCatalog(*catalog_dirs)
+        catalog.summaries()
+        assert catalog.get_stats()['parses'] == 3
+
+        catalog.summaries()
+        assert catalog.get_stats()['parses'] == 3
+
+        _write_persona(personas_dir, 'bbbb2222', 'Benjamin')
+        catalog.invalidate('bbbb2222')
+        entries = catalog.summaries()
+        assert catalog.get_stats()['parses'] == 4
+        assert entries[2]['name'] == 'Benjamin'
+
+    def test_deleted_and_broken_files(self, catalog_dirs):
+        personas_dir, _ = catalog_dirs
+        catalog = PersonaCatalog(*catalog_dirs)
+        catalog.summaries()
+
+        os.remove(os.path.join(personas_dir, 'aaaa1111.json'))
+        with open(os.path.join(personas_dir, 'kaputt.json'), 'w', encoding='utf-8') as f:
+            f.write('{kaputt')
+
+        assert [e['id'] for e in catalog.summaries()] == ['default', 'bbbb2222']
+        assert catalog.get_stats()['entries'] == 2
+
+    def test_page(self, catalog_dirs):
+        catalog = PersonaCatalog(*catalog_dirs)
+
+        entries, total = catalog.page(offset=1, limit=1)
+        assert total == 3
+        assert [e['id'] for e in entries] == ['aaaa1111']
+
+        entries, total = catalog.page(offset=2)
+        assert [e['id'] for e in entries] == ['bbbb2222']
+
+    def test_persisted_index_skips_parsing(self, catalog_dirs, tmp_path):
+        index_path = str(tmp_path / 'index' / 'persona_catalog.json')
+        first = PersonaCatalog(*catalog_dirs, index_path=index_path)
+        expected = first.summaries()
+        assert os.path.exists(index_path)
+
+        second = PersonaCatalog(*catalog_dirs, index_path=index_path)
+        assert second.summaries() == expected
+        assert second.get_stats()['parses'] == 0
+
+    def test_summary_fields(self):
+        summary = persona_summary('default', {}, True)
+        assert summary['name'] == 'Assistant'
+        assert summary['age'] is None
+        assert 'is_active' not in summary
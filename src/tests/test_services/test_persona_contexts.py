@@ -0,0 +1,135 @@
+"""
+Tests für PersonaContextCache und den warmen Persona-Wechsel in config.activate_persona.
+"""
+import json
+import pytest
+
+import utils.config as config
+from utils.persona_contexts import PersonaContext, PersonaContextCache
+
+
+def _ctx(persona_id, version=(1,)):
+    return PersonaContext(persona_id, {'name': persona_id}, {'char_name': persona_id}, version)
+
+
+# ============================================================
+# LRU
+# ============================================================
+
+class TestPersonaContextCache:
+    """Kapazität, Verdrängung und Versionsprüfung"""
+
+    def test_lru_eviction_calls_on_evict(self):
+        evicted = []
+        cache = PersonaContextCache(max_entries=2, on_evict=evicted.append)
+        cache.put(_ctx('a'))
+        cache.put(_ctx('b'))
+        assert cache.get('a', (1,)) is not None   # a ist jetzt zuletzt verwendet
+        cache.put(_ctx('c'))
+
+        assert evicted == ['b']
+        assert cache.get_stats()['personas'] == ['a', 'c']
+
+    def test_stale_version_is_a_miss(self):
+        cache = PersonaContextCache()
+        cache.put(_ctx('a', version=(1,)))
+
+        assert cache.get('a', (2,)) is None
+        assert cache.get('a', (1,)) is None   # veralteter Eintrag wurde entfernt
+        assert cache.get_stats()['misses'] == 2
+
+    def test_resize(self):
+        evicted = []
+        cache = PersonaContextCache(max_entries=3, on_evict=evicted.append)
+        for pid in ('a', 'b', 'c'):
+            cache.put(_ctx(pid))
+        cache.resize(1)
+
+        assert evicted == ['a', 'b']
+        assert cache.get_stats()['max_entries'] == 1
+
+    def test_failing_on_evict_is_ignored(self):
+        def boom(_pid):
+            raise RuntimeError('nicht initialisiert')
+        cache = PersonaContextCache(max_entries=1, on_evict=boom)
+        cache.put(_ctx('a'))
+        cache.put(_ctx('b'))
+        assert cache.get_stats()['personas'] == ['b']
+
+
+# ============================================================
+# Persona-Wechsel
+# ============================================================
+
+@pytest.fixture
+def persona_tree(tmp_path, monkeypatch):
+    """Minimaler instructions/-Baum mit Default + zwei erstellten Personas"""
+    personas = tmp_path / 'instructions' / 'personas'
+    (personas / 'spec').mkdir(parents=True)
+    (personas / 'spec' / 'persona_spec.json').write_text(
+        json.dumps({'persona_spec': {'persona_type': {'KI': 'Eine KI'}}}), encoding='utf-8')
+    (personas / 'default').mkdir()
+    (personas / 'default' / 'default_persona.json').write_text(
+        json.dumps({'persona_settings': {'name': 'Standard', 'persona': 'KI'}}), encoding='utf-8')
+    created = tmp_path / 'instructions' / 'created_personas'
+    created.mkdir()
+    for pid, name in (('aaaa1111', 'Anna'), ('bbbb2222', 'Ben')):
+        (created / f'{pid}.json').write_text(
+            json.dumps({'id': pid, 'persona_settings': {'name': name, 'persona': 'KI'}}), encoding='utf-8')
+
+    monkeypatch.setattr(config, 'BASE_DIR', str(tmp_path))
+    monkeypatch.setattr(config, 'CREATED_PERSONAS_DIR', str(created))
+    monkeypatch.setattr(config, '_persona_contexts', PersonaContextCache(max_entries=2))
+    config.invalidate_character_cache()
+    yield tmp_path
+    config.invalidate_character_cache()
+
+
+class TestWarmPersonaSwitch:
+    """activate_persona nutzt warme Kontexte"""
+
+    def test_switch_back_reads_no_persona_file(self, persona_tree, monkeypatch):
+        assert config.activate_persona('aaaa1111')
+        assert config.activate_persona('bbbb2222')
+
+        calls = []
+        original = config.load_persona_by_id
+        monkeypatch.setattr(config, 'load_persona_by_id', lambda pid: calls.append(pid) or original(pid))
+        monkeypatch.setattr(config, '_build_character_description_impl',
+                            lambda *a, **kw: pytest.fail('Beschreibung neu gebaut'))
+
+        assert config.activate_persona('aaaa1111')
+        assert calls == []
+        assert config.get_active_persona_id() == 'aaaa1111'
+        assert config.load_character()['char_name'] == 'Anna'
+        assert config.get_persona_context_stats()['hits'] == 1
+
+    def test_updated_persona_is_rebuilt(self, persona_tree):
+        assert config.activate_persona('aaaa1111')
+        assert config.activate_persona('bbbb2222')
+        config.update_created_persona('aaaa1111', {'background': 'Neu'})
+
+        assert config.activate_persona('aaaa1111')
+        assert config.load_character()['background'] == 'Neu'
+
+    def test_cached_settings_are_isolated_from_callers(self, persona_tree):
+        (persona_tree / 'instructions' / 'created_personas' / 'aaaa1111.json').write_text(json.dumps(
+            {'id': 'aaaa1111', 'persona_settings': {'name': 'Anna', 'persona': 'KI', 'core_traits': ['ruhig']}}),
+            encoding='utf-8')
+        assert config.activate_persona('aaaa1111')
+        config.load_char_config()['core_traits'].append('verändert')
+        assert config.activate_persona('bbbb2222')
+
+        assert config.activate_persona('aaaa1111')
+        assert config.get_persona_context_stats()['hits'] == 1
+        assert config.load_char_config()['core_traits'] == ['ruhig']
+
+    def test_restore_default(self, persona_tree):
+        assert config.activate_persona('aaaa1111')
+        assert config.restore_default_persona()
+
+        assert config.get_active_persona_id() == 'default'
+        assert config.load_character()['char_name'] == 'Standard'
+
+    def test_unknown_persona(self, persona_tree):
+        assert config.activate_persona('unbekannt') is False
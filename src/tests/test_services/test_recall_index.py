@@ -0,0 +1,178 @@
+"""
+Tests für den Recall-Index.
+BM25-Ranking, inkrementelle Pflege über save_message / Cortex-Sync und {{recalled_context}}.
+"""
+import pytest
+from unittest.mock import patch
+
+import utils.recall as recall
+from utils.database import create_session, delete_last_message, save_message
+from utils.database.schema import init_persona_db
+from utils.cortex.memory_store import CortexMemoryStore
+from utils.recall import BM25Index, CORTEX, MESSAGE, get_recall_index
+
+
+@pytest.fixture
+def persona_db():
+    """Frische Default-DB (DATA_DIR isoliert conftest) und leere Index-Registry."""
+    init_persona_db('default')
+    recall.invalidate()
+    yield 'default'
+    recall.invalidate()
+
+
+# ============================================================
+# BM25
+# ============================================================
+
+class TestBM25Index:
+    """Ranking und inkrementelle Statistik"""
+
+    def test_rare_term_ranks_first(self):
+        index = BM25Index()
+        index.add('a', 'Wir waren im Zoo und haben Pinguine gesehen')
+        index.add('b', 'Heute war das Wetter schön')
+        index.add('c', 'Das Wetter im Zoo war schön')
+        assert [key for key, _ in index.top_k('Pinguine im Zoo', k=2)] == ['a', 'c']
+
+    def test_remove_and_replace(self):
+        index = BM25Index()
+        index.add('a', 'Katze Minka')
+        index.add('b', 'Hund Bello')
+        index.remove('a')
+        assert index.top_k('Minka') == []
+
+        index.add('b', 'Katze Minka')   # ersetzt
+        assert len(index) == 1
+        assert index.top_k('Bello') == []
+        assert index.top_k('Minka')[0][0] == 'b'
+
+    def test_accept_filter(self):
+        index = BM25Index()
+        index.add('m:1', 'Urlaub am Meer')
+        index.add('c:1', 'Liebt Urlaub am Meer')
+        assert [key for key, _ in index.top_k('Meer', k=5, accept=lambda k: k.startswith('c:'))] == ['c:1']
+
+    def test_unknown_terms(self):
+        index = BM25Index()
+        index.add('a', 'etwas')
+        assert index.top_k('nichts davon') == []
+
+
+# ============================================================
+# RecallIndex
+# ============================================================
+
+class TestRecallIndex:
+    """Aufbau aus der Persona-DB und inkrementelle Updates"""
+
+    def test_build_from_db_and_incremental_messages(self, persona_db):
+        session_id = create_session(persona_id=persona_db)
+        save_message('Meine Katze heißt Minka', True, session_id=session_id)
+        index = get_recall_index(persona_db)
+        assert index.top_k('Minka')[0].label == 'User'
+
+        message_id = save_message('Minka schläft gerade', False, 'Mia', session_id=session_id)
+        hits = index.top_k('schläft Minka', k=1)
+        assert (hits[0].kind, hits[0].ref_id, hits[0].label) == (MESSAGE, message_id, 'Mia')
+
+        delete_last_message(session_id)
+        assert all(hit.ref_id != message_id for hit in index.top_k('schläft'))
+
+    def test_cortex_sync_updates_index(self, persona_db):
+        index = get_recall_index(persona_db)
+        index.build()
+        store = CortexMemoryStore()
+        store.sync(persona_db, 'memory.md', '## Details\n\n- Liebt Pinguine\n- (no entries yet)')
+
+        hits = index.top_k('Pinguine')
+        assert [(h.kind, h.text, h.label) for h in hits] == [(CORTEX, 'Liebt Pinguine', 'memory.md')]
+        assert index.top_k('entries') == []   # Platzhalter wird nicht indiziert
+
+        store.sync(persona_db, 'memory.md', '## Details\n\n- Liebt Robben')
+        assert index.top_k('Pinguine') == []
+        assert index.top_k('Robben')[0].text == 'Liebt Robben'
+
+    def test_kinds_filter(self, persona_db):
+        session_id = create_session(persona_id=persona_db)
+        save_message('Das Meer war kalt', True, session_id=session_id)
+        CortexMemoryStore().sync(persona_db, 'memory.md', '- Mag das Meer')
+
+        hits = get_recall_index(persona_db).top_k('Meer', kinds=[CORTEX])
+        assert [h.kind for h in hits] == [CORTEX]
+
+
+# ============================================================
+# ChatService: {{recalled_context}}
+# ============================================================
+
+class TestRecalledContext:
+    """ChatService._load_recalled_context"""
+
+    def _service(self):
+        from utils.services.chat_service import ChatService
+        with patch('utils.services.chat_service.ChatService.__init__', lambda self, api_client: None):
+            return ChatService.__new__(ChatService)
+
+    def test_disabled_by_default(self, persona_db):
+        with patch('utils.services.chat_service._read_setting', side_effect=lambda k, d=None: d):
+            assert self._service()._load_recalled_context(persona_db, 'Minka', []) == ''
+
+    def test_skips_visible_history(self, persona_db):
+        session_id = create_session(persona_id=persona_db)
+        save_message('Minka war beim Tierarzt', True, session_id=session_id)
+        save_message('Minka hat heute gefressen', True, session_id=session_id)
+        history = [{'role': 'user', 'content': 'Minka hat heute gefressen'}]
+
+        settings = {'recallEnabled': True, 'recallTopK': 5}
+        with patch('utils.services.chat_service._read_setting',
+                   side_effect=lambda k, d=None: settings.get(k, d)):
+            text = self._service()._load_recalled_context(persona_db, 'Wie geht es Minka?', history)
+
+        assert text == '### Recalled Moments\n\n- User: Minka war beim Tierarzt'
+
+
+# ============================================================
+# Vektoren (nur mit NumPy)
+# ============================================================
+
+class _LetterEmbedder:
+    """Deterministischer Mini-Embedder: Buchstabenhäufigkeiten a–z."""
+    dim = 26
+
+    def embed(self, texts):
+        return [[text.lower().count(chr(ord('a') + i)) for i in range(26)] for text in texts]
+
+
+class TestVectorMatrix:
+    """Memmap-Matrix und Fusion mit BM25"""
+
+    def test_add_remove_and_reload(self, tmp_path):
+        pytest.importorskip('numpy')
+        from utils.recall import VectorMatrix
+
+        base = str(tmp_path / 'persona.db.vectors')
+        matrix = VectorMatrix(base, dim=3)
+        matrix.add('a', [1, 0, 0])
+        matrix.add('b', [0, 1, 0])
+        matrix.remove('a')
+        matrix.add('c', [0.9, 0.1, 0])
+        matrix.flush()
+
+        reloaded = VectorMatrix(base, dim=3)
+        assert [key for key, _ in reloaded.top_k([1, 0, 0], k=1)] == ['c']
+        assert 'a' not in reloaded
+
+    def test_embedder_is_fused_with_bm25(self, persona_db):
+        pytest.importorskip('numpy')
+        session_id = create_session(persona_id=persona_db)
+        save_message('zzz zzz', True, session_id=session_id)
+        save_message('Minka', True, session_id=session_id)
+
+        recall.set_embedder(_LetterEmbedder())
+        try:
+            index = get_recall_index(persona_db)
+            assert index.top_k('zz', k=1)[0].text == 'zzz zzz'   # nur semantisch gefunden
+            assert index.get_stats()['vectors'] is True
+        finally:
+            recall.set_embedder(None)
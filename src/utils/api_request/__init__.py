@@ -8,11 +8,17 @@ Exportiert:
 - StreamEvent: Event innerhalb eines Streams
 - clean_api_response: Response-Bereinigung
 - ToolExecutor: Typ-Alias für Tool-Execution Callbacks
+- RetryPolicy / configure_retry_policy: Retry- und Hedging-Konfiguration pro request_type
+- ApiScheduler: Rate-Limiter mit Prioritätsklassen für alle API-Calls
+- ResponseCache: Persistenter LRU-Cache für deterministische Utility-Requests
 """
 
 from .client import ApiClient, ToolExecutor
 from .types import RequestConfig, ApiResponse, StreamEvent
 from .response_cleaner import clean_api_response
+from .resilience import RetryPolicy, get_retry_policy, configure_retry_policy
+from .scheduler import ApiScheduler, SchedulerTimeout
+from .response_cache import ResponseCache
 
 __all__ = [
     'ApiClient',
@@ -21,4 +27,10 @@ __all__ = [
     'ApiResponse',
     'StreamEvent',
     'clean_api_response',
+    'RetryPolicy',
+    'get_retry_policy',
+    'configure_retry_policy',
+    'ApiScheduler',
+    'SchedulerTimeout',
+    'ResponseCache',
 ]
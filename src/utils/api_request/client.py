@@ -7,11 +7,19 @@ Verarbeitet sowohl Stream- als auch Non-Stream-Requests
 """
 
 import os
+import time
 import anthropic
-from typing import Generator, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Generator, Callable, Tuple, Any
 
 from .types import RequestConfig, ApiResponse, StreamEvent
 from .response_cleaner import clean_api_response
+from .resilience import (
+    RetryPolicy, RetryStats, get_retry_policy, is_retryable_error,
+    get_retry_after, compute_backoff
+)
+from .scheduler import ApiScheduler, estimate_input_tokens
+from .response_cache import ResponseCache, make_cache_key
 from ..settings_defaults import get_api_model_default
 from ..logger import log
 
@@ -29,18 +37,45 @@ class ApiClient:
     Einziger Zugang zur Anthropic API.
     Verarbeitet sowohl Stream- als auch Non-Stream-Requests
     über eine einheitliche Konfiguration (RequestConfig).
+
+    Transiente Fehler (Rate-Limit, Overloaded, Verbindungsabbrüche) werden
+    gemäß der RetryPolicy des request_type mit Backoff wiederholt
+    (siehe resilience.py). Die SDK-internen Retries sind deaktiviert,
+    damit es nur eine Retry-Schicht gibt.
+
+    Jeder einzelne API-Call holt sich vorher einen Slot beim ApiScheduler
+    (Rate-Limit + Prioritätsklassen, siehe scheduler.py).
+
+    Non-Stream Antworten ausgewählter request_types werden im
+    ResponseCache memoisiert (siehe response_cache.py).
+
+    Mit base_url (oder ANTHROPIC_BASE_URL) lässt sich der Client auf einen
+    kompatiblen Endpunkt umlenken, z.B. den lokalen Mock-Server aus
+    benchmarks/mock_api.py.
     """
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, response_cache: ResponseCache = None,
+                 base_url: str = None):
         self.api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
+        self.base_url = base_url or os.environ.get('ANTHROPIC_BASE_URL') or None
         self.client = None
+        self.retry_stats = RetryStats()
+        self.scheduler = ApiScheduler()
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+        self._sleep = time.sleep
         self._init_client()
 
+    def _create_client(self, api_key: str):
+        """Erstellt den Anthropic-Client (ohne SDK-interne Retries)"""
+        if self.base_url:
+            return anthropic.Anthropic(api_key=api_key, base_url=self.base_url, max_retries=0)
+        return anthropic.Anthropic(api_key=api_key, max_retries=0)
+
     def _init_client(self):
         """Initialisiert/reinitialisiert den Anthropic-Client"""
         if self.api_key and self.api_key.strip():
             try:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
+                self.client = self._create_client(self.api_key)
                 log.info("ApiClient erfolgreich initialisiert")
             except Exception as e:
                 log.error("Fehler beim Initialisieren des ApiClient: %s", e)
@@ -65,7 +100,7 @@ class ApiClient:
 
         try:
             self.api_key = api_key.strip()
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            self.client = self._create_client(self.api_key)
             log.info("ApiClient erfolgreich aktualisiert")
             return True
         except Exception as e:
@@ -92,6 +127,109 @@ class ApiClient:
             messages.append({'role': 'assistant', 'content': config.prefill})
         return messages
 
+    # ─── Resilienz ──────────────────────────────────────────────────
+
+    def get_retry_stats(self) -> dict:
+        """Gibt die Retry-/Hedge-Zähler pro request_type zurück"""
+        return self.retry_stats.snapshot()
+
+    def _next_retry_delay(self, error: Exception, attempt: int, policy: RetryPolicy):
+        """
+        Entscheidet ob nach einem Fehler erneut versucht wird.
+
+        Returns:
+            Wartezeit in Sekunden, oder None wenn nicht (mehr) retrybar
+        """
+        if attempt >= policy.max_attempts or not is_retryable_error(error, policy):
+            return None
+        return compute_backoff(attempt, policy, get_retry_after(error))
+
+    def _call_with_retry(self, config: RequestConfig, call: Callable[[], Any],
+                         messages: list) -> Any:
+        """
+        Führt einen Non-Stream API-Call mit Retry gemäß Policy aus.
+        Jeder Versuch wartet auf einen Slot beim ApiScheduler.
+
+        Bei endgültigem Fehlschlag wird die letzte Exception weitergereicht,
+        damit die bisherige Fehlerbehandlung der Aufrufer greift.
+        """
+        policy = get_retry_policy(config.request_type)
+        attempt = 0
+        backoff_total = 0.0
+        first_failure = None
+        tokens = estimate_input_tokens(config.system_prompt, messages)
+
+        while True:
+            attempt += 1
+            try:
+                with self.scheduler.slot(config.request_type, tokens):
+                    result = call()
+            except Exception as e:
+                delay = self._next_retry_delay(e, attempt, policy)
+                if delay is None:
+                    self._record_retries(config, attempt, backoff_total, first_failure, False)
+                    raise
+                if first_failure is None:
+                    first_failure = time.monotonic()
+                log.warning(
+                    "API-Fehler bei %s (Versuch %d/%d), Retry in %.2fs: %s",
+                    config.request_type, attempt, policy.max_attempts, delay, e
+                )
+                self._sleep(delay)
+                backoff_total += delay
+                continue
+
+            self._record_retries(config, attempt, backoff_total, first_failure, True)
+            return result
+
+    def _record_retries(self, config: RequestConfig, attempts: int, backoff_total: float,
+                        first_failure, success: bool) -> None:
+        """Schreibt Retry-Anzahl und Latenz-Overhead in die Statistik"""
+        retries = attempts - 1
+        retry_latency = (time.monotonic() - first_failure) if first_failure is not None else 0.0
+        self.retry_stats.record(config.request_type, retries, backoff_total, retry_latency, success)
+        if retries:
+            log.info(
+                "%s nach %d Retries %s (Overhead %.2fs)",
+                config.request_type, retries,
+                'erfolgreich' if success else 'fehlgeschlagen', retry_latency
+            )
+
+    def _call_hedged(self, config: RequestConfig, policy: RetryPolicy,
+                     call: Callable[[], Any]) -> Any:
+        """
+        Hedged Request: Antwortet der erste Call nicht innerhalb von
+        policy.hedge_delay Sekunden, wird ein zweiter identischer Call
+        gestartet. Das erste erfolgreiche Ergebnis gewinnt.
+        """
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='api-hedge')
+        try:
+            primary = pool.submit(call)
+            done, _ = wait([primary], timeout=policy.hedge_delay)
+            if done:
+                return primary.result()
+
+            hedge = pool.submit(call)
+            pending = {primary, hedge}
+            last_error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    self.retry_stats.record_hedge(config.request_type, future is hedge)
+                    log.debug("Hedged Request %s: %s gewinnt",
+                              config.request_type, 'Hedge' if future is hedge else 'Primary')
+                    return result
+            self.retry_stats.record_hedge(config.request_type, False)
+            raise last_error
+        finally:
+            # Verlierer nicht abwarten – läuft im Hintergrund aus
+            pool.shutdown(wait=False)
+
     def request(self, config: RequestConfig) -> ApiResponse:
         """
         Synchroner API-Request. Verwendet für:
@@ -116,8 +254,25 @@ class ApiClient:
         model = self._resolve_model(config.model)
         messages = self._prepare_messages(config)
 
-        try:
-            response = self.client.messages.create(
+        # ── Response-Cache (nur für freigeschaltete request_types) ──
+        cache_key = None
+        cache = self.response_cache
+        if cache is not None and cache.is_enabled_for(config.request_type):
+            cache_key = make_cache_key(
+                model, config.system_prompt, messages, config.temperature, config.max_tokens
+            )
+            cached = cache.get(cache_key, config.request_type)
+            if cached is not None:
+                log.debug("Response-Cache Hit für %s", config.request_type)
+                return ApiResponse(
+                    success=True,
+                    content=cached['content'],
+                    usage=cached['usage'],
+                    stop_reason=cached['stop_reason']
+                )
+
+        def create():
+            return self.client.messages.create(
                 model=model,
                 max_tokens=config.max_tokens,
                 temperature=config.temperature,
@@ -125,6 +280,14 @@ class ApiClient:
                 messages=messages
             )
 
+        policy = get_retry_policy(config.request_type)
+        call = create
+        if policy.hedge_delay is not None:
+            call = lambda: self._call_hedged(config, policy, create)  # noqa: E731
+
+        try:
+            response = self._call_with_retry(config, call, messages)
+
             content = response.content[0].text.strip() if response.content else ''
             usage = None
             if hasattr(response, 'usage') and response.usage:
@@ -132,13 +295,17 @@ class ApiClient:
                     'input_tokens': getattr(response.usage, 'input_tokens', 0) or 0,
                     'output_tokens': getattr(response.usage, 'output_tokens', 0) or 0
                 }
+            stop_reason = getattr(response, 'stop_reason', None)
+
+            if cache_key and content:
+                cache.put(cache_key, config.request_type, content, usage, stop_reason)
 
             return ApiResponse(
                 success=True,
                 content=content,
                 usage=usage,
                 raw_response=response,
-                stop_reason=getattr(response, 'stop_reason', None)
+                stop_reason=stop_reason
             )
 
         except anthropic.APIError as e:
@@ -172,29 +339,59 @@ class ApiClient:
 
         model = self._resolve_model(config.model)
         messages = self._prepare_messages(config)
+        policy = get_retry_policy(config.request_type)
+        attempt = 0
+        backoff_total = 0.0
+        first_failure = None
+        tokens = estimate_input_tokens(config.system_prompt, messages)
 
         try:
-            full_text = ""
-            output_tokens = 0
-            api_input_tokens = 0
+            while True:
+                attempt += 1
+                full_text = ""
+                output_tokens = 0
+                api_input_tokens = 0
+                first_chunk_sent = False
+
+                try:
+                    with self.scheduler.slot(config.request_type, tokens):
+                        with self.client.messages.stream(
+                            model=model,
+                            max_tokens=config.max_tokens,
+                            temperature=config.temperature,
+                            system=config.system_prompt,
+                            messages=messages
+                        ) as stream_ctx:
+                            for text in stream_ctx.text_stream:
+                                full_text += text
+                                first_chunk_sent = True
+                                yield StreamEvent('chunk', text)
+
+                            # Final Message nach Stream-Ende holen
+                            final_message = stream_ctx.get_final_message()
+                            if hasattr(final_message, 'usage') and final_message.usage:
+                                output_tokens = getattr(final_message.usage, 'output_tokens', 0) or 0
+                                api_input_tokens = getattr(final_message.usage, 'input_tokens', 0) or 0
+                                log.info("API Usage - Input: %d, Output: %d", api_input_tokens, output_tokens)
+                except Exception as e:
+                    # Nur vor dem ersten Chunk transparent wiederholen –
+                    # danach hat der Client bereits Teile der Antwort erhalten
+                    delay = None if first_chunk_sent else self._next_retry_delay(e, attempt, policy)
+                    if delay is None:
+                        self._record_retries(config, attempt, backoff_total, first_failure, False)
+                        raise
+                    if first_failure is None:
+                        first_failure = time.monotonic()
+                    log.warning(
+                        "API Stream Fehler vor erstem Chunk bei %s (Versuch %d/%d), Retry in %.2fs: %s",
+                        config.request_type, attempt, policy.max_attempts, delay, e
+                    )
+                    self._sleep(delay)
+                    backoff_total += delay
+                    continue
 
-            with self.client.messages.stream(
-                model=model,
-                max_tokens=config.max_tokens,
-                temperature=config.temperature,
-                system=config.system_prompt,
-                messages=messages
-            ) as stream_ctx:
-                for text in stream_ctx.text_stream:
-                    full_text += text
-                    yield StreamEvent('chunk', text)
-
-                # Final Message nach Stream-Ende holen
-                final_message = stream_ctx.get_final_message()
-                if hasattr(final_message, 'usage') and final_message.usage:
-                    output_tokens = getattr(final_message.usage, 'output_tokens', 0) or 0
-                    api_input_tokens = getattr(final_message.usage, 'input_tokens', 0) or 0
-                    log.info("API Usage - Input: %d, Output: %d", api_input_tokens, output_tokens)
+                self._record_retries(config, attempt, backoff_total, first_failure, True)
+                break
 
             # Clean the complete response
             cleaned_response = clean_api_response(full_text)
@@ -271,14 +468,18 @@ class ApiClient:
                     round_num, MAX_TOOL_ROUNDS, config.request_type
                 )
 
-                # ── API-Call ─────────────────────────────────────────
-                response = self.client.messages.create(
-                    model=model,
-                    max_tokens=config.max_tokens,
-                    temperature=config.temperature,
-                    system=config.system_prompt,
-                    tools=config.tools,
-                    messages=messages
+                # ── API-Call (mit Retry – Tool-Ergebnisse bleiben erhalten) ──
+                response = self._call_with_retry(
+                    config,
+                    lambda: self.client.messages.create(
+                        model=model,
+                        max_tokens=config.max_tokens,
+                        temperature=config.temperature,
+                        system=config.system_prompt,
+                        tools=config.tools,
+                        messages=messages
+                    ),
+                    messages
                 )
 
                 # ── Usage akkumulieren ───────────────────────────────
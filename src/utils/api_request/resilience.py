@@ -0,0 +1,239 @@
+"""
+Resilienz-Schicht für API-Requests.
+
+Enthält:
+- RetryPolicy: Retry-/Hedging-Konfiguration pro request_type
+- Fehler-Klassifikation (retrybar? evtl. schon verarbeitet?)
+- Backoff-Berechnung (exponentiell mit Full-Jitter, Retry-After)
+- RetryStats: Thread-sichere Zähler für Retries, Hedges und Latenz-Overhead
+"""
+
+import random
+import threading
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional, Any
+
+import anthropic
+
+
+# ─── Fehlerklassen ───────────────────────────────────────────────────────────
+
+# Status-Codes bei denen der Request sicher NICHT verarbeitet wurde
+# (Rate-Limit, Overloaded, Service Unavailable) → immer retrybar
+_SAFE_RETRY_STATUS = {429, 503, 529}
+
+# Status-Codes bei denen der Request evtl. schon verarbeitet wurde
+# → nur bei idempotenten Policies retrybar
+_UNSAFE_RETRY_STATUS = {408, 409, 500, 502, 504}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry-Konfiguration für einen request_type"""
+    max_attempts: int = 2                  # Inkl. erstem Versuch
+    base_delay: float = 0.5                # Sekunden (Basis für exponentielles Backoff)
+    max_delay: float = 8.0                 # Obergrenze pro Wartezeit (ohne Retry-After)
+    max_retry_after: float = 20.0          # Längere Retry-After Vorgaben → kein Retry
+    idempotent: bool = False               # True → auch 5xx/Timeouts retrybar
+    hedge_delay: Optional[float] = None    # Sekunden bis zum Hedge-Request (None = aus)
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    'chat':                  RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0,
+                                         max_retry_after=8.0, idempotent=True),
+    'afterthought_decision': RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0,
+                                         max_retry_after=20.0, idempotent=True),
+    'afterthought_followup': RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0,
+                                         max_retry_after=8.0, idempotent=True),
+    'session_title':         RetryPolicy(max_attempts=2, base_delay=0.5, max_delay=2.0,
+                                         max_retry_after=5.0, idempotent=True),
+    'spec_autofill':         RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0,
+                                         max_retry_after=20.0, idempotent=True),
+    'background_autofill':   RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0,
+                                         max_retry_after=20.0, idempotent=True),
+    'memory_summary':        RetryPolicy(max_attempts=5, base_delay=2.0, max_delay=30.0,
+                                         max_retry_after=60.0, idempotent=True),
+    'cortex_update':         RetryPolicy(max_attempts=5, base_delay=2.0, max_delay=30.0,
+                                         max_retry_after=60.0, idempotent=True),
+    'test':                  RetryPolicy(max_attempts=1),
+}
+
+_policy_lock = threading.Lock()
+
+
+def get_retry_policy(request_type: str) -> RetryPolicy:
+    """Gibt die Retry-Policy für einen request_type zurück (Fallback: DEFAULT_POLICY)."""
+    with _policy_lock:
+        return RETRY_POLICIES.get(request_type, DEFAULT_POLICY)
+
+
+def configure_retry_policy(request_type: str, **overrides) -> RetryPolicy:
+    """
+    Überschreibt einzelne Felder der Policy eines request_type.
+
+    Beispiel (Hedging für Session-Titel aktivieren):
+        configure_retry_policy('session_title', hedge_delay=1.5)
+
+    Returns:
+        Die neue, aktive Policy
+    """
+    with _policy_lock:
+        base = RETRY_POLICIES.get(request_type, DEFAULT_POLICY)
+        policy = replace(base, **overrides)
+        RETRY_POLICIES[request_type] = policy
+        return policy
+
+
+# ─── Fehler-Klassifikation ───────────────────────────────────────────────────
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable_error(error: BaseException, policy: RetryPolicy) -> bool:
+    """
+    Prüft ob ein Fehler unter der gegebenen Policy erneut versucht werden darf.
+
+    - Rate-Limit (429), Overloaded (529), 503 und Verbindungsfehler → immer
+    - 408/409/5xx und Timeouts → nur bei idempotenten Policies
+    - Alles andere (400, 401, 403, Credit-Balance, ...) → nie
+    """
+    if 'credit balance' in str(error).lower():
+        return False
+
+    if isinstance(error, anthropic.APITimeoutError):
+        return policy.idempotent
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+
+    status = _status_code(error)
+    if status in _SAFE_RETRY_STATUS:
+        return True
+    if status in _UNSAFE_RETRY_STATUS or (status is not None and status >= 500):
+        return policy.idempotent
+    return False
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Liest die Retry-After Vorgabe aus der Fehler-Response (Sekunden).
+
+    Unterstützt 'retry-after-ms', 'retry-after' als Sekunden und als HTTP-Datum.
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    try:
+        retry_ms = headers.get('retry-after-ms')
+        if retry_ms is not None:
+            return max(0.0, float(retry_ms) / 1000.0)
+    except (TypeError, ValueError):
+        pass
+
+    retry_after = headers.get('retry-after')
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(retry_after))
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def compute_backoff(attempt: int, policy: RetryPolicy,
+                    retry_after: Optional[float] = None) -> Optional[float]:
+    """
+    Berechnet die Wartezeit vor dem nächsten Versuch.
+
+    Exponentielles Backoff mit Full-Jitter: uniform(0, min(max_delay, base * 2^(attempt-1))).
+    Eine Retry-After Vorgabe des Servers gilt als Untergrenze.
+
+    Args:
+        attempt: Anzahl bisher fehlgeschlagener Versuche (1 = erster Fehlschlag)
+        policy: Aktive RetryPolicy
+        retry_after: Server-Vorgabe in Sekunden (optional)
+
+    Returns:
+        Wartezeit in Sekunden, oder None wenn Retry-After das Budget übersteigt
+    """
+    if retry_after is not None and retry_after > policy.max_retry_after:
+        return None
+    ceiling = min(policy.max_delay, policy.base_delay * (2 ** (attempt - 1)))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+# ─── Statistiken ─────────────────────────────────────────────────────────────
+
+class RetryStats:
+    """
+    Thread-sichere Zähler pro request_type.
+
+    Erfasst wie oft Requests wiederholt wurden, wie viele trotz Retries
+    fehlschlugen, wie viel Zeit in Backoffs verbracht wurde und wie oft
+    Hedge-Requests gestartet wurden bzw. gewonnen haben.
+    """
+
+    _FIELDS = ('requests', 'retried_requests', 'retries', 'failed_after_retry',
+               'backoff_seconds', 'retry_latency_seconds', 'hedged', 'hedge_wins')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, request_type: str) -> Dict[str, Any]:
+        entry = self._stats.get(request_type)
+        if entry is None:
+            entry = {field: 0 for field in self._FIELDS}
+            self._stats[request_type] = entry
+        return entry
+
+    def record(self, request_type: str, retries: int, backoff_seconds: float,
+               retry_latency: float, success: bool) -> None:
+        """Erfasst das Ergebnis eines (evtl. wiederholten) Requests."""
+        with self._lock:
+            entry = self._entry(request_type)
+            entry['requests'] += 1
+            if retries:
+                entry['retried_requests'] += 1
+                entry['retries'] += retries
+                entry['backoff_seconds'] += backoff_seconds
+                entry['retry_latency_seconds'] += retry_latency
+                if not success:
+                    entry['failed_after_retry'] += 1
+
+    def record_hedge(self, request_type: str, hedge_won: bool) -> None:
+        """Erfasst einen gestarteten Hedge-Request."""
+        with self._lock:
+            entry = self._entry(request_type)
+            entry['hedged'] += 1
+            if hedge_won:
+                entry['hedge_wins'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Gibt eine Kopie aller Zähler zurück (Sekunden auf ms gerundet)."""
+        with self._lock:
+            result = {}
+            for request_type, entry in self._stats.items():
+                copy = dict(entry)
+                copy['backoff_seconds'] = round(copy['backoff_seconds'], 3)
+                copy['retry_latency_seconds'] = round(copy['retry_latency_seconds'], 3)
+                result[request_type] = copy
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
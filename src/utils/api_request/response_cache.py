@@ -0,0 +1,204 @@
+"""
+Response-Cache – Persistente Memoisierung deterministischer Utility-Requests.
+
+Kleine Prompts wie Session-Titel oder Spec-Autofill werden oft wortgleich
+wiederholt. Der Cache speichert erfolgreiche Antworten in einer eigenen
+SQLite-Datei (data/response_cache.db), Schlüssel ist ein Hash über
+(model, system, messages, temperature, max_tokens).
+
+- Opt-in pro request_type (CACHEABLE_REQUEST_TYPES)
+- LRU-Eviction bei Überschreiten von max_entries
+- TTL-Eviction (Einträge älter als ttl_seconds gelten als Miss)
+- Hit-Rate pro request_type über stats()
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Any, Iterable
+
+from ..logger import log
+from ..sql_loader import sql
+
+
+# ─── Konstanten ──────────────────────────────────────────────────────────────
+
+_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+CACHE_DB_PATH = os.path.join(_DATA_DIR, 'response_cache.db')
+
+# request_types die standardmäßig gecacht werden
+CACHEABLE_REQUEST_TYPES = frozenset({'session_title', 'spec_autofill', 'background_autofill'})
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600   # 7 Tage
+
+
+def make_cache_key(model: str, system_prompt: str, messages: list,
+                   temperature: float, max_tokens: int) -> str:
+    """Stabiler SHA-256 Hash über alle Request-Parameter, die die Antwort bestimmen."""
+    payload = json.dumps(
+        [model, system_prompt, messages, temperature, max_tokens],
+        ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistenter LRU-Cache für Non-Stream API-Antworten.
+
+    Thread-safe: eine gemeinsame Verbindung, alle Zugriffe über einen Lock.
+    Die DB-Datei wird erst beim ersten Zugriff angelegt.
+    """
+
+    def __init__(self, db_path: str = CACHE_DB_PATH,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 request_types: Iterable[str] = CACHEABLE_REQUEST_TYPES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.request_types = set(request_types)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ─── Konfiguration ──────────────────────────────────────────────
+
+    def is_enabled_for(self, request_type: str) -> bool:
+        return request_type in self.request_types
+
+    def enable(self, request_type: str) -> None:
+        self.request_types.add(request_type)
+
+    def disable(self, request_type: str) -> None:
+        self.request_types.discard(request_type)
+
+    # ─── Verbindung ─────────────────────────────────────────────────
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute(sql('response_cache.create_table'))
+            conn.execute(sql('response_cache.create_index'))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _count(self, request_type: str, field: str) -> None:
+        entry = self._stats.setdefault(
+            request_type, {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        )
+        entry[field] += 1
+
+    # ─── Lesen / Schreiben ──────────────────────────────────────────
+
+    def get(self, key: str, request_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Holt eine gecachte Antwort.
+
+        Returns:
+            {'content': str, 'usage': dict|None, 'stop_reason': str|None}
+            oder None bei Miss / abgelaufenem Eintrag
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(sql('response_cache.get_entry'), (key,)).fetchone()
+                if row is None:
+                    self._count(request_type, 'misses')
+                    return None
+
+                content, usage_json, stop_reason, created_at = row
+                if now - created_at > self.ttl_seconds:
+                    conn.execute(sql('response_cache.delete_entry'), (key,))
+                    conn.commit()
+                    self._count(request_type, 'misses')
+                    self._count(request_type, 'evictions')
+                    return None
+
+                conn.execute(sql('response_cache.touch_entry'), (now, key))
+                conn.commit()
+                self._count(request_type, 'hits')
+        except sqlite3.Error as e:
+            log.warning("Response-Cache Lesefehler: %s", e)
+            return None
+
+        return {
+            'content': content,
+            'usage': json.loads(usage_json) if usage_json else None,
+            'stop_reason': stop_reason,
+        }
+
+    def put(self, key: str, request_type: str, content: str,
+            usage: Optional[Dict[str, int]] = None, stop_reason: Optional[str] = None) -> None:
+        """Speichert eine erfolgreiche Antwort und erzwingt das Größenlimit."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    sql('response_cache.upsert_entry'),
+                    (key, request_type, content,
+                     json.dumps(usage) if usage else None, stop_reason, now, now)
+                )
+                self._count(request_type, 'stores')
+                self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error as e:
+            log.warning("Response-Cache Schreibfehler: %s", e)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """TTL- und LRU-Eviction (Lock wird vom Aufrufer gehalten)."""
+        conn.execute(sql('response_cache.delete_expired'), (now - self.ttl_seconds,))
+        count = conn.execute(sql('response_cache.count_entries')).fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(sql('response_cache.delete_lru'), (overflow,))
+            self._count('_lru', 'evictions')
+
+    def clear(self) -> None:
+        """Leert den Cache (Statistiken bleiben erhalten)."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(sql('response_cache.clear'))
+                conn.commit()
+        except sqlite3.Error as e:
+            log.warning("Response-Cache konnte nicht geleert werden: %s", e)
+
+    # ─── Statistik ──────────────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-Rate gesamt und pro request_type."""
+        with self._lock:
+            per_type = {}
+            total_hits = total_lookups = 0
+            for request_type, entry in self._stats.items():
+                if request_type == '_lru':
+                    continue
+                lookups = entry['hits'] + entry['misses']
+                total_hits += entry['hits']
+                total_lookups += lookups
+                per_type[request_type] = {
+                    **entry,
+                    'hit_rate': round(entry['hits'] / lookups, 3) if lookups else 0.0,
+                }
+            return {
+                'enabled_types': sorted(self.request_types),
+                'hit_rate': round(total_hits / total_lookups, 3) if total_lookups else 0.0,
+                'lookups': total_lookups,
+                'lru_evictions': self._stats.get('_lru', {}).get('evictions', 0),
+                'by_type': per_type,
+            }
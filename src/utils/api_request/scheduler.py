@@ -0,0 +1,302 @@
+"""
+Client-seitiger Rate-Limiter und Prioritäts-Scheduler für alle API-Requests.
+
+Zwei Token-Buckets (Requests/Minute und Input-Tokens/Minute) begrenzen den
+gesamten Traffic des ApiClient. Jeder request_type gehört zu einer
+Prioritätsklasse:
+
+    PRIORITY_INTERACTIVE  – Chat-Stream (Nutzer wartet aktiv)
+    PRIORITY_AFTERTHOUGHT – Nachgedanke (Decision + Followup)
+    PRIORITY_BACKGROUND   – Cortex-Updates, Autofill, Session-Titel
+
+Ein Request wird erst zugelassen, wenn keine höher priorisierten Requests
+warten. Hintergrund-Requests dürfen die Buckets außerdem nur bis zu einer
+Reserve leeren, damit für den Chat immer Kapazität übrig bleibt.
+Mehrstufige Abläufe (Cortex Tool-Loop) holen pro API-Call einen neuen Slot
+und werden so zwischen zwei Rounds von interaktiven Requests überholt.
+
+Die Wartezeit ist pro Klasse begrenzt: Chat wartet nie auf die Buckets
+(er belastet sie nur und bremst damit den Hintergrund), der Nachgedanke
+höchstens AFTERTHOUGHT_MAX_WAIT Sekunden – danach werden beide auch ohne
+freie Kapazität zugelassen. Hintergrund-Requests geben nach
+background_max_wait mit SchedulerTimeout auf.
+
+Die Limits kommen aus den Settings (apiRequestsPerMinute,
+apiTokensPerMinute, angewendet in provider.init_services und bei jeder
+Änderung über /api/user-settings). Die Defaults entsprechen Anthropic
+Tier 1 (50 Requests, 30.000 Input-Tokens pro Minute); 0 schaltet das
+lokale Limit ab.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Any
+
+from ..logger import log
+
+
+# ─── Prioritätsklassen ───────────────────────────────────────────────────────
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_AFTERTHOUGHT = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_AFTERTHOUGHT: 'afterthought',
+    PRIORITY_BACKGROUND: 'background',
+}
+
+REQUEST_PRIORITIES: Dict[str, int] = {
+    'chat': PRIORITY_INTERACTIVE,
+    'test': PRIORITY_INTERACTIVE,
+    'afterthought_decision': PRIORITY_AFTERTHOUGHT,
+    'afterthought_followup': PRIORITY_AFTERTHOUGHT,
+    'cortex_update': PRIORITY_BACKGROUND,
+    'memory_summary': PRIORITY_BACKGROUND,
+    'spec_autofill': PRIORITY_BACKGROUND,
+    'background_autofill': PRIORITY_BACKGROUND,
+    'session_title': PRIORITY_BACKGROUND,
+}
+
+# ─── Defaults ────────────────────────────────────────────────────────────────
+
+DEFAULT_REQUESTS_PER_MINUTE = 50  # Anthropic Tier 1 (0 = kein lokales Limit)
+DEFAULT_TOKENS_PER_MINUTE = 30000
+BACKGROUND_RESERVE = 0.2          # Anteil der Kapazität, den Background nicht verbrauchen darf
+BACKGROUND_MAX_WAIT = 300.0       # Sekunden, danach gibt ein Background-Request auf
+INTERACTIVE_MAX_WAIT = 0.0        # Chat wird nie durch die Buckets verzögert
+AFTERTHOUGHT_MAX_WAIT = 10.0      # Sekunden, danach wird der Nachgedanke trotzdem zugelassen
+
+_CHARS_PER_TOKEN = 4              # Grobe Schätzung (wie im ChatService Token-Breakdown)
+
+
+class SchedulerTimeout(Exception):
+    """Request konnte innerhalb der maximalen Wartezeit keinen Slot erhalten."""
+
+
+def get_priority(request_type: str) -> int:
+    """Gibt die Prioritätsklasse eines request_type zurück (Unbekannt → Background)."""
+    return REQUEST_PRIORITIES.get(request_type, PRIORITY_BACKGROUND)
+
+
+def estimate_input_tokens(system_prompt: str, messages: list) -> int:
+    """Schätzt die Input-Tokens eines Requests anhand der Zeichenanzahl."""
+    chars = len(system_prompt or '')
+    for msg in messages or []:
+        content = msg.get('content', '') if isinstance(msg, dict) else msg
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return max(1, chars // _CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """Token-Bucket mit kontinuierlichem Refill (Kapazität pro Minute, 0 = unbegrenzt)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(max(0, per_minute or 0))
+        self.enabled = self.capacity > 0
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self._last
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._last = now
+
+    def time_until(self, amount: float, floor: float = 0.0) -> float:
+        """Sekunden bis `amount` entnommen werden kann, ohne unter `floor` zu fallen."""
+        if not self.enabled:
+            return 0.0
+        missing = amount + floor - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Entnimmt `amount`; darf ins Minus gehen (Chat überzieht, Background wartet länger)."""
+        if self.enabled:
+            self.tokens -= amount
+
+
+class ApiScheduler:
+    """
+    Zentraler Rate-Limiter mit Prioritätsklassen.
+
+    Verwendung:
+        with scheduler.slot('cortex_update', estimated_tokens):
+            client.messages.create(...)
+    """
+
+    def __init__(self, requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+                 background_reserve: float = BACKGROUND_RESERVE,
+                 background_max_wait: float = BACKGROUND_MAX_WAIT,
+                 afterthought_max_wait: float = AFTERTHOUGHT_MAX_WAIT):
+        self._cond = threading.Condition()
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self.background_reserve = background_reserve
+        self.background_max_wait = background_max_wait
+        self.afterthought_max_wait = afterthought_max_wait
+
+        self._waiting = {p: 0 for p in PRIORITY_NAMES}
+        self._active = {p: 0 for p in PRIORITY_NAMES}
+        self._admitted = {p: 0 for p in PRIORITY_NAMES}
+        self._timeouts = {p: 0 for p in PRIORITY_NAMES}
+        self._overdrawn = {p: 0 for p in PRIORITY_NAMES}
+        self._wait_seconds = {p: 0.0 for p in PRIORITY_NAMES}
+        self._max_wait_seconds = {p: 0.0 for p in PRIORITY_NAMES}
+
+    # ─── Konfiguration ──────────────────────────────────────────────
+
+    def configure(self, requests_per_minute: Optional[int] = None,
+                  tokens_per_minute: Optional[int] = None) -> None:
+        """Passt die Limits zur Laufzeit an (Buckets starten voll, 0 = kein Limit, None = unverändert)."""
+        with self._cond:
+            if requests_per_minute is not None:
+                self._requests = TokenBucket(requests_per_minute)
+            if tokens_per_minute is not None:
+                self._tokens = TokenBucket(tokens_per_minute)
+            self._cond.notify_all()
+
+    @property
+    def enabled(self) -> bool:
+        """True, wenn mindestens ein lokales Limit aktiv ist."""
+        return self._requests.enabled or self._tokens.enabled
+
+    # ─── Slot-Vergabe ───────────────────────────────────────────────
+
+    def _higher_priority_waiting(self, priority: int) -> bool:
+        return any(self._waiting[p] for p in self._waiting if p < priority)
+
+    def _max_wait(self, priority: int) -> float:
+        if priority == PRIORITY_INTERACTIVE:
+            return INTERACTIVE_MAX_WAIT
+        if priority == PRIORITY_AFTERTHOUGHT:
+            return self.afterthought_max_wait
+        return self.background_max_wait
+
+    def _wait_time(self, priority: int, tokens: float) -> float:
+        """0 wenn der Request jetzt zugelassen werden kann, sonst Wartezeit."""
+        now = time.monotonic()
+        self._requests.refill(now)
+        self._tokens.refill(now)
+
+        reserve = self.background_reserve if priority == PRIORITY_BACKGROUND else 0.0
+        return max(
+            self._requests.time_until(1, reserve * self._requests.capacity),
+            self._tokens.time_until(tokens, reserve * self._tokens.capacity),
+        )
+
+    def acquire(self, request_type: str, tokens: int = 1) -> None:
+        """
+        Blockiert bis der Request zugelassen wird (höchstens bis zur
+        maximalen Wartezeit seiner Klasse; Chat wartet gar nicht).
+
+        Raises:
+            SchedulerTimeout: Background-Request hat länger als
+                background_max_wait gewartet
+        """
+        priority = get_priority(request_type)
+        tokens = float(tokens)
+        if self._tokens.enabled:
+            # Requests größer als der Bucket würden nie zugelassen
+            tokens = min(tokens, self._tokens.capacity * (1 - self.background_reserve))
+        start = time.monotonic()
+        deadline = start + self._max_wait(priority)
+
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    if not self._higher_priority_waiting(priority):
+                        wait = self._wait_time(priority, tokens)
+                        if wait <= 0:
+                            self._requests.consume(1)
+                            self._tokens.consume(tokens)
+                            break
+                    else:
+                        wait = 0.5
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        if priority == PRIORITY_BACKGROUND:
+                            self._timeouts[priority] += 1
+                            raise SchedulerTimeout(
+                                f'Kein API-Slot für {request_type} nach '
+                                f'{self.background_max_wait:.0f}s (lokales Rate-Limit)'
+                            )
+                        # Chat/Nachgedanke: trotzdem zulassen, Buckets überziehen
+                        self._requests.consume(1)
+                        self._tokens.consume(tokens)
+                        self._overdrawn[priority] += 1
+                        break
+                    wait = min(wait, remaining)
+                    self._cond.wait(timeout=min(wait, 0.5))
+            finally:
+                self._waiting[priority] -= 1
+
+            waited = time.monotonic() - start
+            self._active[priority] += 1
+            self._admitted[priority] += 1
+            self._wait_seconds[priority] += waited
+            self._max_wait_seconds[priority] = max(self._max_wait_seconds[priority], waited)
+            # Niedrigere Klassen neu prüfen lassen
+            self._cond.notify_all()
+
+        if waited > 1.0:
+            log.info("API-Scheduler: %s wartete %.1fs auf einen Slot", request_type, waited)
+
+    def release(self, request_type: str) -> None:
+        """Gibt den Slot eines abgeschlossenen Requests frei."""
+        priority = get_priority(request_type)
+        with self._cond:
+            self._active[priority] = max(0, self._active[priority] - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, request_type: str, tokens: int = 1):
+        """Context-Manager um acquire()/release()."""
+        self.acquire(request_type, tokens)
+        try:
+            yield
+        finally:
+            self.release(request_type)
+
+    # ─── Status ─────────────────────────────────────────────────────
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue-Tiefe, aktive Requests und Bucket-Füllstand pro Klasse."""
+        with self._cond:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            classes = {}
+            for priority, name in PRIORITY_NAMES.items():
+                admitted = self._admitted[priority]
+                classes[name] = {
+                    'queued': self._waiting[priority],
+                    'active': self._active[priority],
+                    'admitted': admitted,
+                    'timeouts': self._timeouts[priority],
+                    'overdrawn': self._overdrawn[priority],
+                    'avg_wait_seconds': round(self._wait_seconds[priority] / admitted, 3) if admitted else 0.0,
+                    'max_wait_seconds': round(self._max_wait_seconds[priority], 3),
+                }
+            return {
+                'queue_depth': sum(self._waiting.values()),
+                'classes': classes,
+                'limits': {
+                    'enabled': self.enabled,
+                    'requests_per_minute': int(self._requests.capacity),
+                    'tokens_per_minute': int(self._tokens.capacity),
+                    'background_reserve': self.background_reserve,
+                },
+                'available': {
+                    'requests': round(self._requests.tokens, 1) if self._requests.enabled else None,
+                    'tokens': int(self._tokens.tokens) if self._tokens.enabled else None,
+                },
+            }
@@ -2,14 +2,20 @@
 Hilfsfunktionen zum Laden von Konfigurationsdateien
 """
 
+import copy
 import json
 import os
+import threading
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Optional, Sequence, Tuple
 from utils.database import create_persona_db, delete_persona_db
 from utils.cortex_service import create_cortex_dir, delete_cortex_dir
 from utils.cortex.tier_tracker import reset_persona as reset_persona_cycle_state
 from utils.logger import log
+from utils.prompt_engine.file_cache import FileValueCache
+from utils.persona_catalog import PersonaCatalog
+from utils.persona_contexts import PersonaContext, PersonaContextCache, DEFAULT_MAX_ENTRIES
+from utils.settings_defaults import get_default
 
 # Base directory for config files (src/)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -93,10 +99,95 @@ def save_avatar_config(avatar_data: Dict[str, Any]) -> bool:
 
 # ===== Persona Config & Profile System =====
 
+PERSONA_SPEC_FILE = 'instructions/personas/spec/persona_spec.json'
+CUSTOM_SPEC_FILE = 'instructions/personas/spec/custom_spec/custom_spec.json'
+
+# Memo für gemergte Spec und Charakterbeschreibung: Key → (Datei-Signaturen, Wert)
+_char_files = FileValueCache()
+_char_memo: Dict[Tuple, Tuple[Tuple, Any]] = {}
+_char_memo_lock = threading.Lock()
+
+
+def _memoized(key: Tuple, paths: Sequence[str], build: Callable[[], Any]) -> Any:
+    """
+    Gibt den gecachten Wert zurück, solange sich keine der Quelldateien geändert hat.
+
+    Die Signaturen werden vor dem Bauen gelesen: ändert sich eine Datei
+    währenddessen, passt der gespeicherte Eintrag beim nächsten Aufruf
+    nicht mehr und wird neu gebaut.
+    """
+    version = _char_files.signatures(paths)
+    with _char_memo_lock:
+        entry = _char_memo.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+    value = build()
+    with _char_memo_lock:
+        _char_memo[key] = (version, value)
+    return value
+
+
+def invalidate_character_cache() -> None:
+    """
+    Verwirft gemergte Spec und Charakterbeschreibung.
+
+    Die Einträge sind bereits über mtime/Größe versioniert; der explizite
+    Aufruf nach eigenen Schreibzugriffen deckt Änderungen ab, die innerhalb
+    derselben mtime-Auflösung bei gleicher Dateigröße passieren.
+    """
+    with _char_memo_lock:
+        _char_memo.clear()
+    _char_files.clear()
+    _persona_contexts.invalidate()
+
+
+def _active_config_written(full_path: str, data: Dict[str, Any]) -> None:
+    """
+    Nach einem eigenen Schreibzugriff auf persona_config.json: den neuen Inhalt
+    hinterlegen (kein erneutes Lesen) und gebaute Beschreibungen verwerfen.
+    Die gemergte Spec bleibt gültig.
+    """
+    _char_files.prime(full_path, data)
+    with _char_memo_lock:
+        for key in [k for k in _char_memo if k[0] == 'description']:
+            del _char_memo[key]
+
+
+def _read_char_profile(profile_path: str, custom_spec_path: str) -> Dict[str, Any]:
+    """Liest persona_spec.json und merged custom_spec.json hinein."""
+    with open(profile_path, 'r', encoding='utf-8') as file:
+        base_profile = json.load(file)
+
+    if os.path.exists(custom_spec_path):
+        try:
+            with open(custom_spec_path, 'r', encoding='utf-8') as f:
+                custom_profile = json.load(f)
+
+            # Merge custom specs in base profile
+            base_spec = base_profile.get('persona_spec', {})
+            custom_spec = custom_profile.get('persona_spec', {})
+
+            for category in ['persona_type', 'core_traits_details', 'knowledge_areas', 'expression_styles', 'scenarios']:
+                custom_items = custom_spec.get(category, {})
+                if custom_items:
+                    if category not in base_spec:
+                        base_spec[category] = {}
+                    base_spec[category].update(custom_items)
+
+            base_profile['persona_spec'] = base_spec
+        except Exception as e:
+            log.warning("Custom Specs konnten nicht geladen werden: %s", e)
+
+    return base_profile
+
+
 def load_char_profile(profile_file: str = 'instructions/personas/spec/persona_spec.json') -> Dict[str, Any]:
     """
     Lädt das vollständige Persona-Profil (alle verfügbaren Optionen)
     Merged automatisch Custom Specs aus custom_spec/custom_spec.json
+
+    Das Ergebnis wird pro Version von persona_spec.json und custom_spec.json
+    gecached und von allen Aufrufern geteilt – nicht verändern.
     
     Args:
         profile_file: Pfad zur persona_spec.json
@@ -104,34 +195,9 @@ def load_char_profile(profile_file: str = 'instructions/personas/spec/persona_sp
     Returns:
         Dictionary mit allen verfügbaren Core Traits, Knowledge Areas und Expression Styles
     """
+    paths = (get_config_path(profile_file), get_config_path(CUSTOM_SPEC_FILE))
     try:
-        full_path = get_config_path(profile_file)
-        with open(full_path, 'r', encoding='utf-8') as file:
-            base_profile = json.load(file)
-        
-        # Custom Specs laden und mergen
-        custom_spec_path = get_config_path('instructions/personas/spec/custom_spec/custom_spec.json')
-        if os.path.exists(custom_spec_path):
-            try:
-                with open(custom_spec_path, 'r', encoding='utf-8') as f:
-                    custom_profile = json.load(f)
-                
-                # Merge custom specs in base profile
-                base_spec = base_profile.get('persona_spec', {})
-                custom_spec = custom_profile.get('persona_spec', {})
-                
-                for category in ['persona_type', 'core_traits_details', 'knowledge_areas', 'expression_styles', 'scenarios']:
-                    custom_items = custom_spec.get(category, {})
-                    if custom_items:
-                        if category not in base_spec:
-                            base_spec[category] = {}
-                        base_spec[category].update(custom_items)
-                
-                base_profile['persona_spec'] = base_spec
-            except Exception as e:
-                log.warning("Custom Specs konnten nicht geladen werden: %s", e)
-        
-        return base_profile
+        return _memoized(('profile', *paths), paths, lambda: _read_char_profile(*paths))
     except FileNotFoundError:
         log.warning("%s nicht gefunden.", profile_file)
         return {"persona_spec": {"persona_type": {}, "core_traits_details": {}, "knowledge_areas": {}, "expression_styles": {}}}
@@ -151,12 +217,11 @@ def load_char_config(config_file: str = 'instructions/personas/active/persona_co
         Dictionary mit der aktuellen Auswahl (name, age, gender, persona, core_traits, knowledge, expression)
     """
     ensure_active_persona_config()
-    try:
-        full_path = get_config_path(config_file)
-        with open(full_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data.get('persona_settings', {})
-    except FileNotFoundError:
+    full_path = get_config_path(config_file)
+    data = _char_files.load(full_path)
+    if isinstance(data, dict):
+        return dict(data.get('persona_settings', {}))
+    if not os.path.exists(full_path):
         log.warning("%s nicht gefunden. Verwende Default.", config_file)
         return {
             "name": "Assistant",
@@ -167,17 +232,16 @@ def load_char_config(config_file: str = 'instructions/personas/active/persona_co
             "knowledge": ["Allgemeinwissen"],
             "expression": "normal"
         }
-    except Exception as e:
-        log.error("Fehler beim Laden der Persona-Konfiguration: %s", e)
-        return {
-            "name": "Assistant",
-            "age": 18,
-            "gender": "divers",
-            "persona": "KI",
-            "core_traits": [],
-            "knowledge": [],
-            "expression": "normal"
-        }
+    log.error("Fehler beim Laden der Persona-Konfiguration: %s nicht lesbar", config_file)
+    return {
+        "name": "Assistant",
+        "age": 18,
+        "gender": "divers",
+        "persona": "KI",
+        "core_traits": [],
+        "knowledge": [],
+        "expression": "normal"
+    }
 
 
 def get_active_persona_id(config_file: str = 'instructions/personas/active/persona_config.json') -> str:
@@ -188,13 +252,10 @@ def get_active_persona_id(config_file: str = 'instructions/personas/active/perso
         Persona-ID als String ('default' oder eine UUID)
     """
     ensure_active_persona_config()
-    try:
-        full_path = get_config_path(config_file)
-        with open(full_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data.get('active_persona_id', 'default')
-    except Exception:
+    data = _char_files.load(get_config_path(config_file))
+    if not isinstance(data, dict):
         return 'default'
+    return data.get('active_persona_id', 'default')
 
 
 def set_active_persona_id(persona_id: str, config_file: str = 'instructions/personas/active/persona_config.json') -> bool:
@@ -216,6 +277,7 @@ def set_active_persona_id(persona_id: str, config_file: str = 'instructions/pers
         
         with open(full_path, 'w', encoding='utf-8') as file:
             json.dump(data, file, ensure_ascii=False, indent=2)
+        _active_config_written(full_path, data)
         return True
     except Exception as e:
         log.error("Fehler beim Setzen der aktiven Persona-ID: %s", e)
@@ -251,6 +313,9 @@ def save_char_config(config_data: Dict[str, Any], config_file: str = 'instructio
         
         with open(full_path, 'w', encoding='utf-8') as file:
             json.dump(wrapped_data, file, ensure_ascii=False, indent=2)
+        _active_config_written(full_path, wrapped_data)
+        # Die aktive Persona weicht jetzt ggf. von ihrem warmen Kontext ab
+        _persona_contexts.invalidate(wrapped_data["active_persona_id"])
         return True
     except Exception as e:
         log.error("Fehler beim Speichern der Persona-Konfiguration: %s", e)
@@ -276,7 +341,7 @@ def get_available_char_options(profile_file: str = 'instructions/personas/spec/p
         base_spec = base_profile.get('persona_spec', {})
         
         # Custom Specs separat laden
-        custom_spec_path = get_config_path('instructions/personas/spec/custom_spec/custom_spec.json')
+        custom_spec_path = get_config_path(CUSTOM_SPEC_FILE)
         custom_spec = {}
         if os.path.exists(custom_spec_path):
             try:
@@ -316,6 +381,21 @@ CREATED_PERSONAS_DIR = os.path.join(BASE_DIR, 'instructions', 'created_personas'
 DEFAULT_PERSONA_FILE = 'instructions/personas/default/default_persona.json'
 ACTIVE_PERSONA_FILE = 'instructions/personas/active/persona_config.json'
 
+# Persona-Liste: Zusammenfassungen pro Datei-Version (nur im Speicher)
+_persona_catalog = PersonaCatalog(CREATED_PERSONAS_DIR, get_config_path(DEFAULT_PERSONA_FILE))
+
+
+def _release_persona(persona_id: str) -> None:
+    """Persona fällt aus dem LRU: gecachte Cortex-Inhalte freigeben."""
+    from utils.provider import get_cortex_service
+    get_cortex_service().evict_cache(persona_id)
+
+
+# Warme Persona-Kontexte für schnelle Wechsel (Kapazität: personaContextCacheSize)
+_persona_contexts = PersonaContextCache(
+    get_default('personaContextCacheSize', DEFAULT_MAX_ENTRIES), on_evict=_release_persona
+)
+
 
 def ensure_active_persona_config():
     """
@@ -369,81 +449,31 @@ def load_default_persona() -> Dict[str, Any]:
         }
 
 
-def list_created_personas() -> list:
-    """Listet alle erstellten Personas aus dem created_personas Ordner"""
+def list_created_personas(offset: int = 0, limit: Optional[int] = None) -> list:
+    """
+    Listet die Standard-Persona und alle erstellten Personas.
+
+    Args:
+        offset: Erster Eintrag (0 = Standard-Persona)
+        limit: Maximale Anzahl Einträge (None = alle)
+    """
+    return get_persona_page(offset, limit)[0]
+
+
+def get_persona_page(offset: int = 0, limit: Optional[int] = None) -> Tuple[list, int]:
+    """
+    Ausschnitt der Persona-Liste aus dem Persona-Katalog.
+
+    Nur neue oder geänderte Persona-Dateien werden geparst; 'is_active'
+    kommt aus der active_persona_id der aktiven Config.
+
+    Returns:
+        (Einträge mit is_active, Gesamtanzahl)
+    """
     ensure_created_personas_dir()
-    personas = []
-    
-    # Always add standard persona first
-    default_config = load_default_persona()
-    active_config = load_char_config()
-    
-    default_entry = {
-        "id": "default",
-        "name": default_config.get("name", "Assistant"),
-        "age": default_config.get("age", None),
-        "gender": default_config.get("gender", None),
-        "persona": default_config.get("persona", "KI"),
-        "core_traits": default_config.get("core_traits", []),
-        "knowledge": default_config.get("knowledge", []),
-        "expression": default_config.get("expression", None),
-        "scenarios": default_config.get("scenarios", []),
-        "background": default_config.get("background", ""),
-        "start_msg_enabled": default_config.get("start_msg_enabled", False),
-        "avatar": default_config.get("avatar", None),
-        "avatar_type": default_config.get("avatar_type", None),
-        "is_default": True,
-        "is_active": _configs_match(active_config, default_config)
-    }
-    personas.append(default_entry)
-    
-    # Erstellte Personas laden
-    for filename in sorted(os.listdir(CREATED_PERSONAS_DIR)):
-        if filename.endswith('.json'):
-            try:
-                filepath = os.path.join(CREATED_PERSONAS_DIR, filename)
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                settings = data.get('persona_settings', {})
-                persona_id = data.get('id', filename.replace('.json', ''))
-                entry = {
-                    "id": persona_id,
-                    "name": settings.get("name", "Unbenannt"),
-                    "age": settings.get("age", 18),
-                    "gender": settings.get("gender", "divers"),
-                    "persona": settings.get("persona", "KI"),
-                    "core_traits": settings.get("core_traits", []),
-                    "knowledge": settings.get("knowledge", []),
-                    "expression": settings.get("expression", "normal"),
-                    "scenarios": settings.get("scenarios", []),
-                    "background": settings.get("background", ""),
-                    "start_msg_enabled": settings.get("start_msg_enabled", False),
-                    "avatar": settings.get("avatar", None),
-                    "avatar_type": settings.get("avatar_type", None),
-                    "is_default": False,
-                    "is_active": _configs_match(active_config, settings)
-                }
-                personas.append(entry)
-            except Exception as e:
-                log.error("Fehler beim Laden von %s: %s", filename, e)
-    
-    return personas
-
-
-def _configs_match(config_a: Dict, config_b: Dict) -> bool:
-    """Prüft ob zwei Persona-Configs übereinstimmen (alle relevanten Felder)"""
-    return (
-        config_a.get("name") == config_b.get("name") and
-        config_a.get("age") == config_b.get("age") and
-        config_a.get("gender") == config_b.get("gender") and
-        config_a.get("persona") == config_b.get("persona") and
-        sorted(config_a.get("core_traits", [])) == sorted(config_b.get("core_traits", [])) and
-        sorted(config_a.get("knowledge", [])) == sorted(config_b.get("knowledge", [])) and
-        config_a.get("expression") == config_b.get("expression") and
-        sorted(config_a.get("scenarios", [])) == sorted(config_b.get("scenarios", [])) and
-        config_a.get("background", "") == config_b.get("background", "") and
-        config_a.get("start_msg_enabled", False) == config_b.get("start_msg_enabled", False)
-    )
+    entries, total = _persona_catalog.page(offset, limit)
+    active_id = get_active_persona_id()
+    return [{**entry, "is_active": entry["id"] == active_id} for entry in entries], total
 
 
 def save_created_persona(config_data: Dict[str, Any]) -> Optional[str]:
@@ -465,6 +495,7 @@ def save_created_persona(config_data: Dict[str, Any]) -> Optional[str]:
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(save_data, f, ensure_ascii=False, indent=2)
+        _persona_catalog.invalidate(persona_id)
         
         # Create the associated persona database
         create_persona_db(persona_id)
@@ -509,6 +540,8 @@ def update_created_persona(persona_id: str, update_data: Dict[str, Any]) -> bool
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        _persona_catalog.invalidate(persona_id)
+        _persona_contexts.invalidate(persona_id)
         
         # Wenn diese Persona aktuell aktiv ist, Config neu laden
         if get_active_persona_id() == persona_id:
@@ -531,6 +564,8 @@ def delete_created_persona(persona_id: str) -> bool:
     try:
         if os.path.exists(filepath):
             os.remove(filepath)
+            _persona_catalog.invalidate(persona_id)
+            _persona_contexts.invalidate(persona_id)
             # Delete the associated persona database
             delete_persona_db(persona_id)
             # Lösche den Cortex-Ordner
@@ -572,44 +607,63 @@ def load_persona_by_id(persona_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _invalidate_prompt_engine_cache():
-    """Invalidiert den PromptEngine-Cache nach Persona-Wechsel (lazy import um Zirkularität zu vermeiden)."""
-    try:
-        from utils.provider import get_prompt_engine
-        engine = get_prompt_engine()
-        if engine:
-            engine.invalidate_cache()
-            log.info("PromptEngine-Cache nach Persona-Wechsel invalidiert")
-    except Exception as e:
-        log.warning("PromptEngine-Cache konnte nicht invalidiert werden: %s", e)
+def _persona_file(persona_id: str) -> str:
+    """Quelldatei einer Persona (default_persona.json oder created_personas/<id>.json)."""
+    if persona_id == "default":
+        return get_config_path(DEFAULT_PERSONA_FILE)
+    return os.path.join(CREATED_PERSONAS_DIR, f"{persona_id}.json")
 
 
 def activate_persona(persona_id: str) -> bool:
-    """Aktiviert eine Persona (kopiert sie in die aktive Config inkl. Avatar und setzt ID)"""
-    config = load_persona_by_id(persona_id)
-    if config is None:
-        return False
-    
+    """
+    Aktiviert eine Persona (kopiert sie in die aktive Config inkl. Avatar und setzt ID).
+
+    Zuletzt aktive Personas liegen als warmer Kontext im Speicher (Settings +
+    gebaute Beschreibung): der Wechsel liest dann keine Datei, schreibt
+    persona_config.json in einem Schritt und hinterlegt die Beschreibung
+    direkt im Memo von build_character_description().
+    """
+    version = _char_files.signatures(
+        (_persona_file(persona_id), get_config_path(PERSONA_SPEC_FILE), get_config_path(CUSTOM_SPEC_FILE))
+    )
+    ctx = _persona_contexts.get(persona_id, version)
+    if ctx is None:
+        config = load_persona_by_id(persona_id)
+        if config is None:
+            return False
+        ctx = PersonaContext(persona_id, config, _build_character_description_impl(config), version)
+
     # Avatar-Daten bleiben in der Config (kein Stripping mehr)
-    success = save_char_config(config)
-    if success:
-        set_active_persona_id(persona_id)
-        # PromptEngine-Cache invalidieren damit System-Prompt mit neuer Persona gebaut wird
-        _invalidate_prompt_engine_cache()
-    return success
+    ensure_active_persona_config()
+    full_path = get_config_path(ACTIVE_PERSONA_FILE)
+    # Eigene Kopie für den Datei-Cache: Aufrufer von load_char_config() dürfen
+    # verschachtelte Listen verändern, ohne den warmen Kontext zu verfälschen
+    data = {"active_persona_id": persona_id, "persona_settings": copy.deepcopy(ctx.settings)}
+    try:
+        with open(full_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+    except Exception as e:
+        log.error("Fehler beim Aktivieren der Persona %s: %s", persona_id, e)
+        return False
+    _active_config_written(full_path, data)
+
+    paths = (full_path, get_config_path(PERSONA_SPEC_FILE), get_config_path(CUSTOM_SPEC_FILE))
+    with _char_memo_lock:
+        _char_memo[('description', *paths)] = (_char_files.signatures(paths), ctx.description)
+    _persona_contexts.put(ctx)
+    # PromptEngine-Caches sind über die Datei-Signatur der persona_config.json
+    # versioniert – der nächste Build liest die neue Persona automatisch
+    return True
 
 
 def restore_default_persona() -> bool:
     """Stellt die Standard-Persona als aktive Config inkl. Avatar wieder her"""
-    default_config = load_default_persona()
-    
-    # Avatar-Daten bleiben in der Config (kein Stripping mehr)
-    success = save_char_config(default_config)
-    if success:
-        set_active_persona_id('default')
-        # PromptEngine-Cache invalidieren damit System-Prompt mit neuer Persona gebaut wird
-        _invalidate_prompt_engine_cache()
-    return success
+    return activate_persona('default')
+
+
+def get_persona_context_stats() -> Dict[str, Any]:
+    """Belegung und Trefferquote der warmen Persona-Kontexte."""
+    return _persona_contexts.get_stats()
 
 
 def build_character_description_from_config(
@@ -636,6 +690,9 @@ def build_character_description(
 ) -> Dict[str, Any]:
     """
     Baut dynamisch die vollständige Charakterbeschreibung aus persona_config und persona_spec zusammen
+
+    Memoisiert über die Signaturen von persona_config.json, persona_spec.json
+    und custom_spec.json – gebaut wird nur nach einer Änderung.
     
     Args:
         config_file: Pfad zur persona_config.json (aktuelle Auswahl)
@@ -644,8 +701,13 @@ def build_character_description(
     Returns:
         Dictionary mit char_name, identity, core, behavior, comms, voice
     """
-    config = load_char_config(config_file)
-    return _build_character_description_impl(config, profile_file)
+    ensure_active_persona_config()
+    paths = (get_config_path(config_file), get_config_path(profile_file), get_config_path(CUSTOM_SPEC_FILE))
+    description = _memoized(
+        ('description', *paths), paths,
+        lambda: _build_character_description_impl(load_char_config(config_file), profile_file),
+    )
+    return dict(description)
 
 
 def _build_character_description_impl(
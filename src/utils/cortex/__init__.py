@@ -1,4 +1,4 @@
-"""Cortex Package — Update-Frequenz, zyklische Trigger-Logik und Update-Service."""
+"""Cortex Package — Update-Frequenz, zyklische Trigger-Logik, Update-Service und Job-Queue."""
 
 from utils.cortex.tier_tracker import (
     get_cycle_base, set_cycle_base, reset_session, reset_all,
@@ -6,9 +6,10 @@ from utils.cortex.tier_tracker import (
 )
 from utils.cortex.tier_checker import check_and_trigger_cortex_update
 from utils.cortex.update_service import CortexUpdateService
+from utils.cortex.job_queue import CortexJobQueue
 
 __all__ = [
     'get_cycle_base', 'set_cycle_base', 'reset_session', 'reset_all',
     'rebuild_cycle_base', 'get_progress', 'check_and_trigger_cortex_update',
-    'CortexUpdateService',
+    'CortexUpdateService', 'CortexJobQueue',
 ]
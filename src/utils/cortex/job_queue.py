@@ -0,0 +1,378 @@
+"""
+Cortex Job Queue — Persistente Warteschlange für Cortex-Updates.
+
+Ersetzt die frei gestarteten Daemon-Threads pro Persona:
+- Jobs liegen in einer eigenen SQLite-Datei (data/cortex_jobs.db) und
+  überleben einen Neustart; unterbrochene Jobs werden beim Start wieder
+  eingeplant.
+- Ein fester Worker-Pool arbeitet die Jobs ab, pro Persona läuft höchstens
+  ein Update gleichzeitig.
+- Coalescing: ein weiterer Trigger für dieselbe Persona und Session wird in
+  den wartenden Job zusammengeführt (Vereinigung der Nachrichtenbereiche)
+  statt übersprungen zu werden.
+- Mindestabstand statt Verwerfen: ein Job wird frühestens min_interval
+  Sekunden nach dem letzten Update derselben Persona gestartet.
+- Fehlgeschlagene Updates werden mit exponentiellem Backoff wiederholt,
+  aber nur wenn das Ergebnis ausdrücklich 'retryable': True meldet (ohne
+  Angabe gilt ein Fehler als endgültig).
+- stats() liefert Durchsatz und Latenzen (Wartezeit, Laufzeit).
+
+Usage:
+    queue = CortexJobQueue()
+    job_id = queue.enqueue('default', session_id=3, to_message_id=120)
+    queue.get_job(job_id)   # {'status': 'pending', ...}
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.database import connection as db_connection
+from utils.logger import log
+from utils.sql_loader import sql
+
+
+# ─── Konstanten ──────────────────────────────────────────────────────────────
+
+CORTEX_JOBS_DB_NAME = 'cortex_jobs.db'
+
+DEFAULT_WORKERS = 2
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 30.0
+BACKOFF_MAX_SECONDS = 600.0
+KEEP_FINISHED_JOBS = 500
+
+# Fenster für Latenz-Perzentile und Durchsatz
+_SAMPLE_SIZE = 500
+_THROUGHPUT_WINDOW_SECONDS = 300.0
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_JOB_COLUMNS = (
+    'id', 'persona_id', 'session_id', 'status', 'reason', 'from_message_id', 'to_message_id',
+    'triggers', 'attempts', 'not_before', 'created_at', 'started_at', 'finished_at',
+    'last_error', 'result_json',
+)
+
+JobRunner = Callable[[str, int, Dict[str, Any]], Dict[str, Any]]
+
+
+def _run_cortex_update(persona_id: str, session_id: int, job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Standard-Runner: CortexUpdateService.execute_update (Abstand regelt die Queue).
+
+    Der (ggf. zusammengeführte) Nachrichtenbereich des Jobs begrenzt das
+    Update; später eingetroffene Nachrichten gehören zum nächsten Job.
+    """
+    from utils.cortex.update_service import CortexUpdateService
+    return CortexUpdateService().execute_update(
+        persona_id=persona_id,
+        session_id=session_id,
+        respect_rate_limit=False,
+        from_message_id=job.get('from_message_id'),
+        to_message_id=job.get('to_message_id')
+    )
+
+
+def _union(a: Optional[int], b: Optional[int], pick) -> Optional[int]:
+    values = [v for v in (a, b) if v is not None]
+    return pick(values) if values else None
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-Rank Perzentil in Millisekunden (None bei leerer Liste)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 1)
+
+
+def _row_to_job(row: Tuple) -> Dict[str, Any]:
+    job = dict(zip(_JOB_COLUMNS, row))
+    result_json = job.pop('result_json')
+    job['result'] = json.loads(result_json) if result_json else None
+    return job
+
+
+def backoff_delay(attempts: int) -> float:
+    """Wartezeit vor dem nächsten Versuch (30s, 60s, 120s, … max. 10 min)."""
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+class CortexJobQueue:
+    """
+    SQLite-Warteschlange mit Worker-Pool. Thread-safe.
+
+    Args:
+        db_path: Pfad der Queue-DB (Default: DATA_DIR/cortex_jobs.db)
+        workers: Anzahl Worker-Threads
+        runner: Führt einen Job aus, Rückgabe wie execute_update()
+        min_interval: Mindestabstand zwischen Updates derselben Persona (Sekunden)
+        max_attempts: Versuche pro Job, bevor er als failed gilt
+    """
+
+    def __init__(self, db_path: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+                 runner: Optional[JobRunner] = None, min_interval: Optional[float] = None,
+                 max_attempts: int = MAX_ATTEMPTS):
+        if min_interval is None:
+            from utils.cortex.update_service import RATE_LIMIT_SECONDS
+            min_interval = RATE_LIMIT_SECONDS
+        self._db_path = db_path
+        self.workers = max(1, workers)
+        self.runner = runner or _run_cortex_update
+        self.min_interval = min_interval
+        self.max_attempts = max(1, max_attempts)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._running_personas: Dict[str, int] = {}   # persona_id → job_id
+        self._last_finished: Dict[str, float] = {}
+
+        self._counts = {'enqueued': 0, 'coalesced': 0, 'completed': 0, 'failed': 0, 'retried': 0}
+        self._wait_times: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self._run_times: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self._finished_at: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+
+    # ─── Verbindung ─────────────────────────────────────────────────
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path or os.path.join(db_connection.DATA_DIR, CORTEX_JOBS_DB_NAME)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Lazy-Verbindung (Lock wird vom Aufrufer gehalten)."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute(sql('cortex_jobs.create_table'))
+            conn.execute(sql('cortex_jobs.create_index'))
+            # Nach einem Absturz/Neustart: laufende Jobs wieder einplanen
+            requeued = conn.execute(sql('cortex_jobs.requeue_running')).rowcount
+            for persona_id, finished_at in conn.execute(sql('cortex_jobs.get_last_finished')):
+                self._last_finished[persona_id] = finished_at
+            conn.commit()
+            if requeued:
+                log.info("Cortex-Queue: %d unterbrochene Jobs wieder eingeplant", requeued)
+            self._conn = conn
+        return self._conn
+
+    # ─── Lifecycle ──────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Startet den Worker-Pool (idempotent) und nimmt wartende Jobs wieder auf."""
+        with self._lock:
+            self._connection()
+            self._stopping = False
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._worker, name=f"cortex-worker-{i}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stoppt die Worker; laufende Jobs werden zu Ende geführt."""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout)
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            if not self._threads and self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ─── Einreihen ──────────────────────────────────────────────────
+
+    def enqueue(self, persona_id: str, session_id: int, from_message_id: Optional[int] = None,
+                to_message_id: Optional[int] = None, reason: str = 'trigger') -> int:
+        """
+        Plant ein Cortex-Update ein.
+
+        Wartet für dieselbe Persona und Session bereits ein Job, wird der
+        Trigger dort hineingezogen (Nachrichtenbereich = Vereinigung).
+
+        Returns:
+            ID des (ggf. zusammengeführten) Jobs
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            existing = conn.execute(
+                sql('cortex_jobs.get_pending_for_session'), (persona_id, session_id)
+            ).fetchone()
+            if existing:
+                job_id, old_from, old_to = existing
+                conn.execute(sql('cortex_jobs.coalesce_job'), (
+                    _union(old_from, from_message_id, min),
+                    _union(old_to, to_message_id, max),
+                    reason, job_id
+                ))
+                self._counts['coalesced'] += 1
+            else:
+                not_before = max(now, self._last_finished.get(persona_id, 0.0) + self.min_interval)
+                job_id = conn.execute(sql('cortex_jobs.insert_job'), (
+                    persona_id, session_id, reason, from_message_id, to_message_id, not_before, now
+                )).lastrowid
+                self._counts['enqueued'] += 1
+            conn.commit()
+            self._wakeup.notify()
+
+        if existing:
+            log.info("Cortex-Job %d: Trigger zusammengeführt — Persona: %s, Session: %s",
+                     job_id, persona_id, session_id)
+        else:
+            log.info("Cortex-Job %d eingeplant — Persona: %s, Session: %s (%s)",
+                     job_id, persona_id, session_id, reason)
+        self.start()
+        return job_id
+
+    # ─── Worker ─────────────────────────────────────────────────────
+
+    def _claim(self) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """
+        Übernimmt den nächsten fälligen Job (Lock wird vom Aufrufer gehalten).
+
+        Returns:
+            (Job, None) oder (None, Sekunden bis zur nächsten Fälligkeit | None)
+        """
+        conn = self._connection()
+        now = time.time()
+        for job_id, persona_id, session_id in conn.execute(sql('cortex_jobs.get_due_jobs'), (now,)).fetchall():
+            if persona_id in self._running_personas:
+                continue
+            ready_at = self._last_finished.get(persona_id, 0.0) + self.min_interval
+            if ready_at > now:
+                continue
+            if conn.execute(sql('cortex_jobs.mark_running'), (now, job_id)).rowcount:
+                conn.commit()
+                self._running_personas[persona_id] = job_id
+                row = conn.execute(sql('cortex_jobs.get_job'), (job_id,)).fetchone()
+                return _row_to_job(row), None
+
+        next_due = conn.execute(sql('cortex_jobs.get_next_not_before')).fetchone()[0]
+        if next_due is None:
+            return None, None
+        # Fällige, aber blockierte Jobs: nach Ablauf des Mindestabstands erneut prüfen
+        waits = [max(0.0, next_due - now)]
+        waits += [t + self.min_interval - now for t in self._last_finished.values()
+                  if t + self.min_interval > now]
+        return None, max(0.05, min(waits))
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                job, wait = (None, None) if self._stopping else self._claim()
+                while job is None:
+                    if self._stopping:
+                        return
+                    self._wakeup.wait(wait)
+                    job, wait = (None, None) if self._stopping else self._claim()
+            self._execute(job)
+
+    def _execute(self, job: Dict[str, Any]) -> None:
+        persona_id = job['persona_id']
+        started = time.time()
+        log.info("Cortex-Job %d gestartet (Versuch %d/%d) — Persona: %s, Session: %s, "
+                 "Nachrichten: %s–%s, Trigger: %d",
+                 job['id'], job['attempts'], self.max_attempts, persona_id, job['session_id'],
+                 job['from_message_id'], job['to_message_id'], job['triggers'])
+        try:
+            result = self.runner(persona_id, job['session_id'], job) or {}
+        except Exception as e:
+            log.error("Cortex-Job %d Exception: %s", job['id'], e, exc_info=True)
+            result = {'success': False, 'error': str(e), 'retryable': True}
+        finished = time.time()
+        self._finish(job, result, started, finished)
+
+    def _finish(self, job: Dict[str, Any], result: Dict[str, Any], started: float, finished: float) -> None:
+        job_id, persona_id = job['id'], job['persona_id']
+        result_json = json.dumps(result, ensure_ascii=False, default=str)
+        with self._lock:
+            conn = self._connection()
+            self._running_personas.pop(persona_id, None)
+            self._last_finished[persona_id] = finished
+            self._wait_times.append(max(0.0, started - job['created_at']))
+            self._run_times.append(finished - started)
+
+            if result.get('success'):
+                conn.execute(sql('cortex_jobs.mark_done'), (finished, result_json, job_id))
+                self._counts['completed'] += 1
+                self._finished_at.append(finished)
+                outcome = 'abgeschlossen'
+            elif result.get('retryable', False) and job['attempts'] < self.max_attempts:
+                delay = backoff_delay(job['attempts'])
+                conn.execute(sql('cortex_jobs.mark_retry'), (finished + delay, result.get('error'), job_id))
+                self._counts['retried'] += 1
+                outcome = f"fehlgeschlagen, neuer Versuch in {delay:.0f}s"
+            else:
+                conn.execute(sql('cortex_jobs.mark_failed'), (finished, result.get('error'), result_json, job_id))
+                self._counts['failed'] += 1
+                self._finished_at.append(finished)
+                outcome = 'endgültig fehlgeschlagen'
+            conn.execute(sql('cortex_jobs.delete_old_finished'), (KEEP_FINISHED_JOBS,))
+            conn.commit()
+            self._wakeup.notify_all()
+
+        log_fn = log.info if result.get('success') else log.warning
+        log_fn("Cortex-Job %d %s (%.1fs) — Persona: %s%s",
+               job_id, outcome, finished - started, persona_id,
+               '' if result.get('success') else f" — {result.get('error', '?')}")
+
+    # ─── Abfragen ───────────────────────────────────────────────────
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute(sql('cortex_jobs.get_job'), (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list_jobs(self, persona_id: Optional[str] = None, status: Optional[str] = None,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        """Neueste Jobs zuerst."""
+        with self._lock:
+            rows = self._connection().execute(
+                sql('cortex_jobs.list_jobs'), (persona_id, persona_id, status, status, limit)
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Wartet, bis kein Job mehr wartet oder läuft (für Tests und Benchmarks)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                counts = dict(self._connection().execute(sql('cortex_jobs.count_by_status')).fetchall())
+            if not counts.get(PENDING) and not counts.get(RUNNING):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Zähler, Job-Anzahl pro Status, Durchsatz und Latenzen."""
+        now = time.time()
+        with self._lock:
+            by_status = dict(self._connection().execute(sql('cortex_jobs.count_by_status')).fetchall())
+            recent = [t for t in self._finished_at if now - t <= _THROUGHPUT_WINDOW_SECONDS]
+            wait_times, run_times = list(self._wait_times), list(self._run_times)
+            return {
+                'workers': self.workers,
+                'alive_workers': sum(1 for t in self._threads if t.is_alive()),
+                'running_personas': sorted(self._running_personas),
+                'jobs': {status: by_status.get(status, 0) for status in (PENDING, RUNNING, DONE, FAILED)},
+                **self._counts,
+                'throughput_per_minute': round(len(recent) * 60 / _THROUGHPUT_WINDOW_SECONDS, 2),
+                'wait': {'p50_ms': _percentile(wait_times, 50), 'p99_ms': _percentile(wait_times, 99)},
+                'run': {'p50_ms': _percentile(run_times, 50), 'p99_ms': _percentile(run_times, 99)},
+            }
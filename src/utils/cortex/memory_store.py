@@ -0,0 +1,355 @@
+"""
+Cortex Memory Store – Strukturiertes Persona-Gedächtnis in der Persona-DB.
+
+Jede Zeile der Cortex-Dateien (memory.md, soul.md, relationship.md) ist ein
+Eintrag in cortex_entries mit Sektion, Zeitstempeln und Salience. Die
+Markdown-Dateien bleiben die editierbare Ansicht: nach jedem Schreibzugriff
+wird der Store per Diff synchronisiert – unveränderte Einträge behalten ID,
+created_at und Salience, neue bekommen frische Zeitstempel, entfernte werden
+gelöscht.
+
+Neue und gelöschte Einträge werden an den Recall-Index gemeldet
+(utils.recall.notify_cortex).
+
+Für den System-Prompt wählt select_entries() die relevantesten Einträge
+unter einem Token-Budget aus (Überlappung mit der aktuellen Nachricht,
+Aktualität, Salience). Dadurch bleibt die Prompt-Größe konstant, auch wenn
+das Gedächtnis unbegrenzt wächst – es wird nichts mehr abgeschnitten.
+
+Abrufe (mark_recalled) liegen auf dem Prompt-Build-Pfad und schreiben daher
+nicht sofort: sie werden im Speicher gesammelt, beim Lesen über entries()
+eingerechnet und beim nächsten sync() (oder flush_recalls()) in einem
+Rutsch gespeichert.
+
+Usage:
+    store = CortexMemoryStore()
+    store.sync('default', 'memory.md', content)
+    entries = store.entries('default', 'memory.md')
+    chosen = select_entries(entries, query='Katzen', token_budget=500)
+"""
+
+import hashlib
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from utils.database import connection as db_connection
+from utils.database.connection import get_db_connection
+from utils.database.schema import init_persona_db
+from utils.logger import log
+from utils.recall import notify_cortex
+from utils.sql_loader import sql
+
+from .sections import HEADING, PLACEHOLDER, Entry, parse_entries
+
+# Gewichtung der Auswahl
+RELEVANCE_WEIGHT = 2.0          # Anteil der Query-Wörter im Eintrag
+RECENCY_HALF_LIFE_DAYS = 30.0   # Aktualität halbiert sich alle 30 Tage
+
+# Verstärkung bei Abruf (nur wenn der Eintrag zur Nachricht passte)
+RECALL_BOOST = 0.05
+MAX_SALIENCE = 2.0
+
+_TERM = re.compile(r'\w{3,}')
+
+
+def estimate_tokens(text: str) -> int:
+    """Grobe Token-Schätzung (~4 Zeichen pro Token)."""
+    return len(text) // 4 if text else 0
+
+
+def _terms(text: str) -> Set[str]:
+    return set(_TERM.findall(text.lower())) if text else set()
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+@dataclass(frozen=True)
+class MemoryEntry:
+    """Ein gespeicherter Eintrag einer Cortex-Datei."""
+    id: int
+    filename: str
+    section: str
+    kind: str
+    text: str
+    position: int
+    salience: float
+    created_at: float
+    updated_at: float
+    recall_count: int = 0
+    last_recalled_at: Optional[float] = None
+
+    @property
+    def is_content(self) -> bool:
+        return self.kind != HEADING and self.text != PLACEHOLDER
+
+    def as_entry(self) -> Entry:
+        return Entry(self.kind, self.section, self.text)
+
+
+class CortexMemoryStore:
+    """
+    Synchronisiert Cortex-Dateien in cortex_entries und liest sie zurück.
+
+    Eine Verbindung pro Aufruf (wie utils.database). Der zuletzt
+    synchronisierte Inhalts-Hash pro (DB, Datei) wird im Speicher gehalten,
+    damit ensure_synced() für unveränderte Dateien keine Abfrage kostet.
+
+    _lock schützt nur den In-Memory-Zustand; DB-Zugriffe laufen unter einem
+    Lock pro Persona-DB, damit eine Persona die anderen nicht blockiert.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._db_locks: Dict[str, threading.Lock] = {}
+        self._initialized: Set[str] = set()
+        self._synced: Dict[Tuple[str, str], str] = {}
+        # db_key → entry_id → (Abrufe, Summe der Boosts, letzter Abruf)
+        self._pending_recalls: Dict[str, Dict[int, Tuple[int, float, float]]] = {}
+
+    # ===== Synchronisation =====
+
+    def sync(self, persona_id: str, filename: str, content: str) -> Dict[str, int]:
+        """
+        Gleicht die Einträge einer Datei mit ihrem neuen Inhalt ab.
+
+        Returns:
+            {'inserted': n, 'deleted': n, 'kept': n}
+        """
+        parsed = parse_entries(content)
+        now = time.time()
+        stats = {'inserted': 0, 'deleted': 0, 'kept': 0}
+        added: List[Tuple[int, str, str]] = []
+        db_key = self._db_key(persona_id)
+        with self._db_lock(db_key):
+            conn = self._connect(persona_id)
+            try:
+                self._write_recalls(conn, db_key)
+                existing: Dict[Tuple[str, str, str], List[Tuple[int, int]]] = {}
+                for row in conn.execute(sql('cortex.get_entries'), (filename,)):
+                    key = (row[3], row[2], row[4])  # kind, section, text
+                    existing.setdefault(key, []).append((row[0], row[5]))
+
+                for position, entry in enumerate(parsed):
+                    matches = existing.get((entry.kind, entry.section, entry.text))
+                    if matches:
+                        entry_id, old_position = matches.pop(0)
+                        if old_position != position:
+                            conn.execute(sql('cortex.update_position'), (position, entry_id))
+                        stats['kept'] += 1
+                    else:
+                        cursor = conn.execute(sql('cortex.insert_entry'), (
+                            filename, entry.section, entry.kind, entry.text,
+                            position, 1.0, now, now))
+                        if entry.is_content:
+                            added.append((cursor.lastrowid, entry.text, filename))
+                        stats['inserted'] += 1
+
+                stale = [(entry_id,) for rows in existing.values() for entry_id, _ in rows]
+                if stale:
+                    conn.executemany(sql('cortex.delete_entry'), stale)
+                stats['deleted'] = len(stale)
+
+                digest = _content_hash(content)
+                conn.execute(sql('cortex.upsert_file_hash'), (filename, digest, now))
+                conn.commit()
+            finally:
+                conn.close()
+            with self._lock:
+                self._synced[(db_key, filename)] = digest
+        notify_cortex(persona_id, added=added, removed=[entry_id for (entry_id,) in stale])
+        log.debug("Cortex-Store synchronisiert: %s/%s %s", persona_id, filename, stats)
+        return stats
+
+    def ensure_synced(self, persona_id: str, filename: str, content: str) -> bool:
+        """Synchronisiert nur, wenn sich der Inhalt seit dem letzten Abgleich geändert hat."""
+        digest = _content_hash(content)
+        key = (self._db_key(persona_id), filename)
+        with self._lock:
+            if self._synced.get(key) == digest:
+                return False
+        with self._db_lock(key[0]):
+            conn = self._connect(persona_id)
+            try:
+                row = conn.execute(sql('cortex.get_file_hash'), (filename,)).fetchone()
+            finally:
+                conn.close()
+        if row and row[0] == digest:
+            with self._lock:
+                self._synced[key] = digest
+            return False
+        self.sync(persona_id, filename, content)
+        return True
+
+    def forget(self, persona_id: str) -> None:
+        """Verwirft den Sync-Stand einer Persona (z.B. nach Löschen der DB)."""
+        db_key = self._db_key(persona_id)
+        with self._lock:
+            self._initialized.discard(db_key)
+            self._pending_recalls.pop(db_key, None)
+            for key in [k for k in self._synced if k[0] == db_key]:
+                del self._synced[key]
+
+    # ===== Lesen / Schreiben =====
+
+    def entries(self, persona_id: str, filename: str) -> List[MemoryEntry]:
+        """Alle Einträge einer Datei in Dokument-Reihenfolge (inkl. noch nicht gespeicherter Abrufe)."""
+        db_key = self._db_key(persona_id)
+        with self._db_lock(db_key):
+            conn = self._connect(persona_id)
+            try:
+                rows = conn.execute(sql('cortex.get_entries'), (filename,)).fetchall()
+            finally:
+                conn.close()
+            with self._lock:
+                pending = dict(self._pending_recalls.get(db_key, {}))
+        entries = [MemoryEntry(*row) for row in rows]
+        if not pending:
+            return entries
+        return [self._with_pending(e, pending[e.id]) if e.id in pending else e for e in entries]
+
+    def mark_recalled(self, persona_id: str, entry_ids: Iterable[int],
+                      boost: float = RECALL_BOOST) -> None:
+        """
+        Zählt Abrufe und verstärkt die Salience der Einträge (gedeckelt).
+
+        Nur im Speicher – gespeichert wird beim nächsten sync() bzw. flush_recalls().
+        """
+        now = time.time()
+        db_key = self._db_key(persona_id)
+        with self._lock:
+            pending = self._pending_recalls.setdefault(db_key, {})
+            for entry_id in entry_ids:
+                count, boosts, _ = pending.get(entry_id, (0, 0.0, now))
+                pending[entry_id] = (count + 1, boosts + boost, now)
+
+    def flush_recalls(self, persona_id: str) -> int:
+        """Schreibt gesammelte Abrufe in die DB. Returns: Anzahl betroffener Einträge."""
+        db_key = self._db_key(persona_id)
+        with self._db_lock(db_key):
+            conn = self._connect(persona_id)
+            try:
+                written = self._write_recalls(conn, db_key)
+                conn.commit()
+            finally:
+                conn.close()
+        return written
+
+    def set_salience(self, persona_id: str, entry_id: int, salience: float) -> None:
+        """Setzt die Salience eines Eintrags (0 … MAX_SALIENCE)."""
+        salience = min(max(float(salience), 0.0), MAX_SALIENCE)
+        with self._db_lock(self._db_key(persona_id)):
+            conn = self._connect(persona_id)
+            try:
+                conn.execute(sql('cortex.set_salience'), (salience, entry_id))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def get_stats(self, persona_id: str) -> Dict[str, int]:
+        """Anzahl gespeicherter Einträge pro Datei."""
+        with self._db_lock(self._db_key(persona_id)):
+            conn = self._connect(persona_id)
+            try:
+                return dict(conn.execute(sql('cortex.count_entries')).fetchall())
+            finally:
+                conn.close()
+
+    # ===== Intern =====
+
+    @staticmethod
+    def _db_key(persona_id: str) -> str:
+        return db_connection.get_db_path(persona_id)
+
+    def _db_lock(self, db_key: str) -> threading.Lock:
+        with self._lock:
+            return self._db_locks.setdefault(db_key, threading.Lock())
+
+    def _write_recalls(self, conn, db_key: str) -> int:
+        """Übernimmt die gesammelten Abrufe in die offene Transaktion (Aufrufer hält den DB-Lock)."""
+        with self._lock:
+            pending = self._pending_recalls.pop(db_key, None)
+        if not pending:
+            return 0
+        conn.executemany(sql('cortex.mark_recalled'), [
+            (count, last_at, boosts, MAX_SALIENCE, entry_id)
+            for entry_id, (count, boosts, last_at) in pending.items()
+        ])
+        return len(pending)
+
+    @staticmethod
+    def _with_pending(entry: MemoryEntry, pending: Tuple[int, float, float]) -> MemoryEntry:
+        count, boosts, last_at = pending
+        return replace(entry, recall_count=entry.recall_count + count, last_recalled_at=last_at,
+                       salience=min(entry.salience + boosts, MAX_SALIENCE))
+
+    def _connect(self, persona_id: str):
+        db_key = self._db_key(persona_id)
+        if db_key not in self._initialized:
+            init_persona_db(persona_id)
+            self._initialized.add(db_key)
+        return get_db_connection(persona_id)
+
+
+# ===== Auswahl =====
+
+def score_entry(entry: MemoryEntry, query_terms: Set[str], now: float) -> float:
+    """Relevanz × Salience: Anteil der Query-Wörter im Eintrag plus Aktualität."""
+    relevance = len(query_terms & _terms(entry.text)) / len(query_terms) if query_terms else 0.0
+    age_days = max(0.0, now - entry.updated_at) / 86400
+    recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    return entry.salience * (RELEVANCE_WEIGHT * relevance + recency)
+
+
+def select_entries(entries: Sequence[MemoryEntry], query: Optional[str],
+                   token_budget: int, now: Optional[float] = None) -> List[MemoryEntry]:
+    """
+    Wählt die besten Inhalts-Einträge, deren Zeilen zusammen ins Budget passen.
+
+    Überschriften und Platzhalter werden nicht gewählt (siehe render_excerpt).
+    Einträge, die nicht mehr passen, werden übersprungen – kleinere dahinter
+    können das Budget noch füllen.
+
+    Returns:
+        Gewählte Einträge, absteigend nach Score
+    """
+    now = time.time() if now is None else now
+    query_terms = _terms(query or '')
+    ranked = sorted(
+        (e for e in entries if e.is_content),
+        key=lambda e: (-score_entry(e, query_terms, now), -e.updated_at, e.position),
+    )
+    chosen: List[MemoryEntry] = []
+    remaining = token_budget
+    for entry in ranked:
+        cost = estimate_tokens(entry.text) + 1
+        if cost <= remaining:
+            chosen.append(entry)
+            remaining -= cost
+    return chosen
+
+
+def matches_query(entry: MemoryEntry, query: Optional[str]) -> bool:
+    """True wenn der Eintrag mindestens ein Wort der Query enthält."""
+    return bool(_terms(query or '') & _terms(entry.text))
+
+
+def render_excerpt(entries: Sequence[MemoryEntry], chosen_ids: Set[int]) -> List[Entry]:
+    """
+    Ausschnitt einer Datei: Titel, Sektionen mit gewählten Einträgen und diese
+    Einträge selbst, in Dokument-Reihenfolge (für sections.render_entries).
+    """
+    sections_used = {e.section for e in entries if e.id in chosen_ids}
+    excerpt: List[Entry] = []
+    for entry in entries:
+        if entry.kind == HEADING:
+            is_title = not entry.text.startswith('##')
+            if is_title or entry.section in sections_used:
+                excerpt.append(entry.as_entry())
+        elif entry.id in chosen_ids:
+            excerpt.append(entry.as_entry())
+    return excerpt
@@ -0,0 +1,272 @@
+"""
+Cortex Sections – Zeilenmodell der Cortex-Markdown-Dateien.
+
+Eine Cortex-Datei besteht aus Überschriften ("# Titel", "## Sektion"),
+Bullets ("- Eintrag") und freien Textzeilen. parse_entries() zerlegt den
+Inhalt in Einträge (kind, section, text), render_entries() setzt eine
+(Teil-)Menge davon wieder zu Markdown zusammen – für die gerenderte
+Datei-Ansicht und für den Prompt-Ausschnitt des Memory-Stores.
+
+append_bullet() / replace_bullet() / remove_bullet() ändern einzelne Bullets
+einer Sektion (Patch-Tools des Cortex-Updates). Sie arbeiten auf den
+Originalzeilen, der Rest der Datei bleibt zeichengenau erhalten. Ein Patch
+wird vollständig validiert, bevor er angewendet wird; ist er nicht
+anwendbar, wirft er PatchError und der Inhalt bleibt unverändert.
+
+Usage:
+    entries = parse_entries(content)
+    text = render_entries([e for e in entries if keep(e)])
+    content = append_bullet(content, 'Shared Experiences', 'Zoo-Besuch im Mai')
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+HEADING = 'heading'
+BULLET = 'bullet'
+TEXT = 'text'
+
+# Platzhalter-Bullet der Templates (kein echter Eintrag)
+PLACEHOLDER = '(no entries yet)'
+
+_BULLET_PREFIXES = ('- ', '* ')
+
+# Obergrenze für einen einzelnen Bullet (Patch-Tools)
+MAX_BULLET_CHARS = 500
+
+# Template-Platzhalter in Überschriften ("About {{user}}") passen auf jeden Namen
+_TEMPLATE_VAR = re.compile(r'\{\{\w+\}\}')
+
+
+@dataclass(frozen=True)
+class Entry:
+    """Eine Zeile einer Cortex-Datei."""
+    kind: str       # heading | bullet | text
+    section: str    # Text der umgebenden "##"-Überschrift ('' = vor der ersten)
+    text: str       # Heading: ganze Zeile inkl. '#', Bullet: ohne '- '
+
+    @property
+    def is_content(self) -> bool:
+        """True für echte Erinnerungen (keine Überschrift, kein Platzhalter)."""
+        return self.kind != HEADING and self.text != PLACEHOLDER
+
+
+def parse_entries(content: str) -> List[Entry]:
+    """Zerlegt Markdown in Einträge; Leerzeilen entfallen."""
+    entries: List[Entry] = []
+    section = ''
+    for raw in content.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            if line.startswith('##'):
+                section = line.lstrip('#').strip()
+            entries.append(Entry(HEADING, section, line))
+        elif line.startswith(_BULLET_PREFIXES):
+            entries.append(Entry(BULLET, section, line[2:].strip()))
+        elif line == '-':
+            continue
+        else:
+            entries.append(Entry(TEXT, section, line))
+    return entries
+
+
+def render_entries(entries: Iterable[Entry]) -> str:
+    """
+    Setzt Einträge zu Markdown zusammen.
+
+    Überschriften stehen allein in ihrem Block, aufeinanderfolgende Bullets
+    und Textzeilen bilden einen Block; Blöcke sind durch Leerzeilen getrennt.
+    Die Templates aus cortex_service bleiben dabei zeichengenau erhalten.
+    """
+    blocks: List[List[str]] = []
+    previous_heading = True
+    for entry in entries:
+        if entry.kind == HEADING:
+            blocks.append([entry.text])
+            previous_heading = True
+            continue
+        line = f"- {entry.text}" if entry.kind == BULLET else entry.text
+        if previous_heading:
+            blocks.append([line])
+        else:
+            blocks[-1].append(line)
+        previous_heading = False
+    if not blocks:
+        return ''
+    return '\n\n'.join('\n'.join(block) for block in blocks) + '\n\n'
+
+
+# ─── Patches ─────────────────────────────────────────────────────────────────
+
+class PatchError(ValueError):
+    """Patch ist nicht anwendbar; der Inhalt bleibt unverändert."""
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.split()).casefold()
+
+
+def _section_matches(heading: str, wanted: str) -> bool:
+    name = _normalize(heading.lstrip('#'))
+    if name == wanted:
+        return True
+    parts = _TEMPLATE_VAR.split(name)
+    if len(parts) == 1:
+        return False
+    return re.fullmatch('.+'.join(re.escape(part) for part in parts), wanted) is not None
+
+
+def _scan_sections(lines: List[str]) -> List[Tuple[str, int, int]]:
+    """(Überschrift, Zeilenindex, Ende exklusiv) aller "##"-Sektionen."""
+    sections: List[Tuple[str, int, int]] = []
+    for i, raw in enumerate(lines):
+        line = raw.strip()
+        if line.startswith('#'):
+            if sections and sections[-1][2] == -1:
+                name, start, _ = sections[-1]
+                sections[-1] = (name, start, i)
+            if line.startswith('##'):
+                sections.append((line.lstrip('#').strip(), i, -1))
+    if sections and sections[-1][2] == -1:
+        name, start, _ = sections[-1]
+        sections[-1] = (name, start, len(lines))
+    return sections
+
+
+def _find_section(lines: List[str], section: str) -> Tuple[int, int]:
+    wanted = _normalize((section or '').lstrip('#'))
+    sections = _scan_sections(lines)
+    for name, start, end in sections:
+        if _section_matches(name, wanted):
+            return start, end
+    available = ', '.join(f"'{name}'" for name, _, _ in sections) or '(none)'
+    raise PatchError(f"Section '{section}' not found. Available sections: {available}")
+
+
+def _bullets(lines: List[str], start: int, end: int) -> List[Tuple[int, str]]:
+    """(Zeilenindex, Text) der Bullets zwischen start und end."""
+    result = []
+    for i in range(start + 1, end):
+        line = lines[i].strip()
+        if line.startswith(_BULLET_PREFIXES):
+            result.append((i, line[2:].strip()))
+    return result
+
+
+def _clean_bullet(text: Optional[str]) -> str:
+    """Validiert den Text eines neuen Bullets."""
+    text = (text or '').strip()
+    if text.startswith(_BULLET_PREFIXES):
+        text = text[2:].strip()
+    if not text or text == PLACEHOLDER:
+        raise PatchError("Bullet text must not be empty")
+    if '\n' in text:
+        raise PatchError("Bullet text must be a single line")
+    if text.startswith('#'):
+        raise PatchError("Bullet text must not start with '#'")
+    if len(text) > MAX_BULLET_CHARS:
+        raise PatchError(f"Bullet text is too long ({len(text)} > {MAX_BULLET_CHARS} chars)")
+    return text
+
+
+def _find_bullet(lines: List[str], start: int, end: int, section: str, text: Optional[str]) -> int:
+    """Zeilenindex des Bullets (exakt, sonst ohne Groß-/Kleinschreibung und Leerraum)."""
+    wanted = (text or '').strip()
+    if wanted.startswith(_BULLET_PREFIXES):
+        wanted = wanted[2:].strip()
+    bullets = [(i, t) for i, t in _bullets(lines, start, end) if t != PLACEHOLDER]
+    for i, existing in bullets:
+        if existing == wanted:
+            return i
+    for i, existing in bullets:
+        if _normalize(existing) == _normalize(wanted):
+            return i
+    current = '; '.join(f"'{t}'" for _, t in bullets) or '(none)'
+    raise PatchError(f"Bullet '{wanted}' not found in section '{section}'. Current bullets: {current}")
+
+
+def _join(lines: List[str], original: str) -> str:
+    content = '\n'.join(lines)
+    return content + '\n' if original.endswith('\n') or not original else content
+
+
+def _indent_of(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def append_bullet(content: str, section: str, text: str) -> str:
+    """
+    Hängt einen Bullet an das Ende einer Sektion an.
+
+    Ersetzt den Template-Platzhalter, falls die Sektion noch leer ist.
+    Ein bereits vorhandener gleicher Bullet wird nicht doppelt angelegt.
+
+    Raises:
+        PatchError: Sektion unbekannt oder Text ungültig
+    """
+    text = _clean_bullet(text)
+    lines = content.splitlines()
+    start, end = _find_section(lines, section)
+    bullets = _bullets(lines, start, end)
+    if any(_normalize(existing) == _normalize(text) for _, existing in bullets):
+        return content
+
+    placeholders = [i for i, existing in bullets if existing == PLACEHOLDER]
+    if placeholders and len(placeholders) == len(bullets):
+        lines[placeholders[0]] = f"{_indent_of(lines[placeholders[0]])}- {text}"
+        return _join(lines, content)
+
+    # Nach der letzten nicht-leeren Zeile der Sektion einfügen
+    last = start
+    for i in range(start + 1, end):
+        if lines[i].strip():
+            last = i
+    if last == start:
+        lines[start + 1:start + 1] = ['', f"- {text}"]
+    else:
+        lines.insert(last + 1, f"{_indent_of(lines[last]) if bullets else ''}- {text}")
+    return _join(lines, content)
+
+
+def replace_bullet(content: str, section: str, old_text: str, new_text: str) -> str:
+    """
+    Ersetzt einen Bullet einer Sektion.
+
+    Raises:
+        PatchError: Sektion oder Bullet unbekannt, neuer Text ungültig
+    """
+    new_text = _clean_bullet(new_text)
+    lines = content.splitlines()
+    start, end = _find_section(lines, section)
+    index = _find_bullet(lines, start, end, section, old_text)
+    lines[index] = f"{_indent_of(lines[index])}- {new_text}"
+    return _join(lines, content)
+
+
+def remove_bullet(content: str, section: str, text: str) -> str:
+    """
+    Entfernt einen Bullet aus einer Sektion.
+
+    Wird die Sektion dadurch leer, kommt der Template-Platzhalter zurück.
+
+    Raises:
+        PatchError: Sektion oder Bullet unbekannt
+    """
+    lines = content.splitlines()
+    start, end = _find_section(lines, section)
+    index = _find_bullet(lines, start, end, section, text)
+    if len(_bullets(lines, start, end)) == 1:
+        lines[index] = f"{_indent_of(lines[index])}- {PLACEHOLDER}"
+    else:
+        del lines[index]
+    return _join(lines, content)
+
+
+def section_bullets(content: str, section: str) -> List[str]:
+    """Bullets einer Sektion (ohne Platzhalter) – für Tool-Rückmeldungen."""
+    lines = content.splitlines()
+    start, end = _find_section(lines, section)
+    return [text for _, text in _bullets(lines, start, end) if text != PLACEHOLDER]
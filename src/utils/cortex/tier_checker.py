@@ -5,14 +5,13 @@ Der User wählt eine Frequenz (Häufig=50%, Mittel=75%, Selten=95%).
 Bei Erreichen der Schwelle: Update → Zähler reset → zyklisch wiederholen.
 """
 
-import threading
 import math
 import json
 import os
-from typing import Dict, Optional
+from typing import Optional
 
 from utils.logger import log
-from utils.database import get_message_count
+from utils.database import get_message_count, get_max_message_id
 from utils.cortex.tier_tracker import (
     get_cycle_base, set_cycle_base, get_progress
 )
@@ -187,43 +186,22 @@ def check_and_trigger_cortex_update(
 
 # ─── Background-Update ──────────────────────────────────────────────────────
 
-_active_updates: Dict[str, threading.Thread] = {}
-_active_lock = threading.Lock()
+def _start_background_cortex_update(persona_id: str, session_id: int, reason: str = 'trigger') -> Optional[int]:
+    """
+    Plant das Cortex-Update in der persistenten Job-Queue ein.
 
+    Die Queue führt weitere Trigger für dieselbe Session zusammen, hält den
+    Mindestabstand pro Persona ein und wiederholt fehlgeschlagene Updates.
 
-def _start_background_cortex_update(persona_id: str, session_id: int) -> None:
-    """
-    Startet das Cortex-Update in einem Background-Thread.
-    Nur ein Update pro Persona gleichzeitig (via _active_updates Dict).
+    Returns:
+        Job-ID oder None, wenn das Einplanen fehlschlug
     """
-    with _active_lock:
-        existing = _active_updates.get(persona_id)
-        if existing and existing.is_alive():
-            log.info("Cortex-Update übersprungen: läuft bereits — Persona: %s", persona_id)
-            return
-
-        def _run_update():
-            try:
-                from utils.cortex.update_service import CortexUpdateService
-                service = CortexUpdateService()
-                result = service.execute_update(
-                    persona_id=persona_id,
-                    session_id=session_id
-                )
-                if result.get('success'):
-                    log.info("Cortex-Update abgeschlossen: %d Tool-Calls — Persona: %s",
-                             result.get('tool_calls_count', 0), persona_id)
-                else:
-                    log.warning("Cortex-Update fehlgeschlagen: %s — Persona: %s",
-                                result.get('error', '?'), persona_id)
-            except Exception as e:
-                log.error("Cortex-Update Exception: %s", e)
-            finally:
-                # Thread aus Tracking entfernen
-                with _active_lock:
-                    _active_updates.pop(persona_id, None)
-
-        thread_name = f"cortex-update-{persona_id}"
-        thread = threading.Thread(target=_run_update, name=thread_name, daemon=True)
-        _active_updates[persona_id] = thread
-        thread.start()
+    try:
+        from utils.provider import get_cortex_job_queue
+        to_message_id = get_max_message_id(session_id, persona_id=persona_id)
+        return get_cortex_job_queue().enqueue(
+            persona_id, session_id, to_message_id=to_message_id, reason=reason
+        )
+    except Exception as e:
+        log.error("Cortex-Update konnte nicht eingeplant werden: %s — Persona: %s", e, persona_id)
+        return None
@@ -1,15 +1,21 @@
 """
 Cortex Update Service — Führt Cortex-Updates via tool_use API aus.
 
-Läuft in Background-Threads (gestartet durch tier_checker).
+Läuft in den Workern der CortexJobQueue (eingeplant durch tier_checker).
 Verwendet ApiClient.tool_request() für den Tool-Call-Loop und
 CortexService für das eigentliche Datei-I/O.
 
 Enthält:
 - CortexUpdateService: Hauptklasse mit execute_update()
-- CORTEX_TOOLS: Tool-Definitionen für read_file/write_file
+- CORTEX_TOOLS: Tool-Definitionen für read_file/write_file und die
+  Patch-Tools append_bullet/replace_bullet/remove_bullet (einzelne Bullets
+  einer Sektion statt der ganzen Datei)
 - System-Prompt-Builder für Cortex-Update-Calls
-- Rate-Limiting (30s zwischen Updates pro Persona)
+- Rate-Limiting (30s zwischen Updates pro Persona) für direkte Aufrufe;
+  die Job-Queue plant stattdessen mit Mindestabstand ein
+- Inkrementelle Updates: pro Session merkt sich chat_sessions.last_memory_message_id
+  die zuletzt eingearbeitete Nachricht; Folge-Updates senden nur die neuen
+  Nachrichten plus eine kurze Überlappung als Kontext
 """
 
 import time
@@ -17,10 +23,11 @@ import threading
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, Tuple
+from typing import Callable, Dict, Any, Optional, Tuple
 
 from utils.logger import log
 from utils.api_request import RequestConfig
+from utils.cortex.sections import append_bullet, remove_bullet, replace_bullet, section_bullets
 
 
 # ─── Konstanten ──────────────────────────────────────────────────────────────
@@ -32,6 +39,8 @@ CORTEX_UPDATE_TEMPERATURE = 0.4
 
 RATE_LIMIT_SECONDS = 30  # Mindestabstand zwischen Updates pro Persona
 
+CORTEX_UPDATE_OVERLAP_MESSAGES = 4  # Bereits eingearbeitete Nachrichten als Anschluss-Kontext
+
 # ─── Rate-Limit State ────────────────────────────────────────────────────────
 
 _rate_lock = threading.Lock()
@@ -62,6 +71,8 @@ _FALLBACK_CORTEX_TOOLS = [
         "name": "write_file",
         "description": "Writes new content to one of your Cortex files. "
                        "Overwrites the entire file content. "
+                       "Only use this to restructure a whole file — for single bullets "
+                       "use append_bullet, replace_bullet or remove_bullet. "
                        "Always write the COMPLETE new content — not just the changes.",
         "input_schema": {
             "type": "object",
@@ -82,6 +93,68 @@ _FALLBACK_CORTEX_TOOLS = [
     }
 ]
 
+# Patch-Tools: Feld → Default-Beschreibung (überschreibbar via cortex_update_tools.json)
+_PATCH_TOOL_FIELDS = {
+    "append_bullet": {
+        "tool_description": "Adds one bullet to the end of a section of one of your Cortex files. "
+                            "Use this for new facts — no need to rewrite the file.",
+        "section_description": "Section heading without '##' (e.g. 'Shared Experiences')",
+        "text_description": "The new bullet (one short line, without '- ')",
+    },
+    "replace_bullet": {
+        "tool_description": "Replaces one existing bullet of a section with a new version. "
+                            "Use this when something changed.",
+        "section_description": "Section heading without '##'",
+        "old_text_description": "The current bullet text exactly as in the file (without '- ')",
+        "new_text_description": "The new bullet text (one short line, without '- ')",
+    },
+    "remove_bullet": {
+        "tool_description": "Removes one bullet from a section. "
+                            "Only use this if the bullet is clearly outdated or wrong.",
+        "section_description": "Section heading without '##'",
+        "text_description": "The bullet text exactly as in the file (without '- ')",
+    },
+}
+
+_PATCH_TOOL_INPUTS = {
+    "append_bullet": ["section", "text"],
+    "replace_bullet": ["section", "old_text", "new_text"],
+    "remove_bullet": ["section", "text"],
+}
+
+PATCH_TOOL_NAMES = tuple(_PATCH_TOOL_FIELDS)
+
+
+def _build_patch_tool(name: str, descriptions: Dict[str, str]) -> Dict[str, Any]:
+    """Baut die Definition eines Patch-Tools (Beschreibungen fallen auf die Defaults zurück)."""
+    defaults = _PATCH_TOOL_FIELDS[name]
+    fields = _PATCH_TOOL_INPUTS[name]
+    properties = {
+        "filename": {
+            "type": "string",
+            "enum": ["memory.md", "soul.md", "relationship.md"],
+            "description": descriptions.get('filename_description', "Name of the Cortex file to change")
+        }
+    }
+    for field in fields:
+        key = f"{field}_description"
+        properties[field] = {
+            "type": "string",
+            "description": descriptions.get(key, defaults[key])
+        }
+    return {
+        "name": name,
+        "description": descriptions.get('tool_description', defaults['tool_description']),
+        "input_schema": {
+            "type": "object",
+            "properties": properties,
+            "required": ["filename"] + fields
+        }
+    }
+
+
+_FALLBACK_CORTEX_TOOLS += [_build_patch_tool(name, {}) for name in PATCH_TOOL_NAMES]
+
 # Backward-compatible alias
 CORTEX_TOOLS = _FALLBACK_CORTEX_TOOLS
 
@@ -135,6 +208,37 @@ class CortexUpdateService:
             limit=limit, session_id=session_id, persona_id=persona_id
         )
 
+    def _load_messages(self, session_id: int, persona_id: str,
+                       after_id: int, until_id: int, limit: int) -> list:
+        """Lazy-Load eines Nachrichtenbereichs (after_id, until_id] mit IDs."""
+        from utils.database import get_messages_in_range
+        return get_messages_in_range(session_id, after_id, until_id, limit, persona_id=persona_id)
+
+    def _load_memory_state(self, session_id: int, persona_id: str) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Lädt Memory-Marker und höchste Nachrichten-ID der Session.
+
+        Returns:
+            (last_memory_message_id, max_message_id) — (None, None) wenn die
+            Session-Daten nicht lesbar sind (dann volles Kontextfenster)
+        """
+        try:
+            from utils.database import get_max_message_id, get_memory_marker
+            return (get_memory_marker(session_id, persona_id=persona_id),
+                    get_max_message_id(session_id, persona_id=persona_id))
+        except Exception as e:
+            log.warning("Memory-Marker nicht lesbar (Session %s): %s", session_id, e)
+            return None, None
+
+    def _save_memory_marker(self, session_id: int, persona_id: str,
+                            start_id: Optional[int], end_id: int):
+        """Speichert den Memory-Marker nach einem erfolgreichen Update."""
+        try:
+            from utils.database import set_memory_marker
+            set_memory_marker(session_id, end_id, start_id, persona_id=persona_id)
+        except Exception as e:
+            log.warning("Memory-Marker konnte nicht gespeichert werden (Session %s): %s", session_id, e)
+
     def _check_rate_limit(self, persona_id: str) -> bool:
         """
         Prüft ob das Rate-Limit eingehalten wird.
@@ -159,14 +263,35 @@ class CortexUpdateService:
     def execute_update(
         self,
         persona_id: str,
-        session_id: int
+        session_id: int,
+        respect_rate_limit: bool = True,
+        incremental: bool = True,
+        from_message_id: Optional[int] = None,
+        to_message_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Führt ein vollständiges Cortex-Update durch.
 
+        Hat die Session einen Memory-Marker, werden nur die Nachrichten
+        danach gesendet (höchstens context_limit), plus die letzten
+        CORTEX_UPDATE_OVERLAP_MESSAGES davor als Anschluss-Kontext. Ohne
+        Marker (oder mit incremental=False) wird wie bisher das komplette
+        Kontextfenster gesendet. Nach Erfolg rückt der Marker vor.
+
+        from_message_id/to_message_id (Nachrichtenbereich eines Jobs der
+        CortexJobQueue, inklusiv) begrenzen die geladenen Nachrichten:
+        to_message_id ersetzt die aktuell höchste Nachrichten-ID als
+        Obergrenze, from_message_id gilt als Untergrenze, solange die
+        Session keinen Memory-Marker hat.
+
         Args:
             persona_id: Persona-ID
             session_id: Session-ID
+            respect_rate_limit: False, wenn der Aufrufer den Abstand selbst
+                regelt (CortexJobQueue plant Jobs mit Mindestabstand ein)
+            incremental: False ignoriert den Memory-Marker (volles Fenster)
+            from_message_id: Erste Nachricht des Bereichs (optional)
+            to_message_id: Letzte Nachricht des Bereichs (optional)
 
         Returns:
             {
@@ -176,10 +301,16 @@ class CortexUpdateService:
                 'files_read': list,
                 'duration_seconds': float,
                 'usage': dict or None,
-                'error': str or None
+                'error': str or None,
+                'new_messages': int (nur bei Erfolg; 0 = nichts Neues, übersprungen),
+                'overlap_messages': int (nur bei Erfolg),
+                'retryable': bool (lohnt ein neuer Versuch? Nie nach bereits
+                    geschriebenen Dateien – Patch-Tools würden doppelt angewendet)
             }
         """
         start_time = time.monotonic()
+        files_read = []
+        files_written = []
 
         log.info(
             "═══ Cortex-Update gestartet ═══ Persona: %s | Session: %s",
@@ -187,7 +318,7 @@ class CortexUpdateService:
         )
 
         # ── Rate-Limit Check ────────────────────────────────────────
-        if not self._check_rate_limit(persona_id):
+        if respect_rate_limit and not self._check_rate_limit(persona_id):
             return {
                 'success': False,
                 'tool_calls_count': 0,
@@ -195,7 +326,8 @@ class CortexUpdateService:
                 'files_read': [],
                 'duration_seconds': 0,
                 'usage': None,
-                'error': 'Rate-Limit: Zu kurz nach dem letzten Update'
+                'error': 'Rate-Limit: Zu kurz nach dem letzten Update',
+                'retryable': True
             }
 
         try:
@@ -220,21 +352,49 @@ class CortexUpdateService:
             context_limit = self._get_context_limit()
 
             # ── 3b. Gesprächsverlauf laden ───────────────────────────
-            conversation_history = self._load_conversation(
-                limit=context_limit,
-                session_id=session_id,
-                persona_id=persona_id
-            )
+            # Obergrenze vorab festhalten: später eintreffende Nachrichten
+            # gehören zum nächsten Update und dürfen den Marker nicht überholen
+            marker, until_id = self._load_memory_state(session_id, persona_id)
+            if not incremental:
+                marker = None
+            if to_message_id is not None:
+                until_id = to_message_id
+            if marker is not None:
+                after_id = marker
+            elif from_message_id is not None:
+                after_id = from_message_id - 1
+            else:
+                after_id = 0
+            overlap_history = []
+
+            if until_id is None:
+                conversation_history = self._load_conversation(
+                    limit=context_limit,
+                    session_id=session_id,
+                    persona_id=persona_id
+                )
+            else:
+                conversation_history = self._load_messages(
+                    session_id, persona_id, after_id, until_id, context_limit
+                )
 
-            if not conversation_history or len(conversation_history) < 4:
+            if marker is not None:
+                if not conversation_history:
+                    log.info("Cortex-Update übersprungen: keine neuen Nachrichten seit #%s (Session: %s)",
+                             marker, session_id)
+                    return self._skipped_result(start_time)
+                overlap_history = self._load_messages(
+                    session_id, persona_id, 0, marker, CORTEX_UPDATE_OVERLAP_MESSAGES
+                )
+            elif not conversation_history or len(conversation_history) < 4:
                 return self._error_result(
                     f'Zu wenig Gesprächsverlauf ({len(conversation_history) if conversation_history else 0} Nachrichten)',
                     start_time
                 )
 
             log.info(
-                "Cortex-Update: %d Nachrichten geladen (Session: %s)",
-                len(conversation_history), session_id
+                "Cortex-Update: %d neue + %d überlappende Nachrichten geladen (Session: %s, Marker: %s)",
+                len(conversation_history), len(overlap_history), session_id, marker
             )
 
             # ── 4. System-Prompt bauen ───────────────────────────────
@@ -248,18 +408,16 @@ class CortexUpdateService:
             messages = self._build_messages(
                 conversation_history=conversation_history,
                 persona_name=persona_name,
-                user_name=user_name
+                user_name=user_name,
+                overlap_history=overlap_history
             )
 
             # ── 5b. Tools laden ──────────────────────────────────────
             tools = self._build_cortex_tools()
 
             # ── 6. Tool-Executor erstellen ───────────────────────────
-            files_read = []
-            files_written = []
-
             def cortex_tool_executor(tool_name: str, tool_input: dict) -> Tuple[bool, str]:
-                """Führt Cortex-Tools aus: read_file, write_file"""
+                """Führt Cortex-Tools aus: read_file, write_file, Patch-Tools"""
                 return self._execute_tool(
                     cortex_service=cortex_service,
                     persona_id=persona_id,
@@ -307,6 +465,11 @@ class CortexUpdateService:
                         response.content[:200] + '...' if len(response.content) > 200 else response.content
                     )
 
+                if until_id is not None:
+                    self._save_memory_marker(
+                        session_id, persona_id, conversation_history[0].get('id'), until_id
+                    )
+
                 return {
                     'success': True,
                     'tool_calls_count': tool_calls_count,
@@ -314,7 +477,10 @@ class CortexUpdateService:
                     'files_read': files_read,
                     'duration_seconds': round(duration, 2),
                     'usage': response.usage,
-                    'error': None
+                    'error': None,
+                    'new_messages': len(conversation_history),
+                    'overlap_messages': len(overlap_history),
+                    'retryable': False
                 }
             else:
                 log.error(
@@ -328,7 +494,8 @@ class CortexUpdateService:
                     'files_read': files_read,
                     'duration_seconds': round(duration, 2),
                     'usage': response.usage,
-                    'error': response.error
+                    'error': response.error,
+                    'retryable': self._retryable_after(files_written)
                 }
 
         except Exception as e:
@@ -337,7 +504,10 @@ class CortexUpdateService:
                 persona_id, e,
                 exc_info=True
             )
-            return self._error_result(str(e), start_time)
+            result = self._error_result(str(e), start_time, retryable=self._retryable_after(files_written))
+            result['files_written'] = files_written
+            result['files_read'] = files_read
+            return result
 
     # ─── Tool-Executor ──────────────────────────────────────────────
 
@@ -358,7 +528,7 @@ class CortexUpdateService:
         Args:
             cortex_service: CortexService-Instanz
             persona_id: Persona-ID
-            tool_name: 'read_file' oder 'write_file'
+            tool_name: 'read_file', 'write_file' oder ein Patch-Tool
             tool_input: Tool-Input-Dict (z.B. {'filename': 'memory.md'})
             files_read: Tracking-Liste für gelesene Dateien (wird mutiert)
             files_written: Tracking-Liste für geschriebene Dateien (wird mutiert)
@@ -395,12 +565,32 @@ class CortexUpdateService:
                 )
                 return True, f"File '{filename}' successfully updated ({len(content)} chars)."
 
+            elif tool_name in PATCH_TOOL_NAMES:
+                filename = tool_input.get("filename", "")
+                section = tool_input.get("section", "")
+                content = cortex_service.patch_file(
+                    persona_id, filename, self._build_patch(tool_name, tool_input)
+                )
+
+                if filename not in files_written:
+                    files_written.append(filename)
+
+                bullets = section_bullets(content, section)
+                log.info(
+                    "Cortex Tool %s(%s, %s) — Persona: %s",
+                    tool_name, filename, section, persona_id
+                )
+                return True, f"{filename} › {section} updated ({len(bullets)} bullets)."
+
             else:
                 log.warning("Unbekanntes Cortex-Tool: %s", tool_name)
-                return False, f"Unknown tool: '{tool_name}'. Available: read_file, write_file"
+                return False, (
+                    f"Unknown tool: '{tool_name}'. Available: read_file, write_file, "
+                    + ', '.join(PATCH_TOOL_NAMES)
+                )
 
         except ValueError as ve:
-            # Ungültiger Dateiname (CORTEX_FILES Whitelist)
+            # Ungültiger Dateiname (CORTEX_FILES Whitelist) oder nicht anwendbarer Patch
             log.warning("Cortex-Tool Fehler (ValueError): %s", ve)
             return False, str(ve)
 
@@ -408,6 +598,18 @@ class CortexUpdateService:
             log.error("Cortex-Tool Fehler bei %s: %s", tool_name, e)
             return False, f"Error in {tool_name}: {str(e)}"
 
+    @staticmethod
+    def _build_patch(tool_name: str, tool_input: dict) -> Callable[[str], str]:
+        """Übersetzt einen Patch-Tool-Call in eine Funktion alter Inhalt → neuer Inhalt."""
+        section = tool_input.get("section", "")
+        if tool_name == "append_bullet":
+            return lambda content: append_bullet(content, section, tool_input.get("text", ""))
+        if tool_name == "replace_bullet":
+            return lambda content: replace_bullet(
+                content, section, tool_input.get("old_text", ""), tool_input.get("new_text", "")
+            )
+        return lambda content: remove_bullet(content, section, tool_input.get("text", ""))
+
     # ─── System-Prompt Builder ──────────────────────────────────────
 
     def _build_cortex_system_prompt(
@@ -525,9 +727,9 @@ You just had a conversation with {user_name}. Time to update your files.
 
 1. **Read first** — use `read_file` to see where things stand
 2. **Review** — what happened? What is new? What shifted?
-3. **Update** — use `write_file` for files that need it
+3. **Update** — use `append_bullet`, `replace_bullet` and `remove_bullet` to change single bullets. You can call several of them at once
 4. **Be selective** — not every conversation touches all three files. Only update what actually changed
-5. **Write complete files** — always write the full content, not just additions
+5. **Rewrite rarely** — use `write_file` only to restructure a whole file, and then always write the complete content
 
 {tier_guidance}
 
@@ -556,18 +758,27 @@ You just had a conversation with {user_name}. Time to update your files.
         self,
         conversation_history: list,
         persona_name: str,
-        user_name: str
+        user_name: str,
+        overlap_history: list = None
     ) -> list:
         """
         Baut die Messages-Liste für den Cortex-Update API-Call.
 
         Versucht zuerst die PromptEngine zu verwenden (Template aus
         cortex_update_user_message.json). Fällt bei Fehler auf inline Fallback zurück.
+        overlap_history (bereits eingearbeitet) wird als Anschluss-Kontext
+        vor den neuen Nachrichten markiert.
         """
         # Gesprächsverlauf formatieren
         conversation_text = self._format_conversation(
             conversation_history, persona_name, user_name
         )
+        if overlap_history:
+            overlap_text = self._format_conversation(overlap_history, persona_name, user_name)
+            conversation_text = (
+                f"*(Earlier — already in your Cortex files, for context only:)*\n\n{overlap_text}"
+                f"\n\n*(New since your last update:)*\n\n{conversation_text}"
+            )
 
         # Versuch 1: Über PromptEngine (externalisiertes Template)
         engine = self._get_prompt_engine()
@@ -592,7 +803,7 @@ You just had a conversation with {user_name}. Time to update your files.
 
 ---
 
-Now read your Cortex files and update them based on this conversation. Use the `read_file` and `write_file` tools."""
+Now read your Cortex files and update them based on this conversation. Use `read_file`, then `append_bullet`, `replace_bullet` or `remove_bullet` for the bullets that changed."""
 
         return [{"role": "user", "content": user_message}]
 
@@ -658,6 +869,9 @@ Now read your Cortex files and update them based on this conversation. Use the `
                         "required": ["filename", "content"]
                     }
                 }
+            ] + [
+                _build_patch_tool(name, descriptions.get(name, {}))
+                for name in PATCH_TOOL_NAMES
             ]
         except Exception as e:
             log.warning("Cortex Tools via Engine fehlgeschlagen, nutze Fallback: %s", e)
@@ -712,8 +926,36 @@ Now read your Cortex files and update them based on this conversation. Use the `
         except (TypeError, ValueError):
             return 65
 
-    def _error_result(self, error: str, start_time: float) -> Dict[str, Any]:
-        """Erstellt ein standardisiertes Fehler-Ergebnis."""
+    @staticmethod
+    def _retryable_after(files_written: list) -> bool:
+        """
+        Fehler nach bereits geschriebenen Dateien nicht wiederholen: ein neuer
+        Versuch würde append_bullet & Co. erneut anwenden (doppelte Bullets).
+        Transiente API-Fehler wiederholt der ApiClient ohnehin pro Versuch.
+        """
+        if files_written:
+            log.warning("Cortex-Update nach Schreibzugriffen fehlgeschlagen (%s) – kein neuer Versuch",
+                        ', '.join(files_written))
+            return False
+        return True
+
+    def _skipped_result(self, start_time: float) -> Dict[str, Any]:
+        """Ergebnis ohne API-Call: seit dem Memory-Marker ist nichts Neues hinzugekommen."""
+        return {
+            'success': True,
+            'tool_calls_count': 0,
+            'files_written': [],
+            'files_read': [],
+            'duration_seconds': round(time.monotonic() - start_time, 2),
+            'usage': None,
+            'error': None,
+            'new_messages': 0,
+            'overlap_messages': 0,
+            'retryable': False
+        }
+
+    def _error_result(self, error: str, start_time: float, retryable: bool = False) -> Dict[str, Any]:
+        """Erstellt ein standardisiertes Fehler-Ergebnis (Vorbedingungen: nicht wiederholbar)."""
         duration = time.monotonic() - start_time
         return {
             'success': False,
@@ -722,5 +964,6 @@ Now read your Cortex files and update them based on this conversation. Use the `
             'files_read': [],
             'duration_seconds': round(duration, 2),
             'usage': None,
-            'error': error
+            'error': error,
+            'retryable': retryable
         }
@@ -13,15 +13,21 @@ import os
 import shutil
 import tempfile
 import threading
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 
 from .api_request import ApiClient
+from .cortex.memory_store import (
+    CortexMemoryStore, estimate_tokens, matches_query, render_excerpt, select_entries
+)
+from .cortex.sections import HEADING, render_entries
 from .logger import log
 
 
 # ─── Limits ──────────────────────────────────────────────────────────────────
 
-MAX_CORTEX_FILE_SIZE = 8000  # Max Zeichen pro Cortex-Datei (~2000 Tokens)
+# Token-Budget des Cortex-Inhalts im System-Prompt (alle drei Dateien zusammen).
+# Passt der volle Inhalt nicht, wählt der Memory-Store die relevantesten Einträge.
+CORTEX_PROMPT_TOKEN_BUDGET = 3000
 
 
 # ─── Konstanten ──────────────────────────────────────────────────────────────
@@ -103,6 +109,13 @@ TEMPLATES = {
     'relationship.md': RELATIONSHIP_TEMPLATE,
 }
 
+# Datei → (read_all-Key, Placeholder, Sektions-Header im System-Prompt)
+PROMPT_SECTIONS = {
+    'memory.md': ('memory', 'cortex_memory', 'Memories & Knowledge'),
+    'soul.md': ('soul', 'cortex_soul', 'Identity & Inner Self'),
+    'relationship.md': ('relationship', 'cortex_relationship', 'Relationship & Shared History'),
+}
+
 
 # ─── Tool-Use Definitionen ──────────────────────────────────────────────────
 
@@ -288,6 +301,14 @@ def ensure_cortex_dirs() -> int:
     return count
 
 
+def _wrap_section(content: str, header: str) -> str:
+    """Setzt den Sektions-Header vor den Inhalt, leerer Inhalt → ''."""
+    stripped = content.strip()
+    if not stripped:
+        return ''
+    return f"### {header}\n\n{stripped}"
+
+
 # ─── CortexService Klasse ───────────────────────────────────────────────────
 
 class CortexService:
@@ -297,14 +318,18 @@ class CortexService:
 
     Features:
     - Atomare Schreibvorgänge (tempfile + os.replace)
-    - Dateigröße-Limit (MAX_CORTEX_FILE_SIZE)
+    - Strukturierter Memory-Store (ein Eintrag pro Zeile in der Persona-DB)
+    - Prompt-Auswahl unter Token-Budget statt Abschneiden der Dateien
     - In-Memory-Cache mit Write-Through (thread-safe)
     """
 
-    def __init__(self, api_client: ApiClient):
+    def __init__(self, api_client: ApiClient,
+                 memory_store: Optional[CortexMemoryStore] = None):
         self.api_client = api_client
+        self.memory_store = memory_store or CortexMemoryStore()
         self._cache: Dict[str, Dict[str, str]] = {}  # persona_id → {filename: content}
         self._cache_lock = threading.Lock()
+        self._patch_lock = threading.Lock()
 
     # ─── Pfad-Auflösung ─────────────────────────────────────────────────
 
@@ -352,8 +377,19 @@ class CortexService:
         if result:
             with self._cache_lock:
                 self._cache.pop(persona_id, None)
+            self.memory_store.forget(persona_id)
         return result
 
+    def evict_cache(self, persona_id: str) -> None:
+        """
+        Gibt die gecachten Cortex-Inhalte einer Persona frei.
+
+        Wird aufgerufen, wenn die Persona aus dem LRU warmer Persona-Kontexte
+        fällt; der nächste Zugriff liest die Dateien neu.
+        """
+        with self._cache_lock:
+            self._cache.pop(persona_id, None)
+
     # ─── Datei-I/O ──────────────────────────────────────────────────────
 
     def read_file(self, persona_id: str, filename: str) -> str:
@@ -397,7 +433,9 @@ class CortexService:
 
     def write_file(self, persona_id: str, filename: str, content: str) -> None:
         """
-        Schreibt eine einzelne Cortex-Datei (überschreibt komplett).
+        Schreibt eine einzelne Cortex-Datei (überschreibt komplett) und
+        gleicht den Memory-Store mit dem neuen Inhalt ab. Der Inhalt wird
+        nicht gekürzt – die Prompt-Größe begrenzt get_cortex_for_prompt().
 
         Args:
             persona_id: Persona-ID
@@ -411,15 +449,6 @@ class CortexService:
             raise ValueError(f"Ungültige Cortex-Datei: {filename}. "
                              f"Erlaubt: {CORTEX_FILES}")
 
-        # Dateigröße-Limit prüfen
-        original_len = len(content)
-        if original_len > MAX_CORTEX_FILE_SIZE:
-            content = content[:MAX_CORTEX_FILE_SIZE]
-            log.warning(
-                "Cortex-Datei gekürzt: %s/%s — %d → %d Zeichen",
-                persona_id, filename, original_len, MAX_CORTEX_FILE_SIZE
-            )
-
         # Defensiv: Verzeichnis sicherstellen
         self.ensure_cortex_files(persona_id)
 
@@ -460,6 +489,41 @@ class CortexService:
                 except OSError:
                     pass
 
+        # Memory-Store nachziehen; schlägt das fehl, holt ensure_synced()
+        # den Abgleich beim nächsten Prompt nach
+        try:
+            self.memory_store.sync(persona_id, filename, content)
+        except Exception as e:
+            log.warning("Cortex-Store Sync fehlgeschlagen für %s/%s: %s",
+                        persona_id, filename, e)
+
+    def patch_file(self, persona_id: str, filename: str,
+                   patch: Callable[[str], str]) -> str:
+        """
+        Wendet einen Patch (alter Inhalt → neuer Inhalt) auf eine Cortex-Datei an.
+
+        Lesen, Patchen und Schreiben laufen unter einer Sperre; wirft der
+        Patch (z.B. PatchError bei unbekannter Sektion), bleibt die Datei
+        unverändert. Ohne Änderung wird nicht geschrieben.
+
+        Args:
+            persona_id: Persona-ID
+            filename: 'memory.md', 'soul.md' oder 'relationship.md'
+            patch: Funktion, z.B. lambda c: append_bullet(c, 'Sektion', 'Text')
+
+        Returns:
+            Der neue Dateiinhalt
+
+        Raises:
+            ValueError: Wenn filename nicht in CORTEX_FILES oder der Patch ungültig ist
+        """
+        with self._patch_lock:
+            content = self.read_file(persona_id, filename)
+            patched = patch(content)
+            if patched != content:
+                self.write_file(persona_id, filename, patched)
+            return patched
+
     def read_all(self, persona_id: str) -> Dict[str, str]:
         """
         Liest alle drei Cortex-Dateien einer Persona.
@@ -482,45 +546,75 @@ class CortexService:
 
     # ─── Prompt-Integration ─────────────────────────────────────────────
 
-    def get_cortex_for_prompt(self, persona_id: str) -> Dict[str, str]:
+    def get_cortex_for_prompt(self, persona_id: str, query: Optional[str] = None,
+                              token_budget: int = CORTEX_PROMPT_TOKEN_BUDGET) -> Dict[str, str]:
         """
         Liest Cortex-Dateien und formatiert sie als Placeholder-Werte
         mit Sektions-Headern für den System-Prompt.
 
+        Passt der gesamte Inhalt ins Token-Budget, werden die Dateien
+        vollständig übernommen. Sonst wählt der Memory-Store die für die
+        aktuelle Nachricht (query) relevantesten Einträge aus; Titel und
+        Sektions-Überschriften der gewählten Einträge bleiben erhalten.
+
         Leere Dateien → leerer String (Sektion wird im Template unsichtbar).
         Wird vom ChatService aufgerufen, um {{cortex_memory}},
         {{cortex_soul}} und {{cortex_relationship}} als runtime_vars zu liefern.
 
         Args:
             persona_id: Persona-ID
+            query: Aktuelle Nachricht (Relevanz-Signal), optional
+            token_budget: Max. geschätzte Tokens aller drei Sektionen
 
         Returns:
             {
-                'cortex_memory': '### Erinnerungen & Wissen\n\n...' oder '',
-                'cortex_soul': '### Identität & Innere Haltung\n\n...' oder '',
-                'cortex_relationship': '### Beziehung & Gemeinsame Geschichte\n\n...' oder '',
+                'cortex_memory': '### Memories & Knowledge\n\n...' oder '',
+                'cortex_soul': '### Identity & Inner Self\n\n...' oder '',
+                'cortex_relationship': '### Relationship & Shared History\n\n...' oder '',
             }
         """
         files = self.read_all(persona_id)
-
-        def _wrap_section(content: str, header: str) -> str:
-            """Wraps content with section header, or returns empty string."""
-            stripped = content.strip()
-            if not stripped:
-                return ''
-            return f"### {header}\n\n{stripped}"
-
-        return {
-            'cortex_memory': _wrap_section(
-                files['memory'], 'Memories & Knowledge'
-            ),
-            'cortex_soul': _wrap_section(
-                files['soul'], 'Identity & Inner Self'
-            ),
-            'cortex_relationship': _wrap_section(
-                files['relationship'], 'Relationship & Shared History'
-            ),
+        full = {
+            placeholder: _wrap_section(files[key], header)
+            for key, placeholder, header in PROMPT_SECTIONS.values()
         }
+        if sum(estimate_tokens(text) for text in full.values()) <= token_budget:
+            return full
+
+        try:
+            return self._select_for_prompt(persona_id, files, query, token_budget)
+        except Exception as e:
+            log.warning("Cortex-Auswahl fehlgeschlagen für %s, nutze volle Dateien: %s",
+                        persona_id, e)
+            return full
+
+    def _select_for_prompt(self, persona_id: str, files: Dict[str, str],
+                           query: Optional[str], token_budget: int) -> Dict[str, str]:
+        """Budgetierte Auswahl über die Einträge aller drei Dateien."""
+        store = self.memory_store
+        per_file = {}
+        overhead = 0
+        for filename, (key, _placeholder, header) in PROMPT_SECTIONS.items():
+            store.ensure_synced(persona_id, filename, files[key])
+            per_file[filename] = store.entries(persona_id, filename)
+            overhead += estimate_tokens(f"### {header}\n\n")
+            overhead += sum(estimate_tokens(e.text) + 1
+                            for e in per_file[filename] if e.kind == HEADING)
+
+        candidates = [e for entries in per_file.values() for e in entries]
+        chosen = select_entries(candidates, query, max(0, token_budget - overhead))
+        chosen_ids = {e.id for e in chosen}
+
+        result = {}
+        for filename, (_key, placeholder, header) in PROMPT_SECTIONS.items():
+            excerpt = render_excerpt(per_file[filename], chosen_ids)
+            has_content = any(e.kind != HEADING for e in excerpt)
+            result[placeholder] = _wrap_section(render_entries(excerpt), header) if has_content else ''
+
+        store.mark_recalled(persona_id, [e.id for e in chosen if matches_query(e, query)])
+        log.debug("Cortex-Auswahl %s: %d von %d Einträgen (Budget %d Tokens)",
+                  persona_id, len(chosen), sum(1 for e in candidates if e.is_content), token_budget)
+        return result
 
     # ─── Cortex-Update via tool_use ─────────────────────────────────────
 
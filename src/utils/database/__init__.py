@@ -40,6 +40,7 @@ from .chat import (
     clear_chat_history,
     get_total_message_count,
     get_max_message_id,
+    get_messages_in_range,
     get_last_message,
     delete_last_message,
     update_last_message_text,
@@ -54,7 +55,9 @@ from .sessions import (
     get_session,
     update_session_title,
     delete_session,
-    get_current_session_id
+    get_current_session_id,
+    get_memory_marker,
+    set_memory_marker
 )
 
 # Legacy aliases for backwards compatibility
@@ -84,6 +87,7 @@ __all__ = [
     'clear_chat_history',
     'get_total_message_count',
     'get_max_message_id',
+    'get_messages_in_range',
     'get_last_message',
     'delete_last_message',
     'update_last_message_text',
@@ -97,6 +101,8 @@ __all__ = [
     'update_session_title',
     'delete_session',
     'get_current_session_id',
+    'get_memory_marker',
+    'set_memory_marker',
     
     # Legacy aliases
     'get_session_message_count'
@@ -192,6 +192,9 @@ def save_message(message: str, is_user: bool, character_name: str = 'Assistant',
     conn.commit()
     conn.close()
     
+    from ..recall import notify_message
+    notify_message(persona_id, message_id, message, 'User' if is_user else character_name)
+    
     return message_id
 
 
@@ -203,6 +206,9 @@ def clear_chat_history(persona_id: str = 'default'):
     cursor.execute(sql('chat.delete_all_sessions'))
     conn.commit()
     conn.close()
+    
+    from ..recall import invalidate
+    invalidate(persona_id)
 
 
 def get_total_message_count(persona_id: str = 'default') -> int:
@@ -234,6 +240,35 @@ def get_max_message_id(session_id: int, persona_id: str = 'default') -> Optional
     return row[0] if row and row[0] else None
 
 
+def get_messages_in_range(session_id: int, after_id: int, until_id: int, limit: int,
+                          persona_id: str = 'default') -> List[Dict[str, Any]]:
+    """
+    Gets the newest messages with after_id < id <= until_id, oldest first.
+    
+    Unlike get_conversation_context, roles are not merged and every
+    message keeps its ID (used for incremental Cortex updates).
+    
+    Args:
+        session_id: Session ID
+        after_id: Exclusive lower bound (0 = from the start)
+        until_id: Inclusive upper bound
+        limit: Maximum number of messages (the newest are kept)
+        persona_id: Persona ID
+        
+    Returns:
+        List of {'id', 'role', 'content'} dicts
+    """
+    conn = get_db_connection(persona_id)
+    cursor = conn.cursor()
+    cursor.execute(sql('chat.get_messages_in_range'), (session_id, after_id, until_id, limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return [
+        {'id': row[0], 'role': 'user' if row[2] else 'assistant', 'content': row[1]}
+        for row in reversed(rows)
+    ]
+
+
 def get_last_message(session_id: int, persona_id: str = 'default') -> Optional[Dict[str, Any]]:
     """
     Gets the last message of a session.
@@ -295,6 +330,9 @@ def delete_last_message(session_id: int, persona_id: str = 'default') -> Optiona
     conn.commit()
     conn.close()
     
+    from ..recall import notify_message_removed
+    notify_message_removed(persona_id, deleted['id'])
+    
     log.info("Letzte Nachricht gelöscht: session=%s, msg_id=%s, is_user=%s",
              session_id, deleted['id'], deleted['is_user'])
     return deleted
@@ -320,5 +358,7 @@ def update_last_message_text(session_id: int, new_text: str, persona_id: str = '
     conn.close()
     
     if affected > 0:
+        from ..recall import invalidate
+        invalidate(persona_id)
         log.info("Letzte Nachricht aktualisiert: session=%s", session_id)
     return affected > 0
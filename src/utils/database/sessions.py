@@ -4,6 +4,7 @@ Session Management
 Handles:
 - Creating/updating/deleting sessions
 - Session queries and summaries
+- Memory marker (last message folded into Cortex)
 - Multi-persona session aggregation
 """
 
@@ -218,6 +219,9 @@ def delete_session(session_id: int, persona_id: str = 'default') -> bool:
         
         conn.commit()
         conn.close()
+        
+        from ..recall import invalidate
+        invalidate(persona_id)
         return True
     except Exception as e:
         log.error("Error deleting session: %s", e)
@@ -241,4 +245,51 @@ def get_current_session_id(persona_id: str = 'default') -> Optional[int]:
     result = cursor.fetchone()
     conn.close()
     
-    return result[0] if result else None
\ No newline at end of file
+    return result[0] if result else None
+
+
+def get_memory_marker(session_id: int, persona_id: str = 'default') -> Optional[int]:
+    """
+    Gets the ID of the last message already folded into Cortex.
+    
+    Args:
+        session_id: Session ID
+        persona_id: Persona ID
+        
+    Returns:
+        Message ID or None if the session has never been processed
+    """
+    conn = get_db_connection(persona_id)
+    cursor = conn.cursor()
+    
+    cursor.execute(sql('sessions.get_memory_marker'), (session_id,))
+    result = cursor.fetchone()
+    conn.close()
+    
+    return result[0] if result else None
+
+
+def set_memory_marker(session_id: int, end_message_id: int, start_message_id: Optional[int] = None,
+                      persona_id: str = 'default') -> bool:
+    """
+    Stores the memory marker and the message range of the last Cortex update.
+    
+    Args:
+        session_id: Session ID
+        end_message_id: Last message folded into Cortex (new marker)
+        start_message_id: First new message of the update
+        persona_id: Persona ID
+        
+    Returns:
+        True if the session exists
+    """
+    conn = get_db_connection(persona_id)
+    cursor = conn.cursor()
+    
+    cursor.execute(sql('sessions.set_memory_marker'),
+                   (end_message_id, start_message_id, end_message_id, session_id))
+    updated = cursor.rowcount > 0
+    conn.commit()
+    conn.close()
+    
+    return updated
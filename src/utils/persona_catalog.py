@@ -0,0 +1,205 @@
+"""
+Persona Catalog – Index der Persona-Zusammenfassungen für die Persona-Liste.
+
+Statt bei jedem Aufruf alle Dateien in created_personas/ zu parsen, hält der
+Katalog pro Persona-Datei eine Zusammenfassung, versioniert über die
+Datei-Signatur (mtime_ns, size). Ein Aufruf kostet ein Verzeichnis-Scan mit
+os.scandir(); geparst werden nur neue oder geänderte Dateien.
+
+Optional wird der Index als JSON gespeichert (index_path), damit auch der
+erste Aufruf nach einem Neustart keine unveränderte Datei lesen muss.
+
+Usage:
+    catalog = PersonaCatalog(created_dir, default_file)
+    entries, total = catalog.page(offset=0, limit=20)   # Default-Persona zuerst
+    catalog.invalidate('a1b2c3d4')                      # nach eigenem Schreibzugriff
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.logger import log
+
+DEFAULT_PERSONA_ID = 'default'
+
+# Fallback-Werte der Listen-Felder (Default-Persona vs. erstellte Persona)
+_DEFAULT_FALLBACKS = {
+    "name": "Assistant", "age": None, "gender": None, "persona": "KI", "expression": None,
+}
+_CREATED_FALLBACKS = {
+    "name": "Unbenannt", "age": 18, "gender": "divers", "persona": "KI", "expression": "normal",
+}
+
+Signature = Optional[Tuple[int, int]]
+
+
+def _signature(st: os.stat_result) -> Tuple[int, int]:
+    return (st.st_mtime_ns, st.st_size)
+
+
+def persona_summary(persona_id: str, settings: Dict[str, Any], is_default: bool) -> Dict[str, Any]:
+    """Listen-Eintrag einer Persona (ohne is_active)."""
+    fallbacks = _DEFAULT_FALLBACKS if is_default else _CREATED_FALLBACKS
+    return {
+        "id": persona_id,
+        "name": settings.get("name", fallbacks["name"]),
+        "age": settings.get("age", fallbacks["age"]),
+        "gender": settings.get("gender", fallbacks["gender"]),
+        "persona": settings.get("persona", fallbacks["persona"]),
+        "core_traits": settings.get("core_traits", []),
+        "knowledge": settings.get("knowledge", []),
+        "expression": settings.get("expression", fallbacks["expression"]),
+        "scenarios": settings.get("scenarios", []),
+        "background": settings.get("background", ""),
+        "start_msg_enabled": settings.get("start_msg_enabled", False),
+        "avatar": settings.get("avatar", None),
+        "avatar_type": settings.get("avatar_type", None),
+        "is_default": is_default,
+    }
+
+
+class PersonaCatalog:
+    """Signatur-versionierter Index der Persona-Zusammenfassungen. Thread-safe."""
+
+    def __init__(self, personas_dir: str, default_file: str, index_path: Optional[str] = None):
+        """
+        Args:
+            personas_dir: Verzeichnis der erstellten Personas (<id>.json)
+            default_file: Pfad zur default_persona.json
+            index_path: Optionaler Speicherort des Index (JSON); None = nur im Speicher
+        """
+        self._personas_dir = personas_dir
+        self._default_file = default_file
+        self._index_path = index_path
+        self._lock = threading.Lock()
+        # Dateiname → (Signatur, Zusammenfassung); '' = Default-Persona
+        self._entries: Dict[str, Tuple[Signature, Dict[str, Any]]] = {}
+        self._dirty = False
+        self._parses = 0
+        if index_path:
+            self._load_index()
+
+    # ===== Abfragen =====
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Alle Zusammenfassungen: Default-Persona zuerst, dann nach Dateiname sortiert."""
+        with self._lock:
+            result = [self._default_summary()]
+            seen = {''}
+            for name, sig in self._scan():
+                seen.add(name)
+                summary = self._cached(name, sig, self._read_created)
+                if summary is not None:
+                    result.append(summary)
+            for name in set(self._entries) - seen:
+                del self._entries[name]
+                self._dirty = True
+            self._save_index()
+        return result
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Ausschnitt der Persona-Liste.
+
+        Returns:
+            (Einträge ab offset, höchstens limit Stück; Gesamtanzahl)
+        """
+        entries = self.summaries()
+        offset = max(0, offset)
+        end = None if limit is None else offset + max(0, limit)
+        return entries[offset:end], len(entries)
+
+    def invalidate(self, persona_id: Optional[str] = None) -> None:
+        """Verwirft den Eintrag einer Persona (None = alle)."""
+        with self._lock:
+            if persona_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop('' if persona_id == DEFAULT_PERSONA_ID else f"{persona_id}.json", None)
+            self._dirty = True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Anzahl indizierter Dateien und Parse-Vorgänge."""
+        with self._lock:
+            return {'entries': len(self._entries), 'parses': self._parses}
+
+    # ===== Intern =====
+
+    def _scan(self) -> List[Tuple[str, Tuple[int, int]]]:
+        try:
+            with os.scandir(self._personas_dir) as it:
+                files = [(e.name, _signature(e.stat())) for e in it
+                         if e.name.endswith('.json') and e.is_file()]
+        except FileNotFoundError:
+            return []
+        return sorted(files)
+
+    def _cached(self, name: str, sig: Signature, read) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == sig:
+            return entry[1]
+        summary = read(name)
+        self._parses += 1
+        if summary is not None:
+            self._entries[name] = (sig, summary)
+        else:
+            self._entries.pop(name, None)
+        self._dirty = True
+        return summary
+
+    def _default_summary(self) -> Dict[str, Any]:
+        try:
+            sig = _signature(os.stat(self._default_file))
+        except OSError:
+            sig = None
+        summary = self._cached('', sig, self._read_default)
+        return summary if summary is not None else persona_summary(DEFAULT_PERSONA_ID, {}, True)
+
+    def _read_default(self, _name: str) -> Dict[str, Any]:
+        try:
+            with open(self._default_file, 'r', encoding='utf-8') as f:
+                settings = json.load(f).get('persona_settings', {})
+        except Exception as e:
+            log.error("Fehler beim Laden der Standard-Persona: %s", e)
+            settings = {}
+        return persona_summary(DEFAULT_PERSONA_ID, settings, True)
+
+    def _read_created(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._personas_dir, name), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            log.error("Fehler beim Laden von %s: %s", name, e)
+            return None
+        persona_id = data.get('id', name.replace('.json', ''))
+        return persona_summary(persona_id, data.get('persona_settings', {}), False)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            self._entries = {
+                name: (tuple(sig) if sig else None, summary)
+                for name, (sig, summary) in stored.get('entries', {}).items()
+            }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log.warning("Persona-Index nicht lesbar, wird neu aufgebaut: %s", e)
+            self._entries = {}
+
+    def _save_index(self) -> None:
+        if not self._index_path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._index_path), exist_ok=True)
+            tmp_path = self._index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': {name: [sig, summary] for name, (sig, summary) in self._entries.items()}},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self._index_path)
+            self._dirty = False
+        except OSError as e:
+            log.warning("Persona-Index konnte nicht gespeichert werden: %s", e)
@@ -0,0 +1,110 @@
+"""
+Persona Contexts – LRU der zuletzt aktiven ("warmen") Personas.
+
+Ein Kontext hält alles, was ein Persona-Wechsel sonst von der Platte lesen
+und neu berechnen müsste: die Persona-Settings und die fertig gebaute
+Charakterbeschreibung. Gültig ist ein Kontext, solange die Signaturen seiner
+Quelldateien (Persona-Datei, persona_spec.json, custom_spec.json) gleich
+sind – die Prüfung kostet nur os.stat().
+
+Fällt eine Persona aus dem LRU, wird on_evict(persona_id) aufgerufen (z.B.
+um den Cortex-Cache dieser Persona freizugeben). Damit begrenzt die
+Kapazität auch den residenten Cortex-Inhalt.
+
+Usage:
+    contexts = PersonaContextCache(max_entries=4, on_evict=cortex.evict_cache)
+    ctx = contexts.get('a1b2c3d4', version)      # None bei Miss oder veraltet
+    contexts.put(PersonaContext('a1b2c3d4', settings, description, version))
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.logger import log
+
+DEFAULT_MAX_ENTRIES = 4
+
+
+@dataclass(frozen=True)
+class PersonaContext:
+    """Warmer Zustand einer Persona (unveränderlich, Aufrufer nicht verändern)."""
+    persona_id: str
+    settings: Dict[str, Any]
+    description: Dict[str, Any]
+    version: Tuple          # Signaturen der Quelldateien beim Aufbau
+
+
+class PersonaContextCache:
+    """LRU warmer Persona-Kontexte mit konfigurierbarer Kapazität. Thread-safe."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self._max_entries = max(1, int(max_entries))
+        self._on_evict = on_evict
+        self._entries: 'OrderedDict[str, PersonaContext]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, persona_id: str, version: Tuple) -> Optional[PersonaContext]:
+        """Kontext der Persona, falls vorhanden und zur aktuellen Datei-Version passend."""
+        with self._lock:
+            ctx = self._entries.get(persona_id)
+            if ctx is not None and ctx.version == version:
+                self._entries.move_to_end(persona_id)
+                self._hits += 1
+                return ctx
+            if ctx is not None:
+                del self._entries[persona_id]
+            self._misses += 1
+            return None
+
+    def put(self, ctx: PersonaContext) -> None:
+        """Speichert den Kontext als zuletzt verwendet, verdrängt den ältesten bei Überlauf."""
+        with self._lock:
+            self._entries[ctx.persona_id] = ctx
+            self._entries.move_to_end(ctx.persona_id)
+            evicted = self._trim()
+        self._notify(evicted)
+
+    def invalidate(self, persona_id: Optional[str] = None) -> None:
+        """Verwirft den Kontext einer Persona (None = alle). Ohne on_evict-Aufruf."""
+        with self._lock:
+            if persona_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(persona_id, None)
+
+    def resize(self, max_entries: int) -> None:
+        """Ändert die Kapazität (verdrängt ggf. sofort)."""
+        with self._lock:
+            self._max_entries = max(1, int(max_entries))
+            evicted = self._trim()
+        self._notify(evicted)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Treffer, Fehlschläge, Belegung und Kapazität."""
+        with self._lock:
+            return {
+                'hits': self._hits, 'misses': self._misses,
+                'entries': len(self._entries), 'max_entries': self._max_entries,
+                'personas': list(self._entries),
+            }
+
+    def _trim(self) -> list:
+        evicted = []
+        while len(self._entries) > self._max_entries:
+            persona_id, _ = self._entries.popitem(last=False)
+            evicted.append(persona_id)
+        return evicted
+
+    def _notify(self, evicted: list) -> None:
+        if not self._on_evict:
+            return
+        for persona_id in evicted:
+            try:
+                self._on_evict(persona_id)
+            except Exception as e:
+                log.debug("on_evict für Persona %s fehlgeschlagen: %s", persona_id, e)
@@ -0,0 +1,218 @@
+"""
+Prompt Archive – Streaming ZIP-Export/-Import mit Content-Hashes.
+
+Export: Dateien werden blockweise in das Archiv kopiert (kein Einlesen
+ganzer Dateien), der SHA-256 jeder Datei entsteht dabei nebenbei und landet
+in metadata.json ('hashes'). Das Archiv wird als Temp-Datei geschrieben und
+per os.replace() an den Zielpfad verschoben.
+
+Import in drei Schritten:
+    plan   – Einträge lesen, JSON prüfen, Hash mit der lokalen Datei
+             vergleichen → added / changed / unchanged / skipped / removed
+    stage  – geänderte Einträge als Temp-Dateien neben die Ziele schreiben
+    commit – Temp-Dateien per os.replace() einsetzen (nur dieser Schritt
+             braucht den Engine-Lock)
+
+Lokale Hashes werden über die Datei-Signatur gecached (FileValueCache),
+unveränderte Dateien werden also auch bei wiederholten Imports nicht neu
+gelesen.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .file_cache import FileValueCache
+
+CHUNK_SIZE = 64 * 1024
+
+METADATA_NAME = 'metadata.json'
+
+# Diff-Kategorien eines Import-Plans
+CHANGE_TYPES = ('added', 'changed', 'unchanged', 'skipped', 'removed')
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileDigests(FileValueCache):
+    """SHA-256 lokaler Dateien, gecached über (mtime_ns, size)."""
+
+    def __init__(self):
+        super().__init__(parser=_sha256_file)
+
+
+def write_archive(output_path: str, files: Iterable[Tuple[str, str]],
+                  metadata: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Schreibt ein ZIP-Archiv blockweise und atomar.
+
+    Args:
+        output_path: Zielpfad
+        files: (Dateipfad, Name im Archiv); fehlende Dateien werden übersprungen
+        metadata: Inhalt von metadata.json (wird um 'hashes' ergänzt)
+
+    Returns:
+        {Name im Archiv: SHA-256}
+    """
+    dir_path = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(dir_path, exist_ok=True)
+    hashes: Dict[str, str] = {}
+    fd, tmp_path = tempfile.mkstemp(suffix='.zip.tmp', dir=dir_path)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for path, arcname in files:
+                try:
+                    src = open(path, 'rb')
+                except FileNotFoundError:
+                    continue
+                digest = hashlib.sha256()
+                with src, zf.open(arcname, 'w') as dst:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                hashes[arcname] = digest.hexdigest()
+            zf.writestr(METADATA_NAME, json.dumps(
+                {**metadata, 'hashes': hashes}, ensure_ascii=False, indent=2))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return hashes
+
+
+def plan_import(zf: zipfile.ZipFile, resolve_target: Callable[[str], Optional[str]],
+                digests: FileDigests, overwrite: bool = True,
+                remove: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Vergleicht die Einträge eines Archivs mit den lokalen Dateien.
+
+    Einträge werden genau einmal gelesen: Hash, JSON-Prüfung und (für
+    geänderte) der Inhalt für das Staging.
+
+    Args:
+        resolve_target: Name im Archiv → lokaler Zielpfad (None = ignorieren)
+        digests: Hash-Cache für lokale Dateien
+        overwrite: False = vorhandene Dateien nie ersetzen ('merge')
+        remove: Lokale Pfade, die ohne Gegenstück im Archiv gelöscht werden
+
+    Returns:
+        {'entries': [{name, target, change, data?}], 'errors': [str]}
+    """
+    entries: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    seen_targets = set()
+    expected = _archive_hashes(zf)
+    for info in zf.infolist():
+        target = resolve_target(info.filename)
+        if target is None:
+            continue
+        seen_targets.add(target)
+        exists = os.path.isfile(target)
+        if exists and not overwrite:
+            entries.append({'name': info.filename, 'target': target, 'change': 'skipped'})
+            continue
+        try:
+            data = zf.read(info)
+            json.loads(data)  # Validierung
+        except Exception as e:
+            errors.append(f"{info.filename}: {e}")
+            continue
+        sha = hashlib.sha256(data).hexdigest()
+        if info.filename in expected and expected[info.filename] != sha:
+            errors.append(f"{info.filename}: Hash stimmt nicht mit metadata.json überein")
+            continue
+        if exists and sha == digests.load(target):
+            change = 'unchanged'
+        else:
+            change = 'changed' if exists else 'added'
+        entry = {'name': info.filename, 'target': target, 'change': change}
+        if change != 'unchanged':
+            entry['data'] = data
+        entries.append(entry)
+
+    for target in remove:
+        if target not in seen_targets and os.path.isfile(target):
+            entries.append({'name': None, 'target': target, 'change': 'removed'})
+    return {'entries': entries, 'errors': errors}
+
+
+def _archive_hashes(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Hashes aus metadata.json (ältere Exporte und fremde Archive: leer)."""
+    try:
+        hashes = json.loads(zf.read(METADATA_NAME)).get('hashes')
+    except Exception:
+        return {}
+    return hashes if isinstance(hashes, dict) else {}
+
+
+def summarize_plan(plan: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Diff eines Plans: Kategorie → Namen (Archivname bzw. Zieldatei)."""
+    changes: Dict[str, List[str]] = {change: [] for change in CHANGE_TYPES}
+    for entry in plan['entries']:
+        changes[entry['change']].append(entry['name'] or os.path.basename(entry['target']))
+    return changes
+
+
+def stage_import(plan: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Schreibt hinzugefügte/geänderte Einträge als Temp-Dateien neben ihre Ziele.
+
+    Returns:
+        [(Temp-Pfad, Zielpfad)] – bei einem Fehler werden bereits
+        geschriebene Temp-Dateien entfernt und der Fehler weitergereicht
+    """
+    staged: List[Tuple[str, str]] = []
+    try:
+        for entry in plan['entries']:
+            if entry['change'] not in ('added', 'changed'):
+                continue
+            dir_path = os.path.dirname(entry['target'])
+            os.makedirs(dir_path, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                mode='wb', suffix='.tmp', dir=dir_path, delete=False
+            ) as tmp:
+                tmp.write(entry['data'])
+                staged.append((tmp.name, entry['target']))
+    except BaseException:
+        discard_staged(staged)
+        raise
+    return staged
+
+
+def commit_import(plan: Dict[str, Any], staged: List[Tuple[str, str]]) -> List[str]:
+    """Setzt die Temp-Dateien ein und löscht 'removed'-Ziele. Returns: Fehler."""
+    errors: List[str] = []
+    for tmp_path, target in staged:
+        try:
+            os.replace(tmp_path, target)
+        except OSError as e:
+            errors.append(f"{os.path.basename(target)}: {e}")
+            discard_staged([(tmp_path, target)])
+    for entry in plan['entries']:
+        if entry['change'] == 'removed':
+            try:
+                os.remove(entry['target'])
+            except OSError as e:
+                errors.append(f"{os.path.basename(entry['target'])} löschen: {e}")
+    return errors
+
+
+def discard_staged(staged: List[Tuple[str, str]]) -> None:
+    """Entfernt nicht eingesetzte Temp-Dateien."""
+    for tmp_path, _ in staged:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
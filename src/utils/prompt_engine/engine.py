@@ -4,8 +4,16 @@ PromptEngine – Haupt-Engine-Klasse.
 Reine Python-Library – kein Flask, kein PyWebView.
 Liest JSON-Dateien, löst Placeholder auf, gibt fertige Strings zurück.
 
+Threading: Der geladene Zustand liegt in einem unveränderlichen
+EngineSnapshot (snapshot.py). Schreibende Operationen laufen unter dem
+RLock und ersetzen den Snapshot atomar, Leser arbeiten ohne Lock.
+
+Startup: Der validierte Ladezustand wird in einem Load-Cache (load_cache.py)
+abgelegt; Warmstarts lesen nur diese eine Datei. Mit lazy=True lädt die
+Engine im Hintergrund, Leser warten erst beim ersten Zugriff.
+
 Usage:
-    engine = PromptEngine()
+    engine = PromptEngine()                  # oder PromptEngine(lazy=True)
     system_prompt = engine.build_system_prompt(variant='default', runtime_vars={...})
     prefill = engine.build_prefill(variant='default', runtime_vars={...})
 """
@@ -15,29 +23,60 @@ import re
 import json
 import shutil
 import threading
+import time
 import zipfile
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, FrozenSet, Iterable, Optional, List
 
+from .archive import (
+    FileDigests, commit_import, discard_staged, plan_import, stage_import,
+    summarize_plan, write_archive,
+)
+from .load_cache import EngineLoadCache
 from .loader import PromptLoader
-from .placeholder_resolver import PlaceholderResolver
+from .placeholder_resolver import PlaceholderResolver, CompiledTemplate
+from .snapshot import EngineSnapshot, compile_prompt
+from .validation_graph import ValidationGraph
 from .validator import PromptValidator
 from ..logger import log
 
 
+# Marker für turn-volatile Placeholder im gecachten System-Prompt
+_VOLATILE_MARKER = re.compile(r'\x00(\w+)\x00')
+
+
 class PromptEngine:
     """
     Reine Python-Library – kein Flask, kein PyWebView.
     Liest JSON-Dateien, löst Placeholder auf, gibt fertige Strings zurück.
     """
 
-    def __init__(self, instructions_dir: str = None):
+    # Maximale Anzahl gecachter System-Prompts (LRU)
+    PROMPT_CACHE_SIZE = 32
+
+    # Maximale Anzahl gecachter Preview-Blöcke (LRU, Editor)
+    PREVIEW_CACHE_SIZE = 512
+
+    # Threads für das parallele Laden der Domain-Dateien (Kaltstart)
+    LOAD_WORKERS = 4
+
+    # Export-Wiederholungen, falls sich der Stand während des Exports ändert
+    EXPORT_ATTEMPTS = 3
+
+    def __init__(self, instructions_dir: str = None, lazy: bool = False,
+                 cache_path: Optional[str] = None, use_load_cache: bool = True):
         """
         Lädt Manifest, Domain-Dateien und Placeholder-Registry.
 
         Args:
             instructions_dir: Pfad zum instructions/ Verzeichnis.
                               Default: src/instructions/ (relativ zum Modul-Pfad)
+            lazy: Im Hintergrund-Thread laden; der Konstruktor kehrt sofort
+                  zurück, Lesezugriffe warten bis der erste Snapshot steht
+            cache_path: Pfad des Load-Cache.
+                        Default: instructions/.cache/prompt_engine.pickle
+            use_load_cache: False = immer alle Dateien lesen (kein Cache)
         """
         if instructions_dir is None:
             # Standard-Pfad: src/instructions/
@@ -51,132 +90,294 @@ class PromptEngine:
         self._loader = PromptLoader(instructions_dir)
         self._validator = PromptValidator()
 
-        # Daten
-        self._manifest: Dict[str, Any] = {}          # Merged View (System + User)
+        # Datei-Stand der einzelnen Manifeste/Registries (nur unter self._lock verwendet)
         self._system_manifest: Dict[str, Any] = {}   # System-Manifest (Git-tracked)
         self._user_manifest: Dict[str, Any] = {}     # User-Manifest (Gitignored)
-        self._user_prompt_ids: set = set()            # IDs that belong to user manifest
-        self._domains: Dict[str, Any] = {}
-        self._registry: Dict[str, Any] = {}           # Merged View (System + User)
         self._system_registry: Dict[str, Any] = {}    # System-Registry (Git-tracked)
         self._user_registry: Dict[str, Any] = {}      # User-Registry (Gitignored)
-        self._user_placeholder_keys: set = set()      # Keys that belong to user registry
-        self._resolver: Optional[PlaceholderResolver] = None
-        self._load_errors: List[str] = []
 
-        # Initial laden
-        self._load_all()
+        # Leser-Zustand: Merged Manifest, Domains, Registry, Resolver, Templates, Indizes
+        self._current: EngineSnapshot = EngineSnapshot.empty()
+        self._ready = threading.Event()     # gesetzt sobald der erste Snapshot steht
 
-    def _load_all(self):
-        """Lädt alle Dateien. Thread-safe."""
-        with self._lock:
-            self._load_errors = []
-
-            # 0. Check migration (one-time: single manifest → dual manifest)
-            from .manifest_migrator import ManifestMigrator
-            migrator = ManifestMigrator(self._instructions_dir)
-            if migrator.needs_migration():
-                log.info("Manifest-Migration erforderlich \u2013 starte Split...")
-                migration_result = migrator.migrate()
-                if migration_result.get('errors'):
-                    self._load_errors.extend(migration_result['errors'])
-                else:
-                    log.info("Migration abgeschlossen: %d System, %d User Prompts",
-                             migration_result.get('system_prompts', 0),
-                             migration_result.get('migrated_user_prompts', 0))
-            else:
-                # Erstinstallation oder bereits migriert – leeres User-Manifest anlegen
-                migrator.ensure_user_manifest_exists()
+        # Load-Cache für Warmstarts
+        if cache_path is None:
+            cache_path = os.path.join(instructions_dir, '.cache', 'prompt_engine.pickle')
+        prompts_dir = os.path.join(instructions_dir, 'prompts')
+        self._load_cache: Optional[EngineLoadCache] = EngineLoadCache(
+            cache_path, [prompts_dir, os.path.join(prompts_dir, '_meta')]
+        ) if use_load_cache else None
+        self._load_stats: Dict[str, Any] = {}
 
-            try:
-                # 1a. System-Manifest laden (Git-tracked)
-                self._system_manifest = self._loader.load_manifest()
-                log.debug("System-Manifest geladen (Version %s)",
-                          self._system_manifest.get('version'))
-            except Exception as e:
-                self._load_errors.append(f"System-Manifest: {e}")
-                log.error("System-Manifest konnte nicht geladen werden: %s", e)
-                self._system_manifest = {'version': '0', 'prompts': {}}
+        # System-Prompt Cache (LRU, eigener kleiner Lock)
+        self._prompt_cache: 'OrderedDict[tuple, CompiledTemplate]' = OrderedDict()
+        self._prompt_cache_lock = threading.Lock()
+        self._prompt_cache_hits = 0
+        self._prompt_cache_misses = 0
 
-            try:
-                # 1b. User-Manifest laden (gitignored, fehlt beim First Start)
-                self._user_manifest = self._loader.load_user_manifest()
-                user_count = len(self._user_manifest.get('prompts', {}))
-                if user_count:
-                    log.debug("User-Manifest geladen (%d Prompts)", user_count)
-            except Exception as e:
-                self._load_errors.append(f"User-Manifest: {e}")
-                log.warning("User-Manifest konnte nicht geladen werden: %s", e)
-                self._user_manifest = {'version': '2.0', 'prompts': {}}
+        # Preview-Block Cache (Editor): (prompt, Template, referenzierte Werte) → Text
+        self._preview_cache: 'OrderedDict[tuple, str]' = OrderedDict()
 
-            # 1c. Merged Manifest erstellen
-            self._manifest = self._merge_manifests()
+        # SHA-256 der Prompt-Dateien (Import-Dedup), versioniert über die Datei-Signatur
+        self._file_digests = FileDigests()
 
-            try:
-                # 2a. System-Registry laden (Git-tracked)
-                self._system_registry = self._loader.load_registry()
-                log.debug("System-Registry geladen (Version %s)",
-                          self._system_registry.get('version'))
-            except Exception as e:
-                self._load_errors.append(f"System-Registry: {e}")
-                log.error("Placeholder-Registry konnte nicht geladen werden: %s", e)
-                self._system_registry = {'version': '2.0', 'placeholders': {}}
+        # Initial laden
+        if lazy:
+            threading.Thread(target=self._load_initial, name='prompt-engine-load', daemon=True).start()
+        else:
+            self._load_all()
 
-            try:
-                # 2b. User-Registry laden (gitignored, fehlt beim First Start)
-                self._user_registry = self._loader.load_user_registry()
-                user_ph_count = len(self._user_registry.get('placeholders', {}))
-                if user_ph_count:
-                    log.debug("User-Registry geladen (%d Placeholders)", user_ph_count)
-            except Exception as e:
-                self._load_errors.append(f"User-Registry: {e}")
-                log.warning("User-Registry konnte nicht geladen werden: %s", e)
-                self._user_registry = {'version': '2.0', 'placeholders': {}}
+    # ===== Laden =====
 
-            # 2c. Merged Registry erstellen
-            self._registry = self._merge_registries()
+    @property
+    def _snapshot(self) -> EngineSnapshot:
+        """Aktueller Snapshot; wartet beim Lazy-Start auf das erste Laden."""
+        if not self._ready.is_set():
+            self._ready.wait()
+        return self._current
 
-            # 3. Domain-Dateien laden
-            self._domains, domain_errors = self._loader.load_all_domains(self._manifest)
-            self._load_errors.extend(domain_errors)
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Blockiert bis der erste Snapshot veröffentlicht ist. True wenn geladen."""
+        return self._ready.wait(timeout)
 
-            # 4. Placeholder Resolver erstellen (mit merged registry)
-            self._resolver = PlaceholderResolver(
-                self._registry,
-                self._instructions_dir
-            )
+    @property
+    def is_ready(self) -> bool:
+        """True sobald Lesezugriffe nicht mehr warten müssen."""
+        return self._ready.is_set()
 
-            # 5. Validierung (nur Warnings loggen, keine Fehler werfen)
-            validation = self._validator.validate_all(
-                self._manifest, self._domains, self._registry
-            )
-            if validation['errors']:
-                for err in validation['errors']:
-                    log.warning("Validierungsfehler: %s", err)
-                self._load_errors.extend(validation['errors'])
-            if validation['warnings']:
-                for warn in validation['warnings']:
-                    log.debug("Validierungswarnung: %s", warn)
-
-            prompt_count = len(self._manifest.get('prompts', {}))
-            domain_count = len(self._domains)
-            user_count = len(self._user_prompt_ids)
-            ph_count = len(self._registry.get('placeholders', {}))
-            user_ph_count = len(self._user_placeholder_keys)
+    def get_load_stats(self) -> Dict[str, Any]:
+        """Quelle ('cache'/'files') und Dauer des letzten Ladevorgangs."""
+        return dict(self._load_stats)
+
+    def _load_initial(self):
+        """Hintergrund-Laden (lazy=True). Leser dürfen nie dauerhaft blockieren."""
+        try:
+            self._load_all()
+        except Exception as e:
+            log.error("PromptEngine: Laden im Hintergrund fehlgeschlagen: %s", e)
+            self._ready.set()
+
+    def _load_all(self, use_cache: bool = True):
+        """Lädt alle Dateien und veröffentlicht einen neuen Snapshot. Thread-safe.
+
+        Leser sehen bis zum Austausch den vorherigen, vollständigen Stand.
+
+        Args:
+            use_cache: Load-Cache verwenden, falls die Quelldateien unverändert sind
+        """
+        with self._lock:
+            start = time.perf_counter()
+            migration_errors = self._run_migration()
+            cache = self._load_cache
+            key = cache.source_key() if cache else None
+            state = cache.load(key) if cache and use_cache and not migration_errors else None
+            source = 'cache'
+            if state is None:
+                source = 'files'
+                state = self._read_sources(migration_errors)
+                # Nur speichern, wenn sich während des Ladens nichts geändert hat
+                if cache and cache.source_key() == key:
+                    cache.store(key, state)
+            self._apply_state(state)
+
+            self._load_stats = {
+                'source': source,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+            }
+            manifest = self._current.manifest
+            prompt_count = len(manifest.get('prompts', {}))
+            domain_count = len(self._current.domains)
+            user_count = len(self._current.user_prompt_ids)
+            ph_count = len(self._current.registry.get('placeholders', {}))
+            user_ph_count = len(self._current.user_placeholder_keys)
             log.info(
                 "PromptEngine geladen: %d Prompts (%d System, %d User), %d Domain-Dateien, %d Placeholders (%d System, %d User), %d Fehler",
                 prompt_count, prompt_count - user_count, user_count,
-                domain_count, ph_count, ph_count - user_ph_count, user_ph_count, len(self._load_errors)
+                domain_count, ph_count, ph_count - user_ph_count, user_ph_count,
+                len(self._current.load_errors)
             )
+            log.debug("PromptEngine: Laden aus %s in %.1fms", source, self._load_stats['duration_ms'])
+
+    def _apply_state(self, state: Dict[str, Any]) -> None:
+        """Übernimmt einen Ladezustand (aus Dateien oder Cache) als neuen Snapshot."""
+        self._system_manifest = state['system_manifest']
+        self._user_manifest = state['user_manifest']
+        self._system_registry = state['system_registry']
+        self._user_registry = state['user_registry']
+
+        manifest, user_prompt_ids = self._merge_manifests()
+        registry, user_placeholder_keys = self._merge_registries()
+        resolver = PlaceholderResolver(registry, self._instructions_dir)
+        self._publish(EngineSnapshot(
+            manifest, state['domains'], registry, resolver,
+            user_prompt_ids, user_placeholder_keys, state['load_errors'],
+            generation=self._current.generation + 1,
+            compiled=state.get('compiled'),
+            validation=state.get('validation'),
+        ))
+
+    def _run_migration(self) -> List[str]:
+        """Migration prüfen (one-time: single manifest → dual manifest).
+
+        Läuft vor dem Cache-Key, damit dabei geschriebene Dateien schon
+        in den Key eingehen.
 
-    def _merge_manifests(self) -> Dict[str, Any]:
+        Returns:
+            Fehler der Migration
+        """
+        load_errors: List[str] = []
+
+        from .manifest_migrator import ManifestMigrator
+        migrator = ManifestMigrator(self._instructions_dir)
+        if migrator.needs_migration():
+            log.info("Manifest-Migration erforderlich \u2013 starte Split...")
+            migration_result = migrator.migrate()
+            if migration_result.get('errors'):
+                load_errors.extend(migration_result['errors'])
+            else:
+                log.info("Migration abgeschlossen: %d System, %d User Prompts",
+                         migration_result.get('system_prompts', 0),
+                         migration_result.get('migrated_user_prompts', 0))
+        else:
+            # Erstinstallation oder bereits migriert – leeres User-Manifest anlegen
+            migrator.ensure_user_manifest_exists()
+
+        return load_errors
+
+    def _read_sources(self, load_errors: List[str]) -> Dict[str, Any]:
+        """
+        Kaltstart: Manifeste, Registries und Domain-Dateien lesen,
+        validieren und kompilieren.
+
+        Args:
+            load_errors: Bisherige Fehler (Migration), wird ergänzt
+
+        Returns:
+            Ladezustand für _apply_state() und den Load-Cache
+        """
+        try:
+            # 1a. System-Manifest laden (Git-tracked)
+            self._system_manifest = self._loader.load_manifest()
+            log.debug("System-Manifest geladen (Version %s)",
+                      self._system_manifest.get('version'))
+        except Exception as e:
+            load_errors.append(f"System-Manifest: {e}")
+            log.error("System-Manifest konnte nicht geladen werden: %s", e)
+            self._system_manifest = {'version': '0', 'prompts': {}}
+
+        try:
+            # 1b. User-Manifest laden (gitignored, fehlt beim First Start)
+            self._user_manifest = self._loader.load_user_manifest()
+            user_count = len(self._user_manifest.get('prompts', {}))
+            if user_count:
+                log.debug("User-Manifest geladen (%d Prompts)", user_count)
+        except Exception as e:
+            load_errors.append(f"User-Manifest: {e}")
+            log.warning("User-Manifest konnte nicht geladen werden: %s", e)
+            self._user_manifest = {'version': '2.0', 'prompts': {}}
+
+        try:
+            # 2a. System-Registry laden (Git-tracked)
+            self._system_registry = self._loader.load_registry()
+            log.debug("System-Registry geladen (Version %s)",
+                      self._system_registry.get('version'))
+        except Exception as e:
+            load_errors.append(f"System-Registry: {e}")
+            log.error("Placeholder-Registry konnte nicht geladen werden: %s", e)
+            self._system_registry = {'version': '2.0', 'placeholders': {}}
+
+        try:
+            # 2b. User-Registry laden (gitignored, fehlt beim First Start)
+            self._user_registry = self._loader.load_user_registry()
+            user_ph_count = len(self._user_registry.get('placeholders', {}))
+            if user_ph_count:
+                log.debug("User-Registry geladen (%d Placeholders)", user_ph_count)
+        except Exception as e:
+            load_errors.append(f"User-Registry: {e}")
+            log.warning("User-Registry konnte nicht geladen werden: %s", e)
+            self._user_registry = {'version': '2.0', 'placeholders': {}}
+
+        # 3. Domain-Dateien parallel laden (merged Manifest bestimmt die Dateien)
+        manifest, _ = self._merge_manifests()
+        registry, _ = self._merge_registries()
+        domains, domain_errors = self._loader.load_all_domains(manifest, max_workers=self.LOAD_WORKERS)
+        load_errors.extend(domain_errors)
+
+        # 4. Validierung (nur Warnings loggen, keine Fehler werfen).
+        #    Bei einem Reload werden nur geänderte Knoten neu geprüft.
+        previous = self._current._validation
+        if previous is not None:
+            validation = previous.updated(manifest, domains, registry)
+        else:
+            validation = ValidationGraph.build(manifest, domains, registry)
+        for err in validation.errors:
+            log.warning("Validierungsfehler: %s", err)
+        load_errors.extend(validation.errors)
+        for warn in validation.warnings:
+            log.debug("Validierungswarnung: %s", warn)
+
+        # 5. Templates kompilieren
+        compiled = {prompt_id: compile_prompt(manifest, domains, prompt_id)
+                    for prompt_id in manifest.get('prompts', {})}
+
+        return {
+            'system_manifest': self._system_manifest,
+            'user_manifest': self._user_manifest,
+            'system_registry': self._system_registry,
+            'user_registry': self._user_registry,
+            'domains': domains,
+            'load_errors': load_errors,
+            'compiled': compiled,
+            'validation': validation,
+        }
+
+    def _publish(self, snapshot: EngineSnapshot) -> None:
+        """Ersetzt den Snapshot atomar (nur unter self._lock aufrufen)."""
+        self._current = snapshot
+        self._ready.set()
+        with self._prompt_cache_lock:
+            self._prompt_cache.clear()
+
+    # ===== Snapshot-Views (read-only, für interne Aufrufer und Tests) =====
+
+    @property
+    def _manifest(self) -> Dict[str, Any]:
+        return self._snapshot.manifest
+
+    @property
+    def _domains(self) -> Dict[str, Any]:
+        return self._snapshot.domains
+
+    @property
+    def _registry(self) -> Dict[str, Any]:
+        return self._snapshot.registry
+
+    @property
+    def _resolver(self) -> Optional[PlaceholderResolver]:
+        return self._snapshot.resolver
+
+    @property
+    def _compiled(self) -> Dict[str, Dict[str, CompiledTemplate]]:
+        return self._snapshot.compiled
+
+    @property
+    def _user_prompt_ids(self) -> FrozenSet[str]:
+        return self._snapshot.user_prompt_ids
+
+    @property
+    def _user_placeholder_keys(self) -> FrozenSet[str]:
+        return self._snapshot.user_placeholder_keys
+
+    def _merge_manifests(self) -> tuple:
         """Merged System- und User-Manifest zu einem einheitlichen View.
 
         Merge-Strategie:
         - System-Prompts sind die Basis
         - User-Prompts werden dar\u00fcber gelegt
         - Bei ID-Kollision: User gewinnt (User-Anpassung hat Vorrang)
-        - self._user_prompt_ids wird f\u00fcr Write-Routing neu aufgebaut
+
+        Returns:
+            (merged_manifest, user_prompt_ids) – IDs f\u00fcr das Write-Routing
         """
         merged = {
             'version': self._system_manifest.get('version', '0'),
@@ -196,18 +397,18 @@ class PromptEngine:
             merged['prompts'][pid] = {**meta, 'source': meta.get('source', 'user')}
 
         # Tracking-Set f\u00fcr Write-Routing
-        self._user_prompt_ids = set(user_prompts.keys())
-
-        return merged
+        return merged, frozenset(user_prompts.keys())
 
-    def _merge_registries(self) -> Dict[str, Any]:
+    def _merge_registries(self) -> tuple:
         """Merged System- und User-Registry zu einem einheitlichen View.
 
         Merge-Strategie:
         - System-Placeholders sind die Basis
         - User-Placeholders werden darüber gelegt
         - Bei Key-Kollision: User gewinnt (User-Anpassung hat Vorrang)
-        - self._user_placeholder_keys wird für Write-Routing neu aufgebaut
+
+        Returns:
+            (merged_registry, user_placeholder_keys) – Keys für das Write-Routing
         """
         merged = {
             'version': self._system_registry.get('version', '2.0'),
@@ -227,9 +428,7 @@ class PromptEngine:
             merged['placeholders'][key] = {**meta, '_origin': 'user'}
 
         # Tracking set for write routing
-        self._user_placeholder_keys = set(user_phs.keys())
-
-        return merged
+        return merged, frozenset(user_phs.keys())
 
     def _is_user_placeholder(self, key: str) -> bool:
         """Prüft ob ein Placeholder der User-Registry gehört."""
@@ -239,9 +438,15 @@ class PromptEngine:
         """Pr\u00fcft ob ein Prompt dem User-Manifest geh\u00f6rt."""
         return prompt_id in self._user_prompt_ids
 
-    def _save_manifest_for_prompt(self, prompt_id: str) -> None:
-        """Speichert in das richtige Manifest basierend auf Prompt-Zugeh\u00f6rigkeit."""
-        meta = self._manifest.get('prompts', {}).get(prompt_id)
+    def _save_manifest_for_prompt(self, prompt_id: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """Speichert in das richtige Manifest basierend auf Prompt-Zugeh\u00f6rigkeit.
+
+        Args:
+            prompt_id: Prompt-ID
+            meta: Neue Metadaten (Default: Stand im aktuellen Snapshot)
+        """
+        if meta is None:
+            meta = self._manifest.get('prompts', {}).get(prompt_id)
         if not meta:
             return
 
@@ -255,12 +460,203 @@ class PromptEngine:
             self._system_manifest.setdefault('prompts', {})[prompt_id] = clean_meta
             self._loader.save_manifest(self._system_manifest)
 
+    def _indexed(self, view: str, key: Any) -> List[Dict[str, Any]]:
+        """Lookup in einem Manifest-View des aktuellen Snapshots."""
+        return self._snapshot.indexed(view, key)
+
+    def _build_variables(self, variant: str = 'default',
+                         runtime_vars: Optional[Dict[str, str]] = None,
+                         snapshot: Optional[EngineSnapshot] = None):
+        """Variablen-Map für einen Build (wird über alle Blöcke geteilt).
+
+        Lazy: Computed-Werte werden erst beim Rendern eines Slots berechnet
+        und innerhalb des Builds memoisiert.
+        """
+        resolver = (snapshot or self._snapshot).resolver
+        if not resolver:
+            return None
+        return resolver.lazy_values(variant, runtime_vars)
+
+    def get_placeholder_dependencies(self, variant: str = 'default') -> FrozenSet[str]:
+        """Placeholder, die von aktiven Prompts dieser Variante referenziert werden.
+
+        Vereinigung aus den Slots der kompilierten Templates, placeholders_used
+        der Domain-Dateien und requires_any. Gecached pro Variante und Snapshot.
+        """
+        return self._snapshot.placeholder_dependencies(variant)
+
+    # ===== System-Prompt Cache =====
+
+    def _prompt_fingerprint(self, variant: str, runtime_vars: Optional[Dict[str, str]],
+                            category_filter: Optional[str],
+                            snapshot: Optional[EngineSnapshot] = None) -> tuple:
+        """
+        Key eines System-Prompt Builds.
+
+        Bestandteile: Manifest-Version, Generation des Snapshots (Domain-Dateien,
+        Metadaten, Reihenfolge), Signaturen der Quelldateien für static/computed Werte,
+        Variante, Kategorie-Filter und die referenzierten Runtime-Variablen
+        (darunter die Cortex-Inhalte).
+        """
+        snap = snapshot or self._snapshot
+        relevant = snap.placeholder_dependencies(variant)
+        runtime_items = tuple(sorted(
+            (key, str(value)) for key, value in (runtime_vars or {}).items()
+            if key in relevant
+        ))
+        return (
+            snap.manifest.get('version'),
+            snap.generation,
+            snap.resolver.source_version(),
+            variant,
+            category_filter,
+            runtime_items,
+        )
+
+    def get_prompt_cache_stats(self) -> Dict[str, int]:
+        """Hit/Miss-Zähler des System-Prompt Cache."""
+        with self._prompt_cache_lock:
+            return {
+                'hits': self._prompt_cache_hits,
+                'misses': self._prompt_cache_misses,
+                'size': len(self._prompt_cache),
+                'max_size': self.PROMPT_CACHE_SIZE,
+            }
+
+    def clear_prompt_cache(self) -> None:
+        """Leert System-Prompt und Preview-Block Cache (Zähler bleiben erhalten)."""
+        with self._prompt_cache_lock:
+            self._prompt_cache.clear()
+            self._preview_cache.clear()
+
+    def get_resolve_stats(self, variant: str = 'default') -> Dict[str, Any]:
+        """Statistik der Lazy-Auswertung (für Editor-Info und Benchmarks)."""
+        if not self._resolver:
+            return {}
+        stats = self._resolver.get_stats()
+        computed = self._resolver.computed_keys()
+        dependencies = self.get_placeholder_dependencies(variant)
+        stats['computed_registered'] = len(computed)
+        stats['computed_unreferenced'] = sorted(computed - dependencies)
+        return stats
+
     def reload(self):
         """Re-lädt alle JSON-Dateien von Disk. Thread-safe via Lock."""
         log.info("PromptEngine: Reload gestartet")
         if self._resolver:
             self._resolver.invalidate_cache()
-        self._load_all()
+        self._load_all(use_cache=False)
+
+    def apply_file_changes(self, paths: List[str]) -> Dict[str, Any]:
+        """
+        Übernimmt extern geänderte Dateien (Aufruf durch PromptFileWatcher).
+
+        Änderungen unter prompts/_meta/ (Manifeste, Registries) betreffen alle
+        Prompts → vollständiger reload(). Sonst werden nur die geänderten
+        Domain-Dateien neu geladen (reload_domains).
+
+        Args:
+            paths: Geänderte, neue oder gelöschte Dateien (absolute Pfade)
+
+        Returns:
+            Ergebnis von reload_domains() bzw. {'full_reload': True, ...}
+        """
+        meta_dir = os.path.normcase(os.path.dirname(self._loader.manifest_path))
+        prompts_dir = os.path.dirname(meta_dir)
+        if any(os.path.normcase(os.path.dirname(p)) == meta_dir for p in paths):
+            if self._meta_files_changed():
+                self.reload()
+                return {'full_reload': True, 'reloaded': [], 'unchanged': [], 'errors': self.load_errors}
+
+        filenames = sorted({
+            os.path.basename(p) for p in paths
+            if os.path.normcase(os.path.dirname(p)) == prompts_dir
+        })
+        return self.reload_domains(filenames)
+
+    def _meta_files_changed(self) -> bool:
+        """True wenn Manifeste/Registries auf Disk vom geladenen Stand abweichen.
+
+        Filtert die eigenen Writes des Editors heraus (gleicher Inhalt).
+        """
+        with self._lock:
+            current = (
+                (self._loader.load_manifest, self._system_manifest),
+                (self._loader.load_user_manifest, self._user_manifest),
+                (self._loader.load_registry, self._system_registry),
+                (self._loader.load_user_registry, self._user_registry),
+            )
+            for load, loaded in current:
+                try:
+                    if load() != loaded:
+                        return True
+                except Exception:
+                    return True
+        return False
+
+    def reload_domains(self, filenames: List[str]) -> Dict[str, Any]:
+        """
+        Lädt einzelne Domain-Dateien neu und tauscht sie per Snapshot aus.
+
+        Nur die Prompts dieser Dateien werden validiert und neu kompiliert.
+        Laufende Builds arbeiten auf ihrem Snapshot weiter. Eine nicht lesbare
+        Datei behält ihren bisherigen Stand; Dateien ohne inhaltliche Änderung
+        (z.B. eigene Writes des Editors) erzeugen keinen neuen Snapshot.
+
+        Args:
+            filenames: Domain-Dateinamen relativ zu prompts/ (z.B. 'chat.json')
+
+        Returns:
+            {'full_reload': False, 'reloaded': [...], 'unchanged': [...], 'errors': [...]}
+        """
+        result: Dict[str, Any] = {'full_reload': False, 'reloaded': [], 'unchanged': [], 'errors': []}
+        with self._lock:
+            snap = self._snapshot
+            prompts_by_file: Dict[str, Dict[str, Any]] = {}
+            for prompt_id, meta in snap.manifest.get('prompts', {}).items():
+                prompts_by_file.setdefault(meta.get('domain_file', ''), {})[prompt_id] = meta
+
+            domains = dict(snap.domains)
+            changed_ids: List[str] = []
+            validation_errors: List[str] = []
+            for filename in filenames:
+                manifest_prompts = prompts_by_file.get(filename)
+                if not manifest_prompts:
+                    continue  # Nicht im Manifest referenziert (z.B. Temp-Datei)
+                try:
+                    domain_data = self._loader.load_domain_file(filename)
+                except Exception as e:
+                    result['errors'].append(f"Domain-Datei {filename}: {e}")
+                    log.warning("Hot-Reload: %s nicht geladen, alter Stand bleibt aktiv: %s", filename, e)
+                    continue
+
+                if domain_data == snap.domains.get(filename):
+                    result['unchanged'].append(filename)
+                    continue
+
+                validation_errors.extend(self._validator.validate_domain(domain_data, manifest_prompts))
+                for warning in self._validator.validate_placeholders(domain_data, snap.registry):
+                    log.debug("Validierungswarnung: %s", warning)
+                domains[filename] = domain_data
+                changed_ids.extend(manifest_prompts)
+                result['reloaded'].append(filename)
+
+            if not result['reloaded']:
+                return result
+
+            for err in validation_errors:
+                log.warning("Validierungsfehler: %s", err)
+            result['errors'].extend(validation_errors)
+
+            # Alte Fehler der neu geladenen Prompts/Dateien durch die neuen ersetzen
+            stale = tuple(f"Domain[{pid}]" for pid in changed_ids)
+            load_errors = [
+                err for err in snap.load_errors
+                if not err.startswith(stale) and not any(f in err for f in result['reloaded'])
+            ] + validation_errors
+
+            self._publish(snap.derive(domains=domains, changed=changed_ids, load_errors=load_errors))
+        return result
 
     @property
     def is_loaded(self) -> bool:
@@ -270,7 +666,12 @@ class PromptEngine:
     @property
     def load_errors(self) -> List[str]:
         """Gibt die Liste der Fehler beim Laden zurück."""
-        return self._load_errors.copy()
+        return list(self._snapshot.load_errors)
+
+    @property
+    def generation(self) -> int:
+        """Zähler des aktuellen Snapshots (steigt mit jeder Änderung)."""
+        return self._snapshot.generation
 
     # ===== Prompt-Zugriff =====
 
@@ -280,12 +681,17 @@ class PromptEngine:
 
     def get_prompt(self, prompt_id: str) -> Optional[Dict[str, Any]]:
         """Ein einzelner Prompt mit Content + Metadata."""
-        meta = self._manifest.get('prompts', {}).get(prompt_id)
+        return self._get_prompt_from(self._snapshot, prompt_id)
+
+    @staticmethod
+    def _get_prompt_from(snap: EngineSnapshot, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """{id, meta, content} eines Prompts aus einem Snapshot."""
+        meta = snap.manifest.get('prompts', {}).get(prompt_id)
         if not meta:
             return None
 
         domain_file = meta.get('domain_file', '')
-        domain_data = self._domains.get(domain_file, {})
+        domain_data = snap.domains.get(domain_file, {})
         content_data = domain_data.get(prompt_id, {})
 
         return {
@@ -303,46 +709,21 @@ class PromptEngine:
             category_filter: Optionaler Kategorie-Filter
 
         Returns:
-            Sortierte Liste von {id, meta, content} Dicts
+            Sortierte Liste von {id, meta, content} Dicts (aus dem Index,
+            Einträge nicht verändern)
         """
-        result = []
-        for prompt_id, meta in self._manifest.get('prompts', {}).items():
-            if meta.get('target') != target:
-                continue
-            if not meta.get('enabled', True):
-                continue
-            if category_filter and meta.get('category') != category_filter:
-                continue
-
-            domain_file = meta.get('domain_file', '')
-            domain_data = self._domains.get(domain_file, {})
-            content_data = domain_data.get(prompt_id, {})
-
-            result.append({
-                'id': prompt_id,
-                'meta': meta,
-                'content': content_data
-            })
-
-        # Sortiere nach order
-        result.sort(key=lambda x: x['meta'].get('order', 9999))
-        return result
+        result = self._indexed('target', target)
+        if category_filter:
+            return [p for p in result if p['meta'].get('category') == category_filter]
+        return list(result)
 
     def get_prompts_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Alle Prompts einer Kategorie."""
-        result = []
-        for prompt_id, meta in self._manifest.get('prompts', {}).items():
-            if meta.get('category') == category:
-                domain_file = meta.get('domain_file', '')
-                domain_data = self._domains.get(domain_file, {})
-                content_data = domain_data.get(prompt_id, {})
-                result.append({
-                    'id': prompt_id,
-                    'meta': meta,
-                    'content': content_data
-                })
-        result.sort(key=lambda x: x['meta'].get('order', 9999))
-        return result
+        return list(self._indexed('category', category))
+
+    def get_prompts_by_position(self, position: str) -> List[Dict[str, Any]]:
+        """Alle aktiven Prompts einer Position, sortiert nach order."""
+        return list(self._indexed('position', position))
 
     # ===== Placeholder-Zugriff =====
 
@@ -373,9 +754,55 @@ class PromptEngine:
 
         Returns:
             Der vollständige System-Prompt
+
+        Gecached (LRU) über _prompt_fingerprint(). Turn-volatile Placeholder
+        (Datum/Uhrzeit) stehen im Cache als Marker und werden bei jedem Aufruf
+        frisch eingesetzt. Der Snapshot wird einmal gelesen – Key und Inhalt
+        stammen immer aus demselben Stand.
         """
-        prompts = self.get_prompts_by_target('system_prompt', category_filter)
+        snap = self._snapshot
+        resolver = snap.resolver
+        if not resolver:
+            return self._render_system_prompt(variant, runtime_vars, category_filter, snapshot=snap)
+
+        key = self._prompt_fingerprint(variant, runtime_vars, category_filter, snap)
+        with self._prompt_cache_lock:
+            template = self._prompt_cache.get(key)
+            if template is not None:
+                self._prompt_cache.move_to_end(key)
+                self._prompt_cache_hits += 1
+            else:
+                self._prompt_cache_misses += 1
+
+        if template is None:
+            # Volatile Werte als Marker einsetzen (Runtime-Werte haben weiter Vorrang)
+            markers = {k: '\x00' + k + '\x00' for k in resolver.volatile_keys()}
+            variables = resolver.lazy_values(variant, {**markers, **(runtime_vars or {})})
+            text = self._render_system_prompt(variant, runtime_vars, category_filter, variables, snap)
+            template = CompiledTemplate(text, tuple(_VOLATILE_MARKER.split(text)))
+            with self._prompt_cache_lock:
+                self._prompt_cache[key] = template
+                while len(self._prompt_cache) > self.PROMPT_CACHE_SIZE:
+                    self._prompt_cache.popitem(last=False)
+
+        if not template.has_slots:
+            return template.source
+        return template.render(resolver.lazy_values(variant, runtime_vars))
+
+    def _render_system_prompt(self, variant: str = 'default',
+                              runtime_vars: Optional[Dict[str, str]] = None,
+                              category_filter: str = None,
+                              variables=None,
+                              snapshot: Optional[EngineSnapshot] = None,
+                              memo: Optional[Dict[str, str]] = None) -> str:
+        """Baut den System-Prompt ohne Cache (siehe build_system_prompt)."""
+        snap = snapshot or self._snapshot
+        prompts = snap.indexed('target', 'system_prompt')
+        if category_filter:
+            prompts = [p for p in prompts if p['meta'].get('category') == category_filter]
         parts: List[str] = []
+        if variables is None:
+            variables = self._build_variables(variant, runtime_vars, snap)
 
         # Kategorien die nur für spezifische Kontexte bestimmt sind
         # und NICHT in reguläre Chat-Prompts gehören
@@ -398,7 +825,7 @@ class PromptEngine:
             if not self._should_include_block(meta, runtime_vars, variant):
                 continue
 
-            content = self._resolve_prompt_content(prompt_data, variant, runtime_vars)
+            content = self._resolve_prompt_content(prompt_data, variant, runtime_vars, variables, snap, memo)
             if content:
                 parts.append(content)
 
@@ -407,19 +834,8 @@ class PromptEngine:
     def get_system_prompt_append(self, variant: str = 'default',
                                   runtime_vars: Optional[Dict[str, str]] = None) -> str:
         """Gibt den System-Prompt-Append zurück (z.B. Afterthought-Note)."""
-        prompts = self.get_prompts_by_target('system_prompt')
-        parts: List[str] = []
-
-        for prompt_data in prompts:
-            meta = prompt_data['meta']
-            if meta.get('position') != 'system_prompt_append':
-                continue
-
-            content = self._resolve_prompt_content(prompt_data, variant, runtime_vars)
-            if content:
-                parts.append(content)
-
-        return "\n\n".join(parts)
+        return self._render_position(self._snapshot, 'system_prompt_append', 'system_prompt',
+                                     variant, runtime_vars)
 
     def build_prefill(self, variant: str = 'default',
                       runtime_vars: Optional[Dict[str, str]] = None,
@@ -431,8 +847,17 @@ class PromptEngine:
             runtime_vars: Runtime-Variablen
             category_filter: Optionaler Kategorie-Filter (z.B. 'summary')
         """
-        prompts = self.get_prompts_by_target('prefill')
+        return self._render_prefill(self._snapshot, variant, runtime_vars, category_filter)
+
+    def _render_prefill(self, snap: EngineSnapshot, variant: str = 'default',
+                        runtime_vars: Optional[Dict[str, str]] = None,
+                        category_filter: str = None, variables=None,
+                        memo: Optional[Dict[str, str]] = None) -> str:
+        """Prefill aus einem Snapshot (siehe build_prefill)."""
+        prompts = snap.indexed('target', 'prefill')
         parts: List[str] = []
+        if variables is None and prompts:
+            variables = self._build_variables(variant, runtime_vars, snap)
 
         # Categories that are only intended for specific contexts
         # and do NOT belong in regular chat prefills
@@ -450,7 +875,7 @@ class PromptEngine:
             if category_filter and meta.get('category') != category_filter:
                 continue
 
-            content = self._resolve_prompt_content(prompt_data, variant, runtime_vars)
+            content = self._resolve_prompt_content(prompt_data, variant, runtime_vars, variables, snap, memo)
             if content:
                 parts.append(content)
 
@@ -459,15 +884,22 @@ class PromptEngine:
     def get_first_assistant_content(self, variant: str = 'default',
                                      runtime_vars: Optional[Dict[str, str]] = None) -> str:
         """Baut den Content für die erste Assistant-Message."""
-        prompts = self.get_prompts_by_target('message')
+        return self._render_position(self._snapshot, 'first_assistant', 'message',
+                                     variant, runtime_vars)
+
+    def _render_position(self, snap: EngineSnapshot, position: str, target: str,
+                         variant: str = 'default',
+                         runtime_vars: Optional[Dict[str, str]] = None,
+                         variables=None, memo: Optional[Dict[str, str]] = None) -> str:
+        """Alle aktiven Prompts einer Position (mit passendem target), verbunden."""
+        prompts = [p for p in snap.indexed('position', position)
+                   if p['meta'].get('target') == target]
         parts: List[str] = []
+        if variables is None and prompts:
+            variables = self._build_variables(variant, runtime_vars, snap)
 
         for prompt_data in prompts:
-            meta = prompt_data['meta']
-            if meta.get('position') != 'first_assistant':
-                continue
-
-            content = self._resolve_prompt_content(prompt_data, variant, runtime_vars)
+            content = self._resolve_prompt_content(prompt_data, variant, runtime_vars, variables, snap, memo)
             if content:
                 parts.append(content)
 
@@ -487,7 +919,7 @@ class PromptEngine:
         sequence: List[Dict[str, Any]] = []
 
         # Message-Prompts (first_assistant, history)
-        for prompt_data in self.get_prompts_by_target('message'):
+        for prompt_data in self._indexed('target', 'message'):
             meta = prompt_data['meta']
             position = meta.get('position', '')
             category = meta.get('category', '')
@@ -508,7 +940,7 @@ class PromptEngine:
                 })
 
         # Prefill-Prompts (kein Summary)
-        for prompt_data in self.get_prompts_by_target('prefill'):
+        for prompt_data in self._indexed('target', 'prefill'):
             meta = prompt_data['meta']
             category = meta.get('category', '')
 
@@ -541,12 +973,8 @@ class PromptEngine:
         """
         all_messages: List[Dict[str, str]] = []
 
-        for prompt_id, meta in sorted(
-            self._manifest.get('prompts', {}).items(),
-            key=lambda x: x[1].get('order', 9999)
-        ):
-            if meta.get('category') != 'dialog_injection':
-                continue
+        for prompt_data in self._indexed('category', 'dialog_injection'):
+            meta = prompt_data['meta']
             if not meta.get('enabled', True):
                 continue
             if meta.get('type') != 'multi_turn':
@@ -557,10 +985,7 @@ class PromptEngine:
             if variant_condition and variant_condition != variant:
                 continue
 
-            domain_file = meta.get('domain_file', '')
-            domain_data = self._domains.get(domain_file, {})
-            content_data = domain_data.get(prompt_id, {})
-            variants = content_data.get('variants', {})
+            variants = prompt_data['content'].get('variants', {})
 
             variant_data = variants.get(variant) or variants.get('default')
             if variant_data and 'messages' in variant_data:
@@ -581,11 +1006,12 @@ class PromptEngine:
         Returns:
             Aufgelöster Prompt-Text oder None
         """
-        prompt_data = self.get_prompt(prompt_id)
+        snap = self._snapshot
+        prompt_data = self._get_prompt_from(snap, prompt_id)
         if not prompt_data:
             return None
 
-        return self._resolve_prompt_content(prompt_data, variant, runtime_vars)
+        return self._resolve_prompt_content(prompt_data, variant, runtime_vars, snapshot=snap)
 
     def build_afterthought_inner_dialogue(self, variant: str = 'default',
                                            runtime_vars: Optional[Dict[str, str]] = None) -> Optional[str]:
@@ -618,15 +1044,27 @@ class PromptEngine:
 
     def _resolve_prompt_content(self, prompt_data: Dict[str, Any],
                                  variant: str = 'default',
-                                 runtime_vars: Optional[Dict[str, str]] = None) -> str:
+                                 runtime_vars: Optional[Dict[str, str]] = None,
+                                 variables: Optional[Dict[str, str]] = None,
+                                 snapshot: Optional[EngineSnapshot] = None,
+                                 memo: Optional[Dict[str, str]] = None) -> str:
         """
         Löst den Content eines Prompts auf (Variante + Placeholder).
 
         Logik:
         1. variant_condition prüfen (wenn gesetzt, muss Variante matchen)
         2. Variante wählen: erst spezifisch, dann 'default' Fallback
-        3. Placeholder auflösen
+        3. Placeholder auflösen (kompiliertes Template)
+
+        Args:
+            variables: Bereits aufgebaute Variablen-Map des laufenden Builds.
+                       Fehlt sie, wird sie nur bei Bedarf (Template mit Slots) gebaut.
+            snapshot: Snapshot des laufenden Builds (Default: aktueller)
+            memo: Bereits aufgelöste Inhalte {prompt_id: text} (preview_bundle)
         """
+        if memo is not None and prompt_data.get('id') in memo:
+            return memo[prompt_data['id']]
+
         meta = prompt_data.get('meta', {})
         content_data = prompt_data.get('content', {})
 
@@ -637,7 +1075,8 @@ class PromptEngine:
 
         # Select variant
         variants = content_data.get('variants', {})
-        variant_data = variants.get(variant) or variants.get('default')
+        variant_key = variant if variants.get(variant) else 'default'
+        variant_data = variants.get(variant_key)
         if not variant_data:
             return ''
 
@@ -655,8 +1094,15 @@ class PromptEngine:
             return ''
 
         # Resolve placeholders
-        if self._resolver:
-            resolved = self._resolver.resolve_text(raw_content, variant, runtime_vars)
+        snap = snapshot or self._snapshot
+        if snap.resolver:
+            template = snap.get_template(prompt_data.get('id', ''), variant_key, raw_content)
+            if template.has_slots:
+                if variables is None:
+                    variables = self._build_variables(variant, runtime_vars, snap)
+                resolved = template.render(variables)
+            else:
+                resolved = raw_content
             return self._clean_resolved_text(resolved)
         return raw_content
 
@@ -723,11 +1169,12 @@ class PromptEngine:
         Raises:
             KeyError: Prompt-ID nicht im Manifest
         """
-        prompt_data = self.get_prompt(prompt_id)
+        snap = self._snapshot
+        prompt_data = self._get_prompt_from(snap, prompt_id)
         if not prompt_data:
             raise KeyError(f"Prompt '{prompt_id}' nicht im Manifest gefunden")
 
-        return self._resolve_prompt_content(prompt_data, variant, runtime_vars)
+        return self._resolve_prompt_content(prompt_data, variant, runtime_vars, snapshot=snap)
 
     def get_domain_data(self, prompt_id: str) -> Dict[str, Any]:
         """
@@ -742,13 +1189,195 @@ class PromptEngine:
         Returns:
             Dict mit dem kompletten Domain-Inhalt für diesen Prompt
         """
-        meta = self._manifest.get('prompts', {}).get(prompt_id)
-        if not meta:
-            return {}
+        prompt_data = self.get_prompt(prompt_id)
+        return prompt_data['content'] if prompt_data else {}
 
-        domain_file = meta.get('domain_file', '')
-        domain_data = self._domains.get(domain_file, {})
-        return domain_data.get(prompt_id, {})
+    # ===== Suche (invertierter Index) =====
+
+    def search_prompts(self, query: str, fuzzy: bool = True,
+                       limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Durchsucht Name, ID, Beschreibung und Inhalt aller Prompts.
+
+        Jedes Wort der Anfrage muss als Wort-Präfix vorkommen (mit fuzzy
+        auch mit einem Tippfehler). Der Index wird bei Änderungen
+        inkrementell fortgeschrieben.
+
+        Returns:
+            [{id, name, category, match_type}] – Treffer in Name/ID/Beschreibung
+            ('name') vor Treffern im Inhalt ('content'), jeweils nach order
+        """
+        snap = self._snapshot
+        prompts = snap.manifest.get('prompts', {})
+        hits = sorted(
+            snap.search.search(query, fuzzy),
+            key=lambda hit: (hit[1] != 'name', prompts[hit[0]].get('order', 9999), hit[0]),
+        )
+        if limit is not None:
+            hits = hits[:limit]
+        return [{
+            'id': prompt_id,
+            'name': prompts[prompt_id].get('name', prompt_id),
+            'category': prompts[prompt_id].get('category', 'custom'),
+            'match_type': match_type,
+        } for prompt_id, match_type in hits]
+
+    def get_placeholder_usages(self) -> Dict[str, List[str]]:
+        """Placeholder → Prompt-IDs (nach order), für alle registrierten und alle verwendeten Keys."""
+        snap = self._snapshot
+        registry = snap.registry.get('placeholders', {})
+        used = snap.search.used_placeholders()
+        keys = list(registry) + sorted(set(used) - set(registry))
+        return {key: self._sorted_by_order(snap, used.get(key, ())) for key in keys}
+
+    def get_prompts_using_placeholder(self, key: str) -> List[str]:
+        """Prompt-IDs, deren Inhalt {{key}} referenziert (nach order)."""
+        snap = self._snapshot
+        return self._sorted_by_order(snap, snap.search.placeholder_usages(key))
+
+    @staticmethod
+    def _sorted_by_order(snap: EngineSnapshot, prompt_ids: Iterable[str]) -> List[str]:
+        prompts = snap.manifest.get('prompts', {})
+        return sorted(prompt_ids, key=lambda pid: (prompts[pid].get('order', 9999), pid))
+
+    # ===== Editor-Preview =====
+
+    def preview_bundle(self, variant: str = 'default',
+                       prompt_ids: Optional[List[str]] = None,
+                       runtime_vars: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Alle Preview-Daten des Editors in einem Durchlauf.
+
+        Ein Snapshot und eine Variablen-Map für alle Blöcke und Abschnitte.
+        Aufgelöste Blöcke werden über Template-Text und referenzierte Werte
+        gecached – zwischen zwei Tastendrücken wird nur neu gerendert, was
+        sich geändert hat.
+
+        Args:
+            variant: Variante (default/experimental)
+            prompt_ids: Blöcke, die zurückgegeben werden (None = alle)
+            runtime_vars: Runtime-Variablen
+
+        Returns:
+            {
+                'variant': str,
+                'blocks': [{id, name, category, target, position, order, enabled,
+                            variant_condition, type, content, tokens_est}, ...],
+                'system_prompt', 'system_prompt_append', 'prefill', 'first_assistant': str,
+                'tokens_est': {Abschnitt: int, 'blocks': int},
+                'cache': {'hits': int, 'misses': int},
+            }
+        """
+        snap = self._snapshot
+        variables = self._build_variables(variant, runtime_vars, snap)
+        stats = {'hits': 0, 'misses': 0}
+
+        # Aufgelöster Inhalt aller Prompts (Basis für Blöcke und Abschnitte)
+        memo: Dict[str, str] = {}
+        for prompt_id in snap.manifest.get('prompts', {}):
+            prompt_data = self._get_prompt_from(snap, prompt_id)
+            memo[prompt_id] = self._preview_block_content(
+                snap, prompt_data, variant, runtime_vars, variables, stats)
+
+        sections = {
+            'system_prompt': self._render_system_prompt(variant, runtime_vars, None, variables, snap, memo),
+            'system_prompt_append': self._render_position(
+                snap, 'system_prompt_append', 'system_prompt', variant, runtime_vars, variables, memo),
+            'prefill': self._render_prefill(snap, variant, runtime_vars, None, variables, memo),
+            'first_assistant': self._render_position(
+                snap, 'first_assistant', 'message', variant, runtime_vars, variables, memo),
+        }
+
+        wanted = None if prompt_ids is None else set(prompt_ids)
+        entries = sorted(snap.manifest.get('prompts', {}).items(),
+                         key=lambda x: x[1].get('order', 9999))
+        blocks: List[Dict[str, Any]] = []
+        for prompt_id, meta in entries:
+            if wanted is not None and prompt_id not in wanted:
+                continue
+            prompt_type = meta.get('type', 'text')
+            if prompt_type == 'multi_turn':
+                content = self._format_multi_turn(self._get_prompt_from(snap, prompt_id), variant)
+            else:
+                content = memo.get(prompt_id, '')
+            blocks.append({
+                'id': prompt_id,
+                'name': meta.get('name', prompt_id),
+                'category': meta.get('category', ''),
+                'target': meta.get('target', ''),
+                'position': meta.get('position', ''),
+                'order': meta.get('order', 9999),
+                'enabled': meta.get('enabled', True),
+                'variant_condition': meta.get('variant_condition'),
+                'type': prompt_type,
+                'content': content,
+                'tokens_est': self.estimate_tokens(content),
+            })
+
+        tokens = {name: self.estimate_tokens(text) for name, text in sections.items()}
+        tokens['blocks'] = sum(block['tokens_est'] for block in blocks)
+        return {
+            'variant': variant,
+            'blocks': blocks,
+            **sections,
+            'tokens_est': tokens,
+            'cache': stats,
+        }
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Grobe Token-Schätzung (~4 Zeichen pro Token)."""
+        return len(text) // 4 if text else 0
+
+    def _preview_block_content(self, snap: EngineSnapshot, prompt_data: Dict[str, Any],
+                               variant: str, runtime_vars: Optional[Dict[str, str]],
+                               variables, stats: Dict[str, int]) -> str:
+        """Aufgelöster Inhalt eines Blocks, gecached über Template + referenzierte Werte."""
+        meta = prompt_data.get('meta', {})
+        variants = prompt_data.get('content', {}).get('variants', {})
+        variant_key = variant if variants.get(variant) else 'default'
+        raw_content = (variants.get(variant_key) or {}).get('content', '')
+        variant_condition = meta.get('variant_condition')
+        if (not raw_content or meta.get('type', 'text') == 'multi_turn' or variables is None
+                or (variant_condition and variant_condition != variant)):
+            return self._resolve_prompt_content(prompt_data, variant, runtime_vars, variables, snap)
+
+        template = snap.get_template(prompt_data['id'], variant_key, raw_content)
+        values = tuple((key, variables.get(key)) for key in sorted(template.placeholders))
+        key = (prompt_data['id'], variant, template.source, values)
+        with self._prompt_cache_lock:
+            content = self._preview_cache.get(key)
+            if content is not None:
+                self._preview_cache.move_to_end(key)
+                stats['hits'] += 1
+                return content
+
+        stats['misses'] += 1
+        content = self._resolve_prompt_content(prompt_data, variant, runtime_vars, variables, snap)
+        with self._prompt_cache_lock:
+            self._preview_cache[key] = content
+            while len(self._preview_cache) > self.PREVIEW_CACHE_SIZE:
+                self._preview_cache.popitem(last=False)
+        return content
+
+    @staticmethod
+    def _format_multi_turn(prompt_data: Optional[Dict[str, Any]], variant: str) -> str:
+        """Multi-Turn Prompt als lesbarer Text ([ROLE]: content) für die Preview."""
+        if not prompt_data:
+            return ''
+        meta = prompt_data.get('meta', {})
+        variant_condition = meta.get('variant_condition')
+        if variant_condition and variant_condition != variant:
+            return ''
+
+        variants = prompt_data.get('content', {}).get('variants', {})
+        variant_data = variants.get(variant) or variants.get('default')
+        if not variant_data or 'messages' not in variant_data:
+            return ''
+        return '\n\n'.join(
+            f"[{msg.get('role', 'user').upper()}]: {msg.get('content', '')}"
+            for msg in variant_data['messages']
+        )
 
     # ===== Mutation (für Editor) =====
 
@@ -756,25 +1385,29 @@ class PromptEngine:
         """Speichert einen Prompt (Content + Metadata). Atomarer Write."""
         with self._lock:
             try:
-                meta = self._manifest.get('prompts', {}).get(prompt_id)
+                snap = self._snapshot
+                meta = snap.manifest.get('prompts', {}).get(prompt_id)
                 if not meta:
                     log.error("Prompt '%s' nicht im Manifest gefunden", prompt_id)
                     return False
 
                 domain_file = meta.get('domain_file', '')
-                domain_data = self._domains.get(domain_file, {})
+                domains = snap.domains
+                manifest = snap.manifest
 
                 # Content aktualisieren
                 if 'content' in data:
-                    domain_data[prompt_id] = data['content']
+                    domain_data = {**domains.get(domain_file, {}), prompt_id: data['content']}
                     self._loader.save_domain_file(domain_file, domain_data)
-                    self._domains[domain_file] = domain_data
+                    domains = {**domains, domain_file: domain_data}
 
                 # Metadata aktualisieren
                 if 'meta' in data:
-                    self._manifest['prompts'][prompt_id].update(data['meta'])
-                    self._save_manifest_for_prompt(prompt_id)
+                    new_meta = {**meta, **data['meta']}
+                    self._save_manifest_for_prompt(prompt_id, new_meta)
+                    manifest = self._with_prompt_meta(manifest, {prompt_id: new_meta})
 
+                self._publish(snap.derive(manifest, domains, changed=(prompt_id,)))
                 return True
             except Exception as e:
                 log.error("Fehler beim Speichern von Prompt '%s': %s", prompt_id, e)
@@ -784,12 +1417,13 @@ class PromptEngine:
         """Erstellt einen neuen Prompt, gibt ID zurück. Immer im User-Manifest."""
         with self._lock:
             try:
+                snap = self._snapshot
                 prompt_id = data.get('id')
                 if not prompt_id:
                     log.error("Neue Prompt-ID fehlt")
                     return None
 
-                if prompt_id in self._manifest.get('prompts', {}):
+                if prompt_id in snap.manifest.get('prompts', {}):
                     log.error("Prompt-ID '%s' existiert bereits", prompt_id)
                     return None
 
@@ -802,20 +1436,23 @@ class PromptEngine:
                 # Neue Prompts gehen IMMER ins User-Manifest
                 clean_meta = {k: v for k, v in meta.items() if k != 'source'}
                 self._user_manifest.setdefault('prompts', {})[prompt_id] = clean_meta
-                self._user_prompt_ids.add(prompt_id)
                 self._loader.save_user_manifest(self._user_manifest)
 
                 # Merged View aktualisieren
-                self._manifest.setdefault('prompts', {})[prompt_id] = {**meta, 'source': 'user'}
+                manifest = self._with_prompt_meta(snap.manifest, {prompt_id: {**meta, 'source': 'user'}})
 
                 # Domain-Datei aktualisieren
+                domains = snap.domains
                 domain_file = meta.get('domain_file', '')
                 if domain_file:
-                    domain_data = self._domains.get(domain_file, {})
-                    domain_data[prompt_id] = data.get('content', {})
+                    domain_data = {**domains.get(domain_file, {}), prompt_id: data.get('content', {})}
                     self._loader.save_domain_file(domain_file, domain_data)
-                    self._domains[domain_file] = domain_data
+                    domains = {**domains, domain_file: domain_data}
 
+                self._publish(snap.derive(
+                    manifest, domains, changed=(prompt_id,),
+                    user_prompt_ids=snap.user_prompt_ids | {prompt_id},
+                ))
                 return prompt_id
             except Exception as e:
                 log.error("Fehler beim Erstellen von Prompt: %s", e)
@@ -825,38 +1462,45 @@ class PromptEngine:
         """Löscht einen Prompt aus Manifest + Domain-Datei."""
         with self._lock:
             try:
-                meta = self._manifest.get('prompts', {}).get(prompt_id)
+                snap = self._snapshot
+                meta = snap.manifest.get('prompts', {}).get(prompt_id)
                 if not meta:
                     return False
 
                 # System prompts cannot be deleted (only disabled)
-                if not self._is_user_prompt(prompt_id):
+                if prompt_id not in snap.user_prompt_ids:
                     log.warning("System-Prompt '%s' kann nicht gelöscht werden "
                                 "(nur deaktivieren möglich)", prompt_id)
                     return False
 
-                # Aus merged View entfernen
-                self._manifest.get('prompts', {}).pop(prompt_id, None)
-
                 # Aus User-Manifest entfernen
                 self._user_manifest.get('prompts', {}).pop(prompt_id, None)
-                self._user_prompt_ids.discard(prompt_id)
                 self._loader.save_user_manifest(self._user_manifest)
 
+                # Aus merged View entfernen
+                prompts = {k: v for k, v in snap.manifest.get('prompts', {}).items() if k != prompt_id}
+                manifest = {**snap.manifest, 'prompts': prompts}
+
                 # Clean up domain file
+                domains = snap.domains
                 domain_file = meta.get('domain_file', '')
-                if domain_file and domain_file in self._domains:
-                    self._domains[domain_file].pop(prompt_id, None)
-                    remaining = self._domains[domain_file]
+                if domain_file and domain_file in domains:
+                    remaining = {k: v for k, v in domains[domain_file].items() if k != prompt_id}
+                    domains = dict(domains)
                     if not remaining:
                         # Domain file is now empty – remove from disk and cache
                         domain_path = os.path.join(self._instructions_dir, 'prompts', domain_file)
                         if os.path.isfile(domain_path):
                             os.remove(domain_path)
-                        del self._domains[domain_file]
+                        del domains[domain_file]
                     else:
                         self._loader.save_domain_file(domain_file, remaining)
+                        domains[domain_file] = remaining
 
+                self._publish(snap.derive(
+                    manifest, domains, changed=(prompt_id,),
+                    user_prompt_ids=snap.user_prompt_ids - {prompt_id},
+                ))
                 return True
             except Exception as e:
                 log.error("Fehler beim Löschen von Prompt '%s': %s", prompt_id, e)
@@ -866,23 +1510,28 @@ class PromptEngine:
         """Aktualisiert die Order-Werte. {prompt_id: new_order}."""
         with self._lock:
             try:
+                snap = self._snapshot
                 system_changed = False
                 user_changed = False
+                changed_metas: Dict[str, Dict[str, Any]] = {}
 
                 for prompt_id, order_val in new_order.items():
-                    if prompt_id in self._manifest.get('prompts', {}):
-                        self._manifest['prompts'][prompt_id]['order'] = order_val
-                        if self._is_user_prompt(prompt_id):
-                            self._user_manifest['prompts'][prompt_id]['order'] = order_val
-                            user_changed = True
-                        elif prompt_id in self._system_manifest.get('prompts', {}):
-                            self._system_manifest['prompts'][prompt_id]['order'] = order_val
-                            system_changed = True
+                    meta = snap.manifest.get('prompts', {}).get(prompt_id)
+                    if meta is None:
+                        continue
+                    changed_metas[prompt_id] = {**meta, 'order': order_val}
+                    if prompt_id in snap.user_prompt_ids:
+                        self._user_manifest['prompts'][prompt_id]['order'] = order_val
+                        user_changed = True
+                    elif prompt_id in self._system_manifest.get('prompts', {}):
+                        self._system_manifest['prompts'][prompt_id]['order'] = order_val
+                        system_changed = True
 
                 if system_changed:
                     self._loader.save_manifest(self._system_manifest)
                 if user_changed:
                     self._loader.save_user_manifest(self._user_manifest)
+                self._publish(snap.derive(self._with_prompt_meta(snap.manifest, changed_metas)))
                 return True
             except Exception as e:
                 log.error("Fehler beim Reorder: %s", e)
@@ -892,24 +1541,32 @@ class PromptEngine:
         """Aktualisiert die placeholders_used-Liste in der Domain-Datei."""
         with self._lock:
             try:
-                meta = self._manifest.get('prompts', {}).get(prompt_id)
+                snap = self._snapshot
+                meta = snap.manifest.get('prompts', {}).get(prompt_id)
                 if not meta:
                     log.error("Prompt '%s' nicht im Manifest gefunden", prompt_id)
                     return False
 
                 domain_file = meta.get('domain_file', '')
-                domain_data = self._domains.get(domain_file, {})
-                prompt_data = domain_data.get(prompt_id, {})
+                domain_data = snap.domains.get(domain_file, {})
+                prompt_data = {**domain_data.get(prompt_id, {}),
+                               'placeholders_used': sorted(set(placeholders))}
 
-                prompt_data['placeholders_used'] = sorted(set(placeholders))
-                domain_data[prompt_id] = prompt_data
+                domain_data = {**domain_data, prompt_id: prompt_data}
                 self._loader.save_domain_file(domain_file, domain_data)
-                self._domains[domain_file] = domain_data
+                domains = {**snap.domains, domain_file: domain_data}
+                self._publish(snap.derive(domains=domains, changed=(prompt_id,)))
                 return True
             except Exception as e:
                 log.error("Fehler beim Update von placeholders_used für '%s': %s", prompt_id, e)
                 return False
 
+    @staticmethod
+    def _with_prompt_meta(manifest: Dict[str, Any],
+                          metas: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Kopie des Manifests mit ersetzten Prompt-Metadaten (Copy-on-Write)."""
+        return {**manifest, 'prompts': {**manifest.get('prompts', {}), **metas}}
+
     def toggle_prompt(self, prompt_id: str, enabled: bool) -> bool:
         """Aktiviert/Deaktiviert einen Prompt."""
         return self.save_prompt(prompt_id, {'meta': {'enabled': enabled}})
@@ -921,31 +1578,32 @@ class PromptEngine:
             key: Placeholder-Key (snake_case)
             data: Dict mit name, description, default, category
         """
-        try:
-            # Check if key already exists (in merged registry)
-            if key in self._registry.get('placeholders', {}):
-                log.error("Placeholder '%s' existiert bereits", key)
-                return False
+        with self._lock:
+            try:
+                # Check if key already exists (in merged registry)
+                if key in self._registry.get('placeholders', {}):
+                    log.error("Placeholder '%s' existiert bereits", key)
+                    return False
 
-            # In User-Registry speichern
-            user_placeholders = self._user_registry.setdefault('placeholders', {})
-            user_placeholders[key] = {
-                'name': data.get('name', key),
-                'description': data.get('description', ''),
-                'source': 'static',
-                'type': 'string',
-                'default': data.get('default', ''),
-                'category': data.get('category', 'custom'),
-                'resolve_phase': 'static',
-            }
+                # In User-Registry speichern
+                user_placeholders = self._user_registry.setdefault('placeholders', {})
+                user_placeholders[key] = {
+                    'name': data.get('name', key),
+                    'description': data.get('description', ''),
+                    'source': 'static',
+                    'type': 'string',
+                    'default': data.get('default', ''),
+                    'category': data.get('category', 'custom'),
+                    'resolve_phase': 'static',
+                }
 
-            self._loader.save_user_registry(self._user_registry)
-            self.reload()
-            log.info("Placeholder '%s' in User-Registry erstellt", key)
-            return True
-        except Exception as e:
-            log.error("Fehler beim Erstellen von Placeholder '%s': %s", key, e)
-            return False
+                self._loader.save_user_registry(self._user_registry)
+                self.reload()
+                log.info("Placeholder '%s' in User-Registry erstellt", key)
+                return True
+            except Exception as e:
+                log.error("Fehler beim Erstellen von Placeholder '%s': %s", key, e)
+                return False
 
     def delete_placeholder(self, key: str) -> bool:
         """Löscht einen Placeholder aus der Registry.
@@ -953,39 +1611,40 @@ class PromptEngine:
         Args:
             key: Placeholder-Key
         """
-        try:
-            # Check if exists (in merged registry)
-            placeholders = self._registry.get('placeholders', {})
-            if key not in placeholders:
-                log.error("Placeholder '%s' nicht gefunden", key)
-                return False
+        with self._lock:
+            try:
+                # Check if exists (in merged registry)
+                placeholders = self._registry.get('placeholders', {})
+                if key not in placeholders:
+                    log.error("Placeholder '%s' nicht gefunden", key)
+                    return False
 
-            # Only static/custom placeholders may be deleted
-            ph = placeholders[key]
-            if ph.get('source') not in ('static', 'custom', 'user'):
-                log.error("Placeholder '%s' has source='%s', only static/custom/user can be deleted",
-                          key, ph.get('source'))
-                return False
+                # Only static/custom placeholders may be deleted
+                ph = placeholders[key]
+                if ph.get('source') not in ('static', 'custom', 'user'):
+                    log.error("Placeholder '%s' has source='%s', only static/custom/user can be deleted",
+                              key, ph.get('source'))
+                    return False
 
-            # Delete from the correct registry
-            if self._is_user_placeholder(key):
-                user_placeholders = self._user_registry.get('placeholders', {})
-                if key in user_placeholders:
-                    del user_placeholders[key]
-                self._loader.save_user_registry(self._user_registry)
-                log.info("Placeholder '%s' aus User-Registry gelöscht", key)
-            else:
-                system_placeholders = self._system_registry.get('placeholders', {})
-                if key in system_placeholders:
-                    del system_placeholders[key]
-                self._loader.save_registry(self._system_registry)
-                log.info("Placeholder '%s' aus System-Registry gelöscht", key)
+                # Delete from the correct registry
+                if self._is_user_placeholder(key):
+                    user_placeholders = self._user_registry.get('placeholders', {})
+                    if key in user_placeholders:
+                        del user_placeholders[key]
+                    self._loader.save_user_registry(self._user_registry)
+                    log.info("Placeholder '%s' aus User-Registry gelöscht", key)
+                else:
+                    system_placeholders = self._system_registry.get('placeholders', {})
+                    if key in system_placeholders:
+                        del system_placeholders[key]
+                    self._loader.save_registry(self._system_registry)
+                    log.info("Placeholder '%s' aus System-Registry gelöscht", key)
 
-            self.reload()
-            return True
-        except Exception as e:
-            log.error("Fehler beim Löschen von Placeholder '%s': %s", key, e)
-            return False
+                self.reload()
+                return True
+            except Exception as e:
+                log.error("Fehler beim Löschen von Placeholder '%s': %s", key, e)
+                return False
 
     # ===== Validierung =====
 
@@ -1006,8 +1665,32 @@ class PromptEngine:
         return errors
 
     def validate_all(self) -> Dict[str, List[str]]:
-        """Validiert alle Prompts + Placeholder-Verknüpfungen."""
-        return self._validator.validate_all(self._manifest, self._domains, self._registry)
+        """Validiert alle Prompts + Placeholder-Verknüpfungen (gecachter Validierungsgraph)."""
+        graph = self._snapshot.validation
+        return {'errors': graph.errors, 'warnings': graph.warnings}
+
+    def get_validation_results(self, prompt_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Validierungsergebnisse pro Knoten.
+
+        Args:
+            prompt_id: Nur Ergebnis dieses Prompts (Manifest + Domain-Eintrag)
+
+        Returns:
+            {'nodes': {node_id: {errors, warnings}}, 'error_count', 'warning_count',
+             'node_count', 'revalidated'} bzw. {errors, warnings} für prompt_id
+             (None wenn unbekannt)
+        """
+        graph = self._snapshot.validation
+        if prompt_id is not None:
+            return graph.prompt_result(prompt_id)
+        return {
+            'nodes': graph.nodes(),
+            'error_count': len(graph.errors),
+            'warning_count': len(graph.warnings),
+            'node_count': len(graph),
+            'revalidated': graph.revalidated,
+        }
 
     def invalidate_cache(self):
         """Leert den Placeholder-Cache (z.B. bei Persona-Wechsel)."""
@@ -1024,7 +1707,11 @@ class PromptEngine:
         - _meta/user_manifest.json (User-Manifest, wenn vorhanden)
         - _meta/placeholder_registry.json
         - prompts/*.json (alle Domain-Dateien)
-        - metadata.json (Export-Datum, Version, Prompt-Count)
+        - metadata.json (Export-Datum, Version, Prompt-Count, SHA-256 je Datei)
+
+        Die Dateien werden blockweise ins Archiv kopiert, ohne den Engine-Lock
+        zu halten. Ändert ein Schreibvorgang während des Exports den Stand,
+        wird der Export wiederholt (EXPORT_ATTEMPTS).
 
         Args:
             output_path: Zielpfad für das ZIP-Archiv
@@ -1035,60 +1722,62 @@ class PromptEngine:
         Raises:
             IOError: Wenn das Archiv nicht erstellt werden kann
         """
-        with self._lock:
-            # Sicherstellen dass Zielverzeichnis existiert
-            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                # System-Manifest
-                manifest_path = self._loader.manifest_path
-                if os.path.exists(manifest_path):
-                    zf.write(manifest_path, '_meta/prompt_manifest.json')
+        prompts_dir = os.path.join(self._instructions_dir, 'prompts')
+        for attempt in range(1, self.EXPORT_ATTEMPTS + 1):
+            # Kurz synchronisieren: kein Schreibvorgang ist gerade halb fertig
+            with self._lock:
+                snap = self._snapshot
+
+            files = [
+                (self._loader.manifest_path, '_meta/prompt_manifest.json'),
+                (self._loader.user_manifest_path, '_meta/user_manifest.json'),
+                (self._loader.registry_path, '_meta/placeholder_registry.json'),
+            ]
+            if os.path.isdir(prompts_dir):
+                for filename in sorted(os.listdir(prompts_dir)):
+                    filepath = os.path.join(prompts_dir, filename)
+                    if filename.endswith('.json') and os.path.isfile(filepath):
+                        files.append((filepath, f'prompts/{filename}'))
+
+            metadata = {
+                'export_date': datetime.now().isoformat(),
+                'version': snap.manifest.get('version', 'unknown'),
+                'prompt_count': len(snap.manifest.get('prompts', {})),
+                'domain_files': sorted(snap.domains.keys()),
+                'placeholder_count': len(snap.registry.get('placeholders', {})),
+            }
+            write_archive(output_path, files, metadata)
 
-                # User-Manifest (wenn vorhanden)
-                user_manifest_path = self._loader.user_manifest_path
-                if os.path.exists(user_manifest_path):
-                    zf.write(user_manifest_path, '_meta/user_manifest.json')
-
-                # Registry
-                registry_path = self._loader.registry_path
-                if os.path.exists(registry_path):
-                    zf.write(registry_path, '_meta/placeholder_registry.json')
-
-                # Domain-Dateien
-                prompts_dir = os.path.join(self._instructions_dir, 'prompts')
-                if os.path.isdir(prompts_dir):
-                    for filename in os.listdir(prompts_dir):
-                        if filename.endswith('.json'):
-                            filepath = os.path.join(prompts_dir, filename)
-                            if os.path.isfile(filepath):
-                                zf.write(filepath, f'prompts/{filename}')
-
-                # Metadata
-                metadata = {
-                    'export_date': datetime.now().isoformat(),
-                    'version': self._manifest.get('version', 'unknown'),
-                    'prompt_count': len(self._manifest.get('prompts', {})),
-                    'domain_files': sorted(self._domains.keys()),
-                    'placeholder_count': len(self._registry.get('placeholders', {})),
-                }
-                zf.writestr('metadata.json', json.dumps(metadata, ensure_ascii=False, indent=2))
+            with self._lock:
+                if self._snapshot is snap:
+                    break
+            log.debug("Prompt-Set Export: Stand während des Exports geändert (Versuch %d)", attempt)
+        else:
+            log.warning("Prompt-Set Export: Stand hat sich bei jedem Versuch geändert – letzter Export bleibt")
 
-            log.info("Prompt-Set exportiert nach: %s", output_path)
-            return output_path
+        log.info("Prompt-Set exportiert nach: %s", output_path)
+        return output_path
 
-    def import_prompt_set(self, zip_path: str, merge_mode: str = 'replace') -> Dict[str, Any]:
+    def import_prompt_set(self, zip_path: str, merge_mode: str = 'replace',
+                          dry_run: bool = False) -> Dict[str, Any]:
         """Importiert ein Prompt-Set aus einem ZIP-Archiv.
 
+        Dateien, deren Inhalt (SHA-256) mit der lokalen Datei übereinstimmt,
+        werden nicht neu geschrieben. Geänderte Dateien werden zuerst als
+        Temp-Dateien abgelegt; nur das Einsetzen (os.replace) und das
+        Nachladen laufen unter dem Engine-Lock.
+
         Args:
             zip_path: Pfad zum ZIP-Archiv
             merge_mode: Import-Modus:
                 - 'replace': Komplett ersetzen (Factory-Reset-Stil)
                 - 'merge': Fehlende ergänzen, bestehende behalten
                 - 'overwrite': Fehlende ergänzen, bestehende überschreiben
+            dry_run: Nur den Diff berechnen, nichts schreiben
 
         Returns:
-            Dict mit {imported: int, skipped: int, errors: list}
+            Dict mit {imported: int, skipped: int, unchanged: int, errors: list,
+            dry_run: bool, changes: {added, changed, unchanged, skipped, removed}}
 
         Raises:
             FileNotFoundError: Wenn ZIP nicht existiert
@@ -1100,138 +1789,65 @@ class PromptEngine:
         if not os.path.exists(zip_path):
             raise FileNotFoundError(f"ZIP-Datei nicht gefunden: {zip_path}")
 
-        result: Dict[str, Any] = {'imported': 0, 'skipped': 0, 'errors': []}
-
-        with self._lock:
-            try:
-                with zipfile.ZipFile(zip_path, 'r') as zf:
-                    # Validierung: Manifest muss enthalten sein
-                    names = zf.namelist()
-                    if '_meta/prompt_manifest.json' not in names:
-                        result['errors'].append("ZIP enthält kein _meta/prompt_manifest.json")
-                        return result
-
-                    if merge_mode == 'replace':
-                        result = self._import_replace(zf)
-                    elif merge_mode == 'merge':
-                        result = self._import_merge(zf, overwrite=False)
-                    elif merge_mode == 'overwrite':
-                        result = self._import_merge(zf, overwrite=True)
-
-                # Neu laden nach Import
-                self.reload()
-                log.info("Prompt-Set importiert (Modus: %s): %d importiert, %d übersprungen, %d Fehler",
-                         merge_mode, result['imported'], result['skipped'], len(result['errors']))
-            except zipfile.BadZipFile:
-                result['errors'].append("Datei ist kein gültiges ZIP-Archiv")
-            except Exception as e:
-                result['errors'].append(f"Import-Fehler: {e}")
-                log.error("Import fehlgeschlagen: %s", e)
-
-        return result
-
-    def _import_replace(self, zf: zipfile.ZipFile) -> Dict[str, Any]:
-        """Import-Modus 'replace': Ersetzt alles komplett."""
-        result: Dict[str, Any] = {'imported': 0, 'skipped': 0, 'errors': []}
-
-        # System-Manifest ersetzen
+        result: Dict[str, Any] = {'imported': 0, 'skipped': 0, 'unchanged': 0, 'errors': [],
+                                  'dry_run': dry_run, 'changes': {}}
+        staged = []
         try:
-            manifest_data = zf.read('_meta/prompt_manifest.json')
-            json.loads(manifest_data)  # Validierung
-            with open(self._loader.manifest_path, 'wb') as f:
-                f.write(manifest_data)
-            result['imported'] += 1
-        except Exception as e:
-            result['errors'].append(f"Manifest: {e}")
-
-        # User-Manifest ersetzen (wenn im ZIP vorhanden)
-        if '_meta/user_manifest.json' in zf.namelist():
-            try:
-                user_data = zf.read('_meta/user_manifest.json')
-                json.loads(user_data)  # Validierung
-                with open(self._loader.user_manifest_path, 'wb') as f:
-                    f.write(user_data)
-                result['imported'] += 1
-            except Exception as e:
-                result['errors'].append(f"User-Manifest: {e}")
-        else:
-            # No user manifest in ZIP → delete existing one
-            if os.path.isfile(self._loader.user_manifest_path):
-                try:
-                    os.remove(self._loader.user_manifest_path)
-                except Exception as e:
-                    result['errors'].append(f"User-Manifest löschen: {e}")
-
-        # Registry ersetzen (wenn vorhanden)
-        if '_meta/placeholder_registry.json' in zf.namelist():
-            try:
-                registry_data = zf.read('_meta/placeholder_registry.json')
-                json.loads(registry_data)  # Validierung
-                with open(self._loader.registry_path, 'wb') as f:
-                    f.write(registry_data)
-                result['imported'] += 1
-            except Exception as e:
-                result['errors'].append(f"Registry: {e}")
-
-        # Domain-Dateien ersetzen
-        prompts_dir = os.path.join(self._instructions_dir, 'prompts')
-        os.makedirs(prompts_dir, exist_ok=True)
+            with zipfile.ZipFile(zip_path, 'r') as zf:
+                # Validierung: Manifest muss enthalten sein
+                if '_meta/prompt_manifest.json' not in zf.namelist():
+                    result['errors'].append("ZIP enthält kein _meta/prompt_manifest.json")
+                    return result
+
+                # 'replace': User-Manifest ohne Gegenstück im ZIP wird gelöscht
+                plan = plan_import(
+                    zf, self._import_target, self._file_digests,
+                    overwrite=merge_mode != 'merge',
+                    remove=[self._loader.user_manifest_path] if merge_mode == 'replace' else (),
+                )
 
-        for name in zf.namelist():
-            if name.startswith('prompts/') and name.endswith('.json'):
-                filename = os.path.basename(name)
-                if not filename or filename.startswith('_'):
-                    continue
-                try:
-                    data = zf.read(name)
-                    json.loads(data)  # Validierung
-                    filepath = os.path.join(prompts_dir, filename)
-                    with open(filepath, 'wb') as f:
-                        f.write(data)
-                    result['imported'] += 1
-                except Exception as e:
-                    result['errors'].append(f"Domain {filename}: {e}")
+            changes = summarize_plan(plan)
+            result['errors'].extend(plan['errors'])
+            result['changes'] = changes
+            result['skipped'] = len(changes['skipped'])
+            result['unchanged'] = len(changes['unchanged'])
+            if dry_run:
+                result['imported'] = len(changes['added']) + len(changes['changed'])
+                return result
+
+            staged = stage_import(plan)
+            changed_paths = [target for _, target in staged] + [
+                entry['target'] for entry in plan['entries'] if entry['change'] == 'removed']
+            with self._lock:
+                result['errors'].extend(commit_import(plan, staged))
+                result['imported'] = len(staged)
+                if changed_paths:
+                    self.apply_file_changes(changed_paths)
+            log.info("Prompt-Set importiert (Modus: %s): %d importiert, %d unverändert, "
+                     "%d übersprungen, %d Fehler", merge_mode, result['imported'],
+                     result['unchanged'], result['skipped'], len(result['errors']))
+        except zipfile.BadZipFile:
+            result['errors'].append("Datei ist kein gültiges ZIP-Archiv")
+        except Exception as e:
+            discard_staged(staged)
+            result['errors'].append(f"Import-Fehler: {e}")
+            log.error("Import fehlgeschlagen: %s", e)
 
         return result
 
-    def _import_merge(self, zf: zipfile.ZipFile, overwrite: bool = False) -> Dict[str, Any]:
-        """Import mode 'merge'/'overwrite': Adds missing, optionally overwrites existing."""
-        result: Dict[str, Any] = {'imported': 0, 'skipped': 0, 'errors': []}
-        prompts_dir = os.path.join(self._instructions_dir, 'prompts')
-
-        for name in zf.namelist():
-            if name == 'metadata.json':
-                continue
-
-            if name == '_meta/prompt_manifest.json':
-                target = self._loader.manifest_path
-            elif name == '_meta/user_manifest.json':
-                target = self._loader.user_manifest_path
-            elif name == '_meta/placeholder_registry.json':
-                target = self._loader.registry_path
-            elif name.startswith('prompts/') and name.endswith('.json'):
-                filename = os.path.basename(name)
-                if not filename or filename.startswith('_'):
-                    continue
-                target = os.path.join(prompts_dir, filename)
-            else:
-                continue
-
-            if os.path.exists(target) and not overwrite:
-                result['skipped'] += 1
-                continue
-
-            try:
-                data = zf.read(name)
-                json.loads(data)  # Validierung
-                os.makedirs(os.path.dirname(target), exist_ok=True)
-                with open(target, 'wb') as f:
-                    f.write(data)
-                result['imported'] += 1
-            except Exception as e:
-                result['errors'].append(f"{name}: {e}")
-
-        return result
+    def _import_target(self, name: str) -> Optional[str]:
+        """Lokaler Zielpfad für einen Eintrag im Import-Archiv (None = ignorieren)."""
+        if name == '_meta/prompt_manifest.json':
+            return self._loader.manifest_path
+        if name == '_meta/user_manifest.json':
+            return self._loader.user_manifest_path
+        if name == '_meta/placeholder_registry.json':
+            return self._loader.registry_path
+        if name.startswith('prompts/') and name.endswith('.json'):
+            filename = os.path.basename(name)
+            if filename and not filename.startswith('_'):
+                return os.path.join(self._instructions_dir, 'prompts', filename)
+        return None
 
     def factory_reset(self, scope: str = 'system') -> Dict[str, Any]:
         """Setzt Prompts auf Factory-Defaults zurück.
@@ -1319,54 +1935,58 @@ class PromptEngine:
         Returns:
             True bei Erfolg
         """
-        try:
-            meta = self._manifest.get('prompts', {}).get(prompt_id)
-            if not meta:
-                log.error("Prompt '%s' nicht im Manifest", prompt_id)
-                return False
-
-            # User prompts have no default → delete completely
-            if self._is_user_prompt(prompt_id):
-                log.info("User-Prompt '%s' hat kein Default – wird gelöscht", prompt_id)
-                return self.delete_prompt(prompt_id)
+        with self._lock:
+            try:
+                snap = self._snapshot
+                meta = snap.manifest.get('prompts', {}).get(prompt_id)
+                if not meta:
+                    log.error("Prompt '%s' nicht im Manifest", prompt_id)
+                    return False
 
-            domain_file = meta.get('domain_file', '')
-            defaults_path = os.path.join(self._instructions_dir, 'prompts', '_defaults', domain_file)
+                # User prompts have no default → delete completely
+                if prompt_id in snap.user_prompt_ids:
+                    log.info("User-Prompt '%s' hat kein Default – wird gelöscht", prompt_id)
+                    return self.delete_prompt(prompt_id)
 
-            if not os.path.exists(defaults_path):
-                log.error("Default-Datei nicht gefunden: %s", defaults_path)
-                return False
+                domain_file = meta.get('domain_file', '')
+                defaults_path = os.path.join(self._instructions_dir, 'prompts', '_defaults', domain_file)
 
-            with open(defaults_path, 'r', encoding='utf-8') as f:
-                defaults_domain = json.load(f)
+                if not os.path.exists(defaults_path):
+                    log.error("Default-Datei nicht gefunden: %s", defaults_path)
+                    return False
 
-            if prompt_id not in defaults_domain:
-                log.error("Prompt '%s' nicht in _defaults enthalten", prompt_id)
-                return False
+                with open(defaults_path, 'r', encoding='utf-8') as f:
+                    defaults_domain = json.load(f)
 
-            # Nur diesen Prompt in der Domain-Datei ersetzen
-            domain_data = self._domains.get(domain_file, {})
-            domain_data[prompt_id] = defaults_domain[prompt_id]
-            self._loader.save_domain_file(domain_file, domain_data)
-            self._domains[domain_file] = domain_data
-
-            # Also reset manifest metadata to default
-            defaults_meta_path = os.path.join(
-                self._instructions_dir, 'prompts', '_defaults', '_meta', 'prompt_manifest.json')
-            if os.path.exists(defaults_meta_path):
-                with open(defaults_meta_path, 'r', encoding='utf-8') as f:
-                    defaults_manifest = json.load(f)
-                default_meta = defaults_manifest.get('prompts', {}).get(prompt_id)
-                if default_meta:
-                    self._system_manifest['prompts'][prompt_id] = default_meta
-                    self._loader.save_manifest(self._system_manifest)
-                    self._manifest['prompts'][prompt_id] = {**default_meta, 'source': 'system'}
+                if prompt_id not in defaults_domain:
+                    log.error("Prompt '%s' nicht in _defaults enthalten", prompt_id)
+                    return False
 
-            log.info("Prompt '%s' auf Factory-Default zurückgesetzt", prompt_id)
-            return True
-        except Exception as e:
-            log.error("reset_prompt_to_default fehlgeschlagen: %s", e)
-            return False
+                # Nur diesen Prompt in der Domain-Datei ersetzen
+                domain_data = {**snap.domains.get(domain_file, {}), prompt_id: defaults_domain[prompt_id]}
+                self._loader.save_domain_file(domain_file, domain_data)
+                domains = {**snap.domains, domain_file: domain_data}
+
+                # Also reset manifest metadata to default
+                manifest = snap.manifest
+                defaults_meta_path = os.path.join(
+                    self._instructions_dir, 'prompts', '_defaults', '_meta', 'prompt_manifest.json')
+                if os.path.exists(defaults_meta_path):
+                    with open(defaults_meta_path, 'r', encoding='utf-8') as f:
+                        defaults_manifest = json.load(f)
+                    default_meta = defaults_manifest.get('prompts', {}).get(prompt_id)
+                    if default_meta:
+                        self._system_manifest['prompts'][prompt_id] = default_meta
+                        self._loader.save_manifest(self._system_manifest)
+                        manifest = self._with_prompt_meta(
+                            manifest, {prompt_id: {**default_meta, 'source': 'system'}})
+
+                self._publish(snap.derive(manifest, domains, changed=(prompt_id,)))
+                log.info("Prompt '%s' auf Factory-Default zurückgesetzt", prompt_id)
+                return True
+            except Exception as e:
+                log.error("reset_prompt_to_default fehlgeschlagen: %s", e)
+                return False
 
     # ===== Startup-Validierung & Recovery =====
 
@@ -0,0 +1,103 @@
+"""
+File Value Cache – Geparste Quelldateien, versioniert über die Datei-Signatur.
+
+Jede Datei wird höchstens einmal pro Änderung gelesen und geparst. Die
+Signatur (mtime_ns, size) aus os.stat() entscheidet, ob der gecachte Wert
+noch gültig ist – manuelle Invalidierung ist nicht nötig.
+
+Usage:
+    cache = FileValueCache()
+    config = cache.load('/pfad/persona_config.json')   # dict oder None
+    key = cache.signatures([path_a, path_b])           # Versions-Key für abgeleitete Werte
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from ..logger import log
+
+
+Signature = Optional[Tuple[int, int]]
+
+
+def _load_json(path: str) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FileValueCache:
+    """Cache für geparste Dateien, Key: (path, mtime_ns, size). Thread-safe."""
+
+    def __init__(self, parser: Callable[[str], Any] = _load_json):
+        self._parser = parser
+        self._entries: Dict[str, Tuple[Signature, Any]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._parses = 0
+
+    @staticmethod
+    def signature(path: str) -> Signature:
+        """(mtime_ns, size) der Datei oder None wenn sie fehlt."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def signatures(self, paths: Iterable[str]) -> Tuple[Signature, ...]:
+        """Kombinierte Signatur mehrerer Dateien (Versions-Key für abgeleitete Werte)."""
+        return tuple(self.signature(p) for p in paths)
+
+    def load(self, path: str) -> Any:
+        """
+        Gibt den geparsten Inhalt zurück, parst nur bei geänderter Signatur.
+
+        Returns:
+            Geparster Inhalt oder None (Datei fehlt oder ist nicht lesbar)
+        """
+        sig = self.signature(path)
+        if sig is None:
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == sig:
+                self._hits += 1
+                return entry[1]
+
+        try:
+            value = self._parser(path)
+        except Exception as e:
+            log.debug("Datei '%s' nicht lesbar: %s", path, e)
+            value = None
+
+        with self._lock:
+            self._parses += 1
+            self._entries[path] = (sig, value)
+        return value
+
+    def prime(self, path: str, value: Any) -> None:
+        """
+        Write-Through: hinterlegt einen gerade geschriebenen Wert unter der
+        aktuellen Signatur, der nächste load() liest die Datei nicht erneut.
+        """
+        sig = self.signature(path)
+        with self._lock:
+            if sig is None:
+                self._entries.pop(path, None)
+            else:
+                self._entries[path] = (sig, value)
+
+    def clear(self) -> None:
+        """Entfernt alle Einträge (beim nächsten Zugriff wird neu geparst)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Treffer, Parse-Vorgänge und Anzahl gecachter Dateien."""
+        with self._lock:
+            return {'hits': self._hits, 'parses': self._parses, 'files': len(self._entries)}
@@ -0,0 +1,108 @@
+"""
+Load Cache – Vorvalidierter Ladezustand der PromptEngine als Pickle-Datei.
+
+Ein Kaltstart liest Manifeste, Registries und alle Domain-Dateien, validiert
+und kompiliert sie. Das Ergebnis wird in einer einzigen Datei abgelegt, deren
+Key aus den Signaturen (mtime_ns, size) aller Quelldateien besteht. Beim
+nächsten Start reicht ein Vergleich der Signaturen und ein pickle.load().
+
+Jede Änderung an einer Quelldatei (Editor, Hot-Reload, manuelle Edits)
+ändert den Key – der Cache wird dann ignoriert und beim nächsten Kaltstart
+neu geschrieben. Fehlerhafte oder veraltete Cache-Dateien werden ignoriert.
+
+Usage:
+    cache = EngineLoadCache(cache_path, [prompts_dir, meta_dir])
+    key = cache.source_key()
+    state = cache.load(key)            # dict oder None
+    cache.store(key, state)
+"""
+
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .file_cache import FileValueCache
+from ..logger import log
+
+
+class EngineLoadCache:
+    """Pickle-Cache für den geladenen Engine-Zustand, Key: Signaturen der Quelldateien."""
+
+    # Erhöhen, wenn sich das Format des gespeicherten Zustands ändert
+    FORMAT_VERSION = 2
+
+    def __init__(self, cache_path: str, source_dirs: Iterable[str]):
+        """
+        Args:
+            cache_path: Pfad der Cache-Datei
+            source_dirs: Verzeichnisse, deren *.json Dateien den Key bilden
+        """
+        self._cache_path = cache_path
+        self._source_dirs = tuple(source_dirs)
+
+    @property
+    def cache_path(self) -> str:
+        return self._cache_path
+
+    def source_key(self) -> Tuple[Any, ...]:
+        """Format-Version + (Pfad, Signatur) aller Quelldateien, sortiert."""
+        entries = []
+        for directory in self._source_dirs:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith('.json'):
+                    path = os.path.join(directory, name)
+                    entries.append((path, FileValueCache.signature(path)))
+        return (self.FORMAT_VERSION, tuple(sorted(entries)))
+
+    def load(self, key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Gespeicherter Zustand, wenn er zum Key passt.
+
+        Returns:
+            State-Dict oder None (fehlt, veraltet oder nicht lesbar)
+        """
+        try:
+            with open(self._cache_path, 'rb') as f:
+                stored_key, state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.debug("Engine-Load-Cache nicht lesbar (%s): %s", self._cache_path, e)
+            return None
+        if stored_key != key:
+            return None
+        return state
+
+    def store(self, key: Tuple[Any, ...], state: Dict[str, Any]) -> bool:
+        """Schreibt den Zustand atomar (temp-file → os.replace). True bei Erfolg."""
+        dir_path = os.path.dirname(self._cache_path)
+        tmp_path = None
+        try:
+            os.makedirs(dir_path, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                mode='wb', suffix='.tmp', dir=dir_path, delete=False
+            ) as tmp:
+                pickle.dump((key, state), tmp, protocol=pickle.HIGHEST_PROTOCOL)
+                tmp_path = tmp.name
+            os.replace(tmp_path, self._cache_path)
+            return True
+        except Exception as e:
+            log.warning("Engine-Load-Cache konnte nicht geschrieben werden: %s", e)
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return False
+
+    def clear(self) -> None:
+        """Entfernt die Cache-Datei."""
+        try:
+            os.remove(self._cache_path)
+        except OSError:
+            pass
@@ -13,6 +13,7 @@ deaktiviert nur diese Domain, nicht das ganze System.
 import os
 import json
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple, List
 from ..logger import log
 
@@ -116,12 +117,14 @@ class PromptLoader:
         filepath = os.path.join(self._prompts_dir, filename)
         return self._load_json(filepath, filename)
 
-    def load_all_domains(self, manifest: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    def load_all_domains(self, manifest: Dict[str, Any],
+                         max_workers: int = 1) -> Tuple[Dict[str, Any], List[str]]:
         """
         Lädt alle Domain-Dateien die im Manifest referenziert werden.
 
         Args:
             manifest: Das geladene Manifest
+            max_workers: Threads für paralleles Lesen (1 = sequentiell)
 
         Returns:
             Tuple von (domain_data_dict, error_list)
@@ -138,23 +141,38 @@ class PromptLoader:
             if domain_file:
                 domain_files.add(domain_file)
 
-        # Lade jede Domain-Datei
-        for filename in sorted(domain_files):
-            try:
-                domains[filename] = self.load_domain_file(filename)
+        filenames = sorted(domain_files)
+        if max_workers > 1 and len(filenames) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(filenames)),
+                                    thread_name_prefix='prompt-load') as pool:
+                results = list(pool.map(self._try_load_domain_file, filenames))
+        else:
+            results = [self._try_load_domain_file(filename) for filename in filenames]
+
+        # Ergebnisse in fester Reihenfolge übernehmen
+        for filename, (data, error) in zip(filenames, results):
+            if error is None:
+                domains[filename] = data
                 log.debug("Domain-Datei geladen: %s", filename)
-            except FileNotFoundError:
+            elif isinstance(error, FileNotFoundError):
                 errors.append(f"Domain-Datei nicht gefunden: {filename}")
                 log.warning("Domain-Datei nicht gefunden: %s", filename)
-            except json.JSONDecodeError as e:
-                errors.append(f"Domain-Datei ungültig: {filename} ({e})")
-                log.error("JSON-Fehler in %s: %s", filename, e)
-            except Exception as e:
-                errors.append(f"Fehler beim Laden von {filename}: {e}")
-                log.error("Unerwarteter Fehler beim Laden von %s: %s", filename, e)
+            elif isinstance(error, json.JSONDecodeError):
+                errors.append(f"Domain-Datei ungültig: {filename} ({error})")
+                log.error("JSON-Fehler in %s: %s", filename, error)
+            else:
+                errors.append(f"Fehler beim Laden von {filename}: {error}")
+                log.error("Unerwarteter Fehler beim Laden von %s: %s", filename, error)
 
         return domains, errors
 
+    def _try_load_domain_file(self, filename: str) -> Tuple[Any, Any]:
+        """(Daten, None) oder (None, Exception) – für das parallele Laden."""
+        try:
+            return self.load_domain_file(filename), None
+        except Exception as e:
+            return None, e
+
     def _load_json(self, filepath: str, name: str) -> Dict[str, Any]:
         """Lädt eine JSON-Datei mit Fehlerbehandlung."""
         if not os.path.exists(filepath):
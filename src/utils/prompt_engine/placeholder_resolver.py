@@ -2,21 +2,123 @@
 Placeholder Resolver – Löst {{placeholder}} in Prompt-Texten auf.
 
 Drei Resolution-Phasen:
-1. Static:   persona_config + user_profile Werte (gecached)
+1. Static:   persona_config + user_profile Werte (gecached, versioniert über
+             die Datei-Signatur der Quelldateien → automatische Invalidierung)
 2. Computed:  Dynamisch berechnete Werte (current_date, char_description, etc.)
 3. Runtime:   Vom Aufrufer übergebene Werte (elapsed_time, inner_dialogue, etc.)
 
 Placeholder-Syntax: {{key}} (doppelte geschweifte Klammern)
 Unbekannte Placeholder bleiben als {{key}} stehen (kein Crash).
+
+Prompt-Texte werden einmalig zu CompiledTemplate kompiliert (Literal-Text +
+Slot-Referenzen), das Rendern ist danach ein einfaches Join ohne Regex.
+Beim Build werden Werte über LazyVariables nur bei Bedarf berechnet.
 """
 
 import re
 import os
 import json
-from typing import Dict, Any, Optional
+import threading
+from collections.abc import Mapping
+from typing import Dict, Any, FrozenSet, Iterator, List, Optional, Tuple
+from .file_cache import FileValueCache
 from ..logger import log
 
 
+class CompiledTemplate:
+    """
+    Vorkompilierter Prompt-Text.
+
+    segments ist das Ergebnis von PATTERN.split(): gerade Indizes sind
+    Literal-Text, ungerade Indizes Placeholder-Keys (Slots).
+    """
+
+    __slots__ = ('source', 'segments', 'placeholders')
+
+    def __init__(self, source: str, segments: Tuple[str, ...]):
+        self.source = source
+        self.segments = segments
+        self.placeholders: FrozenSet[str] = frozenset(segments[1::2])
+
+    @property
+    def has_slots(self) -> bool:
+        return len(self.segments) > 1
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """Setzt die Werte in die Slots ein. Unbekannte Keys bleiben als {{key}} stehen."""
+        if len(self.segments) == 1:
+            return self.segments[0]
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            key = parts[i]
+            if key in variables:
+                parts[i] = str(variables[key])
+            else:
+                parts[i] = '{{' + key + '}}'
+        return ''.join(parts)
+
+
+class LazyVariables(Mapping):
+    """
+    Variablen-Map eines Builds, deren Werte erst beim Zugriff entstehen.
+
+    Gleiche Semantik wie _build_variables() (runtime > computed > static),
+    aber Compute-Functions laufen nur für tatsächlich gerenderte Slots und
+    höchstens einmal pro Build.
+    """
+
+    def __init__(self, resolver: 'PlaceholderResolver', variant: str = 'default',
+                 runtime_vars: Optional[Dict[str, str]] = None):
+        self._resolver = resolver
+        self._variant = variant
+        self._runtime = runtime_vars or {}
+        self._computed: Dict[str, str] = {}
+        self._static: Optional[Dict[str, str]] = None
+        resolver._record_build()
+
+    def __getitem__(self, key: str) -> str:
+        if key in self._runtime:
+            return self._runtime[key]
+        if key in self._computed:
+            return self._computed[key]
+        meta = self._resolver._registry.get(key)
+        if meta is None:
+            raise KeyError(key)
+        phase = meta.get('resolve_phase')
+        if phase == 'computed' and meta.get('compute_function'):
+            value = self._resolver._compute_value(key, meta)
+            self._computed[key] = value
+            self._resolver._record_evaluated()
+            return value
+        if phase == 'static':
+            if self._static is None:
+                self._static = self._resolver._resolve_static()
+            return self._static[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._runtime:
+            return True
+        meta = self._resolver._registry.get(key)
+        if meta is None:
+            return False
+        phase = meta.get('resolve_phase')
+        return phase == 'static' or (phase == 'computed' and bool(meta.get('compute_function')))
+
+    def __iter__(self) -> Iterator[str]:
+        keys = [k for k in self._resolver._registry if k in self]
+        keys.extend(k for k in self._runtime if k not in self._resolver._registry)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    @property
+    def evaluated(self) -> FrozenSet[str]:
+        """Computed-Placeholder, die in diesem Build berechnet wurden."""
+        return frozenset(self._computed)
+
+
 class PlaceholderResolver:
     """Löst {{placeholder}} in Text auf. Drei Phasen: static → computed → runtime."""
 
@@ -31,8 +133,11 @@ class PlaceholderResolver:
         self._registry = registry_data.get('placeholders', {})
         self._instructions_dir = instructions_dir
         self._static_cache: Dict[str, str] = {}
-        self._char_data_cache = None
+        self._static_version = None
+        self._files = FileValueCache()
         self._compute_functions: Dict[str, callable] = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {'builds': 0, 'computed_evaluated': 0}
 
         # Compute-Functions registrieren
         self._register_compute_functions()
@@ -79,17 +184,74 @@ class PlaceholderResolver:
         if not text:
             return text
 
-        variables = self._build_variables(variant, runtime_vars)
-        return self.PATTERN.sub(
-            lambda m: str(variables.get(m.group(1), '{{' + m.group(1) + '}}')),
-            text
-        )
+        template = self.compile(text)
+        if not template.has_slots:
+            return text
+        return template.render(self._build_variables(variant, runtime_vars))
+
+    @classmethod
+    def compile(cls, text: str) -> CompiledTemplate:
+        """Zerlegt einen Text in Literal-Segmente und Placeholder-Slots."""
+        return CompiledTemplate(text, tuple(cls.PATTERN.split(text or '')))
 
     def get_all_values(self, variant: str = 'default',
                        runtime_vars: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """Gibt alle aufgelösten Placeholder-Werte zurück."""
         return self._build_variables(variant, runtime_vars)
 
+    def lazy_values(self, variant: str = 'default',
+                    runtime_vars: Optional[Dict[str, str]] = None) -> LazyVariables:
+        """Variablen-Map für einen Build: Werte werden erst beim Rendern berechnet."""
+        return LazyVariables(self, variant, runtime_vars)
+
+    def computed_keys(self) -> FrozenSet[str]:
+        """Alle Placeholder mit Compute-Function."""
+        return frozenset(
+            key for key, meta in self._registry.items()
+            if meta.get('resolve_phase') == 'computed' and meta.get('compute_function')
+        )
+
+    def volatile_keys(self) -> FrozenSet[str]:
+        """Computed-Placeholder, die sich von Turn zu Turn ändern (Zeit-Kontext).
+
+        Registry-Einträge können sich zusätzlich per 'volatile': true markieren.
+        """
+        return frozenset(
+            key for key, meta in self._registry.items()
+            if meta.get('resolve_phase') == 'computed' and (
+                meta.get('volatile')
+                or meta.get('compute_function', '').startswith('get_time_context.')
+            )
+        )
+
+    def source_version(self) -> Tuple:
+        """Signaturen aller Dateien, aus denen static + computed Werte entstehen."""
+        paths = self._static_source_paths()
+        try:
+            paths = paths + self._char_source_paths()
+        except Exception:
+            pass
+        return self._files.signatures(paths)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Zähler der Lazy-Auswertung: Builds, berechnete und übersprungene Compute-Aufrufe."""
+        with self._stats_lock:
+            builds = self._stats['builds']
+            evaluated = self._stats['computed_evaluated']
+        return {
+            'builds': builds,
+            'computed_evaluated': evaluated,
+            'computed_skipped': builds * len(self.computed_keys()) - evaluated,
+        }
+
+    def _record_build(self) -> None:
+        with self._stats_lock:
+            self._stats['builds'] += 1
+
+    def _record_evaluated(self) -> None:
+        with self._stats_lock:
+            self._stats['computed_evaluated'] += 1
+
     def _build_variables(self, variant: str = 'default',
                          runtime_vars: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """Sammelt alle Werte: static → computed → runtime."""
@@ -108,8 +270,9 @@ class PlaceholderResolver:
         return variables
 
     def _resolve_static(self) -> Dict[str, str]:
-        """Phase 1: Lädt persona_config + user_profile Werte (gecached)."""
-        if self._static_cache:
+        """Phase 1: Lädt persona_config + user_profile Werte (gecached bis sich eine Quelldatei ändert)."""
+        version = self._files.signatures(self._static_source_paths())
+        if self._static_cache and self._static_version == version:
             return self._static_cache.copy()
 
         values: Dict[str, str] = {}
@@ -144,6 +307,7 @@ class PlaceholderResolver:
                 values[key] = str(raw) if raw is not None else ''
 
         self._static_cache = values
+        self._static_version = version
         return values.copy()
 
     def _resolve_computed(self, variant: str = 'default') -> Dict[str, str]:
@@ -154,27 +318,35 @@ class PlaceholderResolver:
             if meta.get('resolve_phase') != 'computed':
                 continue
 
-            compute_fn_name = meta.get('compute_function', '')
-            if not compute_fn_name:
+            if not meta.get('compute_function', ''):
                 continue
 
-            compute_fn = self._compute_functions.get(compute_fn_name)
-            if compute_fn:
-                try:
-                    result = compute_fn()
-                    values[key] = str(result) if result is not None else ''
-                except Exception as e:
-                    log.warning("Compute-Function '%s' fehlgeschlagen: %s", compute_fn_name, e)
-                    values[key] = str(meta.get('default', ''))
-            else:
-                values[key] = str(meta.get('default', ''))
+            values[key] = self._compute_value(key, meta)
 
         return values
 
+    def _compute_value(self, key: str, meta: Dict[str, Any]) -> str:
+        """Berechnet einen einzelnen computed Placeholder (Default bei Fehler)."""
+        compute_fn_name = meta.get('compute_function', '')
+        compute_fn = self._compute_functions.get(compute_fn_name)
+        if not compute_fn:
+            return str(meta.get('default', ''))
+        try:
+            result = compute_fn()
+            return str(result) if result is not None else ''
+        except Exception as e:
+            log.warning("Compute-Function '%s' fehlgeschlagen: %s", compute_fn_name, e)
+            return str(meta.get('default', ''))
+
     def invalidate_cache(self):
-        """Cache leeren (bei Config-Wechsel oder Persona-Wechsel)."""
+        """Cache leeren.
+
+        Nicht mehr nötig bei Persona- oder Profil-Wechsel (Caches sind über die
+        Datei-Signaturen versioniert), erzwingt aber ein vollständiges Neu-Parsen.
+        """
         self._static_cache = {}
-        self._char_data_cache = None
+        self._static_version = None
+        self._files.clear()
 
     def get_registry(self) -> Dict[str, Any]:
         """Gibt die Placeholder-Registry zurück (für Editor/Validierung)."""
@@ -182,16 +354,28 @@ class PlaceholderResolver:
 
     # ===== Datenquellen =====
 
+    def _persona_config_path(self) -> str:
+        return os.path.join(self._instructions_dir, 'personas', 'active', 'persona_config.json')
+
+    def _user_profile_path(self) -> str:
+        """user_profile.json unter src/settings/ (Fallback: relativ zu instructions/)."""
+        src_dir = os.path.dirname(os.path.dirname(self._instructions_dir))
+        profile_path = os.path.join(src_dir, 'settings', 'user_profile.json')
+        if not os.path.exists(profile_path):
+            profile_path = os.path.join(os.path.dirname(self._instructions_dir), 'settings', 'user_profile.json')
+        return profile_path
+
+    def _static_source_paths(self) -> List[str]:
+        """Dateien, aus denen die Static-Phase liest (Versions-Key des Static-Cache)."""
+        return [self._persona_config_path(), self._user_profile_path()]
+
     def _get_from_persona_config(self, source_path: str) -> Any:
         """Liest einen Wert aus der aktiven persona_config.json."""
         try:
-            config_path = os.path.join(self._instructions_dir, 'personas', 'active', 'persona_config.json')
-            if not os.path.exists(config_path):
+            config = self._files.load(self._persona_config_path())
+            if config is None:
                 return None
 
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
             # Pfad navigieren: "persona_settings.name" → config["persona_settings"]["name"]
             parts = source_path.split('.')
             value = config
@@ -208,17 +392,10 @@ class PlaceholderResolver:
     def _get_from_user_profile(self, source_path: str) -> Any:
         """Liest einen Wert aus user_profile.json."""
         try:
-            src_dir = os.path.dirname(os.path.dirname(self._instructions_dir))
-            profile_path = os.path.join(src_dir, 'settings', 'user_profile.json')
-            if not os.path.exists(profile_path):
-                # Fallback: Look relative to instructions_dir's parent
-                profile_path = os.path.join(os.path.dirname(self._instructions_dir), 'settings', 'user_profile.json')
-            if not os.path.exists(profile_path):
+            profile = self._files.load(self._user_profile_path())
+            if not isinstance(profile, dict):
                 return None
 
-            with open(profile_path, 'r', encoding='utf-8') as f:
-                profile = json.load(f)
-
             return profile.get(source_path)
         except Exception as e:
             log.debug("User-Profile Wert '%s' nicht lesbar: %s", source_path, e)
@@ -226,17 +403,23 @@ class PlaceholderResolver:
 
     # ===== Compute-Functions =====
 
+    def _char_source_paths(self) -> List[str]:
+        """Dateien, aus denen build_character_description() liest."""
+        from ..config import get_config_path, ACTIVE_PERSONA_FILE
+        return [
+            get_config_path(ACTIVE_PERSONA_FILE),
+            get_config_path('instructions/personas/spec/persona_spec.json'),
+            get_config_path('instructions/personas/spec/custom_spec/custom_spec.json'),
+        ]
+
     def _get_char_data(self) -> Dict[str, Any]:
-        """Cached: Ruft build_character_description() einmal auf und gibt das Dict zurück."""
-        if self._char_data_cache is not None:
-            return self._char_data_cache
+        """char_data aus config.build_character_description() (dort pro Datei-Version memoisiert)."""
         try:
             from ..config import build_character_description
-            self._char_data_cache = build_character_description()
+            return build_character_description()
         except Exception as e:
             log.warning("char_data konnte nicht berechnet werden: %s", e)
-            self._char_data_cache = {}
-        return self._char_data_cache
+            return {}
 
     def _compute_char_description(self) -> str:
         """Baut die char_description über config.build_character_description()."""
@@ -0,0 +1,265 @@
+"""
+Search Index – Invertierter Index für Prompt-Suche und Placeholder-Verwendung.
+
+Pro Prompt werden Tokens aus Name/ID/Beschreibung ('meta') und aus allen
+Varianten-Texten ('content') sowie die referenzierten Placeholder erfasst.
+Daraus entstehen Postings (Token → Prompt-IDs, Placeholder → Prompt-IDs),
+ein sortiertes Vokabular für Präfix-Suche und eine Lösch-Nachbarschaft
+(Token ohne ein Zeichen → Tokens) für Fuzzy-Suche mit Editierdistanz 1.
+
+Der Index ist wie der EngineSnapshot nach dem Veröffentlichen unveränderlich:
+updated() liefert per Copy-on-Write einen neuen Index, in dem nur die
+geänderten Prompts neu tokenisiert werden.
+
+Usage:
+    index = PromptSearchIndex.build(manifest, domains, compiled)
+    index.search('persona besch')        # [(prompt_id, 'name'|'content'), ...]
+    index.placeholder_usages('char_name')  # frozenset der Prompt-IDs
+    index = index.updated(manifest, domains, compiled, changed=('impersonation',))
+"""
+
+import bisect
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .placeholder_resolver import CompiledTemplate
+
+_WORD = re.compile(r'\w+')
+
+# Kürzere Query-Tokens nur per Präfix (Fuzzy wäre dort zu unscharf)
+FUZZY_MIN_LENGTH = 4
+
+FIELDS = ('meta', 'content')
+
+# (meta-Tokens, content-Tokens, Placeholder)
+Document = Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]
+
+
+def tokenize(text: str) -> Set[str]:
+    """Kleingeschriebene Wörter; snake_case zusätzlich in seine Teile zerlegt."""
+    tokens = set()
+    for word in _WORD.findall(text.lower()):
+        tokens.add(word)
+        if '_' in word:
+            tokens.update(part for part in word.split('_') if part)
+    return tokens
+
+
+def _deletes(token: str) -> Set[str]:
+    """Alle Varianten des Tokens mit genau einem entfernten Zeichen."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Editierdistanz ≤ 1 (Einfügen, Löschen, Ersetzen, Vertauschen benachbarter Zeichen)."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if la > lb:
+        a, b = b, a
+    # b ist genau ein Zeichen länger
+    for i in range(len(a)):
+        if a[i] != b[i]:
+            return a[i:] == b[i + 1:]
+    return True
+
+
+def _document(meta: Dict[str, Any], prompt_id: str, content_data: Any,
+              templates: Optional[Dict[str, CompiledTemplate]]) -> Document:
+    meta_tokens = tokenize(' '.join((meta.get('name', ''), prompt_id, meta.get('description', ''))))
+    content_tokens: Set[str] = set()
+    if isinstance(content_data, dict):
+        for variant_data in content_data.get('variants', {}).values():
+            if isinstance(variant_data, dict) and variant_data.get('content'):
+                content_tokens.update(tokenize(variant_data['content']))
+    placeholders: Set[str] = set()
+    for template in (templates or {}).values():
+        placeholders.update(template.placeholders)
+    return frozenset(meta_tokens), frozenset(content_tokens), frozenset(placeholders)
+
+
+class PromptSearchIndex:
+    """Invertierter Index über alle Prompts eines Snapshots (unveränderlich)."""
+
+    __slots__ = ('_docs', '_postings', '_placeholders', '_vocab', '_deletes')
+
+    def __init__(self, docs: Dict[str, Document],
+                 postings: Dict[str, Dict[str, FrozenSet[str]]],
+                 placeholders: Dict[str, FrozenSet[str]],
+                 vocab: List[str],
+                 deletes: Dict[str, FrozenSet[str]]):
+        self._docs = docs
+        self._postings = postings
+        self._placeholders = placeholders
+        self._vocab = vocab              # sortiert, Vereinigung beider Felder
+        self._deletes = deletes          # Token ohne ein Zeichen → Tokens
+
+    @classmethod
+    def build(cls, manifest: Dict[str, Any], domains: Dict[str, Any],
+              compiled: Dict[str, Dict[str, CompiledTemplate]]) -> 'PromptSearchIndex':
+        """Vollständiger Aufbau aus Manifest, Domains und kompilierten Templates."""
+        docs: Dict[str, Document] = {}
+        maps: List[Dict[str, Set[str]]] = [{}, {}, {}]    # meta, content, placeholders
+        for prompt_id, meta in manifest.get('prompts', {}).items():
+            content_data = domains.get(meta.get('domain_file', ''), {}).get(prompt_id, {})
+            doc = _document(meta, prompt_id, content_data, compiled.get(prompt_id))
+            docs[prompt_id] = doc
+            for slot, keys in enumerate(doc):
+                for key in keys:
+                    maps[slot].setdefault(key, set()).add(prompt_id)
+
+        frozen = [{key: frozenset(ids) for key, ids in m.items()} for m in maps]
+        vocab = sorted(set(frozen[0]) | set(frozen[1]))
+        deletes: Dict[str, Set[str]] = {}
+        for token in vocab:
+            for variant in _deletes(token):
+                deletes.setdefault(variant, set()).add(token)
+        return cls(
+            docs, dict(zip(FIELDS, frozen[:2])), frozen[2], vocab,
+            {variant: frozenset(tokens) for variant, tokens in deletes.items()},
+        )
+
+    def updated(self, manifest: Dict[str, Any], domains: Dict[str, Any],
+                compiled: Dict[str, Dict[str, CompiledTemplate]],
+                changed: Iterable[str]) -> 'PromptSearchIndex':
+        """
+        Neuer Index mit neu tokenisierten Prompts (Copy-on-Write).
+
+        Args:
+            changed: Prompt-IDs, deren Meta oder Content sich geändert hat.
+                     IDs, die nicht mehr im Manifest stehen, werden entfernt.
+        """
+        prompts = manifest.get('prompts', {})
+        new_docs: Dict[str, Optional[Document]] = {}
+        for prompt_id in changed:
+            meta = prompts.get(prompt_id)
+            if meta is None:
+                new_docs[prompt_id] = None
+            else:
+                content_data = domains.get(meta.get('domain_file', ''), {}).get(prompt_id, {})
+                new_docs[prompt_id] = _document(meta, prompt_id, content_data, compiled.get(prompt_id))
+
+        new_docs = {pid: doc for pid, doc in new_docs.items() if self._docs.get(pid) != doc}
+        if not new_docs:
+            return self
+
+        docs = dict(self._docs)
+        postings = {field: dict(self._postings[field]) for field in FIELDS}
+        placeholders = dict(self._placeholders)
+        touched: Set[str] = set()
+
+        for prompt_id, doc in new_docs.items():
+            old = docs.pop(prompt_id, None)
+            if doc is not None:
+                docs[prompt_id] = doc
+            for slot, field_map in enumerate((*(postings[f] for f in FIELDS), placeholders)):
+                before = old[slot] if old else frozenset()
+                after = doc[slot] if doc else frozenset()
+                for key in before - after:
+                    remaining = field_map[key] - {prompt_id}
+                    if remaining:
+                        field_map[key] = remaining
+                    else:
+                        del field_map[key]
+                for key in after - before:
+                    field_map[key] = field_map.get(key, frozenset()) | {prompt_id}
+                if slot < len(FIELDS):
+                    touched.update(before ^ after)
+
+        vocab, deletes = self._vocab, self._deletes
+        added = [t for t in touched if self._has_token(postings, t) and not self._contains(t)]
+        removed = [t for t in touched if not self._has_token(postings, t) and self._contains(t)]
+        if added or removed:
+            if len(added) + len(removed) > 64:
+                vocab = sorted(set(vocab).difference(removed).union(added))
+            else:
+                vocab = list(vocab)
+                for token in removed:
+                    del vocab[bisect.bisect_left(vocab, token)]
+                for token in added:
+                    bisect.insort(vocab, token)
+            deletes = dict(deletes)
+            for token in removed:
+                for variant in _deletes(token):
+                    remaining = deletes[variant] - {token}
+                    if remaining:
+                        deletes[variant] = remaining
+                    else:
+                        del deletes[variant]
+            for token in added:
+                for variant in _deletes(token):
+                    deletes[variant] = deletes.get(variant, frozenset()) | {token}
+
+        return PromptSearchIndex(docs, postings, placeholders, vocab, deletes)
+
+    @staticmethod
+    def _has_token(postings: Dict[str, Dict[str, FrozenSet[str]]], token: str) -> bool:
+        return any(token in postings[field] for field in FIELDS)
+
+    def _contains(self, token: str) -> bool:
+        pos = bisect.bisect_left(self._vocab, token)
+        return pos < len(self._vocab) and self._vocab[pos] == token
+
+    # ===== Abfragen =====
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def expand(self, token: str, fuzzy: bool = True) -> Set[str]:
+        """Vokabular-Tokens zu einem Query-Token: Präfix-Treffer + Editierdistanz 1."""
+        start = bisect.bisect_left(self._vocab, token)
+        end = bisect.bisect_left(self._vocab, token + '\U0010ffff', start)
+        matches = set(self._vocab[start:end])
+        if fuzzy and len(token) >= FUZZY_MIN_LENGTH:
+            candidates = set(self._deletes.get(token, ()))      # ein Zeichen eingefügt
+            for variant in _deletes(token):
+                if self._contains(variant):                      # ein Zeichen entfernt
+                    candidates.add(variant)
+                candidates.update(self._deletes.get(variant, ()))  # ersetzt/vertauscht
+            matches.update(c for c in candidates if _within_one_edit(token, c))
+        return matches
+
+    def search(self, query: str, fuzzy: bool = True) -> List[Tuple[str, str]]:
+        """
+        Prompts, in denen jedes Query-Wort (als Präfix oder mit einem Tippfehler) vorkommt.
+
+        Returns:
+            [(prompt_id, match_type)] – 'name' wenn alle Wörter in Name/ID/
+            Beschreibung vorkommen, sonst 'content'. Unsortiert.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            return []
+
+        any_hits: Optional[Set[str]] = None
+        name_hits: Optional[Set[str]] = None
+        for word in words:
+            tokens = self.expand(word, fuzzy)
+            in_meta: Set[str] = set()
+            in_content: Set[str] = set()
+            for token in tokens:
+                in_meta.update(self._postings['meta'].get(token, ()))
+                in_content.update(self._postings['content'].get(token, ()))
+            hits = in_meta | in_content
+            any_hits = hits if any_hits is None else any_hits & hits
+            name_hits = in_meta if name_hits is None else name_hits & in_meta
+            if not any_hits:
+                return []
+
+        return [(pid, 'name' if pid in name_hits else 'content') for pid in any_hits]
+
+    def placeholder_usages(self, key: str) -> FrozenSet[str]:
+        """Prompt-IDs, deren Inhalt {{key}} referenziert."""
+        return self._placeholders.get(key, frozenset())
+
+    def used_placeholders(self) -> Dict[str, FrozenSet[str]]:
+        """Alle referenzierten Placeholder → Prompt-IDs."""
+        return dict(self._placeholders)
@@ -0,0 +1,205 @@
+"""
+Engine Snapshot – Unveränderlicher Ladezustand der PromptEngine.
+
+Alle Daten, die Leser brauchen (Merged Manifest, Domains, Registry,
+Resolver, kompilierte Templates, Manifest-Indizes), liegen in einem
+EngineSnapshot. Schreibende Operationen bauen per Copy-on-Write einen
+neuen Snapshot (derive) und tauschen die Referenz in der Engine atomar aus.
+Leser holen sich die Referenz einmal und arbeiten ohne Lock auf einem
+konsistenten Stand.
+
+Konvention: Dicts eines veröffentlichten Snapshots werden nie verändert.
+Ausnahme sind abgeleitete Memos (dependencies, nachkompilierte Templates,
+Suchindex, Validierungsgraph), die idempotent befüllt werden.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from .placeholder_resolver import PlaceholderResolver, CompiledTemplate
+from .search_index import PromptSearchIndex
+from .validation_graph import ValidationGraph
+
+
+def compile_prompt(manifest: Dict[str, Any], domains: Dict[str, Any],
+                   prompt_id: str) -> Optional[Dict[str, CompiledTemplate]]:
+    """Kompiliert alle Varianten eines Prompts (None wenn nicht im Manifest)."""
+    meta = manifest.get('prompts', {}).get(prompt_id)
+    if not meta:
+        return None
+    content_data = domains.get(meta.get('domain_file', ''), {}).get(prompt_id, {})
+    variants = content_data.get('variants', {}) if isinstance(content_data, dict) else {}
+    compiled: Dict[str, CompiledTemplate] = {}
+    for variant_name, variant_data in variants.items():
+        if isinstance(variant_data, dict) and variant_data.get('content'):
+            compiled[variant_name] = PlaceholderResolver.compile(variant_data['content'])
+    return compiled
+
+
+def build_indexes(manifest: Dict[str, Any],
+                  domains: Dict[str, Any]) -> Dict[str, Dict[Any, List[Dict[str, Any]]]]:
+    """
+    Vorsortierte Manifest-Views.
+
+    Einträge: {id, meta, content}, sortiert nach order (stabil zur
+    Manifest-Reihenfolge). 'target' und 'position' enthalten nur aktive
+    Prompts, 'category' und 'variant_condition' alle.
+    """
+    entries = []
+    for prompt_id, meta in manifest.get('prompts', {}).items():
+        domain_data = domains.get(meta.get('domain_file', ''), {})
+        entries.append({
+            'id': prompt_id,
+            'meta': meta,
+            'content': domain_data.get(prompt_id, {}),
+        })
+    entries.sort(key=lambda x: x['meta'].get('order', 9999))
+
+    index: Dict[str, Dict[Any, List[Dict[str, Any]]]] = {
+        'target': {}, 'category': {}, 'position': {}, 'variant_condition': {},
+    }
+    for entry in entries:
+        meta = entry['meta']
+        index['category'].setdefault(meta.get('category'), []).append(entry)
+        index['variant_condition'].setdefault(meta.get('variant_condition') or None, []).append(entry)
+        if not meta.get('enabled', True):
+            continue
+        index['target'].setdefault(meta.get('target'), []).append(entry)
+        index['position'].setdefault(meta.get('position'), []).append(entry)
+    return index
+
+
+class EngineSnapshot:
+    """Konsistenter, nach dem Veröffentlichen unveränderlicher Engine-Zustand."""
+
+    __slots__ = (
+        'manifest', 'domains', 'registry', 'resolver', 'user_prompt_ids',
+        'user_placeholder_keys', 'load_errors', 'generation', 'compiled',
+        'index', 'dependencies', '_search', '_validation',
+    )
+
+    def __init__(self, manifest: Dict[str, Any], domains: Dict[str, Any],
+                 registry: Dict[str, Any], resolver: Optional[PlaceholderResolver],
+                 user_prompt_ids: FrozenSet[str] = frozenset(),
+                 user_placeholder_keys: FrozenSet[str] = frozenset(),
+                 load_errors: Iterable[str] = (), generation: int = 0,
+                 compiled: Optional[Dict[str, Dict[str, CompiledTemplate]]] = None,
+                 search: Optional[PromptSearchIndex] = None,
+                 validation: Optional[ValidationGraph] = None):
+        self.manifest = manifest
+        self.domains = domains
+        self.registry = registry
+        self.resolver = resolver
+        self.user_prompt_ids = frozenset(user_prompt_ids)
+        self.user_placeholder_keys = frozenset(user_placeholder_keys)
+        self.load_errors = tuple(load_errors)
+        self.generation = generation
+
+        if compiled is None:
+            compiled = {}
+            for prompt_id in manifest.get('prompts', {}):
+                compiled[prompt_id] = compile_prompt(manifest, domains, prompt_id)
+        self.compiled = compiled
+        self.index = build_indexes(manifest, domains)
+        self.dependencies: Dict[str, FrozenSet[str]] = {}  # Memo: variant → Placeholder
+        self._search = search                               # Memo: erst bei der ersten Suche gebaut
+        self._validation = validation                       # Memo: erst bei der ersten Validierung gebaut
+
+    @classmethod
+    def empty(cls) -> 'EngineSnapshot':
+        """Leerer Zustand vor dem ersten Laden."""
+        return cls({'version': '0', 'prompts': {}}, {}, {'placeholders': {}}, None)
+
+    def derive(self, manifest: Optional[Dict[str, Any]] = None,
+               domains: Optional[Dict[str, Any]] = None,
+               changed: Iterable[str] = (),
+               user_prompt_ids: Optional[Iterable[str]] = None,
+               load_errors: Optional[Iterable[str]] = None) -> 'EngineSnapshot':
+        """
+        Neuer Snapshot mit ersetzten Teilen (Copy-on-Write).
+
+        Args:
+            manifest: Neues Merged Manifest (Default: unverändert)
+            domains: Neue Domain-Map (Default: unverändert)
+            changed: Prompt-IDs, deren Templates neu kompiliert werden
+            user_prompt_ids: Neue User-Prompt-IDs (Default: unverändert)
+            load_errors: Neue Fehlerliste (Default: unverändert)
+        """
+        manifest = self.manifest if manifest is None else manifest
+        domains = self.domains if domains is None else domains
+        compiled = dict(self.compiled)
+        for prompt_id in changed:
+            templates = compile_prompt(manifest, domains, prompt_id)
+            if templates is None:
+                compiled.pop(prompt_id, None)
+            else:
+                compiled[prompt_id] = templates
+        search = None
+        if self._search is not None:
+            search = self._search.updated(manifest, domains, compiled, changed)
+        validation = None
+        if self._validation is not None:
+            validation = self._validation.updated(manifest, domains, self.registry)
+        return EngineSnapshot(
+            manifest, domains, self.registry, self.resolver,
+            self.user_prompt_ids if user_prompt_ids is None else user_prompt_ids,
+            self.user_placeholder_keys,
+            self.load_errors if load_errors is None else load_errors,
+            self.generation + 1, compiled, search, validation,
+        )
+
+    # ===== Lese-Zugriff =====
+
+    def indexed(self, view: str, key: Any) -> List[Dict[str, Any]]:
+        """Lookup in einem Manifest-View (leere Liste wenn nicht vorhanden)."""
+        return self.index.get(view, {}).get(key, [])
+
+    def get_template(self, prompt_id: str, variant_name: str, raw_content: str) -> CompiledTemplate:
+        """Kompiliertes Template; kompiliert nach, falls der Text abweicht."""
+        template = (self.compiled.get(prompt_id) or {}).get(variant_name)
+        if template is None or template.source != raw_content:
+            template = PlaceholderResolver.compile(raw_content)
+        return template
+
+    @property
+    def search(self) -> PromptSearchIndex:
+        """Suchindex; beim ersten Zugriff gebaut, danach von derive() inkrementell fortgeschrieben."""
+        if self._search is None:
+            self._search = PromptSearchIndex.build(self.manifest, self.domains, self.compiled)
+        return self._search
+
+    @property
+    def validation(self) -> ValidationGraph:
+        """Validierungsergebnisse; von derive() nur für geänderte Knoten neu geprüft."""
+        if self._validation is None:
+            self._validation = ValidationGraph.build(self.manifest, self.domains, self.registry)
+        return self._validation
+
+    def placeholder_dependencies(self, variant: str = 'default') -> FrozenSet[str]:
+        """Placeholder, die von aktiven Prompts dieser Variante referenziert werden.
+
+        Vereinigung aus den Slots der kompilierten Templates, placeholders_used
+        der Domain-Dateien und requires_any.
+        """
+        cached = self.dependencies.get(variant)
+        if cached is not None:
+            return cached
+
+        referenced = set()
+        candidates = self.indexed('variant_condition', None) + (
+            self.indexed('variant_condition', variant) if variant else [])
+        for prompt_data in candidates:
+            prompt_id, meta = prompt_data['id'], prompt_data['meta']
+            if not meta.get('enabled', True):
+                continue
+            templates = self.compiled.get(prompt_id) or {}
+            template = templates.get(variant) or templates.get('default')
+            if template is not None:
+                referenced.update(template.placeholders)
+            content_data = prompt_data['content']
+            if isinstance(content_data, dict):
+                referenced.update(content_data.get('placeholders_used', []) or [])
+            referenced.update(meta.get('requires_any') or [])
+
+        result = frozenset(referenced)
+        self.dependencies[variant] = result
+        return result
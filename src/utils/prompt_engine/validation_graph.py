@@ -0,0 +1,304 @@
+"""
+Validation Graph – Inkrementelle Validierung über einen Abhängigkeitsgraphen.
+
+PromptValidator.validate_all() prüft bei jedem Aufruf Manifest, Domains und
+Registry komplett. Der ValidationGraph zerlegt dieselben Prüfungen in Knoten:
+
+    manifest              – Manifest-Version / leeres Manifest
+    prompt:<id>           – Pflichtfelder und Werte im Manifest, domain_file
+                            vorhanden, Domain-Inhalt vollständig, requires_any
+    entry:<datei>:<id>    – Placeholder eines Domain-Eintrags (deklariert,
+                            in der Registry vorhanden)
+
+Jeder Knoten merkt sich seine Eingaben (Manifest-Eintrag, Domain-Eintrag)
+und die Placeholder-Keys, die er referenziert. Bei einem Update werden nur
+Knoten neu geprüft, deren Eingaben sich geändert haben oder deren Keys in
+der Registry hinzugekommen/weggefallen sind; alle anderen Ergebnisse werden
+übernommen. Vergleich zuerst über Identität (Copy-on-Write Snapshots teilen
+unveränderte Dicts), dann über Gleichheit (frisch geladene Dateien).
+
+Die Meldungen sind identisch mit PromptValidator.validate_all(), nur nach
+Knoten gruppiert. Wie EngineSnapshot und PromptSearchIndex ist ein Graph
+nach dem Veröffentlichen unveränderlich: updated() liefert einen neuen.
+
+Usage:
+    graph = ValidationGraph.build(manifest, domains, registry)
+    graph.errors, graph.warnings
+    graph = graph.updated(manifest, domains, registry)
+    graph.revalidated          # Anzahl neu geprüfter Knoten
+"""
+
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from .validator import PromptValidator, PLACEHOLDER_PATTERN
+
+# (errors, warnings)
+NodeResult = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+_EMPTY: NodeResult = ((), ())
+_MISSING = object()
+
+
+def _same(a: Tuple[Any, ...], b: Tuple[Any, ...]) -> bool:
+    return all(x is y or x == y for x, y in zip(a, b))
+
+
+def _entry_keys(entry: Any) -> FrozenSet[str]:
+    """Placeholder-Keys, die ein Domain-Eintrag im Content verwendet."""
+    keys: Set[str] = set()
+    if isinstance(entry, dict):
+        for variant_data in entry.get('variants', {}).values():
+            if isinstance(variant_data, dict) and variant_data.get('content'):
+                keys.update(PLACEHOLDER_PATTERN.findall(variant_data['content']))
+    return frozenset(keys)
+
+
+class ValidationGraph:
+    """Gecachte Validierungsergebnisse pro Knoten (unveränderlich)."""
+
+    __slots__ = (
+        '_prompts', '_domains', '_registry_keys', '_manifest_result',
+        '_file_prompts', '_prompt_inputs', '_prompt_results',
+        '_entry_inputs', '_entry_results', '_node_keys', '_dependents', 'revalidated',
+    )
+
+    _validator = PromptValidator()
+
+    def __init__(self):
+        self._prompts: Dict[str, Any] = {}
+        self._domains: Dict[str, Any] = {}
+        self._registry_keys: FrozenSet[str] = frozenset()
+        self._manifest_result: NodeResult = _EMPTY
+        # domain_file → Prompt-IDs (Reihenfolge = erste Referenz im Manifest)
+        self._file_prompts: Dict[str, List[str]] = {}
+        self._prompt_inputs: Dict[str, Tuple[Any, ...]] = {}
+        self._prompt_results: Dict[str, NodeResult] = {}
+        # Datei → {prompt_id: Eintrag} bzw. {prompt_id: Ergebnis}
+        self._entry_inputs: Dict[str, Dict[str, Any]] = {}
+        self._entry_results: Dict[str, Dict[str, NodeResult]] = {}
+        # Kanten: Knoten → referenzierte Placeholder-Keys und umgekehrt
+        self._node_keys: Dict[Tuple[str, ...], FrozenSet[str]] = {}
+        self._dependents: Dict[str, FrozenSet[Tuple[str, ...]]] = {}
+        self.revalidated = 0
+
+    @classmethod
+    def build(cls, manifest: Dict[str, Any], domains: Dict[str, Any],
+              registry: Dict[str, Any]) -> 'ValidationGraph':
+        """Vollständige Validierung (alle Knoten)."""
+        return cls().updated(manifest, domains, registry)
+
+    # ===== Update =====
+
+    def updated(self, manifest: Dict[str, Any], domains: Dict[str, Any],
+                registry: Dict[str, Any]) -> 'ValidationGraph':
+        """Neuer Graph; geprüft werden nur Knoten mit geänderten Eingaben."""
+        prompts = manifest.get('prompts', {})
+        registry_keys = frozenset(registry.get('placeholders', {}))
+        available = set(domains)
+
+        graph = ValidationGraph()
+        graph._prompts = prompts
+        graph._domains = domains
+        graph._registry_keys = registry_keys
+        graph._manifest_result = self._check_manifest(manifest)
+
+        # Knoten, deren Placeholder-Keys in der Registry hinzugekommen/weggefallen sind
+        dirty: Set[Tuple[str, ...]] = set()
+        for key in registry_keys ^ self._registry_keys:
+            dirty.update(self._dependents.get(key, ()))
+        changed_files = {f for f in available | set(self._domains)
+                         if domains.get(f) is not self._domains.get(f)}
+        domain_set_changed = available != set(self._domains)
+
+        node_keys = dict(self._node_keys)
+        touched_keys: Dict[str, Set[Tuple[str, ...]]] = {}
+
+        def set_keys(node: Tuple[str, ...], keys: FrozenSet[str]) -> None:
+            old = node_keys.get(node, frozenset())
+            if old == keys:
+                return
+            for key in old ^ keys:
+                if key not in touched_keys:
+                    touched_keys[key] = set(self._dependents.get(key, ()))
+            for key in old - keys:
+                touched_keys[key].discard(node)
+            for key in keys - old:
+                touched_keys[key].add(node)
+            if keys:
+                node_keys[node] = keys
+            else:
+                node_keys.pop(node, None)
+
+        revalidated = 0
+
+        # --- Prompt-Knoten ---
+        if prompts is self._prompts:
+            file_prompts = self._file_prompts
+            candidates: Set[str] = {node[1] for node in dirty if node[0] == 'prompt'}
+            for domain_file in changed_files:
+                candidates.update(file_prompts.get(domain_file, ()))
+            if domain_set_changed:
+                candidates.update(pid for pid, inputs in self._prompt_inputs.items() if not inputs[1])
+            prompt_inputs = dict(self._prompt_inputs)
+            prompt_results = dict(self._prompt_results)
+        else:
+            file_prompts = {}
+            for prompt_id, meta in prompts.items():
+                file_prompts.setdefault(meta.get('domain_file', ''), []).append(prompt_id)
+            candidates = set(prompts)
+            prompt_inputs, prompt_results = {}, {}
+            for prompt_id in set(self._prompt_inputs) - set(prompts):
+                set_keys(('prompt', prompt_id), frozenset())
+
+        for prompt_id in candidates:
+            meta = prompts.get(prompt_id)
+            if meta is None:
+                continue
+            domain_file = meta.get('domain_file', '')
+            domain = domains.get(domain_file)
+            entry = domain.get(prompt_id, _MISSING) if isinstance(domain, dict) else _MISSING
+            inputs = (meta, domain_file in available, entry)
+            old_inputs = self._prompt_inputs.get(prompt_id)
+            result = self._prompt_results.get(prompt_id)
+            stale = (
+                old_inputs is None or not _same(old_inputs, inputs)
+                or ('prompt', prompt_id) in dirty
+                # Meldung für fehlende domain_file nennt die verfügbaren Dateien
+                or (domain_set_changed and not inputs[1])
+            )
+            if stale:
+                result = self._check_prompt(prompt_id, meta, domains, available, registry)
+                set_keys(('prompt', prompt_id), frozenset(meta.get('requires_any') or ()))
+                revalidated += 1
+            prompt_inputs[prompt_id] = inputs
+            prompt_results[prompt_id] = result
+        if prompts is not self._prompts:
+            # Manifest-Reihenfolge für die Ausgabe
+            prompt_inputs = {pid: prompt_inputs[pid] for pid in prompts}
+            prompt_results = {pid: prompt_results[pid] for pid in prompts}
+        graph._file_prompts = file_prompts
+        graph._prompt_inputs = prompt_inputs
+        graph._prompt_results = prompt_results
+
+        # --- Entry-Knoten (nur Domain-Dateien, die das Manifest referenziert) ---
+        referenced = [f for f in file_prompts if f in domains]
+        dirty_files = {node[1] for node in dirty if node[0] == 'entry'}
+        for domain_file in set(self._entry_inputs) - set(referenced):
+            for prompt_id in self._entry_inputs[domain_file]:
+                set_keys(('entry', domain_file, prompt_id), frozenset())
+
+        for domain_file in referenced:
+            domain = domains[domain_file]
+            old_inputs = self._entry_inputs.get(domain_file)
+            old_results = self._entry_results.get(domain_file, {})
+            if (old_inputs is not None and domain_file not in changed_files
+                    and domain_file not in dirty_files):
+                graph._entry_inputs[domain_file] = old_inputs
+                graph._entry_results[domain_file] = old_results
+                continue
+            old_inputs = old_inputs or {}
+            inputs, results = {}, {}
+            for prompt_id, entry in domain.items():
+                node = ('entry', domain_file, prompt_id)
+                result = old_results.get(prompt_id)
+                old_entry = old_inputs.get(prompt_id, _MISSING)
+                if (result is None or not (old_entry is entry or old_entry == entry)
+                        or node in dirty):
+                    result = self._check_entry(prompt_id, entry, registry)
+                    set_keys(node, _entry_keys(entry))
+                    revalidated += 1
+                inputs[prompt_id] = entry
+                results[prompt_id] = result
+            for prompt_id in set(old_inputs) - set(domain):
+                set_keys(('entry', domain_file, prompt_id), frozenset())
+            graph._entry_inputs[domain_file] = inputs
+            graph._entry_results[domain_file] = results
+
+        dependents = self._dependents
+        if touched_keys:
+            dependents = dict(dependents)
+            for key, nodes in touched_keys.items():
+                if nodes:
+                    dependents[key] = frozenset(nodes)
+                else:
+                    dependents.pop(key, None)
+        graph._node_keys = node_keys
+        graph._dependents = dependents
+        graph.revalidated = revalidated
+        return graph
+
+    # ===== Knoten-Prüfungen (Mini-Manifest/-Domain wie validate_prompt) =====
+
+    def _check_manifest(self, manifest: Dict[str, Any]) -> NodeResult:
+        errors = []
+        if 'version' not in manifest:
+            errors.append("Manifest: 'version' fehlt")
+        if not manifest.get('prompts'):
+            errors.append("Manifest: Keine Prompts definiert")
+        return tuple(errors), ()
+
+    def _check_prompt(self, prompt_id: str, meta: Dict[str, Any], domains: Dict[str, Any],
+                      available: Set[str], registry: Dict[str, Any]) -> NodeResult:
+        mini_manifest = {'version': 'node', 'prompts': {prompt_id: meta}}
+        errors = self._validator.validate_manifest(mini_manifest)
+        errors.extend(self._validator.validate_cross_references(mini_manifest, available))
+        domain_file = meta.get('domain_file', '')
+        if domain_file in domains:
+            errors.extend(self._validator.validate_domain(domains[domain_file], {prompt_id: meta}))
+        warnings = self._validator.validate_requires_any(mini_manifest, registry)
+        return tuple(errors), tuple(warnings)
+
+    def _check_entry(self, prompt_id: str, entry: Any, registry: Dict[str, Any]) -> NodeResult:
+        return (), tuple(self._validator.validate_placeholders({prompt_id: entry}, registry))
+
+    # ===== Ergebnisse =====
+
+    @property
+    def errors(self) -> List[str]:
+        """Alle Fehler (Manifest, dann Prompts in Manifest-Reihenfolge)."""
+        errors = list(self._manifest_result[0])
+        for result in self._prompt_results.values():
+            errors.extend(result[0])
+        return errors
+
+    @property
+    def warnings(self) -> List[str]:
+        """Alle Warnungen (requires_any, dann Placeholder pro Domain-Datei)."""
+        warnings: List[str] = []
+        for result in self._prompt_results.values():
+            warnings.extend(result[1])
+        for results in self._entry_results.values():
+            for result in results.values():
+                warnings.extend(result[1])
+        return warnings
+
+    def nodes(self) -> Dict[str, Dict[str, List[str]]]:
+        """Knoten mit Fehlern oder Warnungen → {'errors': [...], 'warnings': [...]}."""
+        nodes: Dict[str, Dict[str, List[str]]] = {}
+
+        def add(node_id: str, result: NodeResult) -> None:
+            if result[0] or result[1]:
+                nodes[node_id] = {'errors': list(result[0]), 'warnings': list(result[1])}
+
+        add('manifest', self._manifest_result)
+        for prompt_id, result in self._prompt_results.items():
+            add(f'prompt:{prompt_id}', result)
+        for domain_file, results in self._entry_results.items():
+            for prompt_id, result in results.items():
+                add(f'entry:{domain_file}:{prompt_id}', result)
+        return nodes
+
+    def prompt_result(self, prompt_id: str) -> Optional[Dict[str, List[str]]]:
+        """Fehler und Warnungen eines Prompts (Manifest-Knoten + eigener Domain-Eintrag)."""
+        result = self._prompt_results.get(prompt_id)
+        if result is None:
+            return None
+        errors, warnings = list(result[0]), list(result[1])
+        domain_file = self._prompts[prompt_id].get('domain_file', '')
+        entry_result = self._entry_results.get(domain_file, {}).get(prompt_id)
+        if entry_result:
+            warnings.extend(entry_result[1])
+        return {'errors': errors, 'warnings': warnings}
+
+    def __len__(self) -> int:
+        return 1 + len(self._prompt_results) + sum(len(r) for r in self._entry_results.values())
@@ -0,0 +1,157 @@
+"""
+Prompt File Watcher – Hot-Reload für extern geänderte Prompt-Dateien.
+
+Pollt instructions/prompts/*.json und instructions/prompts/_meta/*.json über
+die Datei-Signatur (mtime_ns, size). Erkannte Änderungen werden gesammelt,
+bis für `debounce` Sekunden keine weitere Änderung kam (Editoren schreiben
+oft mehrfach), und dann an PromptEngine.apply_file_changes() übergeben:
+geänderte Domain-Dateien werden einzeln neu geladen, Änderungen unter _meta/
+lösen einen vollständigen Reload aus.
+
+Polling statt OS-Events: keine zusätzliche Abhängigkeit, funktioniert
+identisch unter Windows/Linux/macOS.
+
+Usage:
+    watcher = PromptFileWatcher(engine, interval=1.0, debounce=0.5)
+    watcher.start()
+    ...
+    watcher.stop()
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .file_cache import FileValueCache, Signature
+from ..logger import log
+
+
+class PromptFileWatcher:
+    """Pollt das Prompt-Verzeichnis und lädt Änderungen inkrementell nach."""
+
+    def __init__(self, engine, interval: float = 1.0, debounce: float = 0.5):
+        """
+        Args:
+            engine: PromptEngine-Instanz
+            interval: Abstand zwischen zwei Scans in Sekunden
+            debounce: Ruhezeit nach der letzten Änderung vor dem Reload
+        """
+        self._engine = engine
+        self._interval = interval
+        self._debounce = debounce
+        self._prompts_dir = os.path.join(engine._instructions_dir, 'prompts')
+        self._meta_dir = os.path.join(self._prompts_dir, '_meta')
+
+        self._signatures: Dict[str, Signature] = self._scan()
+        self._pending: Dict[str, float] = {}    # Pfad → Zeitpunkt der letzten Änderung
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._reloads = 0
+        self._errors = 0
+        self._last_reload: Optional[Dict[str, Any]] = None
+
+    # ===== Lifecycle =====
+
+    def start(self) -> None:
+        """Startet den Poll-Thread (Daemon). Mehrfacher Aufruf ist unschädlich."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='prompt-watcher', daemon=True)
+        self._thread.start()
+        log.info("Prompt-Watcher gestartet (%s, Intervall %.1fs)", self._prompts_dir, self._interval)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stoppt den Poll-Thread und wartet auf sein Ende."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self._errors += 1
+                log.error("Prompt-Watcher: Fehler beim Scan: %s", e)
+
+    # ===== Scan =====
+
+    def _scan(self) -> Dict[str, Signature]:
+        """Signaturen aller beobachteten JSON-Dateien."""
+        signatures: Dict[str, Signature] = {}
+        for directory in (self._prompts_dir, self._meta_dir):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(directory, name)
+                sig = FileValueCache.signature(path)
+                if sig is not None:
+                    signatures[path] = sig
+        return signatures
+
+    def poll(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ein Scan-Durchlauf (vom Thread aufgerufen, in Tests direkt).
+
+        Returns:
+            Reload-Ergebnis, falls in diesem Durchlauf neu geladen wurde, sonst None
+        """
+        now = time.monotonic() if now is None else now
+        current = self._scan()
+        for path in set(current) | set(self._signatures):
+            if current.get(path) != self._signatures.get(path):
+                self._pending[path] = now
+        self._signatures = current
+
+        if not self._pending or now - max(self._pending.values()) < self._debounce:
+            return None
+
+        changed = sorted(self._pending)
+        self._pending.clear()
+        return self._apply(changed)
+
+    def _apply(self, paths: List[str]) -> Optional[Dict[str, Any]]:
+        """Übergibt die gesammelten Änderungen an die Engine und loggt das Ergebnis."""
+        start = time.perf_counter()
+        try:
+            result = self._engine.apply_file_changes(paths)
+        except Exception as e:
+            self._errors += 1
+            log.error("Prompt-Watcher: Reload fehlgeschlagen (%s): %s",
+                      ', '.join(os.path.basename(p) for p in paths), e)
+            return None
+
+        result['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        self._last_reload = result
+        if result['errors']:
+            self._errors += 1
+            for err in result['errors']:
+                log.warning("Prompt-Watcher: %s", err)
+        if result['full_reload'] or result['reloaded']:
+            self._reloads += 1
+            log.info("Prompt-Watcher: %s in %.1fms neu geladen (%d Fehler)",
+                     'alle Dateien' if result['full_reload'] else ', '.join(result['reloaded']),
+                     result['duration_ms'], len(result['errors']))
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Anzahl Reloads/Fehler und Ergebnis des letzten Reloads."""
+        return {
+            'running': self.is_running,
+            'files': len(self._signatures),
+            'pending': len(self._pending),
+            'reloads': self._reloads,
+            'errors': self._errors,
+            'last_reload': self._last_reload,
+        }
@@ -16,6 +16,8 @@ _api_client = None
 _chat_service = None
 _cortex_service = None
 _prompt_engine = None
+_prompt_watcher = None
+_cortex_job_queue = None
 
 
 def init_services(api_key: str = None):
@@ -31,6 +33,7 @@ def init_services(api_key: str = None):
     from .cortex_service import CortexService
 
     _api_client = ApiClient(api_key=api_key)
+    configure_api_scheduler(_api_client)
     _cortex_service = CortexService(_api_client)
     _chat_service = ChatService(_api_client)
 
@@ -38,6 +41,25 @@ def init_services(api_key: str = None):
     _cortex_service.ensure_cortex_files('default')
 
 
+def configure_api_scheduler(api_client):
+    """
+    Lokale Rate-Limits aus den Settings übernehmen (apiRequestsPerMinute,
+    apiTokensPerMinute; 0 = kein lokales Limit). Ungültige Werte fallen auf
+    die Scheduler-Defaults zurück.
+    """
+    from .api_request.scheduler import DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
+    from .settings_defaults import get_setting
+    try:
+        requests_per_minute = int(get_setting('apiRequestsPerMinute', DEFAULT_REQUESTS_PER_MINUTE))
+        tokens_per_minute = int(get_setting('apiTokensPerMinute', DEFAULT_TOKENS_PER_MINUTE))
+    except (TypeError, ValueError):
+        from .logger import log
+        log.warning("Ungültige API-Rate-Limits in den Settings – nutze Defaults")
+        requests_per_minute, tokens_per_minute = DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
+    api_client.scheduler.configure(requests_per_minute=requests_per_minute,
+                                   tokens_per_minute=tokens_per_minute)
+
+
 def get_api_client():
     """Gibt den zentralen ApiClient zurück"""
     if _api_client is None:
@@ -65,7 +87,8 @@ def get_prompt_engine():
     if _prompt_engine is None:
         try:
             from .prompt_engine import PromptEngine
-            _prompt_engine = PromptEngine()
+            # Lädt im Hintergrund – erste Lesezugriffe warten auf den Snapshot
+            _prompt_engine = PromptEngine(lazy=True)
         except Exception as e:
             from .logger import log
             log.warning("PromptEngine konnte nicht initialisiert werden: %s", e)
@@ -76,4 +99,59 @@ def get_prompt_engine():
 def reset_prompt_engine():
     """Setzt die Engine zurück (für Tests oder Reload)."""
     global _prompt_engine
+    stop_prompt_watcher()
     _prompt_engine = None
+
+
+def start_prompt_watcher(interval: float = 1.0, debounce: float = 0.5):
+    """Startet den Hot-Reload Watcher für instructions/prompts (einmal beim Server-Start).
+
+    Returns:
+        PromptFileWatcher oder None wenn keine Engine verfügbar ist
+    """
+    global _prompt_watcher
+    engine = get_prompt_engine()
+    if engine is None:
+        return None
+    if _prompt_watcher is None:
+        from .prompt_engine.watcher import PromptFileWatcher
+        _prompt_watcher = PromptFileWatcher(engine, interval=interval, debounce=debounce)
+    _prompt_watcher.start()
+    return _prompt_watcher
+
+
+def get_prompt_watcher():
+    """Gibt den laufenden PromptFileWatcher zurück (oder None)."""
+    return _prompt_watcher
+
+
+def stop_prompt_watcher():
+    """Stoppt den Hot-Reload Watcher."""
+    global _prompt_watcher
+    if _prompt_watcher is not None:
+        _prompt_watcher.stop()
+        _prompt_watcher = None
+
+
+def get_cortex_job_queue():
+    """Gibt die Cortex-Job-Queue zurück (Worker starten mit dem ersten Job)."""
+    global _cortex_job_queue
+    if _cortex_job_queue is None:
+        from .cortex.job_queue import CortexJobQueue
+        _cortex_job_queue = CortexJobQueue()
+    return _cortex_job_queue
+
+
+def start_cortex_job_queue():
+    """Startet die Cortex-Worker beim Server-Start (nimmt wartende Jobs wieder auf)."""
+    queue = get_cortex_job_queue()
+    queue.start()
+    return queue
+
+
+def stop_cortex_job_queue():
+    """Stoppt die Cortex-Worker."""
+    global _cortex_job_queue
+    if _cortex_job_queue is not None:
+        _cortex_job_queue.stop()
+        _cortex_job_queue = None
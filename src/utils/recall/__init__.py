@@ -0,0 +1,101 @@
+"""
+Recall Package – Lokale Ähnlichkeitssuche pro Persona (offline).
+
+BM25 über Nachrichten und Cortex-Einträge, optional ergänzt um Embeddings
+(set_embedder). Die Indizes werden pro Persona beim ersten Zugriff
+aufgebaut; save_message und der Cortex-Sync melden Änderungen über
+notify_message() / notify_cortex(), ein geladener Index wird dann
+inkrementell nachgeführt. Löschungen ohne genaue IDs verwerfen den Index
+(invalidate), der nächste Zugriff baut ihn neu auf.
+
+Usage:
+    from utils.recall import get_recall_index
+    hits = get_recall_index('default').top_k('Urlaub am Meer', k=5)
+"""
+
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils.database import connection as db_connection
+
+from .bm25 import BM25Index, tokenize
+from .index import CORTEX, MESSAGE, RecallHit, RecallIndex
+from .vectors import Embedder, VectorMatrix, numpy_available
+
+# DB-Pfad → Index (folgt damit auch einem umgelenkten DATA_DIR)
+_indexes: Dict[str, RecallIndex] = {}
+_lock = threading.Lock()
+_embedder: Optional[Embedder] = None
+
+
+def _loaded(persona_id: str) -> Optional[RecallIndex]:
+    with _lock:
+        return _indexes.get(db_connection.get_db_path(persona_id))
+
+
+def get_recall_index(persona_id: str = 'default') -> RecallIndex:
+    """Recall-Index der Persona (wird beim ersten top_k aufgebaut)."""
+    persona_id = persona_id or 'default'
+    db_path = db_connection.get_db_path(persona_id)
+    with _lock:
+        index = _indexes.get(db_path)
+        if index is None:
+            index = RecallIndex(persona_id, embedder=_embedder)
+            _indexes[db_path] = index
+        return index
+
+
+def set_embedder(embedder: Optional[Embedder]) -> None:
+    """Steckt ein Embedding-Modell ein (None = nur BM25). Verwirft geladene Indizes."""
+    global _embedder
+    with _lock:
+        _embedder = embedder
+        _indexes.clear()
+
+
+def invalidate(persona_id: Optional[str] = None) -> None:
+    """Verwirft den Index einer Persona (None = alle)."""
+    with _lock:
+        if persona_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(db_connection.get_db_path(persona_id), None)
+
+
+def notify_message(persona_id: str, message_id: int, text: str, label: str = '') -> None:
+    """Neue oder geänderte Nachricht – nur geladene Indizes werden nachgeführt."""
+    index = _loaded(persona_id)
+    if index is not None:
+        index.add(MESSAGE, message_id, text, label)
+
+
+def notify_message_removed(persona_id: str, message_id: int) -> None:
+    """Nachricht wurde gelöscht."""
+    index = _loaded(persona_id)
+    if index is not None:
+        index.remove(MESSAGE, message_id)
+
+
+def notify_cortex(persona_id: str, added: Iterable[Tuple[int, str, str]] = (),
+                  removed: Iterable[int] = ()) -> None:
+    """
+    Cortex-Einträge wurden synchronisiert.
+
+    Args:
+        added: (entry_id, Text, Dateiname) neuer Inhalts-Einträge
+        removed: IDs gelöschter Einträge
+    """
+    index = _loaded(persona_id)
+    if index is None:
+        return
+    for entry_id in removed:
+        index.remove(CORTEX, entry_id)
+    for entry_id, text, filename in added:
+        index.add(CORTEX, entry_id, text, filename)
+
+
+__all__ = [
+    'BM25Index', 'tokenize', 'RecallIndex', 'RecallHit', 'MESSAGE', 'CORTEX',
+    'Embedder', 'VectorMatrix', 'numpy_available',
+    'get_recall_index', 'set_embedder', 'invalidate', 'notify_message', 'notify_message_removed', 'notify_cortex',
+]
@@ -0,0 +1,160 @@
+"""
+BM25 – Inkrementeller Okapi-BM25-Index im Speicher.
+
+Dokumente werden über einen frei wählbaren Schlüssel hinzugefügt, ersetzt
+oder entfernt; Statistiken (Dokumentlängen, Dokumentfrequenzen) werden
+dabei fortgeschrieben, ein Neuaufbau ist nie nötig. Freigewordene Slots
+werden wiederverwendet.
+
+Abfragen laufen nur über die Posting-Listen der Query-Wörter. Sehr häufige
+Wörter (df > max_df_ratio · N) werden in großen Indizes übersprungen,
+sofern die Query auch seltenere Wörter enthält – sie tragen kaum Gewicht,
+kosten aber die meiste Zeit.
+
+Usage:
+    index = BM25Index()
+    index.add('m:42', 'Ich war gestern mit Max im Zoo')
+    index.top_k('zoo max', k=5)   # [('m:42', 1.73)]
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+_WORD = re.compile(r'\w{2,}')
+
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+DEFAULT_MAX_DF_RATIO = 0.5
+# Erst ab dieser Größe lohnt (und stimmt) das Überspringen häufiger Wörter
+MIN_DOCS_FOR_PRUNING = 1000
+
+
+def tokenize(text: str) -> List[str]:
+    """Kleingeschriebene Wörter ab zwei Zeichen."""
+    return _WORD.findall(text.lower()) if text else []
+
+
+class BM25Index:
+    """Okapi BM25 mit inkrementellem add/remove. Nicht thread-safe (Aufrufer sperrt)."""
+
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B,
+                 max_df_ratio: float = DEFAULT_MAX_DF_RATIO):
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._terms: List[Tuple[str, ...]] = []
+        self._lengths: List[int] = []
+        self._free: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    def add(self, key: str, text: str) -> None:
+        """Fügt ein Dokument hinzu (ersetzt ein vorhandenes mit gleichem Schlüssel)."""
+        if key in self._slots:
+            self.remove(key)
+        counts = Counter(tokenize(text))
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._keys)
+            self._keys.append(None)
+            self._terms.append(())
+            self._lengths.append(0)
+        length = sum(counts.values())
+        self._keys[slot] = key
+        self._terms[slot] = tuple(counts)
+        self._lengths[slot] = length
+        self._slots[key] = slot
+        self._total_length += length
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[slot] = tf
+
+    def remove(self, key: str) -> bool:
+        """Entfernt ein Dokument. Returns: False wenn unbekannt."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        for term in self._terms[slot]:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(slot, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_length -= self._lengths[slot]
+        self._keys[slot] = None
+        self._terms[slot] = ()
+        self._lengths[slot] = 0
+        self._free.append(slot)
+        return True
+
+    def top_k(self, query: str, k: int = 5,
+              accept: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """
+        Die k besten Dokumente zur Query.
+
+        Args:
+            accept: Optionaler Filter auf den Schlüssel (False = überspringen)
+
+        Returns:
+            [(Schlüssel, Score)] absteigend nach Score
+        """
+        n_docs = len(self._slots)
+        if not n_docs or k <= 0:
+            return []
+        terms = [t for t in set(tokenize(query)) if t in self._postings]
+        if not terms:
+            return []
+        terms.sort(key=lambda t: len(self._postings[t]))
+        selected = terms
+        if n_docs >= MIN_DOCS_FOR_PRUNING:
+            max_df = self.max_df_ratio * n_docs
+            selected = [t for t in terms if len(self._postings[t]) <= max_df] or terms[:1]
+
+        avgdl = self._total_length / n_docs or 1.0
+        k1 = self.k1
+        norm_const = k1 * (1 - self.b)
+        norm_len = k1 * self.b / avgdl
+        lengths = self._lengths
+        scores: Dict[int, float] = {}
+        for term in selected:
+            posting = self._postings[term]
+            df = len(posting)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            weight = idf * (k1 + 1)
+            get = scores.get
+            for slot, tf in posting.items():
+                scores[slot] = get(slot, 0.0) + weight * tf / (tf + norm_const + norm_len * lengths[slot])
+
+        keys = self._keys
+        if accept is None:
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(keys[slot], score) for slot, score in best]
+        # Meist reichen die besten 4·k Kandidaten; sonst vollständig sortieren
+        ranked = heapq.nlargest(4 * k, scores.items(), key=lambda item: item[1])
+        result = _accepted(ranked, keys, accept, k)
+        if len(result) < k and len(ranked) < len(scores):
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            result = _accepted(ranked, keys, accept, k)
+        return result
+
+
+def _accepted(ranked: List[Tuple[int, float]], keys: List[Optional[str]],
+              accept: Callable[[str], bool], k: int) -> List[Tuple[str, float]]:
+    result: List[Tuple[str, float]] = []
+    for slot, score in ranked:
+        if accept(keys[slot]):
+            result.append((keys[slot], score))
+            if len(result) >= k:
+                break
+    return result
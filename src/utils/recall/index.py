@@ -0,0 +1,198 @@
+"""
+Recall Index – Ähnlichkeitssuche über Nachrichten und Cortex-Einträge einer Persona.
+
+Quelle ist die Persona-DB: chat_messages und cortex_entries (ohne
+Überschriften und Template-Platzhalter). Der Index wird beim ersten Zugriff
+in einem Durchlauf aufgebaut und danach inkrementell gepflegt (save_message,
+Cortex-Sync). Schlüssel: 'm:<message_id>' bzw. 'c:<entry_id>'.
+
+Mit Embedder kommt eine Vektor-Suche dazu (VectorMatrix neben der
+Persona-DB); beide Rankings werden per Reciprocal Rank Fusion kombiniert.
+
+Usage:
+    index = RecallIndex('default')
+    index.top_k('Wie hieß die Katze?', k=5)   # [RecallHit(...)]
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.database import connection as db_connection
+from utils.logger import log
+from utils.sql_loader import sql
+
+from .bm25 import BM25Index
+from .vectors import Embedder, VectorMatrix, numpy_available
+
+MESSAGE = 'message'
+CORTEX = 'cortex'
+
+_PREFIX = {MESSAGE: 'm', CORTEX: 'c'}
+_KIND = {prefix: kind for kind, prefix in _PREFIX.items()}
+
+# Reciprocal Rank Fusion: Score = Σ 1 / (RRF_K + Rang)
+RRF_K = 60
+# Kandidaten je Ranking vor der Fusion (Vielfaches von k)
+CANDIDATE_FACTOR = 4
+
+EMBED_BATCH_SIZE = 64
+
+
+@dataclass(frozen=True)
+class RecallHit:
+    """Ein Suchtreffer."""
+    kind: str           # message | cortex
+    ref_id: int         # chat_messages.id bzw. cortex_entries.id
+    text: str
+    label: str          # Sprecher (Nachricht) bzw. Cortex-Datei
+    score: float
+
+
+def _key(kind: str, ref_id: int) -> str:
+    return f"{_PREFIX[kind]}:{ref_id}"
+
+
+class RecallIndex:
+    """BM25 (+ optional Vektoren) über die Persona-DB. Thread-safe."""
+
+    def __init__(self, persona_id: str, embedder: Optional[Embedder] = None):
+        self.persona_id = persona_id
+        self._lock = threading.Lock()
+        self._bm25 = BM25Index()
+        self._docs: Dict[str, Tuple[str, str]] = {}   # Schlüssel → (Text, Label)
+        self._embedder = embedder
+        self._vectors: Optional[VectorMatrix] = None
+        self._built = False
+
+    # ===== Aufbau =====
+
+    def build(self) -> int:
+        """Lädt alle Dokumente aus der Persona-DB. Returns: Anzahl Dokumente."""
+        with self._lock:
+            self._build_locked()
+            return len(self._docs)
+
+    def _build_locked(self) -> None:
+        if self._built:
+            return
+        docs: List[Tuple[str, str, str]] = []
+        db_path = db_connection.get_db_path(self.persona_id)
+        if os.path.exists(db_path):
+            conn = db_connection.get_db_connection(self.persona_id)
+            try:
+                for msg_id, text, is_user, character_name in conn.execute(sql('recall.get_all_messages')):
+                    docs.append((_key(MESSAGE, msg_id), text, 'User' if is_user else character_name))
+                for entry_id, text, filename in conn.execute(sql('recall.get_cortex_entries')):
+                    docs.append((_key(CORTEX, entry_id), text, filename))
+            except sqlite3.OperationalError as e:
+                log.debug("Recall-Index %s: Tabellen fehlen (%s)", self.persona_id, e)
+            finally:
+                conn.close()
+
+        for key, text, label in docs:
+            self._bm25.add(key, text)
+            self._docs[key] = (text, label)
+        self._built = True
+        if self._embedder is not None:
+            self._open_vectors(db_path)
+        log.info("Recall-Index aufgebaut: %s (%d Dokumente)", self.persona_id, len(docs))
+
+    def _open_vectors(self, db_path: str) -> None:
+        if not numpy_available():
+            log.warning("Embedder gesetzt, aber NumPy fehlt – Recall nutzt nur BM25")
+            self._embedder = None
+            return
+        try:
+            self._vectors = VectorMatrix(db_path + '.vectors', self._embedder.dim)
+            stale = [key for key in self._vectors.keys() if key not in self._docs]
+            for key in stale:
+                self._vectors.remove(key)
+            missing = [key for key in self._docs if key not in self._vectors]
+            self._embed(missing)
+            self._vectors.flush()
+        except Exception as e:
+            log.warning("Vektor-Index für %s nicht verfügbar: %s", self.persona_id, e)
+            self._vectors = None
+
+    def _embed(self, keys: List[str]) -> None:
+        for start in range(0, len(keys), EMBED_BATCH_SIZE):
+            batch = keys[start:start + EMBED_BATCH_SIZE]
+            vectors = self._embedder.embed([self._docs[key][0] for key in batch])
+            for key, vector in zip(batch, vectors):
+                self._vectors.add(key, vector)
+
+    # ===== Inkrementelle Pflege =====
+
+    def add(self, kind: str, ref_id: int, text: str, label: str = '') -> None:
+        """Fügt ein Dokument hinzu oder ersetzt es (nur wenn der Index schon aufgebaut ist)."""
+        key = _key(kind, ref_id)
+        with self._lock:
+            if not self._built:
+                return
+            self._bm25.add(key, text)
+            self._docs[key] = (text, label)
+            if self._vectors is not None:
+                self._embed([key])
+                self._vectors.flush()
+
+    def remove(self, kind: str, ref_id: int) -> None:
+        key = _key(kind, ref_id)
+        with self._lock:
+            if not self._built:
+                return
+            self._bm25.remove(key)
+            self._docs.pop(key, None)
+            if self._vectors is not None:
+                self._vectors.remove(key)
+
+    # ===== Abfrage =====
+
+    def top_k(self, query: str, k: int = 5, kinds: Optional[Iterable[str]] = None,
+              accept: Optional[Callable[[RecallHit], bool]] = None) -> List[RecallHit]:
+        """
+        Die k relevantesten Dokumente zur Query.
+
+        Args:
+            kinds: Nur diese Dokumentarten (Default: alle)
+            accept: Optionaler Filter auf Treffer (False = überspringen)
+        """
+        prefixes = {_PREFIX[kind] for kind in kinds} if kinds else None
+        with self._lock:
+            self._build_locked()
+            key_filter = (lambda key: key[0] in prefixes) if prefixes else None
+            if accept is not None:
+                base_filter = key_filter
+                key_filter = lambda key: ((base_filter is None or base_filter(key))
+                                          and accept(self._hit(key, 0.0)))
+
+            ranked = self._bm25.top_k(query, k * CANDIDATE_FACTOR if self._vectors else k, key_filter)
+            if self._vectors is not None:
+                ranked = self._fuse(ranked, query, k, key_filter)
+            return [self._hit(key, score) for key, score in ranked[:k]]
+
+    def _fuse(self, lexical: List[Tuple[str, float]], query: str, k: int,
+              key_filter: Optional[Callable[[str], bool]]) -> List[Tuple[str, float]]:
+        vector = self._embedder.embed([query])[0]
+        semantic = [(key, score) for key, score in self._vectors.top_k(vector, k * CANDIDATE_FACTOR)
+                    if key_filter is None or key_filter(key)]
+        fused: Dict[str, float] = {}
+        for ranking in (lexical, semantic):
+            for rank, (key, _score) in enumerate(ranking):
+                fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+    def _hit(self, key: str, score: float) -> RecallHit:
+        prefix, ref_id = key.split(':', 1)
+        text, label = self._docs[key]
+        return RecallHit(_KIND[prefix], int(ref_id), text, label, score)
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'built': self._built,
+                'documents': len(self._docs),
+                'vectors': self._vectors is not None,
+            }
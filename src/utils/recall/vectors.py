@@ -0,0 +1,160 @@
+"""
+Vectors – Optionale Embedding-Suche über eine NumPy-Memmap-Matrix.
+
+Ein Embedder (z.B. ein kleines CPU-Modell) wird über set_embedder() im
+Recall-Paket eingesteckt; ohne Embedder bleibt es bei reinem BM25. NumPy
+ist keine Pflicht-Abhängigkeit – VectorMatrix ist nur nutzbar, wenn
+numpy_available() True liefert.
+
+Die Matrix liegt neben der Persona-DB (<db>.vectors.f32, float32, Zeilen
+L2-normiert) und wird per np.memmap eingeblendet; die Zuordnung
+Zeile → Schlüssel steht in <db>.vectors.json. Neue Vektoren werden an
+freie Zeilen geschrieben, die Datei wächst blockweise.
+
+Usage:
+    matrix = VectorMatrix(db_path + '.vectors', dim=embedder.dim)
+    matrix.add('m:42', embedder.embed(['Ich war im Zoo'])[0])
+    matrix.top_k(embedder.embed(['Zoo'])[0], k=5)
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from utils.logger import log
+
+try:
+    import numpy as np
+except ImportError:  # optionale Abhängigkeit
+    np = None
+
+GROW_ROWS = 4096
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class Embedder(Protocol):
+    """Schnittstelle eines Embedding-Modells."""
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> Sequence[Sequence[float]]:
+        """Ein Vektor der Länge dim pro Text."""
+        ...
+
+
+class VectorMatrix:
+    """Memmap-Matrix normierter Vektoren mit Schlüssel-Zuordnung. Nicht thread-safe."""
+
+    def __init__(self, base_path: str, dim: int):
+        if np is None:
+            raise RuntimeError("NumPy ist nicht installiert – Vektor-Index nicht verfügbar")
+        self.dim = dim
+        self._data_path = base_path + '.f32'
+        self._keys_path = base_path + '.json'
+        self._rows: Dict[str, int] = {}
+        self._row_keys: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._capacity = 0
+        self._used = 0
+        self._matrix = None
+        self._load()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def keys(self) -> List[str]:
+        return list(self._rows)
+
+    def add(self, key: str, vector: Sequence[float]) -> None:
+        """Speichert den (normierten) Vektor unter dem Schlüssel."""
+        vec = np.asarray(vector, dtype=np.float32)
+        if vec.shape != (self.dim,):
+            raise ValueError(f"Vektor hat Dimension {vec.shape}, erwartet ({self.dim},)")
+        norm = float(np.linalg.norm(vec))
+        if norm:
+            vec = vec / norm
+        row = self._rows.get(key)
+        if row is None:
+            row = self._free.pop() if self._free else self._next_row()
+            self._rows[key] = row
+            self._row_keys[row] = key
+        self._matrix[row] = vec
+
+    def remove(self, key: str) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        self._matrix[row] = 0.0
+        self._row_keys[row] = None
+        self._free.append(row)
+        return True
+
+    def top_k(self, vector: Sequence[float], k: int = 5) -> List[Tuple[str, float]]:
+        """Die k ähnlichsten Schlüssel (Kosinus-Ähnlichkeit)."""
+        if not self._rows or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if not norm:
+            return []
+        sims = np.asarray(self._matrix[:self._used] @ (query / norm))
+        if self._free:
+            sims[self._free] = -np.inf
+        k = min(k, len(self._rows))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [(self._row_keys[int(r)], float(sims[r])) for r in top]
+
+    def flush(self) -> None:
+        """Schreibt Matrix und Schlüssel-Zuordnung auf die Platte."""
+        if self._matrix is not None:
+            self._matrix.flush()
+        tmp_path = self._keys_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'dim': self.dim, 'used': self._used, 'rows': self._rows}, f)
+        os.replace(tmp_path, self._keys_path)
+
+    # ===== Intern =====
+
+    def _next_row(self) -> int:
+        if self._used >= self._capacity:
+            self._open(self._capacity + GROW_ROWS)
+        self._used += 1
+        self._row_keys.append(None)
+        return self._used - 1
+
+    def _open(self, capacity: int) -> None:
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self._data_path, 'ab') as f:
+            f.truncate(capacity * self.dim * 4)
+        self._matrix = np.memmap(self._data_path, dtype=np.float32, mode='r+',
+                                 shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def _load(self) -> None:
+        meta: Optional[dict] = None
+        try:
+            with open(self._keys_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log.warning("Vektor-Index nicht lesbar, wird neu aufgebaut: %s", e)
+        if not meta or meta.get('dim') != self.dim or not os.path.exists(self._data_path):
+            if os.path.exists(self._data_path):
+                os.remove(self._data_path)
+            self._open(GROW_ROWS)
+            return
+        rows_on_disk = os.path.getsize(self._data_path) // (self.dim * 4)
+        self._open(max(rows_on_disk, GROW_ROWS))
+        self._rows = {key: int(row) for key, row in meta.get('rows', {}).items()}
+        self._used = int(meta.get('used', 0))
+        self._row_keys = [None] * self._used
+        for key, row in self._rows.items():
+            self._row_keys[row] = key
+        used_rows = set(self._rows.values())
+        self._free = [row for row in range(self._used) if row not in used_rows]
@@ -14,6 +14,11 @@ from ..logger import log
 from ..config import load_character
 
 
+# Recall-Kontext ({{recalled_context}})
+RECALL_TOP_K = 5
+RECALL_SNIPPET_CHARS = 400
+
+
 def _read_setting(key: str, default=None):
     """Liest ein Setting aus user_settings.json mit defaults.json Fallback."""
     import os
@@ -66,7 +71,7 @@ class ChatService:
         except Exception as e:
             log.error("ChatService: PromptEngine konnte nicht geladen werden: %s", e)
 
-    def _load_cortex_context(self, persona_id: str = None) -> Dict[str, str]:
+    def _load_cortex_context(self, persona_id: str = None, query: str = None) -> Dict[str, str]:
         """
         Lädt Cortex-Dateien als Placeholder-Werte für die PromptEngine.
 
@@ -76,6 +81,8 @@ class ChatService:
 
         Args:
             persona_id: Optional Persona-ID (Default: aktive Persona)
+            query: Aktuelle Nachricht – bestimmt, welche Einträge bei
+                   überschrittenem cortexTokenBudget ausgewählt werden
 
         Returns:
             Dict mit cortex_memory, cortex_soul, cortex_relationship
@@ -98,11 +105,59 @@ class ChatService:
                 from ..config import get_active_persona_id
                 persona_id = get_active_persona_id()
 
-            return cortex_service.get_cortex_for_prompt(persona_id)
+            from ..cortex_service import CORTEX_PROMPT_TOKEN_BUDGET
+            token_budget = _read_setting('cortexTokenBudget', CORTEX_PROMPT_TOKEN_BUDGET)
+            return cortex_service.get_cortex_for_prompt(
+                persona_id, query=query, token_budget=token_budget
+            )
         except Exception as e:
             log.warning("Cortex-Kontext konnte nicht geladen werden: %s", e)
             return empty
 
+    def _load_recalled_context(self, persona_id: str, query: str,
+                               conversation_history: list, exclude_text: str = '') -> str:
+        """
+        Sucht ältere Nachrichten und Cortex-Einträge zur aktuellen Nachricht
+        ({{recalled_context}}).
+
+        Nur aktiv mit recallEnabled. Treffer, die schon im Kontextfenster
+        (conversation_history) oder im Cortex-Block stehen, werden übersprungen.
+
+        Returns:
+            '### Recalled Moments\n\n- ...' oder '' (Block entfällt dann)
+        """
+        if not query or not _read_setting('recallEnabled', False):
+            return ''
+        try:
+            from ..recall import MESSAGE, get_recall_index
+
+            if persona_id is None:
+                from ..config import get_active_persona_id
+                persona_id = get_active_persona_id()
+
+            visible = [m.get('content') for m in conversation_history or []
+                       if isinstance(m.get('content'), str)]
+
+            def accept(hit) -> bool:
+                if hit.text == query or (exclude_text and hit.text in exclude_text):
+                    return False
+                return hit.kind != MESSAGE or not any(hit.text in content for content in visible)
+
+            top_k = int(_read_setting('recallTopK', RECALL_TOP_K))
+            hits = get_recall_index(persona_id).top_k(query, k=top_k, accept=accept)
+        except Exception as e:
+            log.warning("Recall-Kontext konnte nicht geladen werden: %s", e)
+            return ''
+
+        if not hits:
+            return ''
+        lines = []
+        for hit in hits:
+            text = hit.text if len(hit.text) <= RECALL_SNIPPET_CHARS else hit.text[:RECALL_SNIPPET_CHARS].rstrip() + '…'
+            text = ' '.join(text.split())
+            lines.append(f"- {hit.label}: {text}" if hit.kind == MESSAGE else f"- {text}")
+        return "### Recalled Moments\n\n" + '\n'.join(lines)
+
     def _build_chat_messages(self, user_message: str, conversation_history: list,
                               char_name: str, user_name: str,
                               nsfw_mode: bool, pending_afterthought: str = None) -> tuple:
@@ -309,8 +364,12 @@ class ChatService:
             except Exception as e:
                 log.warning("last_encounter computation failed: %s", e)
             # Cortex-Daten laden und als runtime_vars hinzufügen
-            cortex_data = self._load_cortex_context(persona_id)
+            cortex_data = self._load_cortex_context(persona_id, query=user_message)
             runtime_vars.update(cortex_data)
+            runtime_vars['recalled_context'] = self._load_recalled_context(
+                persona_id, user_message, conversation_history,
+                exclude_text='\n'.join(cortex_data.values())
+            )
             system_prompt = self._engine.build_system_prompt(variant=variant, runtime_vars=runtime_vars) or ''
         else:
             log.error("ChatService: Kein System-Prompt — PromptEngine nicht verfügbar!")
@@ -490,7 +549,7 @@ class ChatService:
             if ip_address:
                 runtime_vars['ip_address'] = ip_address
             # Cortex-Daten laden und als runtime_vars hinzufügen
-            cortex_data = self._load_cortex_context(persona_id)
+            cortex_data = self._load_cortex_context(persona_id, query=inner_dialogue)
             runtime_vars.update(cortex_data)
 
             if not self._engine:
@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional
 
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _DEFAULTS_FILE = os.path.join(_BASE_DIR, 'settings', 'defaults.json')
+_USER_SETTINGS_FILE = os.path.join(_BASE_DIR, 'settings', 'user_settings.json')
 _MODEL_OPTIONS_FILE = os.path.join(_BASE_DIR, 'settings', 'model_options.json')
 _DEFAULTS_CACHE: Optional[Dict[str, Any]] = None
 _MODEL_OPTIONS_CACHE: Optional[List[Dict[str, Any]]] = None
@@ -33,6 +34,19 @@ def get_default(key: str, fallback: Any = None) -> Any:
     return defaults.get(key, fallback)
 
 
+def get_setting(key: str, fallback: Any = None) -> Any:
+    """Gibt ein Setting zurück: user_settings.json, sonst Default (nicht gecacht)."""
+    try:
+        if os.path.exists(_USER_SETTINGS_FILE):
+            with open(_USER_SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if key in data:
+                return data[key]
+    except Exception:
+        pass
+    return get_default(key, fallback)
+
+
 def get_api_model_default() -> Optional[str]:
     """Gibt das Default-Modell für die API zurück."""
     return get_default('apiModel')